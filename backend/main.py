@@ -156,7 +156,7 @@
 # async def protected_route(current_user: User = Depends(get_current_user)):
 #     return {"message": f"Hello, {current_user.username}! This is a protected route."}
 
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
@@ -165,22 +165,34 @@ from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from typing import Optional
 from sqlalchemy.orm import Session
+import asyncio
 import os
+import time
 from dotenv import load_dotenv
 
 # Local modules
 from database import SessionLocal, engine
 from models import Base, User as DBUser
+from mental_health_ml.utils.structured_logging import configure_logging, get_logger
+
+# Queue-backed structured logging, set up before the routers load their models
+configure_logging()
 
 # ML Inference Routers
 from mental_health_ml.inference.assessment_endpoint import router as assessment_router
 from mental_health_ml.inference.chatbot_endpoint import router as chatbot_router 
 from mental_health_ml.inference.recommendation_endpoint import router as recommendation_router
+from mental_health_ml.utils.metrics import REGISTRY, PROMETHEUS_CONTENT_TYPE, timed
+from mental_health_ml.utils.profiling import (
+    DEBUG_TRACE_HEADER, PROFILING_TOKEN_HEADER, ProfilerBusyError, profiling_authorized,
+    request_trace, sampling_profile, server_timing_header
+)
 
 # Load environment variables
 load_dotenv()
 
 app = FastAPI(title="Mental Health Support API")
+logger = get_logger("backend")
 
 # CORS configuration
 app.add_middleware(
@@ -191,6 +203,48 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency and errors, labelled with the route template (not the raw path) to keep cardinality bounded
+HTTP_REQUEST_DURATION = REGISTRY.histogram("http_request_duration_seconds", "Time until the response starts, per route")
+HTTP_REQUEST_ERRORS = REGISTRY.counter("http_request_errors_total", "Requests that failed with a 5xx status or an exception")
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        HTTP_REQUEST_DURATION.observe(time.perf_counter() - start, method=request.method, route=route, status=status_code)
+        if status_code >= 500:
+            HTTP_REQUEST_ERRORS.inc(method=request.method, route=route)
+
+@app.middleware("http")
+async def trace_debug_requests(request: Request, call_next):
+    """
+    Requests sent with X-Debug-Trace: <PROFILING_TOKEN> get the timed() model stages they ran
+    in a Server-Timing header. Streamed bodies finish after the headers are sent, so the
+    complete trace is also logged once the body is done.
+    """
+    if not profiling_authorized(request.headers.get(DEBUG_TRACE_HEADER)):
+        return await call_next(request)
+    start = time.perf_counter()
+    with request_trace() as trace:
+        response = await call_next(request)
+    response.headers["Server-Timing"] = server_timing_header(trace, time.perf_counter() - start)
+    body = response.body_iterator
+
+    async def body_then_log_trace():
+        async for chunk in body:
+            yield chunk
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        logger.info("request_trace", route=route, server_timing=server_timing_header(trace, time.perf_counter() - start))
+
+    response.body_iterator = body_then_log_trace()
+    return response
+
 
 # JWT Config
 SECRET_KEY = os.getenv("SECRET_KEY")
@@ -234,6 +288,7 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+@timed("db", op="get_user")
 def get_user(db: Session, username: str):
     return db.query(DBUser).filter(DBUser.username == username).first()
 
@@ -312,9 +367,10 @@ async def register_user(user: UserInDB, db: Session = Depends(get_db)):
         hashed_password=get_password_hash(user.hashed_password),
         disabled=False
     )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    with timed("db", op="register_user"):
+        db.add(db_user)
+        db.commit()
+        db.refresh(db_user)
     return {"message": "User registered successfully"}
 
 
@@ -322,6 +378,29 @@ async def register_user(user: UserInDB, db: Session = Depends(get_db)):
 async def health_check():
     return {"status": "healthy", "models": "loaded"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint: every metric in the shared registry, in the text exposition format."""
+    return Response(REGISTRY.render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+@app.post("/admin/profile", include_in_schema=False)
+async def profile_worker(request: Request, seconds: float = 10.0, interval_ms: float = 10.0):
+    """
+    Samples the stacks of every thread in this worker process for `seconds` and returns
+    them as collapsed stacks (flamegraph.pl / speedscope input). Needs PROFILING_TOKEN in
+    X-Profiling-Token; one profile per worker at a time.
+    """
+    if not profiling_authorized(request.headers.get(PROFILING_TOKEN_HEADER)):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND) # Disabled looks like a missing route
+    try:
+        with sampling_profile(seconds, interval_ms) as sampler:
+            await asyncio.sleep(seconds)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return Response(sampler.collapsed(), media_type="text/plain", headers={"X-Profile-Samples": str(sampler.samples)})
+
 # Include ML Routers
 app.include_router(assessment_router, prefix="/api/assessment", tags=["Assessment"])
 app.include_router(chatbot_router, prefix="/api/chat", tags=["Chatbot"])
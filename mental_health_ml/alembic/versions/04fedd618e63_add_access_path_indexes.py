@@ -0,0 +1,42 @@
+"""add_access_path_indexes
+
+Revision ID: 04fedd618e63
+Revises: 92fd7f7fd019
+Create Date: 2026-10-19 10:12:41.503218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '04fedd618e63'
+down_revision: Union[str, None] = '92fd7f7fd019'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index, table, columns); kept in sync with __table_args__ in models/db_models.py
+INDEXES = [
+    ('ix_chat_messages_session_id_timestamp', 'chat_messages', ['session_id', 'timestamp']),
+    ('ix_chat_messages_timestamp', 'chat_messages', ['timestamp']),
+    ('ix_user_assessment_responses_session_id_question_id', 'user_assessment_responses', ['session_id', 'question_id']),
+    ('ix_ml_crisis_predictions_chat_session_id_prediction_timestamp', 'ml_crisis_predictions', ['chat_session_id', 'prediction_timestamp']),
+    ('ix_ml_crisis_predictions_chat_message_id', 'ml_crisis_predictions', ['chat_message_id']),
+    ('ix_ml_crisis_predictions_prediction_timestamp', 'ml_crisis_predictions', ['prediction_timestamp']),
+    ('ix_ml_emotion_predictions_prediction_timestamp', 'ml_emotion_predictions', ['prediction_timestamp']),
+    ('ix_user_resource_interactions_user_id_timestamp', 'user_resource_interactions', ['user_id', 'timestamp']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,129 @@
+"""optional_time_partitioning
+
+Opt-in monthly range partitioning of chat_messages, ml_crisis_predictions and
+ml_emotion_predictions (PostgreSQL only). Nothing changes unless enabled with
+DB_TIME_PARTITIONING=1 or `alembic -x time_partitioning=true upgrade head`; to
+enable it later, downgrade to 04fedd618e63 and upgrade again with the flag.
+
+Each table is rebuilt as a partitioned copy (monthly partitions covering the
+existing rows and PARTITION_MONTHS_AHEAD months ahead, plus a default partition)
+and the rows are copied over, so run it in a maintenance window. Partitioned
+tables need the partition key in every unique constraint, hence:
+- the primary keys become (id, <timestamp>),
+- the foreign keys to chat_messages.id and the unique constraint on
+  ml_emotion_predictions.chat_message_id are dropped (the prediction writer
+  inserts messages before their predictions); downgrade restores them.
+Upcoming partitions are created, and expired ones dropped, by
+services/data_retention.py.
+
+Revision ID: 9febcd92d282
+Revises: 04fedd618e63
+Create Date: 2026-10-19 10:31:07.118436
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+from mental_health_ml.services.data_retention import (
+    DB_TIME_PARTITIONING, PARTITION_MONTHS_AHEAD, add_months, ensure_partitions, is_partitioned, month_start
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9febcd92d282'
+down_revision: Union[str, None] = '04fedd618e63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# In rebuild order: chat_messages first, so its foreign keys can be restored on downgrade.
+TABLES = {
+    'chat_messages': {
+        'key': 'timestamp',
+        'indexes': [('ix_chat_messages_session_id_timestamp', ['session_id', 'timestamp']),
+                    ('ix_chat_messages_timestamp', ['timestamp'])],
+        'foreign_keys': [('chat_messages_session_id_fkey', 'session_id', 'chat_sessions')],
+    },
+    'ml_crisis_predictions': {
+        'key': 'prediction_timestamp',
+        'indexes': [('ix_ml_crisis_predictions_chat_session_id_prediction_timestamp', ['chat_session_id', 'prediction_timestamp']),
+                    ('ix_ml_crisis_predictions_chat_message_id', ['chat_message_id']),
+                    ('ix_ml_crisis_predictions_prediction_timestamp', ['prediction_timestamp'])],
+        'foreign_keys': [('ml_crisis_predictions_chat_session_id_fkey', 'chat_session_id', 'chat_sessions'),
+                         ('ml_crisis_predictions_chat_message_id_fkey', 'chat_message_id', 'chat_messages')],
+    },
+    'ml_emotion_predictions': {
+        'key': 'prediction_timestamp',
+        'indexes': [('ix_ml_emotion_predictions_prediction_timestamp', ['prediction_timestamp'])],
+        'foreign_keys': [('ml_emotion_predictions_chat_message_id_fkey', 'chat_message_id', 'chat_messages')],
+        'unique': ('ml_emotion_predictions_chat_message_id_key', 'ix_ml_emotion_predictions_chat_message_id', ['chat_message_id']),
+    },
+}
+
+
+def _enabled() -> bool:
+    flag = context.get_x_argument(as_dictionary=True).get('time_partitioning', '')
+    return DB_TIME_PARTITIONING or flag.lower() in ('1', 'true')
+
+
+def _rebuild(table: str, spec: dict, partitioned: bool) -> None:
+    """Replaces table with a partitioned (or plain) copy holding the same rows."""
+    bind = op.get_bind()
+    key = spec['key']
+    rebuilt = f'{table}_rebuilt'
+    if partitioned:
+        op.execute(f'UPDATE {table} SET "{key}" = now() WHERE "{key}" IS NULL')
+        op.execute(f'CREATE TABLE {rebuilt} (LIKE {table} INCLUDING DEFAULTS) PARTITION BY RANGE ("{key}")')
+        op.execute(f'ALTER TABLE {rebuilt} ALTER COLUMN "{key}" SET NOT NULL')
+        op.execute(f'CREATE TABLE {table}_default PARTITION OF {rebuilt} DEFAULT')
+        now = datetime.now(timezone.utc)
+        first = bind.execute(sa.text(f'SELECT min("{key}") FROM {table}')).scalar() or now
+        ensure_partitions(bind, table, first, add_months(month_start(now), PARTITION_MONTHS_AHEAD), parent=rebuilt)
+    else:
+        op.execute(f'CREATE TABLE {rebuilt} (LIKE {table} INCLUDING DEFAULTS)')
+    op.execute(f'INSERT INTO {rebuilt} SELECT * FROM {table}')
+
+    # Integer ids: keep the serial sequence alive when the old table is dropped
+    sequence = bind.execute(sa.text("SELECT pg_get_serial_sequence(:table, 'id')"), {'table': table}).scalar()
+    if sequence:
+        op.execute(f'ALTER SEQUENCE {sequence} OWNED BY NONE')
+    op.execute(f'DROP TABLE {table} CASCADE') # Also drops the foreign keys pointing at it (and old partitions)
+    op.execute(f'ALTER TABLE {rebuilt} RENAME TO {table}')
+    if sequence:
+        op.execute(f'ALTER SEQUENCE {sequence} OWNED BY {table}.id')
+
+    op.create_primary_key(f'{table}_pkey', table, ['id', key] if partitioned else ['id'])
+    for name, columns in spec['indexes']:
+        op.create_index(name, table, columns, unique=False)
+    if 'unique' in spec:
+        constraint, index, columns = spec['unique']
+        if partitioned:
+            op.create_index(index, table, columns, unique=False)
+        else:
+            op.create_unique_constraint(constraint, table, columns)
+    for name, column, referred in spec['foreign_keys']:
+        if partitioned and referred in TABLES:
+            continue # Cannot reference a partitioned table by id alone
+        op.create_foreign_key(name, table, referred, [column], ['id'])
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql' or not _enabled():
+        return
+    for table, spec in TABLES.items():
+        if not is_partitioned(bind, table):
+            _rebuild(table, spec, partitioned=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    for table, spec in TABLES.items():
+        if is_partitioned(bind, table):
+            _rebuild(table, spec, partitioned=False)
@@ -0,0 +1,83 @@
+# mental_health_ml/benchmarks/bench_assessment_preprocessing.py
+"""
+Compares assessment preprocessing paths on mental_health_assessment_dataset.csv:
+    legacy_text_build   iterrows() + "Q1: 2 Q2: 3 ..." strings (no tokenization)
+    legacy_text_full    the above + BERT tokenization (--with-tokenizer; downloads the tokenizer)
+    numeric_vectorized  fit-free transform of the Likert answers to float32 [0, 1]
+
+Run from mental_health_ml/:
+    python -m benchmarks.bench_assessment_preprocessing --repeat 5
+"""
+import argparse
+import json
+import time
+
+import pandas as pd
+
+from data.preprocessing.assessment_preprocessing import AssessmentPreprocessor, ASSESSMENT_TARGET_COLUMNS
+
+DEFAULT_DATA_PATH = "../mental_health_assessment_dataset.csv"
+
+
+def legacy_text_build(assessment_df):
+    """The string-building half of preprocess_assessments_as_text, without the tokenizer."""
+    texts = []
+    for _, row in assessment_df.iterrows():
+        texts.append(" ".join([f"Q{i+1}: {ans}" for i, ans in enumerate(row) if pd.notna(ans)]))
+    return texts
+
+
+def time_call(fn, repeat: int) -> float:
+    """Best-of-`repeat` wall time in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(data_path: str = DEFAULT_DATA_PATH, repeat: int = 5, with_tokenizer: bool = False) -> dict:
+    data = pd.read_csv(data_path, encoding="latin-1")
+    X = data.drop(columns=ASSESSMENT_TARGET_COLUMNS)
+    preprocessor = AssessmentPreprocessor().fit_numeric(X)
+
+    timings = {
+        "legacy_text_build": time_call(lambda: legacy_text_build(X), repeat),
+        "numeric_vectorized": time_call(lambda: preprocessor.preprocess_assessments(X), repeat),
+    }
+    if with_tokenizer:
+        preprocessor.tokenizer # Load outside the timed region
+        timings["legacy_text_full"] = time_call(lambda: preprocessor.preprocess_assessments_as_text(X), repeat)
+
+    results = {
+        "rows": len(X),
+        "numeric_columns": preprocessor.num_numeric_features,
+        "text_columns": len(preprocessor.text_columns),
+        "paths": {
+            name: {"seconds": round(seconds, 6), "rows_per_sec": round(len(X) / seconds, 1)}
+            for name, seconds in timings.items()
+        },
+    }
+    baseline = timings.get("legacy_text_full", timings["legacy_text_build"])
+    results["numeric_speedup_vs_legacy"] = round(baseline / timings["numeric_vectorized"], 1)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=DEFAULT_DATA_PATH)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--with-tokenizer", action="store_true")
+    parser.add_argument("--output", default=None, help="Optional JSON output path")
+    args = parser.parse_args()
+
+    results = run(args.data, args.repeat, args.with_tokenizer)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
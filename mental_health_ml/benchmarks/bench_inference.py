@@ -0,0 +1,339 @@
+# mental_health_ml/benchmarks/bench_inference.py
+"""
+End-to-end latency of the inference routers, driven in-process through ASGI (no
+network, no server) under concurrent load:
+    chat         POST /api/chat/chat
+    chat_stream  POST /api/chat/chat/stream (ttfb_ms = time to the first SSE event)
+    assessment   POST /api/assessment/analyze
+    recommend    POST /api/resources/recommend
+
+--models stub (default) replaces the model modules with benchmarks/stub_models.py,
+which sleep for a deterministic, input-dependent time, so the numbers measure the
+orchestration code and are comparable between commits. --models real imports the
+routers as they are (local model artifacts required).
+
+Each scenario reports p50/p95/p99 latency, throughput, and a per-stage breakdown
+(the model and helper calls the route makes, timed where the route calls them).
+With --baseline, percentiles are compared to an earlier result and the run exits
+non-zero when one regressed by more than --max-regression.
+
+Run from mental_health_ml/:
+    python -m benchmarks.bench_inference --requests 500 --concurrency 16 --output bench.json
+    python -m benchmarks.bench_inference --baseline bench.json --max-regression 0.1
+"""
+import argparse
+import asyncio
+import contextlib
+import functools
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from benchmarks import stub_models
+
+SCENARIOS = ("chat", "chat_stream", "assessment", "recommend")
+ROUTE_PATHS = {
+    "chat": "/api/chat/chat",
+    "chat_stream": "/api/chat/chat/stream",
+    "assessment": "/api/assessment/analyze",
+    "recommend": "/api/resources/recommend",
+}
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * q // 100)) # ceil(n * q / 100)
+    return sorted_values[int(rank) - 1]
+
+
+def summarize_ms(seconds: list) -> dict:
+    values = sorted(s * 1000.0 for s in seconds)
+    summary = {f"p{q}": round(percentile(values, q), 3) for q in PERCENTILES}
+    summary["mean"] = round(sum(values) / len(values), 3) if values else 0.0
+    summary["max"] = round(values[-1], 3) if values else 0.0
+    return summary
+
+
+class StageTimer:
+    """Wall time of every call to the instrumented functions, per stage."""
+    def __init__(self):
+        self.durations = {}
+
+    def wrap(self, stage: str, fn):
+        durations = self.durations.setdefault(stage, [])
+
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                durations.append(time.perf_counter() - start) # list.append is atomic, safe from threadpool stages
+        return timed
+
+    def instrument(self, owner, attribute: str, stage: str):
+        setattr(owner, attribute, self.wrap(stage, getattr(owner, attribute)))
+
+    def reset(self):
+        for durations in self.durations.values():
+            durations.clear()
+
+    def report(self, n_requests: int) -> dict:
+        stages = {}
+        for stage, durations in self.durations.items():
+            if durations:
+                stages[stage] = {"calls": len(durations), **summarize_ms(durations),
+                                 "ms_per_request": round(sum(durations) * 1000.0 / n_requests, 3)}
+        return stages
+
+
+# scenario -> (router module, mount prefix as in backend/main.py)
+SCENARIO_ROUTERS = {
+    "chat": ("inference.chatbot_endpoint", "/api/chat"),
+    "chat_stream": ("inference.chatbot_endpoint", "/api/chat"),
+    "assessment": ("inference.assessment_endpoint", "/api/assessment"),
+    "recommend": ("inference.recommendation_endpoint", "/api/resources"),
+}
+
+
+def instrument_router(module, timer: StageTimer):
+    """Times the stages each route calls. Module-level names are looked up at call time,
+    so replacing them times every call site."""
+    name = module.__name__.rsplit(".", 1)[-1]
+    if name == "chatbot_endpoint":
+        timer.instrument(module, "get_history_text", "history")
+        timer.instrument(module, "detect_crisis_hybrid", "crisis")
+        timer.instrument(module, "update_session_risk", "session_risk")
+        timer.instrument(module.chatbot, "generate_response", "generate_response")
+        timer.instrument(module.emotion_detector, "detect_emotion", "emotion")
+        timer.instrument(module, "get_resource_recommendations", "resources")
+        timer.instrument(module, "notify_crisis_team", "notify_crisis_team")
+    elif name == "assessment_endpoint":
+        timer.instrument(module, "predict_assessment_batch", "predict")
+        timer.instrument(module, "build_assessment_response", "build_response")
+    elif name == "recommendation_endpoint":
+        timer.instrument(module.recommender, "recommend_for_assessment", "recommend_for_assessment")
+        timer.instrument(module.recommender, "recommend_for_user", "recommend_for_user")
+
+
+def build_app(scenarios, models: str, latency_ms: dict, jitter: float, timer: StageTimer):
+    """The routers the scenarios need, mounted as in backend/main.py, with their stages instrumented."""
+    if models == "stub":
+        stub_models.install(latency_ms, jitter)
+    from fastapi import FastAPI
+
+    app = FastAPI()
+    for module_name, prefix in dict(SCENARIO_ROUTERS[s] for s in scenarios).items():
+        module = importlib.import_module(module_name)
+        instrument_router(module, timer)
+        app.include_router(module.router, prefix=prefix)
+    return app
+
+
+def build_payloads(scenario: str, n: int, seed: int) -> list:
+    """Deterministic request bodies, from the synthetic data generator."""
+    from datetime import datetime
+    from data.datasets.generate_sample_data import SampleDataGenerator, QUESTION_IDS, LABEL_COLUMNS
+
+    generator = SampleDataGenerator(seed=seed, reference_time=datetime(2025, 1, 1))
+    if scenario in ("chat", "chat_stream"):
+        frame = generator.generate_transcript_frame(max(1, n // 3))
+        messages = frame[frame["role"] == "user"]
+        rows = list(zip(messages["conversation_id"].tolist(), messages["content"].tolist()))
+        return [{"message": text, "session_id": session_id} for session_id, text in (rows * (n // len(rows) + 1))[:n]]
+
+    frame = generator.generate_frame(n)
+    if scenario == "assessment":
+        columns = [f"response_{q_id}" for q_id in QUESTION_IDS] + ["response_additional_comments"]
+        return [{"responses": {column[len("response_"):]: str(value) for column, value in zip(columns, row)}}
+                for row in frame[columns].itertuples(index=False)]
+    payloads = []
+    for i, row in enumerate(frame[LABEL_COLUMNS + ["mental_state_category"]].itertuples(index=False)):
+        if i % 2 == 0:
+            payloads.append({"assessment_results": dict(zip(LABEL_COLUMNS, map(float, row[:-1]))), "limit": 5})
+        else:
+            payloads.append({"user_profile": {"needs": [row[-1]], "interests": ["mindfulness"]}, "limit": 5})
+    return payloads
+
+
+async def asgi_post(app, path: str, payload: dict) -> tuple:
+    """POSTs a JSON body straight into the ASGI app. Returns (status, ttfb_seconds, total_seconds)."""
+    body = json.dumps(payload).encode("utf-8")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": path, "raw_path": path.encode("utf-8"), "query_string": b"",
+        "root_path": "", "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+        "headers": [(b"host", b"bench"), (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("ascii"))],
+    }
+    finished = asyncio.Event()
+    state = {"status": None, "first_byte": None, "request_sent": False}
+
+    async def receive():
+        if not state["request_sent"]:
+            state["request_sent"] = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await finished.wait() # The client stays connected until the response is complete
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            state["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            if state["first_byte"] is None and message.get("body"):
+                state["first_byte"] = time.perf_counter()
+            if not message.get("more_body", False):
+                finished.set()
+
+    start = time.perf_counter()
+    try:
+        await app(scope, receive, send)
+    finally:
+        finished.set()
+    end = time.perf_counter()
+    return state["status"], (state["first_byte"] or end) - start, end - start
+
+
+async def run_load(app, path: str, payloads: list, concurrency: int) -> dict:
+    """Sends every payload, with `concurrency` requests in flight at a time."""
+    latencies, ttfbs, statuses = [], [], {}
+    next_index = iter(range(len(payloads)))
+
+    async def worker():
+        for i in next_index: # Shared iterator: each worker takes the next payload when it is free
+            try:
+                status, ttfb, total = await asgi_post(app, path, payloads[i])
+            except Exception as e:
+                status, ttfb, total = f"exception:{type(e).__name__}", 0.0, 0.0
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+            if status == 200:
+                latencies.append(total)
+                ttfbs.append(ttfb)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.perf_counter() - start
+    return {
+        "requests": len(payloads),
+        "errors": len(payloads) - len(latencies),
+        "status_counts": statuses,
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(len(latencies) / duration, 2) if duration else 0.0,
+        "latency_ms": summarize_ms(latencies),
+        "ttfb_ms": summarize_ms(ttfbs),
+    }
+
+
+def run(scenarios=SCENARIOS, n_requests: int = 500, concurrency: int = 16, warmup: int = 20,
+        models: str = "stub", latency_ms: dict = None, jitter: float = stub_models.DEFAULT_STUB_JITTER,
+        seed: int = 0) -> dict:
+    timer = StageTimer()
+    app = build_app(scenarios, models, latency_ms, jitter, timer)
+    results = {}
+    for scenario in scenarios:
+        path = ROUTE_PATHS[scenario]
+        if warmup:
+            with contextlib.redirect_stdout(sys.stderr):
+                asyncio.run(run_load(app, path, build_payloads(scenario, warmup, seed + 1), concurrency))
+        payloads = build_payloads(scenario, n_requests, seed)
+        timer.reset()
+        with contextlib.redirect_stdout(sys.stderr): # Keeps the routes' own prints out of the JSON report
+            result = asyncio.run(run_load(app, path, payloads, concurrency))
+        result["stages"] = timer.report(n_requests)
+        results[scenario] = result
+    return {
+        "benchmark": "inference",
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "config": {
+            "models": models, "requests": n_requests, "concurrency": concurrency, "warmup": warmup, "seed": seed,
+            "stub_latency_ms": {**stub_models.DEFAULT_STUB_LATENCY_MS, **(latency_ms or {})} if models == "stub" else None,
+            "stub_jitter": jitter if models == "stub" else None,
+        },
+        "scenarios": results,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> list:
+    """Latency percentiles that grew by more than max_regression (relative) since the baseline."""
+    regressions = []
+    for scenario, result in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(scenario)
+        if not previous:
+            continue
+        for q in PERCENTILES:
+            key = f"p{q}"
+            before, after = previous["latency_ms"][key], result["latency_ms"][key]
+            change = (after - before) / before if before else 0.0
+            result.setdefault("vs_baseline", {})[key] = round(change, 4)
+            if change > max_regression:
+                regressions.append({"scenario": scenario, "percentile": key, "baseline_ms": before,
+                                    "current_ms": after, "change": round(change, 4)})
+    return regressions
+
+
+def parse_latency(spec: str) -> dict:
+    """"chatbot=80,emotion=15" -> {"chatbot": 80.0, "emotion": 15.0}"""
+    latency_ms = {}
+    for item in filter(None, spec.split(",")):
+        stage, value = item.split("=", 1)
+        if stage not in stub_models.DEFAULT_STUB_LATENCY_MS:
+            raise argparse.ArgumentTypeError(f"Unknown stub stage '{stage}'")
+        latency_ms[stage] = float(value)
+    return latency_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated subset of: " + ", ".join(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=500, help="Measured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests per scenario")
+    parser.add_argument("--models", choices=["stub", "real"], default="stub")
+    parser.add_argument("--stub-latency", type=parse_latency, default={},
+                        help="Per-stage stub latency in ms, e.g. chatbot=80,emotion=15,crisis_ml=30")
+    parser.add_argument("--stub-jitter", type=float, default=stub_models.DEFAULT_STUB_JITTER)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=None, help="Earlier JSON result to compare percentiles against")
+    parser.add_argument("--max-regression", type=float, default=0.1, help="Allowed relative percentile growth vs --baseline")
+    parser.add_argument("--output", default=None, help="Optional JSON output path")
+    args = parser.parse_args()
+
+    scenarios = [s for s in args.scenarios.split(",") if s]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    results = run(scenarios, args.requests, args.concurrency, args.warmup, args.models,
+                  args.stub_latency, args.stub_jitter, args.seed)
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        results["regressions"] = regressions
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# mental_health_ml/benchmarks/bench_text_pipeline.py
+"""
+Throughput of the text cleaning / anonymization paths on a synthetic corpus:
+    legacy_inline_re     re.sub with inline pattern strings, as before precompilation
+    compiled_functions   anonymize_personal_info + clean_text (precompiled patterns)
+    fused_pipeline       build_text_pipeline().process (two fused regex passes)
+    process_many_<N>w    the fused pipeline over a process pool, for each worker count
+
+Run from mental_health_ml/:
+    python -m benchmarks.bench_text_pipeline --messages 1000000 --workers 2,4
+"""
+import argparse
+import json
+import os
+import random
+import re
+import time
+
+from utils.data_pipeline import build_text_pipeline, clean_text, anonymize_personal_info
+
+_TEMPLATES = [
+    "I've been feeling really {mood} lately, can't sleep!!",
+    "My name is {name} and I need someone to talk to.",
+    "Please call me at {phone} or email {email} :)",
+    "Work is   overwhelming... deadlines\tevery day & no breaks #stressed",
+    "Thanks, that breathing exercise helped a bit.",
+    "why do I always feel like this?? {mood} again",
+]
+_WORDS = {
+    "mood": ["anxious", "down", "hopeless", "okay", "stressed", "tired"],
+    "name": ["Alex", "Sam", "Jordan", "Taylor"],
+    "phone": ["555-123-4567", "555.987.6543", "5551112222"],
+    "email": ["alex@example.com", "sam.t@mail.org", "j_doe99@uni.edu"],
+}
+
+
+def synthetic_messages(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    for _ in range(n):
+        yield rng.choice(_TEMPLATES).format(**{key: rng.choice(values) for key, values in _WORDS.items()})
+
+
+def legacy_clean(text):
+    text = re.sub(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', '[EMAIL]', text)
+    text = re.sub(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b', '[PHONE]', text)
+    text = re.sub(r'\bmy name is \w+\b', 'my name is [NAME]', text, flags=re.IGNORECASE)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'[^\w\s\.\!\?\,\;\:]', '', text)
+    return text.lower().strip()
+
+
+def _timed(n: int, results) -> dict:
+    start = time.perf_counter()
+    count = sum(1 for _ in results)
+    seconds = time.perf_counter() - start
+    assert count == n
+    return {"seconds": round(seconds, 3), "messages_per_sec": round(n / seconds, 1)}
+
+
+def run(n: int, worker_counts: list, chunk_size: int = 2000, seed: int = 0) -> dict:
+    pipeline = build_text_pipeline(anonymize=True)
+    paths = {
+        "legacy_inline_re": _timed(n, (legacy_clean(m) for m in synthetic_messages(n, seed))),
+        "compiled_functions": _timed(n, (clean_text(anonymize_personal_info(m)) for m in synthetic_messages(n, seed))),
+        "fused_pipeline": _timed(n, pipeline.process_many(synthetic_messages(n, seed))),
+    }
+    for workers in worker_counts:
+        paths[f"process_many_{workers}w"] = _timed(
+            n, pipeline.process_many(synthetic_messages(n, seed), workers=workers, chunk_size=chunk_size)
+        )
+    baseline = paths["legacy_inline_re"]["messages_per_sec"]
+    for result in paths.values():
+        result["speedup"] = round(result["messages_per_sec"] / baseline, 2)
+    return {"messages": n, "cpu_count": os.cpu_count(), "chunk_size": chunk_size, "paths": paths}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=1000000)
+    parser.add_argument("--workers", default="2,4", help="Comma-separated worker counts for process_many")
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    parser.add_argument("--output", default=None, help="Optional JSON output path")
+    args = parser.parse_args()
+
+    worker_counts = [int(w) for w in args.workers.split(",") if w]
+    results = run(args.messages, worker_counts, args.chunk_size)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
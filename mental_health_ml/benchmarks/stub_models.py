@@ -0,0 +1,178 @@
+# mental_health_ml/benchmarks/stub_models.py
+"""
+Stand-ins for the model modules imported by the inference routers, so the routers
+can be benchmarked in-process without loading (or downloading) any model. Only the
+modules that load models are replaced; the orchestration around them (keyword crisis
+layer, prefilter cascade, session risk, conversation store, response building) is
+the real code.
+
+Each stub call sleeps for a deterministic, input-dependent time:
+    base_ms * (1 + jitter * u),  u in [-1, 1) derived from a hash of the stage and input
+so the same workload produces the same fake latencies on every run and commit.
+"""
+import hashlib
+import os
+import sys
+import time
+import types
+
+# Per-stage base latency in milliseconds (override with install(latency_ms={...}))
+DEFAULT_STUB_LATENCY_MS = {
+    "chatbot": 80.0,     # MentalHealthChatbot.generate_response
+    "emotion": 15.0,     # EmotionDetector.detect_emotion
+    "crisis_ml": 30.0,   # predict_crisis_ml (zero-shot / student)
+    "assessment": 5.0,   # assessment model, per batch
+    "recommender": 2.0,  # ResourceRecommender
+}
+DEFAULT_STUB_JITTER = 0.2
+
+# Must match models/crisis/ml_crisis_predictor.py
+CRISIS_CANDIDATE_LABELS = [
+    "expressing immediate suicidal intent or severe self-harm",
+    "expressing severe emotional distress or hopelessness",
+    "general negative sentiment, but not a crisis",
+    "neutral or positive statement"
+]
+EMOTIONS = ["sadness", "joy", "love", "anger", "fear", "surprise"]
+
+STUB_RESOURCES = [
+    {"id": f"res-{i:03d}", "title": title, "description": f"{title} (benchmark stub)", "type": kind, "tags": tags}
+    for i, (title, kind, tags) in enumerate([
+        ("Understanding Anxiety", "article", ["anxiety", "education"]),
+        ("Box Breathing", "exercise", ["anxiety", "stress"]),
+        ("Sleep Hygiene Basics", "article", ["sleep", "wellbeing"]),
+        ("Behavioural Activation", "exercise", ["depression", "mood"]),
+        ("Talking to a Counselor", "guide", ["support", "therapy"]),
+        ("Crisis Lines", "helpline", ["crisis", "support"]),
+    ], start=1)
+]
+
+
+class StubLatency:
+    def __init__(self, latency_ms: dict = None, jitter: float = DEFAULT_STUB_JITTER):
+        self.latency_ms = {**DEFAULT_STUB_LATENCY_MS, **(latency_ms or {})}
+        self.jitter = jitter
+
+    def unit(self, stage: str, key: str) -> float:
+        """Deterministic value in [-1, 1) for (stage, key)."""
+        digest = hashlib.md5(f"{stage}:{key}".encode("utf-8")).digest()
+        return int.from_bytes(digest[:4], "big") / 0x80000000 - 1.0
+
+    def sleep(self, stage: str, key: str):
+        delay_ms = self.latency_ms[stage] * (1.0 + self.jitter * self.unit(stage, key))
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000.0)
+
+
+class StubChatbot:
+    def __init__(self, latency: StubLatency):
+        self.latency = latency
+
+    def generate_response(self, user_input, conversation_history=None, max_length=100):
+        self.latency.sleep("chatbot", user_input)
+        return f"I hear you. Can you tell me more about that? ({len(user_input.split())} words)"
+
+
+class StubEmotionDetector:
+    def __init__(self, latency: StubLatency):
+        self.latency = latency
+
+    def detect_emotion(self, text):
+        self.latency.sleep("emotion", text)
+        u = self.latency.unit("emotion_label", text)
+        dominant = EMOTIONS[int((u + 1.0) / 2.0 * len(EMOTIONS)) % len(EMOTIONS)]
+        probs = {emotion: (0.5 if emotion == dominant else 0.1) for emotion in EMOTIONS}
+        return {"dominant_emotion": dominant, "confidence": probs[dominant], "all_emotions": probs}
+
+
+class StubRecommender:
+    def __init__(self, latency: StubLatency):
+        self.latency = latency
+        self.resources = list(STUB_RESOURCES)
+
+    def load_resources(self, resources_data):
+        self.resources = list(resources_data) + [r for r in STUB_RESOURCES if r["id"] not in {d.get("id") for d in resources_data}]
+
+    def recommend_for_user(self, user_profile, user_history=None, n=5):
+        self.latency.sleep("recommender", repr(user_profile))
+        return self.resources[:n]
+
+    def recommend_for_assessment(self, assessment_results, n=5):
+        self.latency.sleep("recommender", repr(sorted(assessment_results.items())))
+        return self.resources[:n]
+
+
+class StubAssessmentModel:
+    """Stands in for TabularAssessmentModel (ASSESSMENT_BACKEND=tabular)."""
+    def __init__(self, latency: StubLatency):
+        self.latency = latency
+
+    def predict_response_batch(self, responses_list: list):
+        self.latency.sleep("assessment", str(len(responses_list)))
+        return [
+            [round((self.latency.unit(f"assessment_{i}", repr(sorted(r.items()))) + 1.0) / 2.0, 4) for i in range(5)]
+            for r in responses_list
+        ]
+
+
+def _stub_module(name: str, **attributes) -> types.ModuleType:
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    module.__file__ = __file__
+    return module
+
+
+def _crisis_ml_module(latency: StubLatency) -> types.ModuleType:
+    def load_ml_crisis_model(backend=None):
+        return "stub"
+
+    def predict_crisis_ml(text_input, threshold_map=None, backend=None):
+        latency.sleep("crisis_ml", text_input)
+        # Mostly benign scores; inputs hashing into the top 2% look like severe distress
+        u = latency.unit("crisis_score", text_input)
+        distress = 0.7 if u > 0.96 else 0.05
+        scores = dict(zip(CRISIS_CANDIDATE_LABELS, [0.02, distress, 0.3, 1.0 - distress - 0.32]))
+        detected = distress >= 0.5
+        return {
+            "ml_crisis_detected": detected,
+            "ml_crisis_label": CRISIS_CANDIDATE_LABELS[1] if detected else None,
+            "ml_confidence": distress if detected else None,
+            "all_ml_scores": scores
+        }
+
+    return _stub_module(
+        "ml_crisis_predictor",
+        CRISIS_CANDIDATE_LABELS=CRISIS_CANDIDATE_LABELS,
+        DEFAULT_ML_THRESHOLD_MAP={CRISIS_CANDIDATE_LABELS[0]: 0.6, CRISIS_CANDIDATE_LABELS[1]: 0.5},
+        ML_CRISIS_BACKEND="stub",
+        load_ml_crisis_model=load_ml_crisis_model,
+        predict_crisis_ml=predict_crisis_ml,
+    )
+
+
+def install(latency_ms: dict = None, jitter: float = DEFAULT_STUB_JITTER) -> StubLatency:
+    """
+    Registers the stub modules in sys.modules. Must run before the inference routers
+    are imported. Modules are registered under both import roots used in the tree
+    (root-style "models..." and "mental_health_ml.models...").
+    """
+    latency = StubLatency(latency_ms, jitter)
+    stubs = {
+        "models.chatbot.model": _stub_module(
+            "model", MentalHealthChatbot=lambda *args, **kwargs: StubChatbot(latency)),
+        "models.emotion.model": _stub_module(
+            "model", EmotionDetector=lambda *args, **kwargs: StubEmotionDetector(latency)),
+        "models.crisis.ml_crisis_predictor": _crisis_ml_module(latency),
+        "models.recommendation.model": _stub_module(
+            "model", ResourceRecommender=lambda *args, **kwargs: StubRecommender(latency)),
+        "models.assessment.model": _stub_module(
+            "model", MentalHealthAssessmentModel=None), # Only used by the "bert" backend
+        "models.assessment.tabular_model": _stub_module(
+            "tabular_model", load_tabular_assessment_model=lambda *args, **kwargs: StubAssessmentModel(latency)),
+    }
+    for name, module in stubs.items():
+        sys.modules[name] = module
+        sys.modules[f"mental_health_ml.{name}"] = module
+    os.environ["ASSESSMENT_BACKEND"] = "tabular"
+    os.environ.setdefault("CRISIS_PREFILTER_PATH", "") # No prefilter: every non-keyword message reaches the (stub) ML stage
+    return latency
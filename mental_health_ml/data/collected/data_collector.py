@@ -5,11 +5,35 @@ from typing import List, Dict
 import json
 from datetime import datetime
 import hashlib
+from utils.jsonl_sink import RotatingJSONLSink, iter_sink_records
 
 class MentalHealthDataCollector:
-    def __init__(self, anonymize=True):
+    def __init__(self, anonymize=True, sink: RotatingJSONLSink = None):
+        """
+        sink: durable append-only storage (see utils/jsonl_sink.py). With a sink,
+        records are handed to its writer thread instead of being kept in
+        collected_data, so memory stays flat in a long-running service.
+        """
         self.anonymize = anonymize
+        self.sink = sink
         self.collected_data = []
+
+    def _store(self, data_point: Dict):
+        if self.sink is not None:
+            self.sink.write(data_point)
+        else:
+            self.collected_data.append(data_point)
+
+    def iter_records(self):
+        """All collected records; read lazily from the sink's rotated files when there is a sink."""
+        if self.sink is not None:
+            self.sink.flush()
+            return iter_sink_records(self.sink.directory, self.sink.prefix)
+        return iter(self.collected_data)
+
+    def close(self):
+        if self.sink is not None:
+            self.sink.close()
         
     def collect_assessment_response(self, user_id: str, responses: Dict, labels: Dict = None):
         """Collect assessment responses for training data"""
@@ -27,7 +51,7 @@ class MentalHealthDataCollector:
             'data_type': 'assessment'
         }
         
-        self.collected_data.append(data_point)
+        self._store(data_point)
         
     def collect_conversation_data(self, user_id: str, conversation: List[Dict], 
                                 feedback: Dict = None):
@@ -55,7 +79,7 @@ class MentalHealthDataCollector:
             'data_type': 'conversation'
         }
         
-        self.collected_data.append(data_point)
+        self._store(data_point)
         
     def anonymize_text(self, text: str) -> str:
         """Anonymize sensitive information in text"""
@@ -64,18 +88,26 @@ class MentalHealthDataCollector:
         return anonymize_personal_info(text)
         
     def export_data(self, filename: str, format='json'):
-        """Export collected data to file"""
+        """Export collected data to file (records are streamed, not loaded all at once)"""
         if format == 'json':
             with open(filename, 'w') as f:
-                json.dump(self.collected_data, f, indent=2)
+                f.write('[')
+                for i, data_point in enumerate(self.iter_records()):
+                    f.write((',\n' if i else '\n') + json.dumps(data_point, indent=2))
+                f.write('\n]')
+        elif format == 'jsonl':
+            # One record per line: training/prepare_data.py streams this format
+            with open(filename, 'w', encoding='utf-8') as f:
+                for data_point in self.iter_records():
+                    f.write(json.dumps(data_point) + '\n')
         elif format == 'csv':
-            df = pd.DataFrame(self.collected_data)
+            df = pd.DataFrame(list(self.iter_records()))
             df.to_csv(filename, index=False)
         else:
-            raise ValueError("Format must be 'json' or 'csv'")
+            raise ValueError("Format must be 'json', 'jsonl' or 'csv'")
             
     def get_training_data(self, data_type: str = None):
-        """Get training data filtered by type"""
-        if data_type:
-            return [d for d in self.collected_data if d['data_type'] == data_type]
-        return self.collected_data
\ No newline at end of file
+        """Get training data filtered by type, as a generator over the collected records"""
+        for data_point in self.iter_records():
+            if not data_type or data_point['data_type'] == data_type:
+                yield data_point
\ No newline at end of file
@@ -2,17 +2,54 @@
 """
 Generate sample training data for the mental health assessment model.
 This creates realistic but synthetic data for initial model training.
+
+Rows are generated a whole chunk at a time with NumPy: one response matrix is
+sampled per chunk from the per-state answer ranges and the labels are computed
+with array operations. The write_* methods stream chunks straight to CSV/Parquet
+(or JSONL for transcripts), so millions of rows can be generated in bounded memory:
+    python -m data.datasets.generate_sample_data --samples 5000000 --conversations 1000000 \
+        --format parquet --output-dir data/synthetic --seed 7
 """
 
-import pandas as pd
-import numpy as np
-import random
-from datetime import datetime, timedelta
+import argparse
 import json
 import os
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+QUESTION_IDS = [
+    'q1_mood', 'q2_anxiety', 'q3_sleep', 'q4_energy', 'q5_concentration',
+    'q6_social', 'q7_appetite', 'q8_hopelessness', 'q9_worthlessness', 'q10_stress'
+]
+LABEL_COLUMNS = ['anxiety_level', 'depression_level', 'stress_level', 'wellbeing_score', 'risk_level']
+
+# Distribution of mental states
+STATE_DISTRIBUTION = {
+    'healthy': 0.4,
+    'mild_symptoms': 0.3,
+    'moderate_symptoms': 0.2,
+    'severe_symptoms': 0.1
+}
+
+GENERATOR_CHUNK_SIZE = int(os.getenv("GENERATOR_CHUNK_SIZE", "100000"))
+
+def _ids(prefix, start_index, n):
+    """prefix_0001-style ids numbered from start_index + 1"""
+    return np.char.mod(f'{prefix}_%04d', np.arange(start_index + 1, start_index + n + 1)).astype(object)
 
 class SampleDataGenerator:
-    def __init__(self):
+    def __init__(self, seed=None, reference_time=None):
+        """
+        seed: makes the output reproducible (for the same seed, sizes and chunk_size).
+        reference_time: timestamps are spread over the year before it (default: now).
+        """
+        self.rng = np.random.default_rng(seed)
+        self.reference_time = reference_time or datetime.now()
         # Define assessment questions and their types
         self.assessment_questions = {
             'q1_mood': 'How would you rate your overall mood in the past week?',
@@ -111,110 +148,288 @@ class SampleDataGenerator:
             ]
         }
 
+        # Chat messages for synthetic transcripts, by the user's mental state
+        self.chat_messages = {
+            'healthy': [
+                "Hi, I just wanted to check in today",
+                "I had a good week, work went well",
+                "I've been sleeping better lately",
+                "Any tips for keeping up good habits?",
+                "I went for a run this morning and feel great",
+                "Just wanted to talk about my day"
+            ],
+            'mild_symptoms': [
+                "I've been a bit stressed with deadlines",
+                "Some days I feel kind of down",
+                "I'm not sleeping as well as I'd like",
+                "I get nervous before meetings",
+                "I feel a little overwhelmed this week",
+                "How do I stop overthinking things?"
+            ],
+            'moderate_symptoms': [
+                "I've been feeling anxious most days",
+                "I can't seem to focus on anything",
+                "I don't enjoy the things I used to",
+                "I keep waking up in the middle of the night",
+                "I've been avoiding my friends lately",
+                "Everything feels like too much right now"
+            ],
+            'severe_symptoms': [
+                "I feel hopeless and I don't know what to do",
+                "I can't get out of bed anymore",
+                "Nothing I do seems to matter",
+                "I feel worthless all the time",
+                "I don't think things will ever get better",
+                "I feel completely alone"
+            ]
+        }
+        self.assistant_replies = {
+            'healthy': [
+                "That's great to hear! What do you think has helped the most?",
+                "It sounds like things are going well. Keep it up!",
+                "Thanks for checking in. Routines like that really help."
+            ],
+            'mild_symptoms': [
+                "That sounds stressful. Would a short breathing exercise help?",
+                "It's normal to have ups and downs. What's been on your mind?",
+                "Breaking tasks into smaller steps can make them feel more manageable."
+            ],
+            'moderate_symptoms': [
+                "I'm sorry you're going through this. How long has it felt this way?",
+                "That sounds really hard. Have you been able to talk to anyone about it?",
+                "It might help to reach out to a mental health professional."
+            ],
+            'severe_symptoms': [
+                "I'm really sorry you're feeling this way. You don't have to go through this alone.",
+                "Your safety matters. If you're in crisis, please call or text 988 right away.",
+                "Would you be willing to reach out to a crisis line or someone you trust today?"
+            ]
+        }
+
+        # Lookup tables for vectorized sampling, one row per state in STATE_DISTRIBUTION order
+        self.states = np.array(list(STATE_DISTRIBUTION))
+        self.state_probabilities = np.array(list(STATE_DISTRIBUTION.values()))
+        self._low = np.array([[self.response_patterns[state][f"{q.split('_', 1)[1]}_range"][0] for q in QUESTION_IDS]
+                              for state in self.states])
+        self._high = np.array([[self.response_patterns[state][f"{q.split('_', 1)[1]}_range"][1] for q in QUESTION_IDS]
+                               for state in self.states])
+        self._comments = self._text_table(self.text_responses)
+        self._user_messages = self._text_table(self.chat_messages)
+        self._replies = self._text_table(self.assistant_replies)
+
+    def _text_table(self, texts_by_state):
+        """(texts, counts): object array [state, i] padded with None, and the number of texts per state"""
+        counts = np.array([len(texts_by_state[state]) for state in self.states])
+        table = np.full((len(self.states), counts.max()), None, dtype=object)
+        for row, state in enumerate(self.states):
+            table[row, :counts[row]] = texts_by_state[state]
+        return table, counts
+
+    def _pick_texts(self, text_table, states):
+        """One text per entry of states, uniform over that state's texts"""
+        table, counts = text_table
+        return table[states, (self.rng.random(len(states)) * counts[states]).astype(np.int64)]
+
+    def sample_states(self, n):
+        """Indices into self.states, drawn from STATE_DISTRIBUTION"""
+        return self.rng.choice(len(self.states), size=n, p=self.state_probabilities)
+
+    def sample_responses(self, states):
+        """(n, 10) answer matrix; each answer is uniform over its state's range (inclusive)"""
+        return self.rng.integers(self._low[states], self._high[states], endpoint=True)
+
+    def compute_labels(self, responses):
+        """Target labels for an (n, 10) answer matrix, as one array per label"""
+        r = {q: responses[:, i].astype(np.float64) for i, q in enumerate(QUESTION_IDS)}
+
+        anxiety_level = (r['q2_anxiety'] + (10 - r['q6_social']) + r['q10_stress']) / 30
+        depression_level = ((10 - r['q1_mood']) + r['q8_hopelessness'] +
+                            r['q9_worthlessness'] + (10 - r['q4_energy'])) / 40
+        stress_level = (r['q10_stress'] + (10 - r['q5_concentration']) + (10 - r['q3_sleep'])) / 30
+        wellbeing_score = (r['q1_mood'] + r['q3_sleep'] + r['q4_energy'] + r['q5_concentration'] +
+                           r['q6_social'] + (10 - r['q8_hopelessness'])) / 60
+        risk_level = (r['q8_hopelessness'] + r['q9_worthlessness']) / 20
+
+        # Apply some noise (+-0.1, +-0.05 for risk) and ensure realistic ranges
+        labels = np.column_stack([anxiety_level, depression_level, stress_level, wellbeing_score, risk_level])
+        noise = self.rng.uniform(-0.1, 0.1, size=labels.shape)
+        noise[:, 4] *= 0.5
+        labels = np.clip(labels + noise, 0, 1).round(3)
+        return {name: labels[:, i] for i, name in enumerate(LABEL_COLUMNS)}
+
+    def sample_timestamps(self, n, max_days=365):
+        """ISO timestamps up to max_days before reference_time"""
+        days = self.rng.integers(0, max_days, size=n, endpoint=True)
+        times = np.datetime64(self.reference_time, 'us') - days.astype('timedelta64[D]')
+        return np.datetime_as_string(times, unit='us')
+
+    def generate_frame(self, n_samples, start_index=0):
+        """
+        n_samples assessments as a flat DataFrame (the CSV layout of save_dataset), with
+        user ids numbered from start_index + 1.
+        """
+        states = self.sample_states(n_samples)
+        responses = self.sample_responses(states)
+        columns = {
+            'user_id': _ids('user', start_index, n_samples),
+            'timestamp': self.sample_timestamps(n_samples)
+        }
+        for i, q_id in enumerate(QUESTION_IDS):
+            columns[f'response_{q_id}'] = responses[:, i]
+        columns['response_additional_comments'] = self._pick_texts(self._comments, states)
+        columns.update(self.compute_labels(responses))
+        columns['mental_state_category'] = self.states[states]
+        return pd.DataFrame(columns)
+
+    def iter_frames(self, n_samples, chunk_size=GENERATOR_CHUNK_SIZE):
+        for start in range(0, n_samples, chunk_size):
+            yield self.generate_frame(min(chunk_size, n_samples - start), start)
+
     def generate_assessment_response(self, mental_state):
         """Generate a single assessment response based on mental state"""
-        pattern = self.response_patterns[mental_state]
-        response = {}
-        
-        # Generate numeric responses (1-10 scale)
-        response['q1_mood'] = random.randint(*pattern['mood_range'])
-        response['q2_anxiety'] = random.randint(*pattern['anxiety_range'])
-        response['q3_sleep'] = random.randint(*pattern['sleep_range'])
-        response['q4_energy'] = random.randint(*pattern['energy_range'])
-        response['q5_concentration'] = random.randint(*pattern['concentration_range'])
-        response['q6_social'] = random.randint(*pattern['social_range'])
-        response['q7_appetite'] = random.randint(*pattern['appetite_range'])
-        response['q8_hopelessness'] = random.randint(*pattern['hopelessness_range'])
-        response['q9_worthlessness'] = random.randint(*pattern['worthlessness_range'])
-        response['q10_stress'] = random.randint(*pattern['stress_range'])
-        
+        states = np.array([list(self.states).index(mental_state)])
+        response = dict(zip(QUESTION_IDS, self.sample_responses(states)[0].tolist()))
+
         # Add a text response
-        response['additional_comments'] = random.choice(self.text_responses[mental_state])
-        
+        response['additional_comments'] = self._pick_texts(self._comments, states)[0]
         return response
 
     def calculate_labels(self, responses, mental_state):
         """Calculate target labels based on responses and mental state"""
-        # Calculate anxiety level (0-1 scale)
-        anxiety_level = (responses['q2_anxiety'] + (10 - responses['q6_social']) + responses['q10_stress']) / 30
-        
-        # Calculate depression level (0-1 scale)
-        depression_level = ((10 - responses['q1_mood']) + responses['q8_hopelessness'] + 
-                           responses['q9_worthlessness'] + (10 - responses['q4_energy'])) / 40
-        
-        # Calculate stress level (0-1 scale)
-        stress_level = (responses['q10_stress'] + (10 - responses['q5_concentration']) + 
-                       (10 - responses['q3_sleep'])) / 30
-        
-        # Calculate wellbeing score (0-1 scale, higher is better)
-        wellbeing_score = (responses['q1_mood'] + responses['q3_sleep'] + responses['q4_energy'] + 
-                          responses['q5_concentration'] + responses['q6_social'] + 
-                          (10 - responses['q8_hopelessness'])) / 60
-        
-        # Calculate risk level (0-1 scale)
-        risk_indicators = [responses['q8_hopelessness'], responses['q9_worthlessness']]
-        risk_level = sum(risk_indicators) / 20
-        
-        # Apply some noise and ensure realistic ranges
-        anxiety_level = max(0, min(1, anxiety_level + random.uniform(-0.1, 0.1)))
-        depression_level = max(0, min(1, depression_level + random.uniform(-0.1, 0.1)))
-        stress_level = max(0, min(1, stress_level + random.uniform(-0.1, 0.1)))
-        wellbeing_score = max(0, min(1, wellbeing_score + random.uniform(-0.1, 0.1)))
-        risk_level = max(0, min(1, risk_level + random.uniform(-0.05, 0.05)))
-        
-        return {
-            'anxiety_level': round(anxiety_level, 3),
-            'depression_level': round(depression_level, 3),
-            'stress_level': round(stress_level, 3),
-            'wellbeing_score': round(wellbeing_score, 3),
-            'risk_level': round(risk_level, 3),
-            'mental_state_category': mental_state
-        }
+        matrix = np.array([[responses[q_id] for q_id in QUESTION_IDS]])
+        labels = {name: float(values[0]) for name, values in self.compute_labels(matrix).items()}
+        labels['mental_state_category'] = mental_state
+        return labels
 
     def generate_dataset(self, n_samples=1000):
-        """Generate a complete dataset"""
-        data = []
-        
-        # Define distribution of mental states
-        state_distribution = {
-            'healthy': 0.4,
-            'mild_symptoms': 0.3,
-            'moderate_symptoms': 0.2,
-            'severe_symptoms': 0.1
-        }
-        
+        """
+        Generate a complete dataset as nested records (the JSON layout of save_dataset).
+        This holds everything in memory; use write_assessments for large datasets.
+        """
         print(f"Generating {n_samples} sample assessments...")
-        
-        for i in range(n_samples):
-            # Select mental state based on distribution
-            rand = random.random()
-            cumulative = 0
-            selected_state = 'healthy'
-            
-            for state, prob in state_distribution.items():
-                cumulative += prob
-                if rand <= cumulative:
-                    selected_state = state
-                    break
-            
-            # Generate response
-            responses = self.generate_assessment_response(selected_state)
-            labels = self.calculate_labels(responses, selected_state)
-            
-            # Create data point
-            data_point = {
-                'user_id': f'user_{i+1:04d}',
-                'timestamp': (datetime.now() - timedelta(days=random.randint(0, 365))).isoformat(),
-                'responses': responses,
-                'labels': labels
+        frame = self.generate_frame(n_samples)
+        columns = {column: frame[column].tolist() for column in frame.columns}
+        response_ids = QUESTION_IDS + ['additional_comments']
+        label_names = LABEL_COLUMNS + ['mental_state_category']
+
+        return [
+            {
+                'user_id': columns['user_id'][i],
+                'timestamp': columns['timestamp'][i],
+                'responses': {q_id: columns[f'response_{q_id}'][i] for q_id in response_ids},
+                'labels': {label: columns[label][i] for label in label_names}
             }
-            
-            data.append(data_point)
-            
-            if (i + 1) % 100 == 0:
-                print(f"Generated {i + 1}/{n_samples} samples...")
-        
-        return data
+            for i in range(n_samples)
+        ]
+
+    def generate_transcript_frame(self, n_conversations, start_index=0, min_turns=2, max_turns=8):
+        """
+        n_conversations synthetic chat transcripts in long format, one row per message:
+        conversation_id, user_id, message_index, role, content, timestamp, mental_state_category.
+        Each turn is a user message followed by an assistant reply, in the user's state.
+        """
+        states = self.sample_states(n_conversations)
+        turns = self.rng.integers(min_turns, max_turns, size=n_conversations, endpoint=True)
+        n_turns = int(turns.sum())
+        conversation = np.repeat(np.arange(n_conversations), turns) # Conversation of each turn
+        first_turn = np.cumsum(turns) - turns
+        turn_number = np.arange(n_turns) - np.repeat(first_turn, turns)
+        turn_states = states[conversation]
+
+        # Conversations start within the last year; turns are 20s-5min apart, replies 1-5s after the message
+        start = (np.datetime64(self.reference_time, 's') -
+                 self.rng.integers(0, 365 * 86400, size=n_conversations).astype('timedelta64[s]'))
+        gaps = self.rng.integers(20, 300, size=n_turns)
+        elapsed = np.cumsum(gaps)
+        elapsed -= np.repeat(elapsed[first_turn] - gaps[first_turn], turns) # Restart the sum for each conversation
+        user_times = start[conversation] + elapsed.astype('timedelta64[s]')
+        reply_times = user_times + self.rng.integers(1, 5, size=n_turns, endpoint=True).astype('timedelta64[s]')
+
+        def interleave(user_values, assistant_values):
+            values = np.empty(2 * n_turns, dtype=np.result_type(user_values, assistant_values))
+            values[0::2], values[1::2] = user_values, assistant_values
+            return values
+
+        message_conversation = np.repeat(conversation, 2)
+        return pd.DataFrame({
+            'conversation_id': _ids('conv', start_index, n_conversations)[message_conversation],
+            'user_id': _ids('user', start_index, n_conversations)[message_conversation],
+            'message_index': interleave(2 * turn_number, 2 * turn_number + 1),
+            'role': np.tile(np.array(['user', 'assistant'], dtype=object), n_turns),
+            'content': interleave(self._pick_texts(self._user_messages, turn_states),
+                                  self._pick_texts(self._replies, turn_states)),
+            'timestamp': np.datetime_as_string(interleave(user_times, reply_times), unit='s'),
+            'mental_state_category': self.states[states][message_conversation]
+        })
+
+    def iter_transcript_frames(self, n_conversations, chunk_size=10000, **turn_kwargs):
+        for start in range(0, n_conversations, chunk_size):
+            yield self.generate_transcript_frame(min(chunk_size, n_conversations - start), start, **turn_kwargs)
+
+    @staticmethod
+    def transcript_records(frame):
+        """Regroups a transcript frame into the conversation records the data collector stores"""
+        columns = {column: frame[column].tolist() for column in frame.columns}
+        starts = np.flatnonzero(frame['message_index'].to_numpy() == 0).tolist() + [len(frame)]
+        for begin, end in zip(starts[:-1], starts[1:]):
+            yield {
+                'user_id': columns['user_id'][begin],
+                'timestamp': columns['timestamp'][begin],
+                'conversation_id': columns['conversation_id'][begin],
+                'conversation': [
+                    {'role': columns['role'][i], 'content': columns['content'][i], 'timestamp': columns['timestamp'][i]}
+                    for i in range(begin, end)
+                ],
+                'feedback': None,
+                'data_type': 'conversation'
+            }
+
+    @staticmethod
+    def write_frames(frames, path):
+        """
+        Streams DataFrames to path (.csv or .parquet), so only one chunk is in
+        memory at a time. Returns the number of rows written.
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        rows = 0
+        writer = None
+        try:
+            for frame in frames:
+                if path.endswith('.parquet'):
+                    table = pa.Table.from_pandas(frame, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(path, table.schema)
+                    writer.write_table(table)
+                else:
+                    frame.to_csv(path, mode='w' if rows == 0 else 'a', header=rows == 0, index=False)
+                rows += len(frame)
+        finally:
+            if writer is not None:
+                writer.close()
+        return rows
+
+    def write_assessments(self, path, n_samples, chunk_size=GENERATOR_CHUNK_SIZE):
+        """Generates n_samples assessments straight to a .csv or .parquet file, chunk by chunk"""
+        return self.write_frames(self.iter_frames(n_samples, chunk_size), path)
+
+    def write_transcripts(self, path, n_conversations, chunk_size=10000, **turn_kwargs):
+        """
+        Generates n_conversations transcripts straight to a file, chunk_size conversations
+        at a time: .csv/.parquet in the long format of generate_transcript_frame, or .jsonl
+        with one collector-style conversation record per line (input for training.prepare_data).
+        Returns the number of messages written.
+        """
+        frames = self.iter_transcript_frames(n_conversations, chunk_size, **turn_kwargs)
+        if not path.endswith('.jsonl'):
+            return self.write_frames(frames, path)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        messages = 0
+        with open(path, 'w', encoding='utf-8') as f:
+            for frame in frames:
+                for record in self.transcript_records(frame):
+                    f.write(json.dumps(record) + '\n')
+                messages += len(frame)
+        return messages
 
     def save_dataset(self, data, output_dir='data/sample'):
         """Save the generated dataset in multiple formats"""
@@ -302,12 +517,45 @@ class SampleDataGenerator:
         for state, count in summary['mental_state_distribution'].items():
             print(f"  {state}: {count} ({count/summary['total_samples']*100:.1f}%)")
 
+def generate_large_dataset(args):
+    """Streams --samples assessments and --conversations transcripts to --output-dir"""
+    generator = SampleDataGenerator(seed=args.seed)
+    extension = 'parquet' if args.format == 'parquet' else 'csv'
+    outputs = []
+    if args.samples:
+        outputs.append(('assessments', os.path.join(args.output_dir, f'assessment_data.{extension}'),
+                        lambda path: generator.write_assessments(path, args.samples, args.chunk_size)))
+    if args.conversations:
+        outputs.append(('messages', os.path.join(args.output_dir, f'chat_transcripts.{args.format}'),
+                        lambda path: generator.write_transcripts(path, args.conversations,
+                                                                 max(1, args.chunk_size // 10))))
+    for what, path, write in outputs:
+        started = time.perf_counter()
+        rows = write(path)
+        seconds = time.perf_counter() - started
+        print(f"✅ Wrote {rows} {what} to {path} in {seconds:.1f}s ({rows / max(seconds, 1e-9):,.0f} rows/s)")
+
 def main():
     """Main function to generate sample data"""
+    parser = argparse.ArgumentParser(description="Generate synthetic assessment data and chat transcripts")
+    parser.add_argument("--samples", type=int, default=0, help="Assessments to stream to --output-dir")
+    parser.add_argument("--conversations", type=int, default=0, help="Chat transcripts to stream to --output-dir")
+    parser.add_argument("--format", choices=["csv", "parquet", "jsonl"], default="parquet",
+                        help="Output format (jsonl applies to transcripts; assessments then use csv)")
+    parser.add_argument("--output-dir", default="data/synthetic")
+    parser.add_argument("--chunk-size", type=int, default=GENERATOR_CHUNK_SIZE,
+                        help="Assessments per chunk (transcripts use a tenth as many conversations)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.samples or args.conversations:
+        generate_large_dataset(args)
+        return
+
     print("🎯 Generating Sample Assessment Data")
     print("=" * 40)
     
-    generator = SampleDataGenerator()
+    generator = SampleDataGenerator(seed=args.seed)
     
     # Generate training dataset
     print("\n1. Generating training dataset...")
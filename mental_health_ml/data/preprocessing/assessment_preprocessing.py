@@ -1,12 +1,38 @@
 # data/preprocessing/assessment_preprocessing.py
 from transformers import BertTokenizer
 import pandas as pd
+import numpy as np
+import torch
+import json
+
+ASSESSMENT_TARGET_COLUMNS = ['anxiety_level', 'depression_level', 'stress_level', 'wellbeing_score', 'risk_level']
+REVERSE_SCORED_MARKER = "(reverse)"
+
+
+class InvalidAssessmentResponses(ValueError):
+    """Responses whose keys or values do not match the questions the model was trained on."""
 
 class AssessmentPreprocessor:
     def __init__(self, max_length=128):
-        self.tokenizer = BertTokenizer.from_pretrained("google/bert_uncased_L-4_H-512_A-8")
+        self._tokenizer = None # Loaded on first use; the numeric path does not need it
         self.max_length = max_length
-        
+        # Numeric feature scaling, learned by fit_numeric() (or restored by load_scaling())
+        self.numeric_columns = None
+        self.text_columns = []
+        self.col_min = None
+        self.col_range = None
+        self.reverse_mask = None
+        # Target scaling, learned by fit_targets(): models are trained on (and predict)
+        # ASSESSMENT_TARGET_COLUMNS min-max scaled to [0, 1] over the training range
+        self.target_min = None
+        self.target_range = None
+
+    @property
+    def tokenizer(self):
+        if self._tokenizer is None:
+            self._tokenizer = BertTokenizer.from_pretrained("google/bert_uncased_L-4_H-512_A-8")
+        return self._tokenizer
+
     def preprocess(self, texts):
         """Preprocess a list of assessment responses"""
         encoded = self.tokenizer(
@@ -20,12 +46,139 @@ class AssessmentPreprocessor:
             "input_ids": encoded["input_ids"],
             "attention_mask": encoded["attention_mask"]
         }
-        
+
+    def fit_numeric(self, assessment_df):
+        """
+        Learns which columns are numeric answers (vs. free text) and their ranges.
+        Items marked "(reverse)" are flipped so that higher always means more distress.
+        """
+        feature_df = assessment_df.drop(columns=[c for c in ASSESSMENT_TARGET_COLUMNS if c in assessment_df.columns])
+        numeric_df = feature_df.apply(pd.to_numeric, errors="coerce")
+        # A column is free text if most of its non-empty values are not numbers
+        is_numeric = numeric_df.notna().sum() >= 0.5 * feature_df.notna().sum()
+        self.numeric_columns = list(feature_df.columns[is_numeric.values])
+        self.text_columns = list(feature_df.columns[~is_numeric.values])
+
+        values = numeric_df[self.numeric_columns].to_numpy(dtype=np.float32)
+        self.col_min = np.nanmin(values, axis=0)
+        self.col_range = np.nanmax(values, axis=0) - self.col_min
+        self.col_range[self.col_range == 0] = 1.0
+        self.reverse_mask = np.array([REVERSE_SCORED_MARKER in str(c) for c in self.numeric_columns])
+        return self
+
+    def fit_targets(self, targets_df):
+        values = targets_df[ASSESSMENT_TARGET_COLUMNS].to_numpy(dtype=np.float32)
+        self.target_min = np.nanmin(values, axis=0)
+        self.target_range = np.nanmax(values, axis=0) - self.target_min
+        self.target_range[self.target_range == 0] = 1.0
+        return self
+
+    def scale_targets(self, targets):
+        """Raw targets (DataFrame or array in ASSESSMENT_TARGET_COLUMNS order) -> float32 in [0, 1]."""
+        if isinstance(targets, pd.DataFrame):
+            targets = targets[ASSESSMENT_TARGET_COLUMNS].to_numpy(dtype=np.float32)
+        return np.clip((np.asarray(targets, dtype=np.float32) - self.target_min) / self.target_range, 0.0, 1.0)
+
+    def unscale_targets(self, scaled):
+        """Model outputs in [0, 1] -> the original target units (e.g. wellbeing_score 0-96)."""
+        return np.asarray(scaled, dtype=np.float32) * self.target_range + self.target_min
+
+    @property
+    def num_numeric_features(self):
+        return len(self.numeric_columns or [])
+
+    def transform_numeric(self, assessment_df):
+        """Returns a float32 array (n_rows, n_numeric_columns) scaled to [0, 1]; missing answers become 0.5."""
+        values = assessment_df[self.numeric_columns].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float32)
+        return self.scale_numeric(values)
+
+    def scale_numeric(self, values):
+        """Same scaling for a raw answer array already in numeric_columns order (NaN = missing)."""
+        scaled = (np.asarray(values, dtype=np.float32) - self.col_min) / self.col_range
+        scaled[:, self.reverse_mask] = 1.0 - scaled[:, self.reverse_mask]
+        np.clip(scaled, 0.0, 1.0, out=scaled)
+        scaled[np.isnan(scaled)] = 0.5
+        return scaled
+
     def preprocess_assessments(self, assessment_df):
-        """Process assessment dataframe with multiple question responses"""
+        """
+        Numeric answers go straight to the model's numerical branch as a float32
+        tensor. Only genuine free-text columns (if any) are tokenized for BERT.
+        """
+        if self.numeric_columns is None:
+            self.fit_numeric(assessment_df)
+        result = {"numerical_features": torch.from_numpy(self.transform_numeric(assessment_df))}
+        if self.text_columns:
+            texts = assessment_df[self.text_columns].fillna("").astype(str).agg(" ".join, axis=1).str.strip().tolist()
+            result.update(self.preprocess(texts))
+        return result
+
+    def preprocess_responses(self, responses: dict):
+        """Single assessment given as {question: answer} (as received by the API)."""
+        return self.preprocess_response_batch([responses])
+
+    def validate_responses(self, responses: dict):
+        """
+        Raises InvalidAssessmentResponses unless every numeric question was answered
+        with a number and there are no unknown questions (free-text answers are
+        optional). Otherwise a misspelt key would silently become a neutral answer.
+        """
+        known = set(self.numeric_columns) | set(self.text_columns)
+        unknown = sorted(key for key in responses if key not in known)
+        missing = [col for col in self.numeric_columns if responses.get(col) in (None, "")]
+        not_numeric = [col for col in self.numeric_columns if col not in missing and pd.isna(pd.to_numeric(responses[col], errors="coerce"))]
+        problems = []
+        if unknown:
+            problems.append(f"unknown questions: {unknown}")
+        if missing:
+            problems.append(f"missing answers: {missing}")
+        if not_numeric:
+            problems.append(f"non-numeric answers: {not_numeric}")
+        if problems:
+            raise InvalidAssessmentResponses("; ".join(problems))
+
+    def preprocess_response_batch(self, responses_list: list):
+        """
+        Several assessments given as {question: answer} dicts, preprocessed as one
+        batch. Raises InvalidAssessmentResponses for the first invalid assessment.
+        """
+        for responses in responses_list:
+            self.validate_responses(responses)
+        columns = self.numeric_columns + self.text_columns
+        rows = pd.DataFrame([{col: responses.get(col) for col in columns} for responses in responses_list], columns=columns)
+        return self.preprocess_assessments(rows)
+
+    def preprocess_assessments_as_text(self, assessment_df):
+        """Legacy path: every answer rendered as "Q1: 2 Q2: 3 ..." and tokenized for BERT."""
         # Concatenate responses with question identifiers
         texts = []
         for _, row in assessment_df.iterrows():
             text = " ".join([f"Q{i+1}: {ans}" for i, ans in enumerate(row) if pd.notna(ans)])
             texts.append(text)
-        return self.preprocess(texts)
\ No newline at end of file
+        return self.preprocess(texts)
+
+    def save_scaling(self, path):
+        scaling = {
+            "numeric_columns": self.numeric_columns,
+            "text_columns": self.text_columns,
+            "col_min": self.col_min.tolist(),
+            "col_range": self.col_range.tolist(),
+        }
+        if self.target_min is not None:
+            scaling.update(target_columns=ASSESSMENT_TARGET_COLUMNS, target_min=self.target_min.tolist(),
+                           target_range=self.target_range.tolist())
+        with open(path, "w") as f:
+            json.dump(scaling, f, indent=2)
+
+    def load_scaling(self, path):
+        with open(path, "r") as f:
+            scaling = json.load(f)
+        self.numeric_columns = scaling["numeric_columns"]
+        self.text_columns = scaling["text_columns"]
+        self.col_min = np.asarray(scaling["col_min"], dtype=np.float32)
+        self.col_range = np.asarray(scaling["col_range"], dtype=np.float32)
+        self.reverse_mask = np.array([REVERSE_SCORED_MARKER in str(c) for c in self.numeric_columns])
+        if "target_min" in scaling: # Absent in scaling files written before targets were normalised
+            self.target_min = np.asarray(scaling["target_min"], dtype=np.float32)
+            self.target_range = np.asarray(scaling["target_range"], dtype=np.float32)
+        return self
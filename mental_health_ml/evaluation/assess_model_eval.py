@@ -31,8 +31,9 @@ class AssessmentModelEvaluator:
         self.model.eval()
         with torch.no_grad():
             predictions = self.model(
-                test_encodings["input_ids"],
-                test_encodings["attention_mask"]
+                test_encodings["numerical_features"],
+                test_encodings.get("input_ids"),
+                test_encodings.get("attention_mask")
             ).numpy()
         
         # Calculate metrics
@@ -1,23 +1,68 @@
 # inference/assessment_endpoint.py
-from fastapi import APIRouter, Body
-from pydantic import BaseModel
-from typing import List, Dict
+from fastapi import APIRouter, Body, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+from typing import List, Dict, Optional
+import json
+import os
 import torch
 from models.assessment.model import MentalHealthAssessmentModel
-from data.preprocessing.assessment_preprocessing import AssessmentPreprocessor
+# Same module path as the tabular model and its pickled preprocessor, so there is one InvalidAssessmentResponses class
+from mental_health_ml.models.assessment.tabular_model import load_tabular_assessment_model
+from mental_health_ml.data.preprocessing.assessment_preprocessing import AssessmentPreprocessor, InvalidAssessmentResponses
+from utils.json_stream import iter_json_items, JSONStreamError
+from mental_health_ml.utils.metrics import BATCH_SIZE, timed, track_queue_wait
+from mental_health_ml.utils.structured_logging import get_logger
 
 router = APIRouter()
+logger = get_logger(__name__)
 
-# Load model (in production, use a singleton pattern)
-model = MentalHealthAssessmentModel()
-model.load_state_dict(torch.load("models/assessment/assessment_model.pt"))
-model.eval()
+# "bert": MentalHealthAssessmentModel (training/train_assessment.py)
+# "tabular": scikit-learn model over the answers (training/train_tabular_assessment.py)
+ASSESSMENT_BACKEND = os.getenv("ASSESSMENT_BACKEND", "bert")
+# /analyze/batch: most assessments accepted per upload, and how many go through the model at once
+ASSESSMENT_BATCH_MAX_ITEMS = int(os.getenv("ASSESSMENT_BATCH_MAX_ITEMS", "10000"))
+ASSESSMENT_BATCH_CHUNK_SIZE = int(os.getenv("ASSESSMENT_BATCH_CHUNK_SIZE", "256"))
 
-preprocessor = AssessmentPreprocessor()
+# Both backends predict ASSESSMENT_TARGET_COLUMNS scaled to [0, 1] (see get_recommendations)
+if ASSESSMENT_BACKEND == "tabular":
+    tabular_model = load_tabular_assessment_model()
+    response_preprocessor = tabular_model.preprocessor
+else:
+    # Numeric scaling learned at training time (see training/train_assessment.py)
+    preprocessor = AssessmentPreprocessor().load_scaling("models/assessment/numeric_scaling.json")
+    response_preprocessor = preprocessor
+
+    # Load model (in production, use a singleton pattern)
+    model = MentalHealthAssessmentModel(num_numerical_features=preprocessor.num_numeric_features)
+    model.load_state_dict(torch.load("models/assessment/assessment_model.pt"))
+    model.eval()
+
+def predict_assessment_batch(responses_list: List[Dict[str, str]]):
+    """Predictions (n_assessments, 5), in ASSESSMENT_TARGET_COLUMNS order, from the configured backend."""
+    model_name = f"assessment_{ASSESSMENT_BACKEND}"
+    BATCH_SIZE.observe(len(responses_list), model=model_name)
+    if ASSESSMENT_BACKEND == "tabular":
+        with timed("forward", model=model_name):
+            return tabular_model.predict_response_batch(responses_list)
+
+    # Preprocess: numeric answers as features, only free-text answers are tokenized
+    with timed("tokenize", model=model_name):
+        inputs = preprocessor.preprocess_response_batch(responses_list)
+    with timed("forward", model=model_name), torch.no_grad():
+        outputs = model(inputs["numerical_features"], inputs.get("input_ids"), inputs.get("attention_mask"))
+    return outputs.numpy()
+
+def predict_assessment(responses: Dict[str, str]):
+    return predict_assessment_batch([responses])[0]
 
 class AssessmentRequest(BaseModel):
     responses: Dict[str, str]
 
+class BatchAssessmentItem(AssessmentRequest):
+    id: Optional[str] = None # Echoed back so clients can match results to their records
+
 class AssessmentResponse(BaseModel):
     anxiety_level: float
     depression_level: float
@@ -28,20 +73,16 @@ class AssessmentResponse(BaseModel):
 
 @router.post("/analyze", response_model=AssessmentResponse)
 async def analyze_assessment(request: AssessmentRequest = Body(...)):
-    # Convert responses to dataframe format
-    responses_text = [f"{q}: {a}" for q, a in request.responses.items()]
-    full_text = " ".join(responses_text)
-    
-    # Preprocess
-    inputs = preprocessor.preprocess([full_text])
-    
     # Get predictions
-    with torch.no_grad():
-        outputs = model(inputs["input_ids"], inputs["attention_mask"])
-    
-    # Convert to response format
-    predictions = outputs.numpy()[0]
+    try:
+        predictions = predict_assessment(request.responses)
+    except InvalidAssessmentResponses as e:
+        raise HTTPException(status_code=422, detail=str(e))
     
+    return build_assessment_response(predictions)
+
+@timed("postprocess", model="assessment_recommendations")
+def build_assessment_response(predictions) -> AssessmentResponse:
     # Generate recommendations based on predictions
     recommendations = get_recommendations(predictions)
     
@@ -54,6 +95,61 @@ async def analyze_assessment(request: AssessmentRequest = Body(...)):
         recommendations=recommendations
     )
 
+async def _analyze_chunk(chunk: list) -> str:
+    """chunk: [(index, BatchAssessmentItem)] -> NDJSON lines, in upload order."""
+    predictions = await run_in_threadpool(track_queue_wait(predict_assessment_batch, "threadpool", route="analyze_batch"),
+                                          [item.responses for _, item in chunk])
+    lines = []
+    for (index, item), row in zip(chunk, predictions):
+        result = {"index": index, "id": item.id, **build_assessment_response(row).model_dump()}
+        lines.append(json.dumps(result) + "\n")
+    return "".join(lines)
+
+@router.post("/analyze/batch")
+async def analyze_assessment_batch(request: Request):
+    """
+    Analyzes up to ASSESSMENT_BATCH_MAX_ITEMS assessments in one call. The body is a
+    JSON array or NDJSON (one AssessmentRequest per line, optionally with an "id").
+    The upload is parsed incrementally and sent to the model in chunks of
+    ASSESSMENT_BATCH_CHUNK_SIZE, and each chunk's results are streamed back as NDJSON
+    as soon as it is done, so memory stays bounded whatever the upload size:
+        {"index": 0, "id": ..., "anxiety_level": ..., ..., "recommendations": [...]}
+        {"index": 1, "id": ..., "error": "..."}   # item failed validation (bad shape or unknown / missing answers)
+        {"error": "...", "processed": n}          # upload rejected, processing stopped
+        {"done": true, "processed": n, "failed": k}
+    """
+    async def results():
+        chunk, processed, failed = [], 0, 0
+        try:
+            index = -1
+            async for raw_item in iter_json_items(request.stream()):
+                index += 1
+                if index >= ASSESSMENT_BATCH_MAX_ITEMS:
+                    break
+                try:
+                    item = BatchAssessmentItem.model_validate(raw_item)
+                    response_preprocessor.validate_responses(item.responses)
+                except (ValidationError, InvalidAssessmentResponses) as e:
+                    failed += 1
+                    yield json.dumps({"index": index, "id": raw_item.get("id") if isinstance(raw_item, dict) else None,
+                                      "error": str(e)}) + "\n"
+                    continue
+                chunk.append((index, item))
+                if len(chunk) >= ASSESSMENT_BATCH_CHUNK_SIZE:
+                    yield await _analyze_chunk(chunk)
+                    processed, chunk = processed + len(chunk), []
+            if chunk:
+                yield await _analyze_chunk(chunk)
+                processed, chunk = processed + len(chunk), []
+            if index >= ASSESSMENT_BATCH_MAX_ITEMS:
+                raise JSONStreamError(f"Upload exceeds {ASSESSMENT_BATCH_MAX_ITEMS} assessments; the rest was not processed.")
+            yield json.dumps({"done": True, "processed": processed, "failed": failed}) + "\n"
+        except Exception as e:
+            logger.exception("assessment_batch_failed", processed=processed)
+            yield json.dumps({"error": str(e), "processed": processed}) + "\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
 def get_recommendations(predictions):
     # Unpack and rescale model outputs to original scale
     anxiety = predictions[0] * 21  # GAD-7 scale
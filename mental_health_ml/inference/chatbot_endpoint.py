@@ -1,18 +1,39 @@
 # inference/chatbot_endpoint.py
 from fastapi import APIRouter, Body, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional
+import asyncio
+import json
+import os
 
 from models.chatbot.model import MentalHealthChatbot
 from models.emotion.model import EmotionDetector
-from models.crisis.model import CrisisDetector
+from models.crisis.hybrid_crisis_detector import detect_crisis_hybrid
+from models.crisis.session_risk_tracker import update_session_risk
+from models.chatbot.conversation_store import get_conversation_store, build_history_text
+from mental_health_ml.services.prediction_writer import PREDICTION_WRITER_CRISIS_ACK_SECONDS, persist_chat_turn
+from mental_health_ml.utils.admission import get_admission_controller
+from mental_health_ml.utils.metrics import timed, track_queue_wait
+from mental_health_ml.utils.structured_logging import get_logger
 
 router = APIRouter()
+logger = get_logger(__name__)
+
+# Write each turn (messages, emotion and crisis predictions) to the database through the
+# write-behind writer (services/prediction_writer.py). Needs DATABASE_URL and ChatSession ids as session_id.
+CHAT_PERSISTENCE = os.getenv("CHAT_PERSISTENCE", "0") == "1"
 
 # Initialize models
 chatbot = MentalHealthChatbot()
 emotion_detector = EmotionDetector()
-crisis_detector = CrisisDetector(threshold=0.7)
+
+def _chatbot_tokenize(text):
+    return chatbot.tokenizer.encode(text, add_special_tokens=False)
+
+# History is measured against the token budget with the chatbot's own tokenizer
+conversation_store = get_conversation_store(_chatbot_tokenize if hasattr(chatbot, "tokenizer") else None)
 
 class ChatMessage(BaseModel):
     role: str  # "user" or "assistant"
@@ -20,52 +41,203 @@ class ChatMessage(BaseModel):
 
 class ChatRequest(BaseModel):
     message: str
+    # Legacy: full history re-sent by the client. With session_id the server keeps
+    # the history, and this is only used to seed a session it does not know yet.
     conversation_history: Optional[List[ChatMessage]] = None
+    session_id: Optional[str] = None  # ChatSession id; enables server-side history and session-level crisis risk tracking
 
 class ChatResponse(BaseModel):
     response: str
     detected_emotion: Optional[dict] = None
     crisis_detected: bool = False
+    session_risk: Optional[dict] = None
     recommended_resources: Optional[List[dict]] = None
+    # {"shed_stages": {stage: reason}} for optional stages skipped under load, and with
+    # CHAT_PERSISTENCE, "crisis_record": "db" | "spill" | "rejected" | "pending" for a detected crisis
+    metadata: Optional[dict] = None
+
+@timed("cache_lookup", model="conversation_store")
+def get_history_text(request: ChatRequest) -> str:
+    """Conversation history for the generator, bounded by token budget (not characters)."""
+    if request.session_id:
+        if request.conversation_history and not conversation_store.has_session(request.session_id):
+            conversation_store.seed(request.session_id, request.conversation_history)
+        return conversation_store.history_text(request.session_id)
+    if request.conversation_history:
+        return build_history_text(conversation_store.turns_from_messages(request.conversation_history))
+    return ""
 
 @router.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest = Body(...), background_tasks: BackgroundTasks = None):
     user_input = request.message
+    admission = get_admission_controller()
+    shed_stages = {}
     
-    # Format conversation history
-    history_text = ""
-    if request.conversation_history:
-        for msg in request.conversation_history:
-            prefix = "User: " if msg.role == "user" else "Assistant: "
-            history_text += prefix + msg.content + "\n"
+    history_text = get_history_text(request)
     
-    # Check for crisis signals
-    crisis_result = crisis_detector.detect_crisis(user_input)
+    # Model stages run in the threadpool, so a slow model does not hold up the event
+    # loop (and every other route with it). Crisis detection (keyword layer included)
+    # and the reply always run; emotion detection is shed when it falls behind.
+    crisis_result, _ = await admission.run("crisis", lambda: run_in_threadpool(
+        _stage_in_threadpool("crisis", "crisis_hybrid", detect_crisis_hybrid), user_input))
+    crisis_detected = crisis_result["is_crisis"]
+
+    # Fold this turn into the session's rolling risk, so a run of concerning
+    # messages can escalate even when no single message does
+    session_risk = None
+    if request.session_id:
+        session_risk = update_session_risk(request.session_id, crisis_result)
+        crisis_detected = crisis_detected or session_risk["escalated"]
     
     # Generate response
-    response = chatbot.generate_response(user_input, history_text)
+    response, _ = await admission.run("generate", lambda: run_in_threadpool(
+        _stage_in_threadpool("generate", "chatbot", chatbot.generate_response), user_input, history_text))
     
     # Detect emotion in user message
-    emotion_result = emotion_detector.detect_emotion(user_input)
+    emotion_result, shed_reason = await admission.run("emotion", lambda: run_in_threadpool(
+        _stage_in_threadpool("forward", "emotion", emotion_detector.detect_emotion), user_input), optional=True)
+    if shed_reason:
+        shed_stages["emotion"] = shed_reason
     
     # Get resource recommendations based on detected emotion/content
-    recommended_resources = get_resource_recommendations(
-        user_input, 
-        emotion_result["dominant_emotion"], 
-        crisis_result["crisis_detected"]
-    )
+    with timed("postprocess", model="resources"):
+        recommended_resources = get_resource_recommendations(
+            user_input, 
+            emotion_result["dominant_emotion"] if emotion_result else None, 
+            crisis_detected
+        )
     
     # If crisis detected, add task to notify emergency team
-    if crisis_result["crisis_detected"] and background_tasks:
+    if crisis_result["is_crisis"] and background_tasks:
         background_tasks.add_task(notify_crisis_team, user_input, crisis_result["confidence"])
+    elif session_risk and session_risk["escalate"] and background_tasks:
+        background_tasks.add_task(notify_crisis_team, user_input, min(session_risk["session_risk"] / session_risk["threshold"], 1.0))
+
+    if request.session_id:
+        conversation_store.append(request.session_id, "user", user_input,
+                                  outputs={"crisis": crisis_result, "emotion": emotion_result})
+        conversation_store.append(request.session_id, "assistant", response)
+    
+    metadata = {"shed_stages": shed_stages}
+    if CHAT_PERSISTENCE and request.session_id:
+        metadata.update(await _persist_turn(request.session_id, user_input, response, crisis_result, emotion_result))
     
     return ChatResponse(
         response=response,
         detected_emotion=emotion_result,
-        crisis_detected=crisis_result["crisis_detected"],
-        recommended_resources=recommended_resources
+        crisis_detected=crisis_detected,
+        session_risk=session_risk,
+        recommended_resources=recommended_resources,
+        metadata=metadata
     )
 
+async def _persist_turn(session_id, user_input, response, crisis_result, emotion_result) -> dict:
+    """
+    Buffers the turn for the write-behind writer. A crisis record is written with
+    priority and acknowledged (committed, or fsynced to the spill file) before the
+    response reports the crisis as handled. Buffering can block (backpressure wait,
+    and the first call creates the writer), so it runs in the threadpool too.
+    """
+    ack = await run_in_threadpool(persist_chat_turn, session_id, user_input, response, crisis_result, emotion_result)
+    if ack is None:
+        return {}
+    status = await run_in_threadpool(ack.wait, PREDICTION_WRITER_CRISIS_ACK_SECONDS)
+    if status is None:
+        logger.error("crisis_record_not_acknowledged", session_id=session_id, timeout=PREDICTION_WRITER_CRISIS_ACK_SECONDS)
+    return {"crisis_record": status or "pending"}
+
+def _stage_in_threadpool(stage: str, model: str, fn):
+    """fn, timed as a stage, with its wait for a threadpool thread recorded as a queue wait."""
+    return track_queue_wait(timed(stage, model=model)(fn), "threadpool", model=model)
+
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest = Body(...), background_tasks: BackgroundTasks = None):
+    """
+    Streaming variant of /chat (Server-Sent Events). All stages start at once and
+    results are sent as they become available, the crisis verdict always first:
+        event: crisis    -> {"crisis_detected", "crisis_type", "confidence", "session_risk"}
+        event: response  -> {"response"}
+        event: emotion   -> detect_emotion result (not sent if the stage was shed under load)
+        event: resources -> {"recommended_resources"}
+        event: done      -> {"metadata"} (see ChatResponse.metadata)
+    """
+    user_input = request.message
+    history_text = get_history_text(request)
+    admission = get_admission_controller()
+
+    # Stages are blocking model calls, so they run in the threadpool, concurrently.
+    # Each task resolves to (result, shed reason); only the emotion stage can be shed.
+    crisis_task = asyncio.ensure_future(admission.run("crisis", lambda: run_in_threadpool(
+        _stage_in_threadpool("crisis", "crisis_hybrid", detect_crisis_hybrid), user_input)))
+    response_task = asyncio.ensure_future(admission.run("generate", lambda: run_in_threadpool(
+        _stage_in_threadpool("generate", "chatbot", chatbot.generate_response), user_input, history_text)))
+    emotion_task = asyncio.ensure_future(admission.run("emotion", lambda: run_in_threadpool(
+        _stage_in_threadpool("forward", "emotion", emotion_detector.detect_emotion), user_input), optional=True))
+
+    async def events():
+        try:
+            # The keyword layer returns without running the ML model, so clear-cut
+            # crises are reported at keyword-matching cost
+            crisis_result, _ = await crisis_task
+            crisis_detected = crisis_result["is_crisis"]
+            session_risk = None
+            if request.session_id:
+                session_risk = update_session_risk(request.session_id, crisis_result)
+                crisis_detected = crisis_detected or session_risk["escalated"]
+            if crisis_result["is_crisis"] and background_tasks:
+                background_tasks.add_task(notify_crisis_team, user_input, crisis_result["confidence"])
+            elif session_risk and session_risk["escalate"] and background_tasks:
+                background_tasks.add_task(notify_crisis_team, user_input, min(session_risk["session_risk"] / session_risk["threshold"], 1.0))
+            yield _sse_event("crisis", {
+                "crisis_detected": crisis_detected,
+                "crisis_type": crisis_result.get("crisis_type"),
+                "confidence": crisis_result.get("confidence"),
+                "session_risk": session_risk,
+            })
+            if crisis_detected:
+                # Crisis resources do not depend on the emotion stage, send them right away
+                yield _sse_event("resources", {"recommended_resources": get_resource_recommendations(user_input, None, True)})
+
+            response, emotion_result, shed_stages = None, None, {}
+            response_sent = emotion_sent = False
+            for next_done in asyncio.as_completed([response_task, emotion_task]):
+                await next_done
+                if not response_sent and response_task.done():
+                    response, _ = response_task.result()
+                    response_sent = True
+                    yield _sse_event("response", {"response": response})
+                if not emotion_sent and emotion_task.done():
+                    emotion_result, shed_reason = emotion_task.result()
+                    emotion_sent = True
+                    if shed_reason:
+                        shed_stages["emotion"] = shed_reason
+                    else:
+                        yield _sse_event("emotion", emotion_result)
+                    if not crisis_detected:
+                        yield _sse_event("resources", {"recommended_resources": get_resource_recommendations(
+                            user_input, emotion_result["dominant_emotion"] if emotion_result else None, False
+                        )})
+
+            if request.session_id:
+                conversation_store.append(request.session_id, "user", user_input,
+                                          outputs={"crisis": crisis_result, "emotion": emotion_result})
+                conversation_store.append(request.session_id, "assistant", response)
+            metadata = {"shed_stages": shed_stages}
+            if CHAT_PERSISTENCE and request.session_id:
+                metadata.update(await _persist_turn(request.session_id, user_input, response, crisis_result, emotion_result))
+            yield _sse_event("done", {"metadata": metadata})
+        except Exception as e:
+            logger.exception("chat_stream_failed")
+            yield _sse_event("error", {"detail": str(e)})
+        finally:
+            for task in (crisis_task, response_task, emotion_task):
+                task.cancel()
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
 def get_resource_recommendations(message, emotion, is_crisis):
     """Get relevant resources based on user message and detected emotion"""
     resources = []
@@ -120,5 +292,6 @@ def get_resource_recommendations(message, emotion, is_crisis):
 def notify_crisis_team(message, confidence):
     """Background task to notify crisis response team"""
     # In production, implement actual notification logic
-    print(f"[CRISIS CAMEROON] Notify SOS team: '{message}' with confidence {confidence:.2f}")
+    # WARNING level: never sampled out. The message itself is redacted in the log output.
+    logger.warning("crisis_team_notified", region="cameroon", text=message, confidence=round(confidence, 2))
     # In real implementation: send to crisis API endpoint, notify staff, etc.
\ No newline at end of file
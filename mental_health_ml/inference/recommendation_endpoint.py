@@ -1,9 +1,14 @@
 # inference/recommendation_endpoint.py
 from fastapi import APIRouter, Body
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import List, Dict, Optional
+from collections import OrderedDict
+import os
+import threading
 
 from models.recommendation.model import ResourceRecommender
+from mental_health_ml.utils.admission import get_admission_controller
 
 router = APIRouter()
 
@@ -23,6 +28,26 @@ sample_resources = [
 recommender = ResourceRecommender()
 recommender.load_resources(sample_resources)
 
+# Recent model recommendations, served again when admission control sheds the
+# recommender stage (requests not seen before get the popular resources)
+RECOMMENDATION_CACHE_SIZE = int(os.getenv("RECOMMENDATION_CACHE_SIZE", "1024"))
+_recent_recommendations = OrderedDict()
+_recent_recommendations_lock = threading.Lock()
+
+def _popular_resources(limit: int) -> list:
+    return sorted(sample_resources, key=lambda x: x.get('popularity', 0), reverse=True)[:limit]
+
+def _cached_recommendations(key: str):
+    with _recent_recommendations_lock:
+        return _recent_recommendations.get(key)
+
+def _cache_recommendations(key: str, resources: list):
+    with _recent_recommendations_lock:
+        _recent_recommendations[key] = resources
+        _recent_recommendations.move_to_end(key)
+        while len(_recent_recommendations) > RECOMMENDATION_CACHE_SIZE:
+            _recent_recommendations.popitem(last=False)
+
 class UserProfile(BaseModel):
     needs: Optional[List[str]] = None
     interests: Optional[List[str]] = None
@@ -43,21 +68,32 @@ class Resource(BaseModel):
 
 class RecommendationResponse(BaseModel):
     recommendations: List[Resource]
+    metadata: Optional[dict] = None # {"shed_stages": {stage: reason}, "served_from": "model" | "cache" | "popular"}
 
 @router.post("/recommend", response_model=RecommendationResponse)
 async def get_recommendations(request: RecommendationRequest = Body(...)):
-    if request.assessment_results:
-        # Prioritize assessment-based recommendations
-        recommended_resources = recommender.recommend_for_assessment(
-            request.assessment_results, request.limit)
-    elif request.user_profile:
-        # Fall back to profile-based recommendations
-        recommended_resources = recommender.recommend_for_user(
-            request.user_profile, request.user_history, request.limit)
+    shed_stages, served_from = {}, "model"
+    if request.assessment_results or request.user_profile:
+        if request.assessment_results:
+            # Prioritize assessment-based recommendations
+            recommend, args = recommender.recommend_for_assessment, (request.assessment_results, request.limit)
+        else:
+            # Fall back to profile-based recommendations
+            recommend, args = recommender.recommend_for_user, (request.user_profile, request.user_history, request.limit)
+        cache_key = request.model_dump_json()
+        recommended_resources, shed_reason = await get_admission_controller().run(
+            "recommender", lambda: run_in_threadpool(recommend, *args), optional=True)
+        if shed_reason:
+            shed_stages["recommender"] = shed_reason
+            recommended_resources = _cached_recommendations(cache_key)
+            served_from = "cache"
+            if recommended_resources is None:
+                recommended_resources, served_from = _popular_resources(request.limit), "popular"
+        else:
+            _cache_recommendations(cache_key, recommended_resources)
     else:
         # Default to generic popular recommendations
-        recommended_resources = sorted(sample_resources, 
-                                      key=lambda x: x.get('popularity', 0), 
-                                      reverse=True)[:request.limit]
+        recommended_resources, served_from = _popular_resources(request.limit), "popular"
     
-    return RecommendationResponse(recommendations=recommended_resources)
\ No newline at end of file
+    return RecommendationResponse(recommendations=recommended_resources,
+                                  metadata={"shed_stages": shed_stages, "served_from": served_from})
\ No newline at end of file
@@ -1,232 +1,232 @@
-# # models/assessment/model.py
-# """
-# Mental Health Assessment Model Implementation
-# Combines BERT-based text analysis with numerical response processing
-# """
+# models/assessment/model.py
+"""
+Mental Health Assessment Model Implementation
+Combines BERT-based text analysis with numerical response processing
+"""
 
-# import torch
-# import torch.nn as nn
-# from transformers import BertModel, BertTokenizer
-# import numpy as np
-# from typing import Dict, List, Optional, Tuple
-# import logging
+import torch
+import torch.nn as nn
+from transformers import BertModel, BertTokenizer
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+import logging
 
-# logger = logging.getLogger(__name__)
+logger = logging.getLogger(__name__)
 
-# class MentalHealthAssessmentModel(nn.Module):
-#     """
-#     Multi-modal mental health assessment model that processes both:
-#     1. Numerical survey responses (1-10 scale questions)
-#     2. Text responses (open-ended comments)
-#     """
+class MentalHealthAssessmentModel(nn.Module):
+    """
+    Multi-modal mental health assessment model that processes both:
+    1. Numerical survey responses (Likert items, normalized to 0-1)
+    2. Text responses (open-ended comments)
+    """
     
-#     def __init__(self, 
-#                  num_numerical_features: int = 10,
-#                  num_labels: int = 5,
-#                  bert_model_name: str = "google/bert_uncased_L-4_H-512_A-8",
-#                  dropout_rate: float = 0.1,
-#                  hidden_size: int = 256):
-#         """
-#         Initialize the assessment model
-        
-#         Args:
-#             num_numerical_features: Number of numerical survey questions
-#             num_labels: Number of output labels (anxiety, depression, stress, wellbeing, risk)
-#             bert_model_name: Pre-trained BERT model to use
-#             dropout_rate: Dropout rate for regularization
-#             hidden_size: Hidden layer size for numerical features
-#         """
-#         super().__init__()
-        
-#         self.num_numerical_features = num_numerical_features
-#         self.num_labels = num_labels
-        
-#         # BERT for text processing
-#         try:
-#             self.bert = BertModel.from_pretrained(bert_model_name)
-#             self.bert_hidden_size = self.bert.config.hidden_size
-#             logger.info(f"Loaded BERT model: {bert_model_name}")
-#         except Exception as e:
-#             logger.warning(f"Could not load {bert_model_name}, using base model")
-#             self.bert = BertModel.from_pretrained("bert-base-uncased")
-#             self.bert_hidden_size = self.bert.config.hidden_size
-        
-#         # Freeze early BERT layers to reduce training time
-#         for param in list(self.bert.parameters())[:-12]:  # Freeze all but last 2 layers
-#             param.requires_grad = False
-        
-#         # Numerical features processing
-#         self.numerical_processor = nn.Sequential(
-#             nn.Linear(num_numerical_features, hidden_size),
-#             nn.ReLU(),
-#             nn.Dropout(dropout_rate),
-#             nn.Linear(hidden_size, hidden_size // 2),
-#             nn.ReLU(),
-#             nn.Dropout(dropout_rate)
-#         )
-        
-#         # Text features processing
-#         self.text_processor = nn.Sequential(
-#             nn.Linear(self.bert_hidden_size, hidden_size),
-#             nn.ReLU(),
-#             nn.Dropout(dropout_rate),
-#             nn.Linear(hidden_size, hidden_size // 2),
-#             nn.ReLU(),
-#             nn.Dropout(dropout_rate)
-#         )
-        
-#         # Combined features processing
-#         combined_size = (hidden_size // 2) * 2  # numerical + text features
-#         self.classifier = nn.Sequential(
-#             nn.Linear(combined_size, hidden_size),
-#             nn.ReLU(),
-#             nn.Dropout(dropout_rate),
-#             nn.Linear(hidden_size, hidden_size // 2),
-#             nn.ReLU(),
-#             nn.Dropout(dropout_rate),
-#             nn.Linear(hidden_size // 2, num_labels),
-#             nn.Sigmoid()  # Output probabilities between 0 and 1
-#         )
-        
-#         # Initialize weights
-#         self._init_weights()
+    def __init__(self, 
+                 num_numerical_features: int = 31, # Likert items in mental_health_assessment_dataset.csv
+                 num_labels: int = 5,
+                 bert_model_name: str = "google/bert_uncased_L-4_H-512_A-8",
+                 dropout_rate: float = 0.1,
+                 hidden_size: int = 256):
+        """
+        Initialize the assessment model
+        
+        Args:
+            num_numerical_features: Number of numerical survey questions
+            num_labels: Number of output labels (anxiety, depression, stress, wellbeing, risk)
+            bert_model_name: Pre-trained BERT model to use
+            dropout_rate: Dropout rate for regularization
+            hidden_size: Hidden layer size for numerical features
+        """
+        super().__init__()
+        
+        self.num_numerical_features = num_numerical_features
+        self.num_labels = num_labels
+        
+        # BERT for text processing
+        try:
+            self.bert = BertModel.from_pretrained(bert_model_name)
+            self.bert_hidden_size = self.bert.config.hidden_size
+            logger.info(f"Loaded BERT model: {bert_model_name}")
+        except Exception as e:
+            logger.warning(f"Could not load {bert_model_name}, using base model")
+            self.bert = BertModel.from_pretrained("bert-base-uncased")
+            self.bert_hidden_size = self.bert.config.hidden_size
+        
+        # Freeze early BERT layers to reduce training time
+        for param in list(self.bert.parameters())[:-12]:  # Freeze all but last 2 layers
+            param.requires_grad = False
+        
+        # Numerical features processing
+        self.numerical_processor = nn.Sequential(
+            nn.Linear(num_numerical_features, hidden_size),
+            nn.ReLU(),
+            nn.Dropout(dropout_rate),
+            nn.Linear(hidden_size, hidden_size // 2),
+            nn.ReLU(),
+            nn.Dropout(dropout_rate)
+        )
+        
+        # Text features processing
+        self.text_processor = nn.Sequential(
+            nn.Linear(self.bert_hidden_size, hidden_size),
+            nn.ReLU(),
+            nn.Dropout(dropout_rate),
+            nn.Linear(hidden_size, hidden_size // 2),
+            nn.ReLU(),
+            nn.Dropout(dropout_rate)
+        )
+        
+        # Combined features processing
+        combined_size = (hidden_size // 2) * 2  # numerical + text features
+        self.classifier = nn.Sequential(
+            nn.Linear(combined_size, hidden_size),
+            nn.ReLU(),
+            nn.Dropout(dropout_rate),
+            nn.Linear(hidden_size, hidden_size // 2),
+            nn.ReLU(),
+            nn.Dropout(dropout_rate),
+            nn.Linear(hidden_size // 2, num_labels),
+            nn.Sigmoid()  # Output probabilities between 0 and 1
+        )
+        
+        # Initialize weights
+        self._init_weights()
     
-#     def _init_weights(self):
-#         """Initialize model weights"""
-#         for module in [self.numerical_processor, self.text_processor, self.classifier]:
-#             for layer in module:
-#                 if isinstance(layer, nn.Linear):
-#                     torch.nn.init.xavier_uniform_(layer.weight)
-#                     torch.nn.init.zeros_(layer.bias)
+    def _init_weights(self):
+        """Initialize model weights"""
+        for module in [self.numerical_processor, self.text_processor, self.classifier]:
+            for layer in module:
+                if isinstance(layer, nn.Linear):
+                    torch.nn.init.xavier_uniform_(layer.weight)
+                    torch.nn.init.zeros_(layer.bias)
     
-#     def forward(self, 
-#                 numerical_features: torch.Tensor,
-#                 input_ids: Optional[torch.Tensor] = None,
-#                 attention_mask: Optional[torch.Tensor] = None) -> torch.Tensor:
-#         """
-#         Forward pass of the model
-        
-#         Args:
-#             numerical_features: Tensor of shape (batch_size, num_numerical_features)
-#             input_ids: BERT input token IDs (batch_size, seq_len)
-#             attention_mask: BERT attention mask (batch_size, seq_len)
+    def forward(self, 
+                numerical_features: torch.Tensor,
+                input_ids: Optional[torch.Tensor] = None,
+                attention_mask: Optional[torch.Tensor] = None) -> torch.Tensor:
+        """
+        Forward pass of the model
+        
+        Args:
+            numerical_features: Tensor of shape (batch_size, num_numerical_features)
+            input_ids: BERT input token IDs (batch_size, seq_len)
+            attention_mask: BERT attention mask (batch_size, seq_len)
             
-#         Returns:
-#             Tensor of shape (batch_size, num_labels) with predictions
-#         """
-#         batch_size = numerical_features.shape[0]
-        
-#         # Process numerical features
-#         numerical_output = self.numerical_processor(numerical_features)
-        
-#         # Process text features if provided
-#         if input_ids is not None and attention_mask is not None:
-#             bert_outputs = self.bert(input_ids=input_ids, attention_mask=attention_mask)
-#             text_features = bert_outputs.pooler_output
-#             text_output = self.text_processor(text_features)
-#         else:
-#             # If no text provided, use zeros
-#             text_output = torch.zeros(batch_size, self.numerical_processor[-2].out_features).to(numerical_features.device)
-        
-#         # Combine features
-#         combined_features = torch.cat([numerical_output, text_output], dim=1)
-        
-#         # Final classification
-#         predictions = self.classifier(combined_features)
-        
-#         return predictions
+        Returns:
+            Tensor of shape (batch_size, num_labels) with predictions
+        """
+        batch_size = numerical_features.shape[0]
+        
+        # Process numerical features
+        numerical_output = self.numerical_processor(numerical_features)
+        
+        # Process text features if provided
+        if input_ids is not None and attention_mask is not None:
+            bert_outputs = self.bert(input_ids=input_ids, attention_mask=attention_mask)
+            text_features = bert_outputs.pooler_output
+            text_output = self.text_processor(text_features)
+        else:
+            # If no text provided, use zeros
+            text_output = torch.zeros(batch_size, self.numerical_processor[-2].out_features).to(numerical_features.device)
+        
+        # Combine features
+        combined_features = torch.cat([numerical_output, text_output], dim=1)
+        
+        # Final classification
+        predictions = self.classifier(combined_features)
+        
+        return predictions
     
-#     def predict_labels(self, predictions: torch.Tensor) -> Dict[str, float]:
-#         """
-#         Convert model predictions to interpretable labels
+    def predict_labels(self, predictions: torch.Tensor) -> Dict[str, float]:
+        """
+        Convert model predictions to interpretable labels
         
-#         Args:
-#             predictions: Model output tensor
+        Args:
+            predictions: Model output tensor
             
-#         Returns:
-#             Dictionary with label names and values
-#         """
-#         if len(predictions.shape) > 1:
-#             predictions = predictions.squeeze()
-        
-#         pred_np = predictions.detach().cpu().numpy()
-        
-#         return {
-#             'anxiety_level': float(pred_np[0]),
-#             'depression_level': float(pred_np[1]),
-#             'stress_level': float(pred_np[2]),
-#             'wellbeing_score': float(pred_np[3]),
-#             'risk_level': float(pred_np[4])
-#         }
+        Returns:
+            Dictionary with label names and values
+        """
+        if len(predictions.shape) > 1:
+            predictions = predictions.squeeze()
+        
+        pred_np = predictions.detach().cpu().numpy()
+        
+        return {
+            'anxiety_level': float(pred_np[0]),
+            'depression_level': float(pred_np[1]),
+            'stress_level': float(pred_np[2]),
+            'wellbeing_score': float(pred_np[3]),
+            'risk_level': float(pred_np[4])
+        }
     
-#     def get_recommendations(self, predictions: Dict[str, float]) -> List[str]:
-#         """
-#         Generate recommendations based on assessment results
+    def get_recommendations(self, predictions: Dict[str, float]) -> List[str]:
+        """
+        Generate recommendations based on assessment results
         
-#         Args:
-#             predictions: Dictionary of predicted labels
+        Args:
+            predictions: Dictionary of predicted labels
             
-#         Returns:
-#             List of recommendation strings
-#         """
-#         recommendations = []
-        
-#         # Anxiety recommendations
-#         if predictions['anxiety_level'] > 0.7:
-#             recommendations.extend([
-#                 "Practice deep breathing exercises for 5-10 minutes daily",
-#                 "Consider trying progressive muscle relaxation techniques",
-#                 "Limit caffeine intake, especially in the afternoon"
-#             ])
-#         elif predictions['anxiety_level'] > 0.5:
-#             recommendations.append("Try mindfulness meditation to help manage worry")
-        
-#         # Depression recommendations
-#         if predictions['depression_level'] > 0.7:
-#             recommendations.extend([
-#                 "Consider scheduling a consultation with a mental health professional",
-#                 "Try to maintain a regular sleep schedule",
-#                 "Engage in light physical activity, even if just a short walk"
-#             ])
-#         elif predictions['depression_level'] > 0.5:
-#             recommendations.extend([
-#                 "Connect with friends or family members",
-#                 "Consider keeping a mood journal"
-#             ])
-        
-#         # Stress recommendations
-#         if predictions['stress_level'] > 0.6:
-#             recommendations.extend([
-#                 "Practice time management techniques",
-#                 "Set boundaries between work and personal time",
-#                 "Try stress-relief activities like yoga or listening to music"
-#             ])
-        
-#         # Wellbeing recommendations
-#         if predictions['wellbeing_score'] < 0.4:
-#             recommendations.extend([
-#                 "Focus on self-care activities that bring you joy",
-#                 "Consider exploring new hobbies or interests",
-#                 "Make time for activities that give you a sense of accomplishment"
-#             ])
-        
-#         # Risk recommendations
-#         if predictions['risk_level'] > 0.6:
-#             recommendations.extend([
-#                 "Please consider reaching out to a crisis helpline for immediate support",
-#                 "Contact a mental health professional as soon as possible",
-#                 "Reach out to trusted friends, family, or support groups"
-#             ])
-        
-#         # General wellness recommendations
-#         if len(recommendations) == 0:
-#             recommendations.extend([
-#                 "Maintain a balanced lifestyle with regular exercise and healthy eating",
-#                 "Practice gratitude by writing down three things you're thankful for daily",
-#                 "Stay connected with supportive people in your life"
-#             ])
-        
-#         return recommendations[:5]  # Limit to top 5 recommendations
+        Returns:
+            List of recommendation strings
+        """
+        recommendations = []
+        
+        # Anxiety recommendations
+        if predictions['anxiety_level'] > 0.7:
+            recommendations.extend([
+                "Practice deep breathing exercises for 5-10 minutes daily",
+                "Consider trying progressive muscle relaxation techniques",
+                "Limit caffeine intake, especially in the afternoon"
+            ])
+        elif predictions['anxiety_level'] > 0.5:
+            recommendations.append("Try mindfulness meditation to help manage worry")
+        
+        # Depression recommendations
+        if predictions['depression_level'] > 0.7:
+            recommendations.extend([
+                "Consider scheduling a consultation with a mental health professional",
+                "Try to maintain a regular sleep schedule",
+                "Engage in light physical activity, even if just a short walk"
+            ])
+        elif predictions['depression_level'] > 0.5:
+            recommendations.extend([
+                "Connect with friends or family members",
+                "Consider keeping a mood journal"
+            ])
+        
+        # Stress recommendations
+        if predictions['stress_level'] > 0.6:
+            recommendations.extend([
+                "Practice time management techniques",
+                "Set boundaries between work and personal time",
+                "Try stress-relief activities like yoga or listening to music"
+            ])
+        
+        # Wellbeing recommendations
+        if predictions['wellbeing_score'] < 0.4:
+            recommendations.extend([
+                "Focus on self-care activities that bring you joy",
+                "Consider exploring new hobbies or interests",
+                "Make time for activities that give you a sense of accomplishment"
+            ])
+        
+        # Risk recommendations
+        if predictions['risk_level'] > 0.6:
+            recommendations.extend([
+                "Please consider reaching out to a crisis helpline for immediate support",
+                "Contact a mental health professional as soon as possible",
+                "Reach out to trusted friends, family, or support groups"
+            ])
+        
+        # General wellness recommendations
+        if len(recommendations) == 0:
+            recommendations.extend([
+                "Maintain a balanced lifestyle with regular exercise and healthy eating",
+                "Practice gratitude by writing down three things you're thankful for daily",
+                "Stay connected with supportive people in your life"
+            ])
+        
+        return recommendations[:5]  # Limit to top 5 recommendations
 
 # class AssessmentPreprocessor:
 #     """
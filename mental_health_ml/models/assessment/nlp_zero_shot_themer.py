@@ -2,6 +2,12 @@
 from transformers import pipeline
 import torch # Though pipeline handles device placement, good to have if extending
 
+from mental_health_ml.utils.model_manager import get_model_manager
+from mental_health_ml.utils.single_flight import coalesce
+from mental_health_ml.utils.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
 # Define our target themes.
 # For multilingual, it's often best if these candidate labels are in English,
 # as many multilingual NLI models are trained with English hypotheses.
@@ -25,20 +31,33 @@ ZERO_SHOT_MODEL_NAME = "MoritzLaurer/mDeBERTa-v3-base-mnli-xnli"
 # This model is specifically good for cross-lingual zero-shot.
 # It's based on mDeBERTa-v3-base and fine-tuned on XNLI and MNLI.
 
-try:
-    classifier_pipeline = pipeline(
+# Key under which the themer is registered with the shared ModelManager.
+# The themer is rarely used, so it is not pinned: it can be evicted under memory
+# pressure and is reloaded transparently on the next request.
+THEMER_MODEL_KEY = "zero_shot_themer"
+
+
+def _build_zero_shot_pipeline():
+    classifier = pipeline(
         "zero-shot-classification",
         model=ZERO_SHOT_MODEL_NAME,
         device=0 if torch.cuda.is_available() else -1 # Use GPU if available
     )
-    print(f"Successfully loaded multilingual zero-shot model: {ZERO_SHOT_MODEL_NAME}")
-except Exception as e:
-    print(f"Error loading zero-shot model {ZERO_SHOT_MODEL_NAME}: {e}")
-    print("Please ensure the model name is correct, you have internet access,")
-    print("and necessary dependencies (like sentencepiece for mDeBERTa) are installed.")
-    classifier_pipeline = None
+    logger.info("themer_model_loaded", model=ZERO_SHOT_MODEL_NAME)
+    return classifier
+
+
+def load_zero_shot_themer():
+    """Returns the zero-shot pipeline, loading it through the shared ModelManager if needed."""
+    try:
+        return get_model_manager().get_or_load(THEMER_MODEL_KEY, _build_zero_shot_pipeline)
+    except Exception as e:
+        # Usually a wrong model name, no internet access or a missing dependency (sentencepiece for mDeBERTa)
+        logger.error("themer_model_load_failed", model=ZERO_SHOT_MODEL_NAME, error=str(e))
+        return None
 
 
+@coalesce("zero_shot_themer")
 def predict_themes_zero_shot_multilingual(text_input: str, candidate_labels: list = None, threshold: float = 0.5) -> dict:
     """
     Predicts themes for a given text using a multilingual zero-shot classification pipeline.
@@ -51,6 +70,7 @@ def predict_themes_zero_shot_multilingual(text_input: str, candidate_labels: lis
     Returns:
         dict: A dictionary containing the input text and a list of detected themes with their scores.
     """
+    classifier_pipeline = load_zero_shot_themer()
     if classifier_pipeline is None:
         return {"text": text_input, "detected_themes": [], "error": "Zero-shot classifier not loaded."}
 
@@ -73,7 +93,7 @@ def predict_themes_zero_shot_multilingual(text_input: str, candidate_labels: lis
             # Handle cases where the input might be a list of texts for batching
             # or if the structure is different for some reason.
             # This simple example assumes single text input for now.
-            print(f"Unexpected zero-shot output structure: {raw_predictions}")
+            logger.warning("themer_unexpected_output", output_type=type(raw_predictions).__name__)
             return {"text": text_input, "detected_themes": [], "error": "Unexpected zero-shot output structure"}
 
         # Sort by score descending for better presentation
@@ -85,7 +105,7 @@ def predict_themes_zero_shot_multilingual(text_input: str, candidate_labels: lis
             "model_version_tag": f"zero_shot_{ZERO_SHOT_MODEL_NAME.replace('/', '_')}" # Make filename friendly
         }
     except Exception as e:
-        print(f"Error during multilingual zero-shot prediction for text '{text_input}': {e}")
+        logger.error("themer_prediction_failed", text=text_input, error=str(e))
         return {"text": text_input, "detected_themes": [], "error": str(e)}
 
 if __name__ == "__main__":
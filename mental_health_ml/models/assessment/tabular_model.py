@@ -0,0 +1,109 @@
+# mental_health_ml/models/assessment/tabular_model.py
+import os
+import pickle
+
+import numpy as np
+from sklearn.ensemble import HistGradientBoostingRegressor
+from sklearn.linear_model import Ridge
+from sklearn.multioutput import MultiOutputRegressor
+
+from mental_health_ml.data.preprocessing.assessment_preprocessing import AssessmentPreprocessor, ASSESSMENT_TARGET_COLUMNS
+from mental_health_ml.utils.model_manager import get_model_manager
+
+# Alternative to the BERT assessment model: a small scikit-learn regressor over the
+# scaled Likert answers. The questionnaires are numeric, so a linear or boosted
+# model reaches comparable error at a fraction of the cost (no tokenizer, no
+# transformer forward pass) and predicts whole batches in one vectorized call.
+TABULAR_ASSESSMENT_PATH = os.getenv("TABULAR_ASSESSMENT_PATH", "models/assessment/tabular_assessment_model.pkl")
+
+TABULAR_MODEL_KEY = "tabular_assessment"
+
+TABULAR_MODEL_FAMILIES = ("ridge", "gbm")
+
+
+def _make_estimator(family: str, random_state: int = 42):
+    if family == "ridge":
+        return Ridge(alpha=1.0) # Natively multi-output
+    if family == "gbm":
+        return MultiOutputRegressor(HistGradientBoostingRegressor(max_iter=200, learning_rate=0.1, random_state=random_state))
+    raise ValueError(f"Unknown tabular model family '{family}'. Expected one of {TABULAR_MODEL_FAMILIES}.")
+
+
+class TabularAssessmentModel:
+    """
+    Multi-output regressor predicting ASSESSMENT_TARGET_COLUMNS from the numeric answers.
+    Scaling (min/range, reverse-scored items) is learned with AssessmentPreprocessor,
+    so the features match those of the BERT model's numerical branch. Like the BERT
+    model it is fit on, and predicts, targets min-max scaled to [0, 1] over the
+    training range; preprocessor.unscale_targets() converts back to original units.
+    """
+    def __init__(self, family: str = "ridge", random_state: int = 42):
+        self.family = family
+        self.estimator = _make_estimator(family, random_state)
+        self.preprocessor = AssessmentPreprocessor()
+        self.target_columns = list(ASSESSMENT_TARGET_COLUMNS)
+
+    @property
+    def feature_columns(self) -> list:
+        return self.preprocessor.numeric_columns
+
+    def fit(self, assessment_df, targets_df):
+        self.preprocessor.fit_numeric(assessment_df)
+        self.preprocessor.fit_targets(targets_df) # Range saved with the model (the preprocessor is pickled with it)
+        y = self.preprocessor.scale_targets(targets_df).astype(np.float64)
+        self.estimator.fit(self.preprocessor.transform_numeric(assessment_df), y)
+        return self
+
+    def predict_scaled(self, features: np.ndarray) -> np.ndarray:
+        """Batch prediction on already scaled features, shape (n_rows, n_features) -> (n_rows, n_targets) in [0, 1]."""
+        predictions = self.estimator.predict(np.asarray(features, dtype=np.float32))
+        return np.clip(predictions, 0.0, 1.0) # The range seen in training
+
+    def predict(self, answers: np.ndarray) -> np.ndarray:
+        """
+        Batch prediction on raw answers, shape (n_rows, n_features) with columns in
+        feature_columns order. NaN marks a missing answer.
+        """
+        answers = np.asarray(answers, dtype=np.float32)
+        if answers.ndim == 1:
+            answers = answers[None, :]
+        return self.predict_scaled(self.preprocessor.scale_numeric(answers))
+
+    def predict_frame(self, assessment_df) -> np.ndarray:
+        return self.predict_scaled(self.preprocessor.transform_numeric(assessment_df))
+
+    def predict_responses(self, responses: dict) -> np.ndarray:
+        """Single assessment given as {question: answer}; returns one row of predictions."""
+        return self.predict_response_batch([responses])[0]
+
+    def predict_response_batch(self, responses_list: list) -> np.ndarray:
+        """
+        Several assessments given as {question: answer} dicts, predicted in one call.
+        Raises InvalidAssessmentResponses for unknown questions or missing / non-numeric answers.
+        """
+        for responses in responses_list:
+            self.preprocessor.validate_responses(responses)
+        answers = np.array([[_to_float(responses.get(col)) for col in self.feature_columns] for responses in responses_list],
+                           dtype=np.float32).reshape(len(responses_list), len(self.feature_columns))
+        return self.predict(answers)
+
+    def save(self, path: str = TABULAR_ASSESSMENT_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "wb") as f:
+            pickle.dump(self, f)
+
+    @classmethod
+    def load(cls, path: str = TABULAR_ASSESSMENT_PATH) -> "TabularAssessmentModel":
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def load_tabular_assessment_model(path: str = TABULAR_ASSESSMENT_PATH) -> TabularAssessmentModel:
+    return get_model_manager().get_or_load(TABULAR_MODEL_KEY, lambda: TabularAssessmentModel.load(path), pinned=True)
@@ -0,0 +1,134 @@
+# mental_health_ml/models/chatbot/conversation_store.py
+import os
+import threading
+from collections import deque
+from typing import Callable, List, Optional
+
+from mental_health_ml.utils.session_store import TTLSessionStore
+
+# Server-side conversation state, keyed by ChatSession id. Clients only send the
+# new message; the recent turns (with their tokenization and model outputs) are
+# kept here in a fixed-size ring buffer, so nothing is re-sent or re-tokenized.
+CONVERSATION_MAX_TURNS = int(os.getenv("CONVERSATION_MAX_TURNS", "20"))
+# Maximum number of tokens of history passed to the response generator
+CONVERSATION_TOKEN_BUDGET = int(os.getenv("CONVERSATION_TOKEN_BUDGET", "512"))
+CONVERSATION_TTL_SECONDS = float(os.getenv("CONVERSATION_TTL_SECONDS", "3600"))
+CONVERSATION_MAX_SESSIONS = int(os.getenv("CONVERSATION_MAX_SESSIONS", "10000"))
+
+ROLE_PREFIXES = {"user": "User: ", "assistant": "Assistant: "}
+
+
+def format_turn(role: str, content: str) -> str:
+    return ROLE_PREFIXES.get(role, "Assistant: ") + content + "\n"
+
+def whitespace_tokenize(text: str) -> list:
+    """Fallback when no model tokenizer is available; approximates the token count."""
+    return text.split()
+
+
+class Turn:
+    __slots__ = ("role", "content", "text", "token_ids", "outputs")
+
+    def __init__(self, role: str, content: str, token_ids: list, outputs: Optional[dict] = None):
+        self.role = role
+        self.content = content
+        self.text = format_turn(role, content) # Formatted once, reused every later turn
+        self.token_ids = token_ids
+        self.outputs = outputs or {} # e.g. crisis/emotion results computed for this turn
+
+
+class ConversationStore:
+    def __init__(self, tokenize: Callable[[str], list] = whitespace_tokenize,
+                 max_turns: int = CONVERSATION_MAX_TURNS,
+                 ttl_seconds: float = CONVERSATION_TTL_SECONDS,
+                 max_sessions: int = CONVERSATION_MAX_SESSIONS):
+        self.tokenize = tokenize
+        self.max_turns = max_turns
+        self.sessions = TTLSessionStore(max_entries=max_sessions, ttl_seconds=ttl_seconds)
+        self._lock = threading.Lock()
+
+    def _buffer(self, session_id: str) -> deque:
+        return self.sessions.get_or_create(session_id, lambda: deque(maxlen=self.max_turns))
+
+    def has_session(self, session_id: str) -> bool:
+        return self.sessions.get(session_id) is not None
+
+    def make_turn(self, role: str, content: str, outputs: Optional[dict] = None) -> Turn:
+        turn = Turn(role, content, [], outputs)
+        turn.token_ids = self.tokenize(turn.text)
+        return turn
+
+    def append(self, session_id: str, role: str, content: str, outputs: Optional[dict] = None) -> Turn:
+        """Tokenizes the turn once and pushes it into the session's ring buffer (oldest turn drops out)."""
+        turn = self.make_turn(role, content, outputs)
+        with self._lock:
+            self._buffer(session_id).append(turn)
+        return turn
+
+    def seed(self, session_id: str, messages: list, token_budget: int = CONVERSATION_TOKEN_BUDGET):
+        """
+        Initializes a session from a client-sent (legacy) history. Only the most
+        recent turns that fit the token budget are kept.
+        """
+        turns = self.turns_from_messages(messages, token_budget)
+        with self._lock:
+            buffer = self._buffer(session_id)
+            buffer.clear()
+            buffer.extend(turns)
+
+    def turns_from_messages(self, messages: list, token_budget: int = CONVERSATION_TOKEN_BUDGET) -> List[Turn]:
+        """
+        Converts client-sent messages ({role, content}) to turns, newest first, and
+        stops as soon as the token budget is used up, so an arbitrarily long
+        history costs at most one budget's worth of tokenization.
+        """
+        kept, used = [], 0
+        for msg in reversed(messages):
+            if len(kept) == self.max_turns:
+                break
+            turn = self.make_turn(msg.role, msg.content)
+            used += len(turn.token_ids)
+            if used > token_budget:
+                break
+            kept.append(turn)
+        kept.reverse()
+        return kept
+
+    def turns(self, session_id: str) -> List[Turn]:
+        with self._lock:
+            buffer = self.sessions.get(session_id)
+            return list(buffer) if buffer else []
+
+    def history_text(self, session_id: str, token_budget: int = CONVERSATION_TOKEN_BUDGET) -> str:
+        return build_history_text(truncate_to_token_budget(self.turns(session_id), token_budget))
+
+    def end_session(self, session_id: str):
+        self.sessions.pop(session_id)
+
+
+def truncate_to_token_budget(turns: List[Turn], token_budget: int) -> List[Turn]:
+    """Keeps the most recent turns whose token counts sum to at most token_budget."""
+    kept, used = [], 0
+    for turn in reversed(turns):
+        used += len(turn.token_ids)
+        if used > token_budget:
+            break
+        kept.append(turn)
+    kept.reverse()
+    return kept
+
+def build_history_text(turns: List[Turn]) -> str:
+    return "".join(turn.text for turn in turns)
+
+
+_conversation_store = None
+
+def get_conversation_store(tokenize: Callable[[str], list] = None) -> ConversationStore:
+    """
+    Process-wide store. The tokenizer given on first use (normally the chatbot's)
+    is the one used to measure history against the token budget.
+    """
+    global _conversation_store
+    if _conversation_store is None:
+        _conversation_store = ConversationStore(tokenize=tokenize or whitespace_tokenize)
+    return _conversation_store
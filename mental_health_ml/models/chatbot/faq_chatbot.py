@@ -1,11 +1,17 @@
 # mental_health_ml/models/chatbot/faq_chatbot.py
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
 import torch
+import numpy as np
 import pandas as pd
 import json
 import os
 import random
 
+from mental_health_ml.utils.metrics import timed
+from mental_health_ml.utils.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
 # --- Configuration ---
 # These should point to the *best* trained model artifacts
 MODEL_PATH = "saved_models/chatbot/intent_classifier_distilbert-base-uncased_intent_classifier_best_epoch3" # Example path, update after training
@@ -17,7 +23,7 @@ MAX_LENGTH = 128
 class FAQChatbot:
     def __init__(self, model_path, label_mapping_path, faq_kb_path):
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        print(f"FAQChatbot using device: {self.device}")
+        logger.info("faq_chatbot_device", device=str(self.device))
 
         if not os.path.exists(model_path) or \
            not os.path.exists(label_mapping_path) or \
@@ -40,32 +46,34 @@ class FAQChatbot:
         self.answer_lookup = self.faq_kb.set_index('intent_id')['answer'].to_dict()
         self.default_fallback_intent = "default_fallback" # Ensure this intent_id exists in your KB
 
-        print("FAQChatbot initialized successfully.")
+        logger.info("faq_chatbot_initialized", intents=len(self.answer_lookup))
 
     def predict_intent(self, text: str) -> tuple[str, float]:
         """Predicts the intent of a given text."""
-        inputs = self.tokenizer.encode_plus(
-            text.lower().strip(),
-            add_special_tokens=True,
-            max_length=MAX_LENGTH,
-            return_token_type_ids=False,
-            padding='max_length',
-            truncation=True,
-            return_attention_mask=True,
-            return_tensors='pt',
-        )
-        input_ids = inputs['input_ids'].to(self.device)
-        attention_mask = inputs['attention_mask'].to(self.device)
-
-        with torch.no_grad():
+        with timed("tokenize", model="faq_intent"):
+            inputs = self.tokenizer.encode_plus(
+                text.lower().strip(),
+                add_special_tokens=True,
+                max_length=MAX_LENGTH,
+                return_token_type_ids=False,
+                padding='max_length',
+                truncation=True,
+                return_attention_mask=True,
+                return_tensors='pt',
+            )
+            input_ids = inputs['input_ids'].to(self.device)
+            attention_mask = inputs['attention_mask'].to(self.device)
+
+        with timed("forward", model="faq_intent"), torch.no_grad():
             outputs = self.model(input_ids, attention_mask=attention_mask)
         
-        logits = outputs.logits
-        probabilities = torch.softmax(logits, dim=1).cpu().numpy()[0]
-        predicted_label_id = np.argmax(probabilities)
-        confidence = probabilities[predicted_label_id]
-        
-        predicted_intent_id = self.id2label.get(predicted_label_id, self.default_fallback_intent)
+        with timed("postprocess", model="faq_intent"):
+            logits = outputs.logits
+            probabilities = torch.softmax(logits, dim=1).cpu().numpy()[0]
+            predicted_label_id = int(np.argmax(probabilities))
+            confidence = probabilities[predicted_label_id]
+
+            predicted_intent_id = self.id2label.get(predicted_label_id, self.default_fallback_intent)
         
         return predicted_intent_id, float(confidence)
 
@@ -83,11 +91,11 @@ class FAQChatbot:
         """
         predicted_intent, confidence = self.predict_intent(user_message)
         
-        print(f"User: '{user_message}' -> Predicted Intent: '{predicted_intent}' (Confidence: {confidence:.4f})")
+        logger.debug("faq_intent_predicted", text=user_message, intent=predicted_intent, confidence=round(confidence, 4))
 
         if confidence < confidence_threshold:
             final_intent = self.default_fallback_intent
-            print(f"  Confidence below threshold ({confidence_threshold}). Using fallback intent.")
+            logger.debug("faq_intent_fallback", intent=predicted_intent, confidence=round(confidence, 4), threshold=confidence_threshold)
         else:
             final_intent = predicted_intent
         
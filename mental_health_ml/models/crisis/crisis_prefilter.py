@@ -0,0 +1,146 @@
+# mental_health_ml/models/crisis/crisis_prefilter.py
+import math
+import os
+import pickle
+
+import numpy as np
+from scipy.sparse import hstack
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import LogisticRegression
+
+from mental_health_ml.utils.model_manager import get_model_manager
+from mental_health_ml.utils.metrics import REGISTRY
+from mental_health_ml.utils.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+# Stage 1 of the crisis cascade: a cheap classifier that decides whether a message
+# is "clearly safe" or must be escalated to the (expensive) zero-shot NLI model.
+# It is tuned for recall on the crisis class, never for precision: a false escalation
+# only costs an NLI pass, a false "safe" could miss a person in crisis.
+CRISIS_PREFILTER_PATH = os.getenv("CRISIS_PREFILTER_PATH", "saved_models/crisis/crisis_prefilter.pkl")
+# Minimum crisis recall the prefilter must have shown on held-out data to be used at all.
+CRISIS_RECALL_FLOOR = float(os.getenv("CRISIS_RECALL_FLOOR", "0.98"))
+
+PREFILTER_MODEL_KEY = "crisis_prefilter"
+
+PREFILTER_DECISIONS = REGISTRY.counter("crisis_prefilter_decisions_total", "Stage-1 crisis prefilter decisions")
+
+
+class CrisisPrefilter:
+    """
+    Logistic regression over hashed word and character n-grams.
+    Hashing keeps the model small and vocabulary-free, so it can be retrained
+    on new pseudo-labelled data without refitting a vocabulary.
+    """
+    def __init__(self, n_features: int = 2 ** 18, recall_floor: float = CRISIS_RECALL_FLOOR):
+        self.word_vectorizer = HashingVectorizer(
+            n_features=n_features, ngram_range=(1, 2), alternate_sign=False, lowercase=True
+        )
+        self.char_vectorizer = HashingVectorizer(
+            n_features=n_features, analyzer="char_wb", ngram_range=(3, 5), alternate_sign=False, lowercase=True
+        )
+        self.classifier = LogisticRegression(class_weight="balanced", max_iter=1000)
+        self.recall_floor = recall_floor
+        self.escalation_threshold = 0.0 # Escalate everything until calibrated
+        self.calibration_report = {}
+
+    def _features(self, texts):
+        return hstack([self.word_vectorizer.transform(texts), self.char_vectorizer.transform(texts)]).tocsr()
+
+    def fit(self, texts: list, labels: list):
+        """Fits on binary labels (1 = crisis, 0 = not crisis)."""
+        self.classifier.fit(self._features(texts), np.asarray(labels, dtype=int))
+        return self
+
+    def predict_scores(self, texts: list) -> np.ndarray:
+        """Crisis probability for each text."""
+        return self.classifier.predict_proba(self._features(texts))[:, 1]
+
+    def calibrate(self, texts: list, labels: list, recall_floor: float = None) -> dict:
+        """
+        Picks the highest escalation threshold whose crisis recall on the given
+        held-out data is at least recall_floor, and records the achieved recall
+        and the share of messages that would still be escalated.
+        """
+        if recall_floor is not None:
+            self.recall_floor = recall_floor
+        labels = np.asarray(labels, dtype=int)
+        scores = self.predict_scores(texts)
+
+        positive_scores = np.sort(scores[labels == 1])[::-1]
+        if len(positive_scores) == 0:
+            raise ValueError("Calibration data must contain at least one crisis example.")
+
+        # Escalating every score >= the k-th highest positive score keeps at least k positives
+        k = max(1, math.ceil(self.recall_floor * len(positive_scores)))
+        self.escalation_threshold = float(positive_scores[k - 1])
+
+        escalated = scores >= self.escalation_threshold
+        self.calibration_report = {
+            "recall_floor": self.recall_floor,
+            "recall": float(escalated[labels == 1].mean()),
+            "escalation_rate": float(escalated.mean()),
+            "escalation_threshold": self.escalation_threshold,
+            "n_calibration": int(len(labels)),
+            "n_calibration_crisis": int(len(positive_scores)),
+        }
+        return self.calibration_report
+
+    def should_escalate(self, text: str) -> tuple:
+        """Returns (escalate, crisis_score) for a single message."""
+        score = float(self.predict_scores([text])[0])
+        return score >= self.escalation_threshold, score
+
+    def save(self, path: str = CRISIS_PREFILTER_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "wb") as f:
+            pickle.dump(self, f)
+
+    @classmethod
+    def load(cls, path: str = CRISIS_PREFILTER_PATH) -> "CrisisPrefilter":
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+
+def load_crisis_prefilter(path: str = CRISIS_PREFILTER_PATH, recall_floor: float = CRISIS_RECALL_FLOOR):
+    """
+    Returns the trained prefilter, or None if there is none or if its measured
+    recall is below the configured floor (in which case every message goes to
+    the NLI stage, exactly as without a cascade).
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        prefilter = get_model_manager().get_or_load(PREFILTER_MODEL_KEY, lambda: CrisisPrefilter.load(path), pinned=True)
+    except Exception as e:
+        logger.error("crisis_prefilter_load_failed", path=path, error=str(e))
+        return None
+
+    measured_recall = prefilter.calibration_report.get("recall", 0.0)
+    if measured_recall < recall_floor:
+        # Cascade disabled
+        logger.warning("crisis_prefilter_recall_below_floor", recall=round(measured_recall, 3), floor=recall_floor)
+        return None
+    return prefilter
+
+
+def prefilter_crisis(text_input: str, prefilter: CrisisPrefilter) -> dict:
+    """
+    Runs stage 1 of the cascade.
+    Returns:
+        dict: {
+            "escalate": bool (True if the NLI stage must run),
+            "prefilter_score": float (crisis probability from the cheap model),
+            "escalation_threshold": float,
+            "calibrated_recall": float (crisis recall measured at calibration time)
+        }
+    """
+    escalate, score = prefilter.should_escalate(text_input)
+    PREFILTER_DECISIONS.inc(decision="escalate" if escalate else "safe")
+    return {
+        "escalate": escalate,
+        "prefilter_score": round(score, 4),
+        "escalation_threshold": prefilter.escalation_threshold,
+        "calibrated_recall": prefilter.calibration_report.get("recall"),
+    }
@@ -0,0 +1,32 @@
+# mental_health_ml/models/crisis/crisis_student.py
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+import torch
+
+MAX_LENGTH = 128
+
+
+class CrisisStudent:
+    """
+    Compact multi-label classifier distilled from the zero-shot crisis model
+    (see training/distill_crisis_student.py). One forward pass scores all
+    crisis candidate labels, instead of one NLI pass per label.
+    """
+    def __init__(self, model_path: str):
+        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        self.tokenizer = AutoTokenizer.from_pretrained(model_path)
+        self.model = AutoModelForSequenceClassification.from_pretrained(model_path).to(self.device)
+        self.model.eval()
+        # Label order is stored in the model config at training time
+        self.labels = [self.model.config.id2label[i] for i in range(self.model.config.num_labels)]
+
+    def predict_scores(self, texts: list) -> list:
+        """Returns one {label: score} dict per text, scores in [0, 1] (independent sigmoids)."""
+        inputs = self.tokenizer(
+            texts, padding=True, truncation=True, max_length=MAX_LENGTH, return_tensors="pt"
+        ).to(self.device)
+        with torch.no_grad():
+            probabilities = torch.sigmoid(self.model(**inputs).logits).cpu().numpy()
+        return [
+            {label: round(float(score), 4) for label, score in zip(self.labels, row)}
+            for row in probabilities
+        ]
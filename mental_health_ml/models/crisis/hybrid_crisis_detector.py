@@ -1,16 +1,24 @@
 # mental_health_ml/models/crisis/hybrid_crisis_detector.py
 from .keyword_crisis_detector import detect_crisis_keywords
-from .ml_crisis_predictor import predict_crisis_ml, load_ml_crisis_model # Ensure model loads
+from .ml_crisis_predictor import predict_crisis_ml, load_ml_crisis_model, CRISIS_CANDIDATE_LABELS # Ensure model loads
+from .crisis_prefilter import load_crisis_prefilter, prefilter_crisis
+from mental_health_ml.utils.metrics import timed
+from mental_health_ml.utils.structured_logging import get_logger
+
+logger = get_logger(__name__)
 
 # Confidence score for keyword detection can be considered very high
 KEYWORD_CRISIS_CONFIDENCE = 0.99
 
-def detect_crisis_hybrid(text_input: str, ml_threshold_map: dict = None) -> dict:
+def detect_crisis_hybrid(text_input: str, ml_threshold_map: dict = None, use_prefilter: bool = True) -> dict:
     """
     Combines keyword and ML-based crisis detection.
+    The ML layer is a cascade: if a calibrated prefilter is available, clearly safe
+    messages are resolved by it and only escalated ones reach the zero-shot model.
     Args:
         text_input (str): The user's text.
         ml_threshold_map (dict, optional): Thresholds for ML crisis predictor.
+        use_prefilter (bool, optional): Set to False to always run the zero-shot model.
     Returns:
         dict: {
             "is_crisis": bool,
@@ -18,14 +26,16 @@ def detect_crisis_hybrid(text_input: str, ml_threshold_map: dict = None) -> dict
             "crisis_type": str (e.g., "keyword_suicide_intent", "ml_suicidal_intent_expression"),
             "details": {
                 "keyword_result": dict from detect_crisis_keywords,
-                "ml_result": dict from predict_crisis_ml
+                "prefilter_result": dict from prefilter_crisis or None if the cascade is not used,
+                "ml_result": dict from predict_crisis_ml (None if not run)
             }
         }
     """
     # Ensure ML model is loaded if it hasn't been already
     load_ml_crisis_model()
 
-    keyword_result = detect_crisis_keywords(text_input)
+    with timed("match", model="crisis_keyword"):
+        keyword_result = detect_crisis_keywords(text_input)
     
     # Layer 1: Keyword detection takes precedence for immediate flagging
     if keyword_result["keyword_crisis_detected"]:
@@ -34,15 +44,30 @@ def detect_crisis_hybrid(text_input: str, ml_threshold_map: dict = None) -> dict
             "confidence": KEYWORD_CRISIS_CONFIDENCE, # Assign high confidence
             "crisis_type": f"keyword_{keyword_result['matched_category']}",
             "triggering_text_segment": keyword_result.get('matched_pattern'), # The regex pattern
-            "details": {"keyword_result": keyword_result, "ml_result": None}
+            "details": {"keyword_result": keyword_result, "prefilter_result": None, "ml_result": None}
         }
 
-    # Layer 2: ML-based detection if no keywords matched
+    # Layer 2a: Cheap prefilter. Only messages it cannot clear are sent to the zero-shot model.
+    prefilter_result = None
+    prefilter = load_crisis_prefilter() if use_prefilter else None
+    if prefilter is not None:
+        with timed("forward", model="crisis_prefilter"):
+            prefilter_result = prefilter_crisis(text_input, prefilter)
+        if not prefilter_result["escalate"]:
+            return {
+                "is_crisis": False,
+                "confidence": 1.0 - prefilter_result["prefilter_score"], # Confidence it's NOT crisis
+                "crisis_type": None,
+                "triggering_text_segment": None,
+                "details": {"keyword_result": keyword_result, "prefilter_result": prefilter_result, "ml_result": None}
+            }
+
+    # Layer 2b: ML-based detection if no keywords matched
     ml_result = predict_crisis_ml(text_input, threshold_map=ml_threshold_map)
     
     if ml_result.get("error"): # Handle potential error from ML predictor
-        print(f"Warning: ML crisis prediction failed: {ml_result['error']}")
-        # Fallback: no crisis detected by ML if it errored. Consider logging this.
+        logger.warning("crisis_ml_layer_failed", error=ml_result["error"])
+        # Fallback: no crisis detected by ML if it errored
         is_ml_crisis = False
         ml_confidence = 0.0
         ml_crisis_type = None
@@ -63,7 +88,7 @@ def detect_crisis_hybrid(text_input: str, ml_threshold_map: dict = None) -> dict
             "confidence": ml_confidence,
             "crisis_type": ml_crisis_type,
             "triggering_text_segment": text_input, # For ML, the whole text is usually the trigger
-            "details": {"keyword_result": keyword_result, "ml_result": ml_result}
+            "details": {"keyword_result": keyword_result, "prefilter_result": prefilter_result, "ml_result": ml_result}
         }
 
     # No crisis detected by either layer
@@ -72,7 +97,7 @@ def detect_crisis_hybrid(text_input: str, ml_threshold_map: dict = None) -> dict
         "confidence": 1.0 - max(keyword_result.get("keyword_crisis_detected",0), ml_result.get("all_ml_scores", {}).get(CRISIS_CANDIDATE_LABELS[0], 0)), # Confidence it's NOT crisis
         "crisis_type": None,
         "triggering_text_segment": None,
-        "details": {"keyword_result": keyword_result, "ml_result": ml_result}
+        "details": {"keyword_result": keyword_result, "prefilter_result": prefilter_result, "ml_result": ml_result}
     }
 
 if __name__ == "__main__":
@@ -1,6 +1,14 @@
 # mental_health_ml/models/crisis/ml_crisis_predictor.py
 from transformers import pipeline
 import torch
+import os
+
+from mental_health_ml.utils.model_manager import get_model_manager
+from mental_health_ml.utils.metrics import timed
+from mental_health_ml.utils.single_flight import coalesce
+from mental_health_ml.utils.structured_logging import get_logger
+
+logger = get_logger(__name__)
 
 # Using a multilingual zero-shot model for broader applicability initially
 # In a production system, a model fine-tuned specifically on crisis data would be much preferred.
@@ -15,31 +23,80 @@ CRISIS_CANDIDATE_LABELS = [
 ]
 # We are most interested in the first one or two.
 
-ml_crisis_pipeline = None
-
-def load_ml_crisis_model():
-    global ml_crisis_pipeline
-    if ml_crisis_pipeline is None:
-        try:
-            print(f"Loading ML crisis model (zero-shot): {ML_CRISIS_MODEL_NAME}...")
-            ml_crisis_pipeline = pipeline(
-                "zero-shot-classification",
-                model=ML_CRISIS_MODEL_NAME,
-                device=0 if torch.cuda.is_available() else -1
-            )
-            print("ML crisis model (zero-shot) loaded successfully.")
-        except Exception as e:
-            print(f"Error loading ML crisis model {ML_CRISIS_MODEL_NAME}: {e}")
-            ml_crisis_pipeline = None
-    return ml_crisis_pipeline
-
-def predict_crisis_ml(text_input: str, threshold_map: dict = None) -> dict:
+# Default thresholds - THESE NEED CAREFUL TUNING
+DEFAULT_ML_THRESHOLD_MAP = {
+    CRISIS_CANDIDATE_LABELS[0]: 0.6, # Higher threshold for immediate suicidal intent
+    CRISIS_CANDIDATE_LABELS[1]: 0.5, # Slightly lower for severe distress
+}
+
+# Which model scores the candidate labels:
+#   "zero_shot": the NLI pipeline above (one pass per candidate label)
+#   "student":   a compact multi-label model distilled from it (one pass per message)
+ML_CRISIS_BACKEND = os.getenv("ML_CRISIS_BACKEND", "zero_shot")
+ML_CRISIS_STUDENT_PATH = os.getenv("ML_CRISIS_STUDENT_PATH", "saved_models/crisis/crisis_student")
+
+# Keys under which the models are registered with the shared ModelManager.
+# Crisis detection is safety-critical, so these models are pinned and never evicted.
+ML_CRISIS_MODEL_KEY = "crisis_zero_shot"
+ML_CRISIS_STUDENT_KEY = "crisis_student"
+
+def _build_ml_crisis_pipeline():
+    logger.info("crisis_model_loading", model=ML_CRISIS_MODEL_NAME)
+    crisis_pipeline = pipeline(
+        "zero-shot-classification",
+        model=ML_CRISIS_MODEL_NAME,
+        device=0 if torch.cuda.is_available() else -1
+    )
+    logger.info("crisis_model_loaded", model=ML_CRISIS_MODEL_NAME)
+    return crisis_pipeline
+
+def load_zero_shot_crisis_model():
+    try:
+        return get_model_manager().get_or_load(ML_CRISIS_MODEL_KEY, _build_ml_crisis_pipeline, pinned=True)
+    except Exception as e:
+        logger.error("crisis_model_load_failed", model=ML_CRISIS_MODEL_NAME, error=str(e))
+        return None
+
+def load_crisis_student_model(model_path: str = None):
+    from .crisis_student import CrisisStudent
+    model_path = model_path or ML_CRISIS_STUDENT_PATH
+    try:
+        return get_model_manager().get_or_load(ML_CRISIS_STUDENT_KEY, lambda: CrisisStudent(model_path), pinned=True)
+    except Exception as e:
+        logger.error("crisis_student_load_failed", path=model_path, error=str(e))
+        return None
+
+def load_ml_crisis_model(backend: str = None):
+    """Loads the model for the configured (or given) backend."""
+    if (backend or ML_CRISIS_BACKEND) == "student":
+        return load_crisis_student_model()
+    return load_zero_shot_crisis_model()
+
+def _score_zero_shot(pipeline_instance, text_input: str):
+    """Returns {label: score} for all candidate labels, or None on unexpected output."""
+    with timed("forward", model=ML_CRISIS_MODEL_KEY): # The pipeline tokenizes and post-processes internally
+        raw_predictions = pipeline_instance(text_input, CRISIS_CANDIDATE_LABELS, multi_label=True)
+    all_scores = {label: 0.0 for label in CRISIS_CANDIDATE_LABELS}
+    if isinstance(raw_predictions, dict) and 'labels' in raw_predictions and 'scores' in raw_predictions:
+        for label, score in zip(raw_predictions['labels'], raw_predictions['scores']):
+            all_scores[label] = round(score, 4)
+        return all_scores
+    return None
+
+def _score_student(student, text_input: str):
+    with timed("forward", model=ML_CRISIS_STUDENT_KEY):
+        scores = student.predict_scores([text_input])[0]
+    return {label: scores.get(label, 0.0) for label in CRISIS_CANDIDATE_LABELS}
+
+@coalesce("crisis_ml")
+def predict_crisis_ml(text_input: str, threshold_map: dict = None, backend: str = None) -> dict:
     """
-    Predicts crisis potential using the ML (zero-shot) model.
+    Predicts crisis potential using the ML model (zero-shot, or the distilled student).
     Args:
         text_input (str): The user's text.
         threshold_map (dict, optional): A dictionary mapping crisis labels to confidence thresholds.
                                         e.g., {"expressing immediate suicidal intent...": 0.7}
+        backend (str, optional): "zero_shot" or "student". Defaults to ML_CRISIS_BACKEND.
     Returns:
         dict: {
             "ml_crisis_detected": bool,
@@ -48,8 +105,9 @@ def predict_crisis_ml(text_input: str, threshold_map: dict = None) -> dict:
             "all_ml_scores": dict of all candidate labels and their scores
         }
     """
-    pipeline_instance = load_ml_crisis_model()
-    if pipeline_instance is None:
+    backend = backend or ML_CRISIS_BACKEND
+    model_instance = load_ml_crisis_model(backend)
+    if model_instance is None:
         return {
             "ml_crisis_detected": False, "ml_crisis_label": None,
             "ml_confidence": None, "all_ml_scores": {},
@@ -57,23 +115,18 @@ def predict_crisis_ml(text_input: str, threshold_map: dict = None) -> dict:
         }
 
     if threshold_map is None:
-        # Default thresholds - THESE NEED CAREFUL TUNING
-        threshold_map = {
-            CRISIS_CANDIDATE_LABELS[0]: 0.6, # Higher threshold for immediate suicidal intent
-            CRISIS_CANDIDATE_LABELS[1]: 0.5, # Slightly lower for severe distress
-        }
+        threshold_map = DEFAULT_ML_THRESHOLD_MAP
 
     try:
-        raw_predictions = pipeline_instance(text_input, CRISIS_CANDIDATE_LABELS, multi_label=True)
-        
-        all_scores = {label: 0.0 for label in CRISIS_CANDIDATE_LABELS}
-        if isinstance(raw_predictions, dict) and 'labels' in raw_predictions and 'scores' in raw_predictions:
-            for label, score in zip(raw_predictions['labels'], raw_predictions['scores']):
-                all_scores[label] = round(score, 4)
-        else: # Fallback for unexpected structure
+        if backend == "student":
+            all_scores = _score_student(model_instance, text_input)
+        else:
+            all_scores = _score_zero_shot(model_instance, text_input)
+        if all_scores is None: # Fallback for unexpected structure
              return {
                 "ml_crisis_detected": False, "ml_crisis_label": None, "ml_confidence": None,
-                "all_ml_scores": all_scores, "error": "Unexpected ML crisis prediction output"
+                "all_ml_scores": {label: 0.0 for label in CRISIS_CANDIDATE_LABELS},
+                "error": "Unexpected ML crisis prediction output"
             }
 
 
@@ -103,10 +156,11 @@ def predict_crisis_ml(text_input: str, threshold_map: dict = None) -> dict:
             "ml_crisis_detected": ml_crisis_detected,
             "ml_crisis_label": best_crisis_label if ml_crisis_detected else None,
             "ml_confidence": highest_crisis_confidence if ml_crisis_detected else None,
-            "all_ml_scores": all_scores
+            "all_ml_scores": all_scores,
+            "ml_backend": backend
         }
     except Exception as e:
-        print(f"Error during ML crisis prediction for text '{text_input}': {e}")
+        logger.error("crisis_prediction_failed", text=text_input, backend=backend, error=str(e))
         return {
             "ml_crisis_detected": False, "ml_crisis_label": None,
             "ml_confidence": None, "all_ml_scores": {},
@@ -0,0 +1,123 @@
+# mental_health_ml/models/crisis/session_risk_tracker.py
+import os
+import threading
+
+from .ml_crisis_predictor import CRISIS_CANDIDATE_LABELS
+from mental_health_ml.utils.session_store import TTLSessionStore
+from mental_health_ml.utils.metrics import REGISTRY
+
+# Session-level crisis risk. Instead of rescoring the whole conversation every turn,
+# each session keeps exponentially decayed per-label scores that are updated in O(1)
+# from the per-message result of detect_crisis_hybrid. A run of individually
+# "not quite crisis" messages can therefore still add up to an escalation.
+
+# Number of turns after which a message's contribution has halved
+SESSION_RISK_HALF_LIFE_TURNS = float(os.getenv("SESSION_RISK_HALF_LIFE_TURNS", "3"))
+# Cumulative risk at which the session is escalated
+SESSION_RISK_THRESHOLD = float(os.getenv("SESSION_RISK_THRESHOLD", "1.5"))
+SESSION_RISK_TTL_SECONDS = float(os.getenv("SESSION_RISK_TTL_SECONDS", "3600"))
+SESSION_RISK_MAX_SESSIONS = int(os.getenv("SESSION_RISK_MAX_SESSIONS", "10000"))
+
+KEYWORD_SIGNAL = "keyword"
+# Contribution of each signal to the cumulative risk. Only the two crisis labels count.
+SESSION_RISK_WEIGHTS = {
+    CRISIS_CANDIDATE_LABELS[0]: 1.0, # suicidal intent / severe self-harm
+    CRISIS_CANDIDATE_LABELS[1]: 0.6, # severe distress / hopelessness
+    KEYWORD_SIGNAL: 1.0,             # any Layer 1 keyword match
+}
+
+SESSION_ESCALATIONS = REGISTRY.counter("crisis_session_escalations_total", "Sessions escalated on cumulative crisis risk")
+
+
+class SessionRiskState:
+    __slots__ = ("decayed_scores", "keyword_hits", "turns", "escalated")
+
+    def __init__(self):
+        self.decayed_scores = {signal: 0.0 for signal in SESSION_RISK_WEIGHTS}
+        self.keyword_hits = {} # matched_category -> count
+        self.turns = 0
+        self.escalated = False
+
+    def risk(self) -> float:
+        return sum(SESSION_RISK_WEIGHTS[signal] * score for signal, score in self.decayed_scores.items())
+
+
+class SessionRiskTracker:
+    def __init__(self, half_life_turns: float = SESSION_RISK_HALF_LIFE_TURNS,
+                 threshold: float = SESSION_RISK_THRESHOLD,
+                 ttl_seconds: float = SESSION_RISK_TTL_SECONDS,
+                 max_sessions: int = SESSION_RISK_MAX_SESSIONS):
+        self.decay = 0.5 ** (1.0 / half_life_turns)
+        self.threshold = threshold
+        self.store = TTLSessionStore(max_entries=max_sessions, ttl_seconds=ttl_seconds)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _turn_signals(crisis_result: dict) -> dict:
+        """Extracts this turn's per-signal scores from a detect_crisis_hybrid result."""
+        details = crisis_result.get("details") or {}
+        keyword_result = details.get("keyword_result") or {}
+        ml_scores = (details.get("ml_result") or {}).get("all_ml_scores") or {}
+        signals = {label: float(ml_scores.get(label, 0.0)) for label in CRISIS_CANDIDATE_LABELS[:2]}
+        signals[KEYWORD_SIGNAL] = 1.0 if keyword_result.get("keyword_crisis_detected") else 0.0
+        return signals
+
+    def update(self, session_id: str, crisis_result: dict) -> dict:
+        """
+        Folds one turn into the session state.
+        Returns:
+            dict: {
+                "session_risk": float (cumulative decayed risk),
+                "threshold": float,
+                "escalate": bool (True only on the turn the threshold is first crossed),
+                "escalated": bool (session is in the escalated state until its risk falls below half the threshold),
+                "turns": int,
+                "decayed_scores": dict,
+                "keyword_hits": dict
+            }
+        """
+        signals = self._turn_signals(crisis_result)
+        category = ((crisis_result.get("details") or {}).get("keyword_result") or {}).get("matched_category")
+        with self._lock:
+            state = self.store.get_or_create(session_id, SessionRiskState)
+            for signal, score in signals.items():
+                state.decayed_scores[signal] = state.decayed_scores[signal] * self.decay + score
+            if category:
+                state.keyword_hits[category] = state.keyword_hits.get(category, 0) + 1
+            state.turns += 1
+
+            risk = state.risk()
+            escalate = False
+            if risk >= self.threshold and not state.escalated:
+                state.escalated = escalate = True
+                SESSION_ESCALATIONS.inc()
+            elif risk < self.threshold / 2:
+                state.escalated = False # Re-arm once the risk has clearly subsided
+            decayed_scores = {signal: round(score, 4) for signal, score in state.decayed_scores.items()}
+            keyword_hits = dict(state.keyword_hits)
+            escalated, turns = state.escalated, state.turns
+
+        return {
+            "session_risk": round(risk, 4),
+            "threshold": self.threshold,
+            "escalate": escalate,
+            "escalated": escalated,
+            "turns": turns,
+            "decayed_scores": decayed_scores,
+            "keyword_hits": keyword_hits,
+        }
+
+    def reset(self, session_id: str):
+        self.store.pop(session_id)
+
+
+_session_risk_tracker = None
+
+def get_session_risk_tracker() -> SessionRiskTracker:
+    global _session_risk_tracker
+    if _session_risk_tracker is None:
+        _session_risk_tracker = SessionRiskTracker()
+    return _session_risk_tracker
+
+def update_session_risk(session_id: str, crisis_result: dict) -> dict:
+    return get_session_risk_tracker().update(session_id, crisis_result)
@@ -1,5 +1,5 @@
 # mental_health_ml/models/db_models.py
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Boolean, ForeignKey, JSON, LargeBinary
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Boolean, ForeignKey, JSON, LargeBinary, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from sqlalchemy.sql import func
@@ -63,6 +63,10 @@ class UserAssessmentResponse(Base):
     response_timestamp = Column(DateTime(timezone=True), server_default=func.now())
     # session = relationship("UserAssessmentSession", back_populates="responses")
     # question = relationship("AssessmentQuestion")
+    __table_args__ = (
+        # AssessmentService: responses of one session, joined to their questions
+        Index("ix_user_assessment_responses_session_id_question_id", "session_id", "question_id"),
+    )
 
 
 class MLAssessmentPrediction(Base):
@@ -99,6 +103,10 @@ class ChatMessage(Base):
     # session = relationship("ChatSession", back_populates="messages")
     # emotion_prediction = relationship("MLEmotionPrediction", uselist=False, back_populates="chat_message")
     # crisis_prediction = relationship("MLCrisisPrediction", uselist=False, back_populates="chat_message")
+    __table_args__ = (
+        Index("ix_chat_messages_session_id_timestamp", "session_id", "timestamp"), # Conversation history
+        Index("ix_chat_messages_timestamp", "timestamp"), # Retention, training exports
+    )
 
 
 class MLEmotionPrediction(Base):
@@ -110,6 +118,9 @@ class MLEmotionPrediction(Base):
     confidence_scores = Column(JSON) # {"joy": 0.1, "sadness": 0.7, ...}
     prediction_timestamp = Column(DateTime(timezone=True), server_default=func.now())
     # chat_message = relationship("ChatMessage", back_populates="emotion_prediction")
+    __table_args__ = (
+        Index("ix_ml_emotion_predictions_prediction_timestamp", "prediction_timestamp"),
+    )
 
 
 class MLCrisisPrediction(Base):
@@ -127,6 +138,11 @@ class MLCrisisPrediction(Base):
     action_taken = Column(String, nullable=True) # Log action taken by system or human
     # chat_message = relationship("ChatMessage", back_populates="crisis_prediction")
     # chat_session = relationship("ChatSession") # Add back_populates if needed
+    __table_args__ = (
+        Index("ix_ml_crisis_predictions_chat_session_id_prediction_timestamp", "chat_session_id", "prediction_timestamp"),
+        Index("ix_ml_crisis_predictions_chat_message_id", "chat_message_id"),
+        Index("ix_ml_crisis_predictions_prediction_timestamp", "prediction_timestamp"),
+    )
 
 
 class ResourcesContent(Base):
@@ -157,6 +173,10 @@ class UserResourceInteraction(Base):
     rating = Column(Integer, nullable=True) # e.g., 1-5
     # user = relationship("User")
     # resource = relationship("ResourcesContent")
+    __table_args__ = (
+        # Recommender: a user's interaction history, most recent first
+        Index("ix_user_resource_interactions_user_id_timestamp", "user_id", "timestamp"),
+    )
 
 class MLModelVersion(Base):
     __tablename__ = "ml_model_versions"
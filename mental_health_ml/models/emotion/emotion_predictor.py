@@ -2,53 +2,67 @@
 from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
 import torch
 
+from mental_health_ml.utils.model_manager import get_model_manager
+from mental_health_ml.utils.single_flight import coalesce
+from mental_health_ml.utils.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
 # Using the GoEmotions model
 EMOTION_MODEL_NAME = "SamLowe/roberta-base-go_emotions"
 
-# Global variable to hold the pipeline and model labels
-emotion_classifier_pipeline = None
+# Key under which the pipeline is registered with the shared ModelManager.
+# Not pinned: it can be evicted under memory pressure and reloads on next use.
+EMOTION_MODEL_KEY = "emotion_goemotions"
+
+# Global variables to hold the model labels
 model_id2label = {} # To store the mapping from index to label name
 model_label2id = {} # To store the mapping from label name to index
 
+def _build_emotion_pipeline():
+    logger.info("emotion_model_loading", model=EMOTION_MODEL_NAME)
+    # We need the model and tokenizer separately to easily access config for labels
+    # The pipeline will use these.
+    tokenizer = AutoTokenizer.from_pretrained(EMOTION_MODEL_NAME)
+    model = AutoModelForSequenceClassification.from_pretrained(EMOTION_MODEL_NAME)
+
+    # The pipeline will handle tokenization and model prediction
+    return pipeline(
+        "text-classification",
+        model=model, # Pass the loaded model
+        tokenizer=tokenizer, # Pass the loaded tokenizer
+        return_all_scores=True, # Crucial for getting scores for all 28 labels
+        device=0 if torch.cuda.is_available() else -1
+    )
+
 def load_emotion_model():
     """Loads the GoEmotions classification pipeline and its label mapping."""
-    global emotion_classifier_pipeline, model_id2label, model_label2id
-    if emotion_classifier_pipeline is None:
-        try:
-            print(f"Loading emotion model: {EMOTION_MODEL_NAME}...")
-            # We need the model and tokenizer separately to easily access config for labels
-            # The pipeline will use these.
-            tokenizer = AutoTokenizer.from_pretrained(EMOTION_MODEL_NAME)
-            model = AutoModelForSequenceClassification.from_pretrained(EMOTION_MODEL_NAME)
-
-            # The pipeline will handle tokenization and model prediction
-            emotion_classifier_pipeline = pipeline(
-                "text-classification",
-                model=model, # Pass the loaded model
-                tokenizer=tokenizer, # Pass the loaded tokenizer
-                return_all_scores=True, # Crucial for getting scores for all 28 labels
-                device=0 if torch.cuda.is_available() else -1
-            )
-
-            # Get the model's config to extract labels
-            # GoEmotions models typically have id2label and label2id in their config
-            if hasattr(model.config, 'id2label'):
-                model_id2label = model.config.id2label
-                model_label2id = model.config.label2id # Also useful
-                print(f"Emotion model loaded successfully. {len(model_id2label)} labels detected (e.g., 0: {model_id2label.get(0)}, 1: {model_id2label.get(1)}).")
-            else:
-                print(f"Warning: Could not reliably get id2label from model config for {EMOTION_MODEL_NAME}.")
-                print("This might affect mapping scores to specific emotion names if pipeline output is not clear.")
-                # If this happens, you might need to manually define the labels based on the GoEmotions paper/dataset.
-                # The GoEmotions labels are: admiration, amusement, anger, annoyance, approval, caring, confusion,
-                # curiosity, desire, disappointment, disapproval, disgust, embarrassment, excitement, fear, gratitude,
-                # grief, joy, love, nervousness, optimism, pride, realization, relief, remorse, sadness, surprise, neutral
-
-        except Exception as e:
-            print(f"Error loading emotion model {EMOTION_MODEL_NAME}: {e}")
-            emotion_classifier_pipeline = None
+    global model_id2label, model_label2id
+    try:
+        emotion_classifier_pipeline = get_model_manager().get_or_load(EMOTION_MODEL_KEY, _build_emotion_pipeline)
+    except Exception as e:
+        logger.error("emotion_model_load_failed", model=EMOTION_MODEL_NAME, error=str(e))
+        return None
+
+    if not model_id2label:
+        # Get the model's config to extract labels
+        # GoEmotions models typically have id2label and label2id in their config
+        model_config = emotion_classifier_pipeline.model.config
+        if hasattr(model_config, 'id2label'):
+            model_id2label = model_config.id2label
+            model_label2id = model_config.label2id # Also useful
+            logger.info("emotion_model_loaded", model=EMOTION_MODEL_NAME, labels=len(model_id2label))
+        else:
+            # Scores may not map to emotion names if the pipeline output is not clear
+            logger.warning("emotion_model_missing_id2label", model=EMOTION_MODEL_NAME)
+            # If this happens, you might need to manually define the labels based on the GoEmotions paper/dataset.
+            # The GoEmotions labels are: admiration, amusement, anger, annoyance, approval, caring, confusion,
+            # curiosity, desire, disappointment, disapproval, disgust, embarrassment, excitement, fear, gratitude,
+            # grief, joy, love, nervousness, optimism, pride, realization, relief, remorse, sadness, surprise, neutral
+
     return emotion_classifier_pipeline
 
+@coalesce("emotion_goemotions")
 def predict_emotion_goemotions(text_input: str, threshold: float = 0.1) -> dict:
     """
     Predicts emotions for a given text using the GoEmotions model.
@@ -102,7 +116,7 @@ def predict_emotion_goemotions(text_input: str, threshold: float = 0.1) -> dict:
                 if score >= threshold:
                     active_emotions.append({"emotion": emotion_name, "score": score})
             except ValueError:
-                print(f"Warning: Could not parse label index from '{item['label']}'")
+                logger.warning("emotion_label_unparsed", label=item["label"])
                 continue # Skip this problematic label
 
         # Sort active emotions by score for clarity
@@ -122,7 +136,7 @@ def predict_emotion_goemotions(text_input: str, threshold: float = 0.1) -> dict:
             "model_version_tag": f"pretrained_{EMOTION_MODEL_NAME.replace('/', '_')}"
         }
     except Exception as e:
-        print(f"Error during GoEmotions prediction for text '{text_input}': {e}")
+        logger.error("emotion_prediction_failed", text=text_input, error=str(e))
         return {
             "text": text_input,
             "active_emotions": [],
@@ -132,8 +146,7 @@ def predict_emotion_goemotions(text_input: str, threshold: float = 0.1) -> dict:
 
 if __name__ == "__main__":
     # Ensure model loads on first call
-    load_emotion_model()
-    if emotion_classifier_pipeline: # Proceed only if model loaded
+    if load_emotion_model(): # Proceed only if model loaded
         sample_texts = [
             "I am so happy and excited about this! This is amazing news.",
             "This is really frustrating and makes me angry. I'm quite annoyed.",
@@ -3,6 +3,10 @@ from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassifica
 import torch
 from typing import List, Dict, Optional, Union
 
+from mental_health_ml.utils.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
 # Define the model identifier from Hugging Face Hub
 MODEL_NAME = "SamLowe/roberta-base-go_emotions"
 MODEL_VERSION_TAG = "SamLowe-roberta-base-go_emotions-v1" # Custom tag for our use
@@ -13,7 +17,7 @@ def _load_model():
     """Loads the model and tokenizer pipeline if they haven't been loaded yet."""
     global _emotion_classifier_pipeline
     if _emotion_classifier_pipeline is None:
-        print(f"Loading emotion detection model: {MODEL_NAME}...")
+        logger.info("emotion_model_loading", model=MODEL_NAME)
         # This model is multi-label, so the pipeline will output scores for all labels.
         # We'll apply a threshold later.
         _emotion_classifier_pipeline = pipeline(
@@ -22,7 +26,7 @@ def _load_model():
             tokenizer=MODEL_NAME,
             return_all_scores=True # Ensures we get scores for all 28 labels
         )
-        print("Emotion detection model loaded.")
+        logger.info("emotion_model_loaded", model=MODEL_NAME)
     return _emotion_classifier_pipeline
 
 def predict_emotions_multi_label(text: str, threshold: float = 0.3) -> Optional[Dict[str, Union[List[str], Dict[str, float], str]]]:
@@ -91,8 +95,7 @@ def predict_emotions_multi_label(text: str, threshold: float = 0.3) -> Optional[
         }
 
     except Exception as e:
-        print(f"Error during emotion prediction: {e}")
-        # In a real app, log this exception properly
+        logger.error("emotion_prediction_failed", text=text, error=str(e))
         return {
             "detected_emotions": ["error"],
             "confidence_scores": {"error": str(e)},
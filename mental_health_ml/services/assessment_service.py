@@ -6,9 +6,12 @@ from mental_health_ml.models.db_models import (
 )
 from mental_health_ml.models.assessment.scorers import StandardizedScorer
 from mental_health_ml.models.assessment.questionnaire_configs import get_questionnaire_config
+from mental_health_ml.utils.structured_logging import get_logger
 from uuid import UUID
 from datetime import datetime
 
+logger = get_logger(__name__)
+
 class AssessmentService:
     def __init__(self, db_session: Session):
         self.db = db_session
@@ -85,33 +88,34 @@ class AssessmentService:
     def process_assessment_session(self, session_id: UUID) -> Optional[MLAssessmentPrediction]:
         session = self.db.query(UserAssessmentSession).get(session_id)
         if not session:
-            print(f"Error: Session {session_id} not found.")
+            logger.error("assessment_session_not_found", session_id=str(session_id))
             return None
 
         # Check if already processed
         existing_prediction = self.db.query(MLAssessmentPrediction)\
             .filter(MLAssessmentPrediction.session_id == session_id).first()
         if existing_prediction:
-            print(f"Info: Session {session_id} already processed. Returning existing prediction.")
+            logger.info("assessment_session_already_processed", session_id=str(session_id))
             return existing_prediction
 
         questionnaire = self.db.query(AssessmentQuestionnaire)\
             .filter(AssessmentQuestionnaire.id == session.questionnaire_id).first()
         if not questionnaire:
-            print(f"Error: Questionnaire for session {session_id} not found.")
+            logger.error("assessment_questionnaire_not_found", session_id=str(session_id))
             return None # Or handle error appropriately
 
         # Check if this questionnaire type has a registered scorer config
         q_config = get_questionnaire_config(questionnaire.name)
         if not q_config:
-            print(f"Info: No standardized scorer registered for questionnaire '{questionnaire.name}'. Skipping rule-based scoring.")
+            logger.info("assessment_scorer_missing", session_id=str(session_id), questionnaire=questionnaire.name)
             # Here you could potentially call an ML-based scorer if one existed for this type
             return None 
 
         responses_data = self.get_responses_for_session(session_id)
         if not responses_data or len(responses_data) != q_config.get("questions_count", -1):
             # Scorer will also handle this, but good to check early
-            print(f"Error: Insufficient or mismatched responses for session {session_id} and questionnaire {questionnaire.name}.")
+            logger.error("assessment_responses_incomplete", session_id=str(session_id), questionnaire=questionnaire.name,
+                         responses=len(responses_data or []), expected=q_config.get("questions_count"))
             # Create a prediction indicating an error or incomplete data
             error_prediction_data = {
                 "session_id": session_id,
@@ -157,7 +161,7 @@ class AssessmentService:
         else:
             # Handle case where scoring returned None (e.g. critical error in scorer)
             # This is different from the "Incomplete Data" handled by the scorer itself
-            print(f"Error: Scoring failed for session {session_id} with questionnaire {questionnaire.name}.")
+            logger.error("assessment_scoring_failed", session_id=str(session_id), questionnaire=questionnaire.name)
             # Log an error prediction
             error_prediction_data = {
                 "session_id": session_id,
@@ -0,0 +1,170 @@
+# mental_health_ml/services/data_retention.py
+import argparse
+import json
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, or_, select, text
+
+from mental_health_ml.utils.metrics import REGISTRY
+from mental_health_ml.utils.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+# Retention for the high-volume chat and prediction tables, and maintenance of
+# their optional monthly range partitions (PostgreSQL only). Partitioning is opt-in:
+# with DB_TIME_PARTITIONING=1 the "time partitioning" migration turns the tables
+# below into partitioned tables with one partition per calendar month plus a
+# default partition. This job (run daily, e.g. from cron) then creates the
+# upcoming monthly partitions and drops whole expired ones. Whatever is left past
+# the cutoff (unpartitioned tables, the default partition and partly expired
+# months) is deleted in small batches using the timestamp indexes.
+DB_TIME_PARTITIONING = os.getenv("DB_TIME_PARTITIONING", "0") == "1"
+CHAT_RETENTION_DAYS = int(os.getenv("CHAT_RETENTION_DAYS", "365"))
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+RETENTION_BATCH_ROWS = int(os.getenv("RETENTION_BATCH_ROWS", "5000"))
+
+# Table -> partition key. Predictions come before the messages they reference,
+# which is the order rows are deleted in.
+PARTITIONED_TABLES = {
+    "ml_emotion_predictions": "prediction_timestamp",
+    "ml_crisis_predictions": "prediction_timestamp",
+    "chat_messages": "timestamp",
+}
+
+RETENTION_ROWS_DELETED = REGISTRY.counter("retention_rows_deleted_total", "Expired rows deleted by the retention job, by table")
+RETENTION_PARTITIONS_DROPPED = REGISTRY.counter("retention_partitions_dropped_total", "Expired monthly partitions dropped by the retention job, by table")
+
+_PARTITION_SUFFIX = re.compile(r"_p(\d{4})(\d{2})$")
+
+
+def month_start(moment: datetime) -> datetime:
+    return datetime(moment.year, moment.month, 1, tzinfo=timezone.utc)
+
+
+def add_months(start: datetime, months: int) -> datetime:
+    index = start.year * 12 + start.month - 1 + months
+    return start.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(table: str, start: datetime) -> str:
+    """chat_messages, 2025-06-01 -> chat_messages_p202506"""
+    return f"{table}_p{start:%Y%m}"
+
+
+def is_partitioned(connection, table: str) -> bool:
+    if connection.dialect.name != "postgresql":
+        return False
+    row = connection.execute(text("SELECT 1 FROM pg_class WHERE relname = :table AND relkind = 'p'"
+                                  " AND pg_table_is_visible(oid)"), {"table": table}).first()
+    return row is not None
+
+
+def list_partitions(connection, table: str) -> Dict[str, datetime]:
+    """Monthly partitions of table: name -> first day of the month. The default partition is not listed."""
+    rows = connection.execute(text(
+        "SELECT child.relname FROM pg_inherits"
+        " JOIN pg_class parent ON parent.oid = pg_inherits.inhparent"
+        " JOIN pg_class child ON child.oid = pg_inherits.inhrelid"
+        " WHERE parent.relname = :table"), {"table": table})
+    partitions = {}
+    for (name,) in rows:
+        match = _PARTITION_SUFFIX.search(name)
+        if match:
+            partitions[name] = datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=timezone.utc)
+    return partitions
+
+
+def ensure_partitions(connection, table: str, first_month: datetime, last_month: datetime, parent: Optional[str] = None) -> List[str]:
+    """
+    Creates the monthly partitions of table from first_month to last_month
+    (inclusive) that do not exist yet; returns the names created. parent is the
+    partitioned table to attach them to, if it is not (yet) called table.
+    A month whose rows already landed in the default partition cannot be created;
+    it is logged and skipped, so keep PARTITION_MONTHS_AHEAD ahead of the writers.
+    """
+    existing = set(list_partitions(connection, parent or table))
+    created = []
+    start = month_start(first_month)
+    while start <= last_month:
+        end = add_months(start, 1)
+        name = partition_name(table, start)
+        if name not in existing:
+            try:
+                with connection.begin_nested():
+                    connection.execute(text(f"CREATE TABLE {name} PARTITION OF {parent or table}"
+                                            f" FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"))
+                created.append(name)
+            except Exception as e:
+                logger.error("partition_create_failed", table=table, partition=name, error=str(e))
+        start = end
+    return created
+
+
+def drop_expired_partitions(connection, table: str, cutoff: datetime) -> List[str]:
+    """Drops the monthly partitions of table that end at or before cutoff."""
+    dropped = []
+    for name, start in sorted(list_partitions(connection, table).items()):
+        if add_months(start, 1) <= cutoff:
+            connection.execute(text(f"DROP TABLE {name}"))
+            RETENTION_PARTITIONS_DROPPED.inc(table=table)
+            dropped.append(name)
+    return dropped
+
+
+def purge_expired_rows(engine, metadata, cutoff: datetime, batch_rows: int = RETENTION_BATCH_ROWS) -> Dict[str, int]:
+    """
+    Deletes rows older than cutoff from the PARTITIONED_TABLES, batch_rows at a time
+    (one transaction per batch, so locks stay short). Predictions of an expired
+    message are deleted with it even if they are a little newer than the cutoff.
+    """
+    messages = metadata.tables["chat_messages"]
+    expired_messages = select(messages.c.id).where(messages.c.timestamp < cutoff)
+    deleted = {}
+    for name, key in PARTITIONED_TABLES.items():
+        table = metadata.tables[name]
+        condition = table.c[key] < cutoff
+        if table is not messages and "chat_message_id" in table.c:
+            condition = or_(condition, table.c.chat_message_id.in_(expired_messages))
+        deleted[name] = 0
+        while True:
+            with engine.begin() as connection:
+                ids = connection.execute(select(table.c.id).where(condition).limit(batch_rows)).scalars().all()
+                if ids:
+                    connection.execute(delete(table).where(table.c.id.in_(ids)))
+            deleted[name] += len(ids)
+            RETENTION_ROWS_DELETED.inc(len(ids), table=name)
+            if len(ids) < batch_rows:
+                break
+    return deleted
+
+
+def run_retention(engine, metadata, retention_days: int = CHAT_RETENTION_DAYS, months_ahead: int = PARTITION_MONTHS_AHEAD,
+                  batch_rows: int = RETENTION_BATCH_ROWS, now: Optional[datetime] = None) -> dict:
+    """One retention pass: partition maintenance (partitioned tables only), then batched deletes."""
+    now = now or datetime.now(timezone.utc)
+    cutoff = now - timedelta(days=retention_days)
+    summary = {"cutoff": cutoff.isoformat(), "partitions_created": [], "partitions_dropped": []}
+    with engine.begin() as connection:
+        for table in PARTITIONED_TABLES:
+            if is_partitioned(connection, table):
+                summary["partitions_created"] += ensure_partitions(connection, table, now, add_months(month_start(now), months_ahead))
+                summary["partitions_dropped"] += drop_expired_partitions(connection, table, cutoff)
+    summary["rows_deleted"] = purge_expired_rows(engine, metadata, cutoff, batch_rows)
+    logger.info("retention_run_completed", cutoff=summary["cutoff"], rows_deleted=summary["rows_deleted"],
+                partitions_created=len(summary["partitions_created"]), partitions_dropped=len(summary["partitions_dropped"]))
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create upcoming partitions and delete chat / prediction rows past retention")
+    parser.add_argument("--days", type=int, default=CHAT_RETENTION_DAYS, help="Keep rows from the last N days")
+    parser.add_argument("--months-ahead", type=int, default=PARTITION_MONTHS_AHEAD)
+    parser.add_argument("--batch-rows", type=int, default=RETENTION_BATCH_ROWS)
+    args = parser.parse_args()
+
+    from mental_health_ml.config.db import Base, engine
+    import mental_health_ml.models.db_models # Registers the tables on Base.metadata
+    print(json.dumps(run_retention(engine, Base.metadata, args.days, args.months_ahead, args.batch_rows), indent=2))
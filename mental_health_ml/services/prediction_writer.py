@@ -0,0 +1,362 @@
+# mental_health_ml/services/prediction_writer.py
+import atexit
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.exc import DataError, IntegrityError
+
+from mental_health_ml.utils.metrics import REGISTRY, timed
+from mental_health_ml.utils.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+# Write-behind persistence for the rows written per chat turn (chat messages and
+# emotion / crisis / assessment predictions). Request handlers only buffer rows; a
+# writer thread inserts them in bulk (one executemany per table and column set)
+# every PREDICTION_WRITER_FLUSH_MS or PREDICTION_WRITER_FLUSH_ROWS rows. Rows that
+# cannot be written (database unavailable, or buffer still full after the
+# backpressure wait) are appended to a local spill file, fsynced, and replayed once
+# the database accepts writes again, in the same transaction as the next batch.
+# Rows the database itself refuses (constraint or data errors, e.g. a session id
+# with no chat_sessions row) are isolated and moved to a .rejected file; the rest
+# of their batch is written.
+PREDICTION_WRITER_FLUSH_MS = float(os.getenv("PREDICTION_WRITER_FLUSH_MS", "200"))
+PREDICTION_WRITER_FLUSH_ROWS = int(os.getenv("PREDICTION_WRITER_FLUSH_ROWS", "500"))
+PREDICTION_WRITER_MAX_PENDING = int(os.getenv("PREDICTION_WRITER_MAX_PENDING", "20000"))
+PREDICTION_WRITER_BACKPRESSURE_MS = float(os.getenv("PREDICTION_WRITER_BACKPRESSURE_MS", "50"))
+PREDICTION_WRITER_SPILL_PATH = os.getenv("PREDICTION_WRITER_SPILL_PATH", "data/collected/prediction_writer_spill.jsonl")
+PREDICTION_WRITER_RETRY_SECONDS = float(os.getenv("PREDICTION_WRITER_RETRY_SECONDS", "5"))
+# How long a request waits for its crisis record to be acknowledged
+PREDICTION_WRITER_CRISIS_ACK_SECONDS = float(os.getenv("PREDICTION_WRITER_CRISIS_ACK_SECONDS", "2"))
+
+WRITER_ROWS = REGISTRY.counter("prediction_writer_rows_total", "Rows inserted by the write-behind writer, by table")
+WRITER_SPILLED = REGISTRY.counter("prediction_writer_spilled_total", "Rows written to the spill file, by reason (backpressure or db_unavailable)")
+WRITER_REJECTED = REGISTRY.counter("prediction_writer_rejected_total", "Rows refused by the database (constraint or data errors), by table")
+WRITER_PENDING = REGISTRY.gauge("prediction_writer_pending_rows", "Rows buffered in memory, waiting for the next flush")
+
+
+def _encode(value):
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _decode_row(table, row: dict) -> dict:
+    """Restores the UUID and datetime values of a row read back from the spill file."""
+    decoded = dict(row)
+    for name, value in row.items():
+        if value is None or not isinstance(value, str) or name not in table.c:
+            continue
+        try:
+            python_type = table.c[name].type.python_type
+        except NotImplementedError:
+            continue
+        if python_type is uuid.UUID:
+            decoded[name] = uuid.UUID(value)
+        elif python_type is datetime:
+            decoded[name] = datetime.fromisoformat(value)
+        elif python_type is date:
+            decoded[name] = date.fromisoformat(value)
+    return decoded
+
+
+class WriteAck:
+    """
+    Outcome of a priority write: "db" (committed), "spill" (fsynced to the spill file)
+    or "rejected" (refused by the database, moved to the .rejected file).
+    """
+    def __init__(self):
+        self._done = threading.Event()
+        self.status: Optional[str] = None
+
+    def _set(self, status: str):
+        self.status = status
+        self._done.set()
+
+    def wait(self, timeout: float = None) -> Optional[str]:
+        """The status, or None if the write is still pending after timeout."""
+        self._done.wait(timeout)
+        return self.status
+
+
+class WriteBehindWriter:
+    def __init__(self, engine, metadata, flush_rows: int = PREDICTION_WRITER_FLUSH_ROWS,
+                 flush_seconds: float = PREDICTION_WRITER_FLUSH_MS / 1000.0,
+                 max_pending: int = PREDICTION_WRITER_MAX_PENDING,
+                 backpressure_seconds: float = PREDICTION_WRITER_BACKPRESSURE_MS / 1000.0,
+                 spill_path: str = PREDICTION_WRITER_SPILL_PATH,
+                 retry_seconds: float = PREDICTION_WRITER_RETRY_SECONDS):
+        self.engine = engine
+        self.metadata = metadata
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.max_pending = max_pending
+        self.backpressure_seconds = backpressure_seconds
+        self.spill_path = spill_path
+        self.retry_seconds = retry_seconds
+        # Parents before children, so a batch can hold a message and its predictions
+        self._table_order = {table.name: i for i, table in enumerate(metadata.sorted_tables)}
+
+        self._cond = threading.Condition()
+        self._pending: List[Tuple] = [] # (table, row)
+        self._urgent: List[Tuple] = [] # (table or None, row, WriteAck)
+        self._closed = False
+        self._retry_at = 0.0
+        self._spill_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="prediction-writer", daemon=True)
+        self._thread.start()
+
+    def enqueue(self, model, row: dict) -> bool:
+        """
+        Buffers a row for model (a declarative class or a Table). If the buffer is full,
+        waits up to backpressure_seconds for the writer to drain it, then spills the
+        row instead. Returns False if the row was spilled.
+        """
+        table = getattr(model, "__table__", model)
+        deadline = time.monotonic() + self.backpressure_seconds
+        with self._cond:
+            while len(self._pending) >= self.max_pending and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            if len(self._pending) < self.max_pending and not self._closed:
+                self._pending.append((table, row))
+                if len(self._pending) >= self.flush_rows:
+                    self._cond.notify_all()
+                WRITER_PENDING.set(len(self._pending))
+                return True
+        self._spill([(table, row)], "backpressure")
+        return False
+
+    def write_priority(self, model, row: dict) -> WriteAck:
+        """
+        Crisis records: written at once, together with everything buffered before
+        them (so the message they reference is inserted first), and never subject to
+        backpressure. The returned WriteAck completes once the row is committed or spilled.
+        """
+        ack = WriteAck()
+        with self._cond:
+            if not self._closed:
+                self._urgent.append((getattr(model, "__table__", model), row, ack))
+                self._cond.notify_all()
+                return ack
+        self._spill([(getattr(model, "__table__", model), row)], "db_unavailable")
+        ack._set("spill")
+        return ack
+
+    def flush(self, timeout: float = None) -> Optional[str]:
+        """Writes everything buffered so far; returns the status of that write."""
+        ack = WriteAck()
+        with self._cond:
+            if self._closed:
+                return None
+            self._urgent.append((None, None, ack))
+            self._cond.notify_all()
+        return ack.wait(timeout)
+
+    def close(self, timeout: float = None):
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self):
+        next_flush = time.monotonic() + self.flush_seconds
+        while True:
+            with self._cond:
+                while not (self._urgent or self._closed or len(self._pending) >= self.flush_rows):
+                    remaining = next_flush - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                rows, urgent, closing = self._pending, self._urgent, self._closed
+                self._pending, self._urgent = [], []
+                WRITER_PENDING.set(0)
+                self._cond.notify_all() # Wake producers waiting for room
+            next_flush = time.monotonic() + self.flush_seconds
+            rows += [(table, row) for table, row, _ in urgent if table is not None]
+            status, rejected = self._write(rows) if rows else ("db", [])
+            rejected_ids = {id(row) for row in rejected}
+            for _, row, ack in urgent:
+                ack._set("rejected" if id(row) in rejected_ids else status)
+            if closing:
+                return
+
+    def _write(self, rows: List[Tuple]) -> Tuple[str, list]:
+        """
+        Writes rows, and the spilled rows, in one transaction. Returns the status
+        ("db" or "spill") and the rows the database refused.
+        """
+        now = time.monotonic()
+        if now >= self._retry_at:
+            with self._spill_lock:
+                spilled = self._read_spill()
+                try:
+                    # One insert, parents first: a spilled prediction may reference a message of this batch
+                    rejected = self._insert(spilled + rows)
+                except Exception as e:
+                    self._retry_at = now + self.retry_seconds
+                    logger.error("prediction_writer_db_unavailable", rows=len(rows), error=str(e))
+                else:
+                    if spilled:
+                        os.remove(self.spill_path)
+                        logger.info("prediction_writer_spill_replayed", rows=len(spilled))
+                    return "db", rejected
+        self._spill(rows, "db_unavailable")
+        return "spill", []
+
+    def _insert(self, rows: List[Tuple]) -> list:
+        """
+        Inserts rows in one transaction, parents before children. If the database
+        refuses the batch (constraint or data error), inserts it again row by row, each
+        row in a savepoint, and moves the refused rows to the rejected file. Returns the
+        refused rows. Any other error propagates, with nothing committed.
+        """
+        # executemany needs the same columns in every row of a statement
+        groups: Dict[Tuple, list] = {}
+        for table, row in rows:
+            groups.setdefault((table, tuple(sorted(row))), []).append(row)
+        try:
+            with timed("db", op="bulk_insert"):
+                with self.engine.begin() as connection:
+                    for table, columns in sorted(groups, key=lambda key: self._table_order.get(key[0].name, 0)):
+                        connection.execute(table.insert(), groups[(table, columns)])
+        except (IntegrityError, DataError) as e:
+            logger.warning("prediction_writer_batch_refused", rows=len(rows), error=str(e))
+            return self._insert_row_by_row(rows)
+        for (table, _), group in groups.items():
+            WRITER_ROWS.inc(len(group), table=table.name)
+        return []
+
+    def _insert_row_by_row(self, rows: List[Tuple]) -> list:
+        inserted, rejected = [], []
+        with timed("db", op="row_insert"):
+            with self.engine.begin() as connection:
+                for table, row in sorted(rows, key=lambda item: self._table_order.get(item[0].name, 0)):
+                    try:
+                        with connection.begin_nested():
+                            connection.execute(table.insert(), [row])
+                    except (IntegrityError, DataError) as e:
+                        rejected.append((table, row, e))
+                    else:
+                        inserted.append(table)
+        for table in inserted:
+            WRITER_ROWS.inc(table=table.name)
+        self._reject(rejected)
+        return [row for _, row, _ in rejected]
+
+    def _spill(self, rows: List[Tuple], reason: str):
+        if not rows:
+            return
+        lines = "".join(json.dumps({"table": table.name, "row": row}, default=_encode) + "\n" for table, row in rows)
+        with self._spill_lock:
+            os.makedirs(os.path.dirname(self.spill_path) or ".", exist_ok=True)
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+        WRITER_SPILLED.inc(len(rows), reason=reason)
+
+    def _read_spill(self) -> List[Tuple]:
+        """The rows of the spill file; call with _spill_lock held."""
+        if not os.path.exists(self.spill_path):
+            return []
+        try:
+            with open(self.spill_path, "r", encoding="utf-8") as f:
+                records = [json.loads(line) for line in f if line.strip()]
+            return [(table, _decode_row(table, record["row"]))
+                    for record in records
+                    for table in [self.metadata.tables[record["table"]]]]
+        except (ValueError, KeyError) as e:
+            # Unreadable, so it can never be replayed
+            rejected_path = self._rejected_path()
+            os.replace(self.spill_path, rejected_path)
+            logger.error("prediction_writer_spill_rejected", path=rejected_path, error=str(e))
+            return []
+
+    def _rejected_path(self) -> str:
+        return f"{self.spill_path}.rejected-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')}"
+
+    def _reject(self, rejected: List[Tuple]):
+        """Appends the rows the database refused, with the error, to a .rejected file next to the spill file."""
+        if not rejected:
+            return
+        rejected_path = self._rejected_path()
+        os.makedirs(os.path.dirname(rejected_path) or ".", exist_ok=True)
+        with open(rejected_path, "a", encoding="utf-8") as f:
+            for table, row, error in rejected:
+                f.write(json.dumps({"table": table.name, "row": row, "error": str(error)}, default=_encode) + "\n")
+                WRITER_REJECTED.inc(table=table.name)
+        logger.error("prediction_writer_rows_rejected", rows=len(rejected), path=rejected_path, error=str(rejected[0][2]))
+
+
+_default_writer = None
+_default_writer_lock = threading.Lock()
+
+def get_prediction_writer() -> WriteBehindWriter:
+    """Process-wide writer on the application database (config/db.py)."""
+    global _default_writer
+    if _default_writer is None:
+        with _default_writer_lock:
+            if _default_writer is None:
+                from mental_health_ml.config.db import Base, engine
+                import mental_health_ml.models.db_models # Registers the tables on Base.metadata
+                _default_writer = WriteBehindWriter(engine, Base.metadata)
+                atexit.register(_default_writer.close)
+    return _default_writer
+
+
+def persist_chat_turn(chat_session_id: str, user_text: str, reply_text: str, crisis_result: dict,
+                      emotion_result: Optional[dict] = None) -> Optional[WriteAck]:
+    """
+    Buffers the rows of one chat turn: both messages, the emotion prediction and the
+    crisis prediction. A detected crisis is written with priority; its WriteAck is
+    returned so the caller can wait for it. Returns None otherwise, or when
+    chat_session_id is not a ChatSession id (UUID).
+    """
+    try:
+        session_id = uuid.UUID(str(chat_session_id))
+    except ValueError:
+        return None
+    from mental_health_ml.models.db_models import ChatMessage, MLCrisisPrediction, MLEmotionPrediction
+
+    writer = get_prediction_writer()
+    now = datetime.now(timezone.utc) # Explicit: rows may reach the database well after the turn
+    user_message_id = uuid.uuid4()
+    writer.enqueue(ChatMessage, {"id": user_message_id, "session_id": session_id, "sender_type": "user",
+                                 "message_text": user_text, "timestamp": now})
+    writer.enqueue(ChatMessage, {"id": uuid.uuid4(), "session_id": session_id, "sender_type": "bot",
+                                 "message_text": reply_text, "timestamp": now})
+    if emotion_result:
+        writer.enqueue(MLEmotionPrediction, {
+            "chat_message_id": user_message_id,
+            "model_version": emotion_result.get("model_version_tag", "emotion_detector"),
+            "detected_emotion": emotion_result.get("dominant_emotion"),
+            "confidence_scores": emotion_result.get("all_emotions", emotion_result.get("all_emotion_scores")),
+            "prediction_timestamp": now,
+        })
+    crisis_row = {
+        "chat_message_id": user_message_id,
+        "chat_session_id": session_id,
+        "model_version": "crisis_hybrid",
+        "is_crisis_detected": bool(crisis_result.get("is_crisis")),
+        "crisis_type": crisis_result.get("crisis_type"),
+        "confidence": crisis_result.get("confidence"),
+        "triggering_text_segment": crisis_result.get("triggering_text_segment"),
+        "prediction_timestamp": now,
+        "action_taken": "crisis_team_notified" if crisis_result.get("is_crisis") else None,
+    }
+    if crisis_result.get("is_crisis"):
+        return writer.write_priority(MLCrisisPrediction, crisis_row)
+    writer.enqueue(MLCrisisPrediction, crisis_row)
+    return None
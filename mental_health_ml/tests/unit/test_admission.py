@@ -0,0 +1,43 @@
+# mental_health_ml/tests/unit/test_admission.py
+import asyncio
+
+from mental_health_ml.utils.admission import STAGE_SHED, AdmissionController, parse_stage_map
+
+def test_optional_stage_is_shed_when_queue_is_full():
+    controller = AdmissionController(latency_goals={}, max_in_flight={"emotion": 1})
+    shed_before = STAGE_SHED.value(stage="emotion", reason="queue_depth")
+    assert controller.try_enter("emotion", optional=True) is None
+    assert controller.try_enter("emotion", optional=True) == "queue_depth"
+    assert controller.try_enter("emotion") is None # Required calls are never shed
+    assert STAGE_SHED.value(stage="emotion", reason="queue_depth") == shed_before + 1
+    controller.exit("emotion", 0.01)
+    controller.exit("emotion", 0.01)
+    assert controller.try_enter("emotion", optional=True) is None
+
+def test_slow_stage_is_shed_with_periodic_probes():
+    controller = AdmissionController(latency_goals={"themes": 0.1}, max_in_flight={}, probe_interval=3600)
+    result, shed = controller.run_sync("themes", lambda: "ok", optional=True)
+    assert (result, shed) == ("ok", None)
+    controller.try_enter("themes")
+    controller.exit("themes", 1.0) # Smoothed latency now above the goal
+    assert controller.run_sync("themes", lambda: "probe", optional=True) == ("probe", None)
+    assert controller.run_sync("themes", lambda: "ok", optional=True) == (None, "latency")
+    assert controller.snapshot()["themes"]["in_flight"] == 0
+
+def test_async_run_does_not_start_shed_calls():
+    controller = AdmissionController(latency_goals={}, max_in_flight={"emotion": 0})
+    started = []
+
+    async def detect():
+        started.append(True)
+        return "joy"
+
+    assert asyncio.run(controller.run("emotion", detect, optional=True)) == (None, "queue_depth")
+    assert asyncio.run(controller.run("crisis", detect)) == ("joy", None)
+    assert started == [True]
+    disabled = AdmissionController(max_in_flight={"emotion": 0}, enabled=False)
+    assert asyncio.run(disabled.run("emotion", detect, optional=True)) == ("joy", None)
+
+def test_parse_stage_map():
+    assert parse_stage_map("emotion=0.1, themes=2") == {"emotion": 0.1, "themes": 2.0}
+    assert parse_stage_map("emotion=4", int) == {"emotion": 4}
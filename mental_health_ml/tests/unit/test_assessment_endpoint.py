@@ -0,0 +1,62 @@
+# mental_health_ml/tests/unit/test_assessment_endpoint.py
+import asyncio
+import importlib
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+
+from mental_health_ml.models.assessment.tabular_model import TABULAR_MODEL_KEY, TabularAssessmentModel
+from mental_health_ml.utils.model_manager import get_model_manager
+
+# The inference modules use root-style imports (models..., utils...), as when the app runs them
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+VALID = {"gad_1": "3", "phq_1": "2", "pss_4 (reverse)": "0"}
+INVALID = {"gad_1": "3", "phq1": "2", "pss_4 (reverse)": "0"} # Misnamed question id
+
+@pytest.fixture(scope="module")
+def endpoint():
+    rng = np.random.default_rng(0)
+    answers = pd.DataFrame({column: rng.integers(0, 4, 100) for column in VALID})
+    targets = pd.DataFrame({"anxiety_level": answers["gad_1"], "depression_level": answers["phq_1"],
+                            "stress_level": answers["pss_4 (reverse)"], "wellbeing_score": 25 - answers.sum(axis=1),
+                            "risk_level": (answers.sum(axis=1) >= 6).astype(int)})
+    model = TabularAssessmentModel(family="ridge").fit(answers, targets)
+    manager = get_model_manager()
+    manager.get_or_load(TABULAR_MODEL_KEY, lambda: model, pinned=True) # Resident, so the endpoint does not load from disk
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("ASSESSMENT_BACKEND", "tabular")
+        sys.modules.pop("inference.assessment_endpoint", None)
+        yield importlib.import_module("inference.assessment_endpoint")
+    sys.modules.pop("inference.assessment_endpoint", None)
+    manager.unload_model(TABULAR_MODEL_KEY)
+
+def test_tabular_backend_rejects_invalid_answers_with_422(endpoint):
+    result = asyncio.run(endpoint.analyze_assessment(endpoint.AssessmentRequest(responses=VALID)))
+    assert 0.0 <= result.anxiety_level <= 1.0
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(endpoint.analyze_assessment(endpoint.AssessmentRequest(responses=INVALID)))
+    assert error.value.status_code == 422
+
+def test_batch_reports_invalid_items_and_keeps_going(endpoint):
+    body = "".join(json.dumps({"id": str(i), "responses": responses}) + "\n"
+                   for i, responses in enumerate([VALID, INVALID, VALID])).encode("utf-8")
+
+    async def stream():
+        yield body
+
+    async def collect():
+        response = await endpoint.analyze_assessment_batch(SimpleNamespace(stream=stream))
+        return "".join([chunk async for chunk in response.body_iterator])
+
+    lines = [json.loads(line) for line in asyncio.run(collect()).splitlines()]
+    assert [line.get("index") for line in lines] == [1, 0, 2, None] # Validation errors are reported as items arrive
+    assert "phq1" in lines[0]["error"] and lines[0]["id"] == "1"
+    assert "recommendations" in lines[1] and lines[2]["id"] == "2"
+    assert lines[-1] == {"done": True, "processed": 2, "failed": 1}
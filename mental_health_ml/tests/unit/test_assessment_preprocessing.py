@@ -0,0 +1,54 @@
+# mental_health_ml/tests/unit/test_assessment_preprocessing.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from mental_health_ml.data.preprocessing.assessment_preprocessing import AssessmentPreprocessor, InvalidAssessmentResponses
+
+def _frame():
+    return pd.DataFrame({
+        "gad_1": [0, 3, 1, None],
+        "pss_4 (reverse)": [0, 4, 2, 1],
+        "notes": ["tired", None, "ok", "fine"],
+        "anxiety_level": [0, 3, 1, 2], # Target, must be ignored
+    })
+
+def test_numeric_columns_are_scaled_and_text_columns_detected():
+    preprocessor = AssessmentPreprocessor().fit_numeric(_frame())
+    assert preprocessor.numeric_columns == ["gad_1", "pss_4 (reverse)"]
+    assert preprocessor.text_columns == ["notes"]
+
+    scaled = preprocessor.transform_numeric(_frame())
+    assert scaled.dtype == np.float32
+    np.testing.assert_allclose(scaled[:, 0], [0.0, 1.0, 1 / 3, 0.5], rtol=1e-6) # Missing answer -> 0.5
+    np.testing.assert_allclose(scaled[:, 1], [1.0, 0.0, 0.5, 0.75], rtol=1e-6) # Reverse-scored item flipped
+
+def _targets():
+    return pd.DataFrame({"anxiety_level": [0, 3, 1, 2], "depression_level": [0, 4, 2, 1], "stress_level": [1, 1, 1, 1],
+                         "wellbeing_score": [96, 0, 48, 24], "risk_level": [0, 1, 0, 1]})
+
+def test_scaling_round_trip(tmp_path):
+    fitted = AssessmentPreprocessor().fit_numeric(_frame()).fit_targets(_targets())
+    path = str(tmp_path / "scaling.json")
+    fitted.save_scaling(path)
+    restored = AssessmentPreprocessor().load_scaling(path)
+    np.testing.assert_array_equal(restored.transform_numeric(_frame()), fitted.transform_numeric(_frame()))
+    np.testing.assert_array_equal(restored.scale_targets(_targets()), fitted.scale_targets(_targets()))
+
+def test_targets_are_scaled_to_unit_range():
+    preprocessor = AssessmentPreprocessor().fit_targets(_targets())
+    scaled = preprocessor.scale_targets(_targets())
+    assert scaled.min() >= 0.0 and scaled.max() <= 1.0
+    np.testing.assert_allclose(scaled[:, 3], [1.0, 0.0, 0.5, 0.25]) # wellbeing_score 0-96
+    np.testing.assert_allclose(scaled[:, 2], [0.0] * 4) # Constant target does not divide by zero
+    np.testing.assert_allclose(preprocessor.unscale_targets(scaled), _targets().to_numpy(), rtol=1e-6)
+
+def test_unknown_or_missing_answers_are_rejected():
+    preprocessor = AssessmentPreprocessor().fit_numeric(_frame())
+    preprocessor.validate_responses({"gad_1": "2", "pss_4 (reverse)": "1"}) # Free text is optional
+    with pytest.raises(InvalidAssessmentResponses, match="unknown questions: \\['gad1'\\]"):
+        preprocessor.preprocess_responses({"gad1": "2", "gad_1": "2", "pss_4 (reverse)": "1"})
+    with pytest.raises(InvalidAssessmentResponses, match="missing answers"):
+        preprocessor.preprocess_responses({"gad_1": "2", "notes": "tired"})
+    with pytest.raises(InvalidAssessmentResponses, match="non-numeric answers"):
+        preprocessor.preprocess_responses({"gad_1": "often", "pss_4 (reverse)": "1"})
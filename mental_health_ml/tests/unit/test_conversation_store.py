@@ -0,0 +1,54 @@
+# mental_health_ml/tests/unit/test_conversation_store.py
+from types import SimpleNamespace
+
+from mental_health_ml.models.chatbot.conversation_store import ConversationStore, truncate_to_token_budget
+from mental_health_ml.utils.session_store import TTLSessionStore
+
+def char_tokenize(text):
+    """Stub tokenizer: one token per character, so budgets are easy to reason about."""
+    return list(text)
+
+def message(role, content):
+    return SimpleNamespace(role=role, content=content) # Shaped like the endpoint's ChatMessage
+
+def test_history_is_truncated_to_budget_newest_first():
+    store = ConversationStore(tokenize=char_tokenize)
+    store.append("s1", "user", "first")     # "User: first\n" = 12 tokens
+    store.append("s1", "assistant", "ok")   # "Assistant: ok\n" = 14 tokens
+    store.append("s1", "user", "second")    # "User: second\n" = 13 tokens
+    assert store.history_text("s1", token_budget=27) == "Assistant: ok\nUser: second\n"
+    assert store.history_text("s1", token_budget=12) == "" # The newest turn alone does not fit
+    assert [t.content for t in truncate_to_token_budget(store.turns("s1"), 100)] == ["first", "ok", "second"]
+
+def test_seed_from_legacy_history_keeps_recent_turns_in_budget():
+    tokenized = []
+    store = ConversationStore(tokenize=lambda text: tokenized.append(text) or char_tokenize(text))
+    history = [message("user", "a" * 50)] + [message("user", f"m{i}") for i in range(3)]
+    store.seed("s1", history, token_budget=20)
+    assert [t.content for t in store.turns("s1")] == ["m1", "m2"] # "User: mX\n" = 9 tokens each
+    assert len(tokenized) == 3 # Stops at the first turn over budget; older turns are never tokenized
+    store.seed("s1", [message("assistant", "hello")])
+    assert [(t.role, t.content) for t in store.turns("s1")] == [("assistant", "hello")] # Replaces, not appends
+
+def test_ring_buffer_evicts_oldest_turns():
+    store = ConversationStore(tokenize=char_tokenize, max_turns=3)
+    for i in range(5):
+        store.append("s1", "user", f"m{i}", outputs={"index": i})
+    turns = store.turns("s1")
+    assert [t.content for t in turns] == ["m2", "m3", "m4"]
+    assert turns[-1].outputs == {"index": 4}
+    assert turns[-1].token_ids == char_tokenize("User: m4\n") # Tokenized once, on append
+
+def test_sessions_expire_after_ttl():
+    now = [0.0]
+    store = ConversationStore(tokenize=char_tokenize)
+    store.sessions = TTLSessionStore(ttl_seconds=10, clock=lambda: now[0])
+    store.append("s1", "user", "hello")
+    now[0] = 5.0
+    assert store.has_session("s1")
+    now[0] = 20.0
+    assert not store.has_session("s1")
+    assert store.turns("s1") == []
+    store.append("s2", "user", "hi")
+    store.end_session("s2")
+    assert not store.has_session("s2")
@@ -0,0 +1,70 @@
+# mental_health_ml/tests/unit/test_crisis_prefilter.py
+from unittest.mock import patch, MagicMock
+
+from mental_health_ml.models.crisis.crisis_prefilter import CrisisPrefilter, load_crisis_prefilter
+from mental_health_ml.models.crisis.hybrid_crisis_detector import detect_crisis_hybrid
+
+CRISIS_TEXTS = [
+    "I can't go on like this, I have a plan to end things",
+    "nobody would care if I disappeared forever",
+    "I've been giving away my things, I won't need them",
+    "tonight is the night I stop the pain for good",
+    "I wrote goodbye letters to my family",
+    "I keep thinking about taking all my pills",
+] * 5
+SAFE_TEXTS = [
+    "how do I book an appointment?",
+    "I had a nice walk in the park today",
+    "what is the opening time of the clinic",
+    "thanks, that breathing exercise helped",
+    "can you recommend an article about sleep",
+    "I feel a bit tired after work",
+] * 5
+
+def make_prefilter(recall_floor=0.95):
+    texts = CRISIS_TEXTS + SAFE_TEXTS
+    labels = [1] * len(CRISIS_TEXTS) + [0] * len(SAFE_TEXTS)
+    prefilter = CrisisPrefilter(n_features=2 ** 12, recall_floor=recall_floor).fit(texts, labels)
+    prefilter.calibrate(texts, labels)
+    return prefilter
+
+def test_calibration_meets_recall_floor():
+    prefilter = make_prefilter(recall_floor=0.95)
+    report = prefilter.calibration_report
+    assert report["recall"] >= 0.95
+    assert 0.0 < report["escalation_rate"] <= 1.0
+    for text in CRISIS_TEXTS:
+        assert prefilter.should_escalate(text)[0] is True
+
+def test_prefilter_below_floor_is_disabled(tmp_path):
+    prefilter = make_prefilter(recall_floor=0.5)
+    prefilter.calibration_report["recall"] = 0.5
+    path = str(tmp_path / "prefilter.pkl")
+    prefilter.save(path)
+    assert load_crisis_prefilter(path=path, recall_floor=0.99) is None
+
+def test_safe_message_skips_zero_shot_model():
+    prefilter = MagicMock()
+    prefilter.should_escalate.return_value = (False, 0.01)
+    prefilter.escalation_threshold = 0.2
+    prefilter.calibration_report = {"recall": 0.99}
+    with patch('mental_health_ml.models.crisis.hybrid_crisis_detector.load_crisis_prefilter', return_value=prefilter), \
+         patch('mental_health_ml.models.crisis.hybrid_crisis_detector.load_ml_crisis_model'), \
+         patch('mental_health_ml.models.crisis.hybrid_crisis_detector.predict_crisis_ml') as mock_ml:
+        result = detect_crisis_hybrid("What time does the clinic open?")
+        mock_ml.assert_not_called()
+        assert result["is_crisis"] is False
+        assert result["details"]["prefilter_result"]["escalate"] is False
+
+def test_escalated_message_reaches_zero_shot_model():
+    prefilter = MagicMock()
+    prefilter.should_escalate.return_value = (True, 0.7)
+    prefilter.escalation_threshold = 0.2
+    prefilter.calibration_report = {"recall": 0.99}
+    mock_ml_output = {"ml_crisis_detected": False, "ml_crisis_label": None, "ml_confidence": None, "all_ml_scores": {}}
+    with patch('mental_health_ml.models.crisis.hybrid_crisis_detector.load_crisis_prefilter', return_value=prefilter), \
+         patch('mental_health_ml.models.crisis.hybrid_crisis_detector.load_ml_crisis_model'), \
+         patch('mental_health_ml.models.crisis.hybrid_crisis_detector.predict_crisis_ml', return_value=mock_ml_output) as mock_ml:
+        result = detect_crisis_hybrid("Everything feels heavy lately.")
+        mock_ml.assert_called_once()
+        assert result["details"]["prefilter_result"]["escalate"] is True
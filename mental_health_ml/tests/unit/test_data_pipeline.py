@@ -0,0 +1,21 @@
+# mental_health_ml/tests/unit/test_data_pipeline.py
+from mental_health_ml.utils.data_pipeline import build_text_pipeline, clean_text, anonymize_personal_info
+
+MESSAGES = [
+    "My name is Alex, mail me at alex@example.com!!",
+    "call   555-123-4567\tplease & thanks",
+    "nothing personal here :)",
+    "",
+]
+
+def test_fused_pipeline_matches_functions():
+    pipeline = build_text_pipeline(anonymize=True)
+    for message in MESSAGES:
+        assert pipeline.process(message) == clean_text(anonymize_personal_info(message))
+    assert build_text_pipeline(anonymize=False).process(MESSAGES[0]) == clean_text(MESSAGES[0])
+
+def test_process_many_preserves_order_across_workers():
+    pipeline = build_text_pipeline()
+    items = [f"{i} {MESSAGES[i % len(MESSAGES)]}" for i in range(50)]
+    expected = [pipeline.process(item) for item in items]
+    assert list(pipeline.process_many(items, workers=2, chunk_size=7)) == expected
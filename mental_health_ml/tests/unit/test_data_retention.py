@@ -0,0 +1,51 @@
+# mental_health_ml/tests/unit/test_data_retention.py
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+os.environ.setdefault("DATABASE_URL", "sqlite://") # config/db.py needs one at import
+
+from sqlalchemy import create_engine, func, select
+
+from mental_health_ml.config.db import Base
+from mental_health_ml.models.db_models import ChatMessage, ChatSession, MLCrisisPrediction, MLEmotionPrediction
+from mental_health_ml.services.data_retention import add_months, month_start, partition_name, run_retention
+
+def test_month_helpers():
+    start = month_start(datetime(2025, 11, 17, 8, 30, tzinfo=timezone.utc))
+    assert start == datetime(2025, 11, 1, tzinfo=timezone.utc)
+    assert add_months(start, 2) == datetime(2026, 1, 1, tzinfo=timezone.utc)
+    assert add_months(start, -11) == datetime(2024, 12, 1, tzinfo=timezone.utc)
+    assert partition_name("chat_messages", start) == "chat_messages_p202511"
+
+def test_expired_rows_are_deleted_in_batches(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    tables = [ChatSession.__table__, ChatMessage.__table__, MLEmotionPrediction.__table__, MLCrisisPrediction.__table__]
+    Base.metadata.create_all(engine, tables=tables)
+    now = datetime(2025, 6, 1, tzinfo=timezone.utc)
+    session_id = uuid.uuid4()
+    messages, emotions, crises = [], [], []
+    for age_days in (400, 380, 370, 10, 1):
+        message_id = uuid.uuid4()
+        timestamp = now - timedelta(days=age_days)
+        messages.append({"id": message_id, "session_id": session_id, "sender_type": "user", "message_text": "hi",
+                         "timestamp": timestamp})
+        # Written a little after its message, so the 370 day old one is just inside retention
+        emotions.append({"chat_message_id": message_id, "detected_emotion": "joy",
+                         "prediction_timestamp": timestamp + timedelta(days=6)})
+        crises.append({"chat_message_id": message_id, "chat_session_id": session_id, "is_crisis_detected": False,
+                       "prediction_timestamp": timestamp})
+    crises.append({"chat_message_id": None, "chat_session_id": session_id, "is_crisis_detected": True, "prediction_timestamp": now - timedelta(days=500)})
+    with engine.begin() as connection:
+        connection.execute(ChatSession.__table__.insert(), {"id": session_id})
+        connection.execute(ChatMessage.__table__.insert(), messages)
+        connection.execute(MLEmotionPrediction.__table__.insert(), emotions)
+        connection.execute(MLCrisisPrediction.__table__.insert(), crises)
+
+    summary = run_retention(engine, Base.metadata, retention_days=365, batch_rows=2, now=now)
+
+    assert summary["rows_deleted"] == {"ml_emotion_predictions": 3, "ml_crisis_predictions": 4, "chat_messages": 3}
+    assert summary["partitions_created"] == summary["partitions_dropped"] == [] # Not partitioned on SQLite
+    with engine.connect() as connection:
+        for table in tables[1:]:
+            assert connection.execute(select(func.count()).select_from(table)).scalar() == 2
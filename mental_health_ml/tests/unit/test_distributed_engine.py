@@ -0,0 +1,51 @@
+# mental_health_ml/tests/unit/test_distributed_engine.py
+import os
+import socket
+from unittest.mock import patch
+
+import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
+from torch.utils.data import TensorDataset
+from torch.utils.data.distributed import DistributedSampler
+
+from mental_health_ml.training.distributed import init_distributed, cleanup_distributed
+from mental_health_ml.training.engine import TrainingEngine, make_data_loader
+
+def _free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _dict_dataset_collate(batch):
+    features, targets = zip(*batch)
+    return {"x": torch.stack(features), "y": torch.stack(targets)}
+
+def _mse_loss(model, batch):
+    return torch.nn.functional.mse_loss(model(batch["x"]), batch["y"]), batch["y"].size(0)
+
+def _train_rank(rank, world_size, port, result_dir):
+    os.environ.update({"RANK": str(rank), "WORLD_SIZE": str(world_size),
+                       "MASTER_ADDR": "127.0.0.1", "MASTER_PORT": str(port)})
+    init_distributed("gloo")
+    torch.manual_seed(0) # Same initial weights on every rank
+    features = torch.randn(64, 4)
+    dataset = TensorDataset(features, features.sum(dim=1, keepdim=True))
+    loader = make_data_loader(dataset, batch_size=8, sampler=DistributedSampler(dataset), collate_fn=_dict_dataset_collate, num_workers=0)
+    model = torch.nn.Linear(4, 1)
+    engine = TrainingEngine(model, torch.optim.SGD(model.parameters(), lr=0.05), _mse_loss,
+                            precision="fp32", grad_accum_steps=2)
+    with patch("mental_health_ml.training.engine.mlflow"):
+        engine.fit(loader, epochs=2)
+    torch.save({"weights": model.state_dict(), "history": engine.history}, os.path.join(result_dir, f"rank{rank}.pt"))
+    cleanup_distributed()
+
+def test_ddp_ranks_stay_in_sync(tmp_path):
+    world_size = 2
+    mp.spawn(_train_rank, args=(world_size, _free_port(), str(tmp_path)), nprocs=world_size, join=True)
+    results = [torch.load(str(tmp_path / f"rank{r}.pt")) for r in range(world_size)]
+    for key in results[0]["weights"]:
+        assert torch.allclose(results[0]["weights"][key], results[1]["weights"][key])
+    # Throughput is aggregated over ranks, so every rank reports the same number
+    assert results[0]["history"][-1]["train_samples_per_sec"] == results[1]["history"][-1]["train_samples_per_sec"]
+    assert not dist.is_initialized()
@@ -0,0 +1,50 @@
+# mental_health_ml/tests/unit/test_generate_sample_data.py
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from mental_health_ml.data.datasets.generate_sample_data import QUESTION_IDS, LABEL_COLUMNS, SampleDataGenerator
+
+REFERENCE_TIME = datetime(2025, 1, 1, 12, 0)
+
+def make_generator(seed=7):
+    return SampleDataGenerator(seed=seed, reference_time=REFERENCE_TIME)
+
+def test_seed_makes_frames_reproducible():
+    assert make_generator().generate_frame(500).equals(make_generator().generate_frame(500))
+    assert not make_generator(1).generate_frame(500).equals(make_generator(2).generate_frame(500))
+
+def test_responses_stay_within_state_profiles_and_labels_in_range():
+    generator = make_generator()
+    frame = generator.generate_frame(5000)
+    for state, pattern in generator.response_patterns.items():
+        rows = frame[frame['mental_state_category'] == state]
+        assert len(rows) > 0
+        for q_id in QUESTION_IDS:
+            low, high = pattern[f"{q_id.split('_', 1)[1]}_range"]
+            assert rows[f'response_{q_id}'].between(low, high).all()
+        assert rows['response_additional_comments'].isin(generator.text_responses[state]).all()
+    assert frame[LABEL_COLUMNS].apply(lambda column: column.between(0, 1).all()).all()
+
+def test_chunked_writers_match_requested_sizes(tmp_path):
+    generator = make_generator()
+    csv_path = str(tmp_path / "assessments.csv")
+    assert generator.write_assessments(csv_path, 1050, chunk_size=100) == 1050
+    frame = pd.read_csv(csv_path)
+    assert len(frame) == 1050 and frame['user_id'].is_unique
+
+    parquet_path = str(tmp_path / "transcripts.parquet")
+    messages = generator.write_transcripts(parquet_path, 120, chunk_size=50)
+    transcripts = pd.read_parquet(parquet_path)
+    assert len(transcripts) == messages and transcripts['conversation_id'].nunique() == 120
+
+def test_transcripts_alternate_roles_in_time_order():
+    frame = make_generator().generate_transcript_frame(30, min_turns=1, max_turns=4)
+    records = list(SampleDataGenerator.transcript_records(frame))
+    assert len(records) == 30
+    for record in records:
+        roles = [message['role'] for message in record['conversation']]
+        assert roles == ['user', 'assistant'] * (len(roles) // 2) and 2 <= len(roles) <= 8
+        times = np.array([message['timestamp'] for message in record['conversation']], dtype='datetime64[s]')
+        assert (np.diff(times) > np.timedelta64(0, 's')).all()
@@ -0,0 +1,35 @@
+# mental_health_ml/tests/unit/test_json_stream.py
+import asyncio
+import json
+
+import pytest
+
+from mental_health_ml.utils.json_stream import iter_json_items, JSONStreamError
+
+ITEMS = [{"id": "a", "responses": {"gad_1": "3", "note": "très fatigué"}}, {"id": "b", "responses": {}}, 42]
+
+async def _chunks(body: bytes, size: int):
+    for i in range(0, len(body), size):
+        yield body[i:i + size]
+
+def _parse(body: bytes, size: int, **kwargs):
+    async def collect():
+        return [item async for item in iter_json_items(_chunks(body, size), **kwargs)]
+    return asyncio.run(collect())
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 64])
+def test_array_and_ndjson_split_at_any_byte(chunk_size):
+    array_body = json.dumps(ITEMS, ensure_ascii=False).encode("utf-8")
+    ndjson_body = "\n".join(json.dumps(item, ensure_ascii=False) for item in ITEMS).encode("utf-8")
+    assert _parse(array_body, chunk_size) == ITEMS
+    assert _parse(ndjson_body, chunk_size) == ITEMS
+
+@pytest.mark.parametrize("body", [b'[{"a": 1}', b'[{"a": 1} {"b": 2}]', b'{"a": 1}\n{broken\n'])
+def test_malformed_uploads_are_rejected(body):
+    with pytest.raises(JSONStreamError):
+        _parse(body, 4)
+
+def test_oversized_item_is_rejected():
+    body = json.dumps([{"blob": "x" * 5000}]).encode("utf-8")
+    with pytest.raises(JSONStreamError):
+        _parse(body, 256, max_item_bytes=1000)
@@ -0,0 +1,28 @@
+# mental_health_ml/tests/unit/test_jsonl_sink.py
+import pytest
+
+from mental_health_ml.utils.jsonl_sink import RotatingJSONLSink, iter_sink_records, sink_files
+
+@pytest.mark.parametrize("compression", [None, "gzip"])
+def test_records_survive_rotation_in_order(tmp_path, compression):
+    with RotatingJSONLSink(str(tmp_path), compression=compression, max_file_bytes=500, flush_bytes=200) as sink:
+        for i in range(100):
+            assert sink.write({"i": i, "data_type": "assessment"})
+        sink.flush()
+        assert [r["i"] for r in iter_sink_records(str(tmp_path))] == list(range(100))
+    assert len(sink_files(str(tmp_path))) > 1 # Rotated by size
+
+def test_new_sink_never_appends_to_existing_files(tmp_path):
+    with RotatingJSONLSink(str(tmp_path)) as sink:
+        sink.write({"run": 1})
+    with RotatingJSONLSink(str(tmp_path)) as sink:
+        sink.write({"run": 2})
+    assert len(sink_files(str(tmp_path))) == 2
+    assert [r["run"] for r in iter_sink_records(str(tmp_path))] == [1, 2]
+
+def test_full_queue_drops_instead_of_blocking(tmp_path):
+    sink = RotatingJSONLSink(str(tmp_path), max_queue=1, flush_seconds=60)
+    results = [sink.write({"i": i}) for i in range(1000)]
+    sink.close()
+    assert False in results
+    assert sum(1 for _ in iter_sink_records(str(tmp_path))) == sum(results)
@@ -0,0 +1,32 @@
+# mental_health_ml/tests/unit/test_keyword_automaton.py
+import json
+
+from mental_health_ml.utils.keyword_automaton import KeywordAutomaton
+
+LEXICON = {
+    "negative": ["sad", "worried"],
+    "crisis": ["kill myself", "end it all", "hopeless"],
+}
+
+def test_whole_word_case_insensitive_matches_with_spans():
+    text = "Crusade aside, I'm SAD and want to   kill\tmyself. Hopeless-ish."
+    matches = KeywordAutomaton(LEXICON).find(text)
+    assert [(keyword, category) for keyword, category, _ in matches] == [
+        ("sad", "negative"), ("kill myself", "crisis"), ("hopeless", "crisis")
+    ]
+    for keyword, _, (start, end) in matches:
+        assert " ".join(text[start:end].lower().split()) == keyword
+
+def test_overlapping_matches_keep_leftmost_longest():
+    automaton = KeywordAutomaton({"crisis": ["end it all", "it all"]})
+    assert [m[0] for m in automaton.find("I want to end it all")] == ["end it all"]
+    assert [m[0] for m in automaton.find("I want to end it all", overlapping=True)] == ["end it all", "it all"]
+
+def test_external_lexicon_file(tmp_path):
+    path = tmp_path / "lexicon.json"
+    path.write_text(json.dumps({"negative": [f"term{i}" for i in range(5000)] + ["worn out"]}))
+    automaton = KeywordAutomaton.from_lexicon_file(str(path))
+    assert len(automaton) == 5001
+    assert automaton.find_many(["so worn out", None, "term42 term4200x"]) == [
+        [("worn out", "negative", (3, 11))], [], [("term42", "negative", (0, 6))]
+    ]
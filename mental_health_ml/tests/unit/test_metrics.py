@@ -0,0 +1,45 @@
+# mental_health_ml/tests/unit/test_metrics.py
+import asyncio
+
+import pytest
+
+from mental_health_ml.utils.metrics import MetricsRegistry, STAGE_ERRORS, STAGE_LATENCY, timed
+
+def test_histogram_exposition_is_cumulative():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("request_seconds", "Request latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, route="/chat")
+    lines = registry.render_prometheus().splitlines()
+    assert lines[:2] == ["# HELP request_seconds Request latency", "# TYPE request_seconds histogram"]
+    assert lines[2:] == [
+        'request_seconds_bucket{route="/chat",le="0.1"} 2',
+        'request_seconds_bucket{route="/chat",le="1"} 3',
+        'request_seconds_bucket{route="/chat",le="+Inf"} 4',
+        'request_seconds_sum{route="/chat"} 3.65',
+        'request_seconds_count{route="/chat"} 4',
+    ]
+    assert histogram.value(route="/chat") == 4
+
+def test_counter_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.counter("events_total").inc(kind='say "hi"\\')
+    assert 'events_total{kind="say \\"hi\\"\\\\"} 1' in registry.render_prometheus()
+
+def test_timed_records_latency_and_errors():
+    @timed("forward", model="test_sync")
+    def forward():
+        return 1
+
+    @timed("forward", model="test_async")
+    async def forward_async():
+        return 2
+
+    assert forward() == 1 and asyncio.run(forward_async()) == 2
+    with pytest.raises(ValueError):
+        with timed("forward", model="test_error"):
+            raise ValueError("boom")
+    assert STAGE_LATENCY.value(stage="forward", model="test_sync") == 1
+    assert STAGE_LATENCY.value(stage="forward", model="test_async") == 1
+    assert STAGE_LATENCY.value(stage="forward", model="test_error") == 1
+    assert STAGE_ERRORS.value(stage="forward", model="test_error", error="ValueError") == 1
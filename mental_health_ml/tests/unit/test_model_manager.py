@@ -0,0 +1,73 @@
+# mental_health_ml/tests/unit/test_model_manager.py
+import threading
+import time
+
+from mental_health_ml.utils.model_manager import ModelManager, estimate_model_size
+
+# Plain byte strings stand in for models; their size is estimated from the pickled payload.
+BLOB_SIZE = 1000
+
+def make_loader(name, calls):
+    def loader():
+        calls.append(name)
+        return b"x" * BLOB_SIZE
+    return loader
+
+def test_lru_model_is_evicted_when_over_budget():
+    calls = []
+    budget = int(estimate_model_size(b"x" * BLOB_SIZE) * 2.5) # Room for two models
+    manager = ModelManager(memory_budget_bytes=budget)
+
+    manager.get_or_load("crisis", make_loader("crisis", calls))
+    manager.get_or_load("themer", make_loader("themer", calls))
+    manager.get_or_load("crisis", make_loader("crisis", calls)) # Touch: themer is now LRU
+    manager.get_or_load("emotion", make_loader("emotion", calls))
+
+    resident = [m["name"] for m in manager.get_residency_stats()["models"]]
+    assert resident == ["crisis", "emotion"]
+    assert manager.resident_bytes() <= budget
+
+    # Evicted model reloads transparently
+    manager.get_or_load("themer", make_loader("themer", calls))
+    assert calls == ["crisis", "themer", "emotion", "themer"]
+
+def test_pinned_model_is_never_evicted():
+    calls = []
+    budget = int(estimate_model_size(b"x" * BLOB_SIZE) * 1.5) # Room for one model
+    manager = ModelManager(memory_budget_bytes=budget)
+
+    manager.get_or_load("crisis", make_loader("crisis", calls), pinned=True)
+    manager.get_or_load("themer", make_loader("themer", calls))
+
+    resident = [m["name"] for m in manager.get_residency_stats()["models"]]
+    assert "crisis" in resident
+
+def test_concurrent_requests_share_one_load():
+    calls = []
+    manager = ModelManager(memory_budget_bytes=None)
+
+    def slow_loader():
+        calls.append("themer")
+        time.sleep(0.2)
+        return b"x" * BLOB_SIZE
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(manager.get_or_load("themer", slow_loader)))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert calls == ["themer"]
+    assert len(results) == 5
+    assert all(r is results[0] for r in results)
+
+def test_unload_model():
+    manager = ModelManager(memory_budget_bytes=None)
+    manager.get_or_load("themer", make_loader("themer", []))
+    assert manager.unload_model("themer") is True
+    assert manager.unload_model("themer") is False
+    assert manager.resident_bytes() == 0
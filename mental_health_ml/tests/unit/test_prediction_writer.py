@@ -0,0 +1,146 @@
+# mental_health_ml/tests/unit/test_prediction_writer.py
+import glob
+import json
+import os
+import uuid
+from datetime import datetime, timezone
+
+os.environ.setdefault("DATABASE_URL", "sqlite://") # config/db.py needs one at import
+
+import pytest
+from sqlalchemy import create_engine, event, func, select
+
+from mental_health_ml.config.db import Base
+from mental_health_ml.models.db_models import ChatMessage, ChatSession, MLCrisisPrediction, MLEmotionPrediction, User
+from mental_health_ml.services.prediction_writer import WriteBehindWriter
+
+TABLES = [User.__table__, ChatSession.__table__, ChatMessage.__table__, MLEmotionPrediction.__table__, MLCrisisPrediction.__table__]
+
+@pytest.fixture
+def database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    event.listen(engine, "connect", lambda connection, record: connection.execute("PRAGMA foreign_keys=ON"))
+    Base.metadata.create_all(engine, tables=TABLES)
+    session_id = uuid.uuid4()
+    with engine.begin() as connection:
+        connection.execute(ChatSession.__table__.insert(), {"id": session_id})
+    return engine, session_id
+
+def _message(session_id, text="hello"):
+    return {"id": uuid.uuid4(), "session_id": session_id, "sender_type": "user", "message_text": text,
+            "timestamp": datetime.now(timezone.utc)}
+
+def _count(engine, table):
+    with engine.connect() as connection:
+        return connection.execute(select(func.count()).select_from(table)).scalar()
+
+def test_rows_are_inserted_in_bulk(database, tmp_path):
+    engine, session_id = database
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+    writer = WriteBehindWriter(engine, Base.metadata, flush_rows=1000, flush_seconds=60, spill_path=str(tmp_path / "spill.jsonl"))
+    try:
+        for i in range(50):
+            message = _message(session_id, f"message {i}")
+            writer.enqueue(ChatMessage, message)
+            writer.enqueue(MLEmotionPrediction, {"chat_message_id": message["id"], "detected_emotion": "joy"})
+        assert _count(engine, ChatMessage.__table__) == 0 # Still buffered
+        assert writer.flush(timeout=5) == "db"
+    finally:
+        writer.close()
+    assert _count(engine, ChatMessage.__table__) == 50
+    assert _count(engine, MLEmotionPrediction.__table__) == 50
+    assert len([s for s in statements if s.startswith("INSERT")]) == 2 # One executemany per table
+
+def test_crisis_row_is_acknowledged_with_its_message(database, tmp_path):
+    engine, session_id = database
+    writer = WriteBehindWriter(engine, Base.metadata, flush_rows=1000, flush_seconds=60, spill_path=str(tmp_path / "spill.jsonl"))
+    try:
+        message = _message(session_id, "I want to end it")
+        writer.enqueue(ChatMessage, message)
+        ack = writer.write_priority(MLCrisisPrediction, {"chat_message_id": message["id"], "chat_session_id": session_id,
+                                                         "is_crisis_detected": True, "confidence": 0.99})
+        assert ack.wait(timeout=5) == "db"
+        assert _count(engine, MLCrisisPrediction.__table__) == 1
+        assert _count(engine, ChatMessage.__table__) == 1
+    finally:
+        writer.close()
+
+def test_rows_spill_while_database_is_down_and_replay_later(database, tmp_path):
+    engine, session_id = database
+    spill_path = str(tmp_path / "spill.jsonl")
+    down = {"value": True}
+
+    def fail_while_down(conn, cursor, statement, *args):
+        if down["value"] and statement.startswith("INSERT"):
+            raise RuntimeError("database unavailable")
+
+    event.listen(engine, "before_cursor_execute", fail_while_down)
+    writer = WriteBehindWriter(engine, Base.metadata, flush_rows=1000, flush_seconds=60,
+                               spill_path=spill_path, retry_seconds=0)
+    try:
+        message = _message(session_id)
+        writer.enqueue(ChatMessage, message)
+        ack = writer.write_priority(MLCrisisPrediction, {"chat_message_id": message["id"], "is_crisis_detected": True})
+        assert ack.wait(timeout=5) == "spill"
+        assert os.path.exists(spill_path) and _count(engine, ChatMessage.__table__) == 0
+
+        down["value"] = False
+        writer.enqueue(ChatMessage, _message(session_id, "later"))
+        assert writer.flush(timeout=5) == "db"
+    finally:
+        writer.close()
+    assert not os.path.exists(spill_path)
+    assert _count(engine, ChatMessage.__table__) == 2
+    assert _count(engine, MLCrisisPrediction.__table__) == 1
+
+def test_full_buffer_spills_after_backpressure_wait(database, tmp_path):
+    engine, session_id = database
+    spill_path = str(tmp_path / "spill.jsonl")
+    writer = WriteBehindWriter(engine, Base.metadata, flush_rows=1000, flush_seconds=60, max_pending=1,
+                               backpressure_seconds=0.01, spill_path=spill_path)
+    try:
+        assert writer.enqueue(ChatMessage, _message(session_id)) is True
+        assert writer.enqueue(ChatMessage, _message(session_id)) is False
+        assert writer.flush(timeout=5) == "db" # Replays the spilled row too
+    finally:
+        writer.close()
+    assert _count(engine, ChatMessage.__table__) == 2
+
+def test_refused_rows_are_isolated_from_their_batch(database, tmp_path):
+    engine, session_id = database
+    spill_path = str(tmp_path / "spill.jsonl")
+    writer = WriteBehindWriter(engine, Base.metadata, flush_rows=1000, flush_seconds=60, spill_path=spill_path)
+    try:
+        for i in range(10):
+            writer.enqueue(ChatMessage, _message(session_id, f"message {i}"))
+        orphan = _message(uuid.uuid4(), "no such session") # A valid UUID, but not a chat_sessions row
+        writer.enqueue(ChatMessage, orphan)
+        writer.enqueue(MLEmotionPrediction, {"chat_message_id": orphan["id"], "detected_emotion": "joy"})
+        ack = writer.write_priority(MLCrisisPrediction, {"chat_message_id": orphan["id"], "is_crisis_detected": True})
+        assert ack.wait(timeout=5) == "rejected"
+
+        writer.enqueue(ChatMessage, _message(session_id, "later"))
+        assert writer.flush(timeout=5) == "db" # Not sent to the spill file
+    finally:
+        writer.close()
+    assert _count(engine, ChatMessage.__table__) == 11
+    assert _count(engine, MLEmotionPrediction.__table__) == _count(engine, MLCrisisPrediction.__table__) == 0
+    assert not os.path.exists(spill_path)
+    rejected_lines = [json.loads(line) for path in glob.glob(spill_path + ".rejected-*") for line in open(path)]
+    assert sorted(line["table"] for line in rejected_lines) == ["chat_messages", "ml_crisis_predictions", "ml_emotion_predictions"]
+
+def test_spilled_child_is_replayed_with_its_buffered_message(database, tmp_path):
+    engine, session_id = database
+    spill_path = str(tmp_path / "spill.jsonl")
+    writer = WriteBehindWriter(engine, Base.metadata, flush_rows=1000, flush_seconds=60, max_pending=1,
+                               backpressure_seconds=0.01, spill_path=spill_path)
+    try:
+        message = _message(session_id)
+        assert writer.enqueue(ChatMessage, message) is True
+        assert writer.enqueue(MLEmotionPrediction, {"chat_message_id": message["id"], "detected_emotion": "joy"}) is False
+        assert writer.flush(timeout=5) == "db"
+    finally:
+        writer.close()
+    assert _count(engine, ChatMessage.__table__) == _count(engine, MLEmotionPrediction.__table__) == 1
+    assert not os.path.exists(spill_path) and not glob.glob(spill_path + ".rejected-*")
@@ -0,0 +1,44 @@
+# mental_health_ml/tests/unit/test_prepare_data.py
+import json
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from mental_health_ml.training.prepare_data import PARQUET_SCHEMAS, run_etl
+
+RECORDS = [
+    # Different questionnaires, so different response keys per chunk
+    {"data_type": "assessment", "user_id": 1, "timestamp": "2025-01-01T10:00:00",
+     "responses": {"gad_1": 2, "gad_2": "mail me at a@b.com"}, "labels": {"anxiety_level": 0.5, "risk_level": 1}},
+    {"data_type": "assessment", "user_id": "u2", "timestamp": "2025-01-02T10:00:00",
+     "responses": {"phq_1": 3}}, # No labels
+    {"data_type": "assessment", "user_id": 3, "timestamp": "2025-01-03T10:00:00",
+     "responses": {"pss_4": 1}, "labels": {"anxiety_level": None, "unknown_label": 4}}, # All-null label column in its chunk
+    {"data_type": "conversation", "user_id": 4, "conversation": [
+        {"role": "user", "content": "hi", "timestamp": "2025-01-04T10:00:00"},
+        {"role": "assistant", "content": "hello", "timestamp": "2025-01-04T10:00:01"}]},
+]
+
+def test_part_files_read_back_as_one_dataset(tmp_path):
+    data_file = tmp_path / "training_data.jsonl"
+    data_file.write_text("".join(json.dumps(record) + "\n" for record in RECORDS), encoding="utf-8")
+    output_dir = tmp_path / "processed"
+
+    totals = run_etl(str(data_file), str(output_dir), chunk_size=1, workers=1) # One part file per record
+    assert sum(n for key, n in totals.items() if key.startswith("assessment")) == 3
+
+    parts = sorted((output_dir / "assessment").rglob("*.parquet"))
+    assert len(parts) == 3
+    for part in parts:
+        assert pq.read_schema(part).remove_metadata() == PARQUET_SCHEMAS["assessment"]
+
+    assessments = pd.read_parquet(output_dir / "assessment").sort_values("timestamp").reset_index(drop=True)
+    assert list(assessments.columns) == PARQUET_SCHEMAS["assessment"].names + ["split"]
+    assert list(assessments["user_id"]) == ["1", "u2", "3"]
+    assert dict(assessments.loc[0, "responses"]) == {"gad_1": "2", "gad_2": "mail me at email"}
+    assert assessments.loc[0, "anxiety_level"] == 0.5 and assessments.loc[0, "risk_level"] == 1.0
+    assert assessments[["anxiety_level", "risk_level"]].iloc[1:].isna().all().all()
+    assert "unknown_label" not in assessments.columns
+
+    conversations = pd.read_parquet(output_dir / "conversation")
+    assert conversations[["input", "output", "user_id"]].values.tolist() == [["hi", "hello", "4"]]
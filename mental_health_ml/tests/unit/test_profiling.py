@@ -0,0 +1,63 @@
+# mental_health_ml/tests/unit/test_profiling.py
+import threading
+import time
+
+import pytest
+
+from mental_health_ml.utils import profiling
+from mental_health_ml.utils.metrics import timed
+from mental_health_ml.utils.profiling import (
+    ProfilerBusyError, profiling_authorized, StackSampler, request_trace, sampling_profile, server_timing_header
+)
+
+def _busy_until(event):
+    while not event.is_set():
+        sum(range(1000))
+
+def test_stack_sampler_collapses_running_threads():
+    done = threading.Event()
+    worker = threading.Thread(target=_busy_until, args=(done,), name="busy worker")
+    worker.start()
+    try:
+        sampler = StackSampler(interval=0.001)
+        for _ in range(5):
+            sampler.sample_once()
+    finally:
+        done.set()
+        worker.join()
+    assert sampler.samples == 5
+    stacks = [line.rsplit(" ", 1) for line in sampler.collapsed().splitlines()]
+    busy = [(stack, int(count)) for stack, count in stacks if stack.startswith("busy_worker;")]
+    assert busy and sum(count for _, count in busy) == 5
+    assert all("_busy_until (test_profiling.py:" in stack for stack, _ in busy)
+
+def test_only_one_profile_at_a_time():
+    with sampling_profile(0.5, interval_ms=5):
+        with pytest.raises(ProfilerBusyError):
+            with sampling_profile(0.5):
+                pass
+    with pytest.raises(ValueError):
+        with sampling_profile(3600):
+            pass
+
+def test_request_trace_collects_timed_stages():
+    with timed("forward", model="outside_trace"):
+        pass
+    with request_trace() as trace:
+        with timed("tokenize", model="emotion"):
+            pass
+        with timed("forward", model="emotion"):
+            time.sleep(0.002)
+    header = server_timing_header(trace, total_seconds=0.01)
+    names = [entry.split(";")[0] for entry in header.split(", ")]
+    assert names == ["tokenize", "forward", "total"]
+    assert 'desc="model=emotion"' in header and "total;dur=10.0" in header
+
+def test_token_check_rejects_non_ascii_instead_of_raising(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILING_TOKEN", "")
+    assert not profiling_authorized("secret") # Off without PROFILING_TOKEN
+    monkeypatch.setattr(profiling, "PROFILING_TOKEN", "secret")
+    assert profiling_authorized("secret")
+    assert not profiling_authorized(None)
+    assert not profiling_authorized("sécret")
+    assert not profiling_authorized("\udcff")
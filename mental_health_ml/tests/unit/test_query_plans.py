@@ -0,0 +1,72 @@
+# mental_health_ml/tests/unit/test_query_plans.py
+# Query-plan regressions: the hot queries must keep using the indexes declared in
+# models/db_models.py (and created by the 04fedd618e63 migration). SQLite stands
+# in for PostgreSQL here; both pick the same composite index for these lookups.
+import os
+import uuid
+from datetime import datetime, timezone
+
+os.environ.setdefault("DATABASE_URL", "sqlite://") # config/db.py needs one at import
+
+import pytest
+from sqlalchemy import create_engine, event, select
+
+from mental_health_ml.config.db import Base
+from mental_health_ml.models.db_models import (
+    AssessmentQuestion, AssessmentQuestionnaire, ChatMessage, ChatSession, MLCrisisPrediction, MLEmotionPrediction,
+    User, UserAssessmentResponse, UserAssessmentSession, UserResourceInteraction
+)
+
+# Core tables: queries are built on these so the test does not depend on the ORM relationships
+responses, questions = UserAssessmentResponse.__table__, AssessmentQuestion.__table__
+messages, crises, emotions = ChatMessage.__table__, MLCrisisPrediction.__table__, MLEmotionPrediction.__table__
+interactions = UserResourceInteraction.__table__
+
+TABLES = [User.__table__, ChatSession.__table__, messages, crises, emotions, AssessmentQuestionnaire.__table__,
+          questions, UserAssessmentSession.__table__, responses, interactions] # Not resources_content: ARRAY is PostgreSQL only
+
+SESSION_ID, USER_ID = uuid.uuid4(), uuid.uuid4()
+CUTOFF = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'plans.db'}")
+    Base.metadata.create_all(engine, tables=TABLES)
+    return engine
+
+def _plan(engine, query) -> str:
+    """EXPLAIN QUERY PLAN of query, as SQLite compiles it, one line per plan step joined by " | "."""
+    statements = []
+    listener = lambda conn, cursor, statement, parameters, *args: statements.append((statement, parameters))
+    event.listen(engine, "before_cursor_execute", listener)
+    with engine.connect() as connection:
+        connection.execute(query).all()
+        event.remove(engine, "before_cursor_execute", listener)
+        (statement, parameters), = statements
+        rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+    return " | ".join(row[-1] for row in rows)
+
+@pytest.mark.parametrize("query, index, ordered_by_index", [
+    # AssessmentService.get_responses_for_session: a session's answers in questionnaire order
+    (select(responses.c.answer_value).join(questions, responses.c.question_id == questions.c.id)
+     .where(responses.c.session_id == SESSION_ID).order_by(questions.c.order_in_questionnaire.asc()),
+     "ix_user_assessment_responses_session_id_question_id", False),
+    # Conversation history, oldest first
+    (select(messages).where(messages.c.session_id == SESSION_ID).order_by(messages.c.timestamp),
+     "ix_chat_messages_session_id_timestamp", True),
+    # Latest crisis flags of a chat session
+    (select(crises).where(crises.c.chat_session_id == SESSION_ID).order_by(crises.c.prediction_timestamp.desc()).limit(10),
+     "ix_ml_crisis_predictions_chat_session_id_prediction_timestamp", True),
+    # Recommender: a user's recent interactions
+    (select(interactions).where(interactions.c.user_id == USER_ID).order_by(interactions.c.timestamp.desc()).limit(50),
+     "ix_user_resource_interactions_user_id_timestamp", True),
+    # Retention job
+    (select(messages.c.id).where(messages.c.timestamp < CUTOFF).limit(5000), "ix_chat_messages_timestamp", True),
+    (select(emotions.c.id).where(emotions.c.prediction_timestamp < CUTOFF).limit(5000),
+     "ix_ml_emotion_predictions_prediction_timestamp", True),
+])
+def test_hot_queries_use_their_index(engine, query, index, ordered_by_index):
+    plan = _plan(engine, query)
+    assert index in plan
+    if ordered_by_index:
+        assert "TEMP B-TREE" not in plan # No separate sort step
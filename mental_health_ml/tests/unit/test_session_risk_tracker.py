@@ -0,0 +1,44 @@
+# mental_health_ml/tests/unit/test_session_risk_tracker.py
+from mental_health_ml.models.crisis.ml_crisis_predictor import CRISIS_CANDIDATE_LABELS
+from mental_health_ml.models.crisis.session_risk_tracker import SessionRiskTracker
+from mental_health_ml.utils.session_store import TTLSessionStore
+
+def make_result(suicidal=0.0, distress=0.0, keyword_category=None):
+    """Builds a detect_crisis_hybrid-shaped result for one turn."""
+    return {
+        "is_crisis": False,
+        "details": {
+            "keyword_result": {
+                "keyword_crisis_detected": keyword_category is not None,
+                "matched_category": keyword_category,
+            },
+            "ml_result": {"all_ml_scores": {CRISIS_CANDIDATE_LABELS[0]: suicidal, CRISIS_CANDIDATE_LABELS[1]: distress}},
+        },
+    }
+
+def test_repeated_borderline_messages_escalate_once():
+    tracker = SessionRiskTracker(half_life_turns=3, threshold=1.5)
+    results = [tracker.update("s1", make_result(suicidal=0.45)) for _ in range(8)]
+    escalations = [r["escalate"] for r in results]
+    assert escalations.count(True) == 1
+    assert results[0]["escalate"] is False # A single borderline message is not enough
+    assert results[-1]["escalated"] is True
+    assert results[-1]["turns"] == 8
+
+def test_risk_decays_and_sessions_are_independent():
+    tracker = SessionRiskTracker(half_life_turns=1, threshold=10.0)
+    first = tracker.update("s1", make_result(suicidal=0.8, keyword_category="severe_hopelessness"))
+    later = tracker.update("s1", make_result())
+    assert later["session_risk"] < first["session_risk"]
+    assert later["keyword_hits"] == {"severe_hopelessness": 1}
+    assert tracker.update("s2", make_result())["session_risk"] == 0.0
+
+def test_store_expires_and_bounds_entries():
+    now = [0.0]
+    store = TTLSessionStore(max_entries=2, ttl_seconds=10, clock=lambda: now[0])
+    store.get_or_create("a", dict)
+    store.get_or_create("b", dict)
+    store.get_or_create("c", dict) # Evicts "a", the least recently used
+    assert store.get("a") is None and len(store) == 2
+    now[0] = 11.0
+    assert store.get("b") is None and len(store) == 0
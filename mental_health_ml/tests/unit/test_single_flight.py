@@ -0,0 +1,44 @@
+# mental_health_ml/tests/unit/test_single_flight.py
+import threading
+import time
+
+from mental_health_ml.utils.single_flight import COALESCED_CALLS, coalesce
+
+def test_concurrent_identical_calls_share_one_execution():
+    executions = []
+
+    @coalesce("test_model")
+    def predict(text, threshold_map=None):
+        executions.append(text)
+        time.sleep(0.05)
+        return {"text": text, "scores": [0.1, 0.9]}
+
+    leaders = COALESCED_CALLS.value(model="test_model", role="leader")
+    followers = COALESCED_CALLS.value(model="test_model", role="follower")
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(predict("I can't go on", threshold_map={"a": 0.5})))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert executions == ["I can't go on"]
+    assert COALESCED_CALLS.value(model="test_model", role="leader") == leaders + 1
+    assert COALESCED_CALLS.value(model="test_model", role="follower") == followers + 3
+    assert all(result == {"text": "I can't go on", "scores": [0.1, 0.9]} for result in results)
+    results[0]["scores"].append(1.0) # Every caller owns its copy
+    assert all(len(result["scores"]) == 2 for result in results[1:])
+
+def test_sequential_and_different_calls_are_not_coalesced():
+    calls = []
+
+    @coalesce("test_sequential")
+    def predict(text):
+        calls.append(text)
+        return len(text)
+
+    assert [predict("a"), predict("a"), predict("bb")] == [1, 1, 2]
+    assert calls == ["a", "a", "bb"]
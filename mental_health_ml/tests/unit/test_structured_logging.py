@@ -0,0 +1,49 @@
+# mental_health_ml/tests/unit/test_structured_logging.py
+import io
+import json
+import logging
+import queue
+
+from mental_health_ml.utils.structured_logging import (
+    LOG_RECORDS_DROPPED, LogSampler, NonBlockingQueueHandler, configure_logging, get_logger,
+    parse_sampling, shutdown_logging
+)
+
+def test_user_text_is_redacted_and_fields_are_json():
+    stream = io.StringIO()
+    configure_logging(level="DEBUG", fmt="json", sampling="", redact_text=True, stream=stream)
+    try:
+        get_logger("test.redaction").info("faq_intent_predicted", text="I feel hopeless", intent="sadness", confidence=0.91)
+    finally:
+        shutdown_logging()
+    entry = json.loads(stream.getvalue().splitlines()[-1])
+    assert entry["event"] == "faq_intent_predicted"
+    assert entry["intent"] == "sadness" and entry["confidence"] == 0.91
+    assert entry["text"].startswith("<redacted len=15 ")
+    assert "hopeless" not in stream.getvalue()
+
+def test_sampling_uses_longest_prefix_and_spares_warnings():
+    sampler = LogSampler(parse_sampling("app=0.5, app.models.chatbot=0"))
+    assert sampler.rate("app.models.chatbot.faq") == 0.0
+    assert sampler.rate("app.models.crisis") == 0.5
+    assert sampler.rate("other") == 1.0
+
+    stream = io.StringIO()
+    configure_logging(level="DEBUG", fmt="text", sampling="test.sampled=0", stream=stream)
+    try:
+        logger = get_logger("test.sampled")
+        logger.info("dropped_by_sampling")
+        logger.warning("always_kept")
+    finally:
+        shutdown_logging()
+    assert "dropped_by_sampling" not in stream.getvalue()
+    assert "always_kept" in stream.getvalue()
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    record = logging.LogRecord("test.queue", logging.INFO, __file__, 1, "event", None, None)
+    dropped_before = LOG_RECORDS_DROPPED.value()
+    handler.emit(record)
+    handler.emit(record)
+    assert handler.queue.qsize() == 1
+    assert LOG_RECORDS_DROPPED.value() == dropped_before + 1
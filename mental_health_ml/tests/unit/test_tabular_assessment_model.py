@@ -0,0 +1,53 @@
+# mental_health_ml/tests/unit/test_tabular_assessment_model.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from mental_health_ml.data.preprocessing.assessment_preprocessing import ASSESSMENT_TARGET_COLUMNS, InvalidAssessmentResponses
+from mental_health_ml.models.assessment.tabular_model import TabularAssessmentModel
+
+def _data(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    answers = pd.DataFrame({
+        "gad_1": rng.integers(0, 4, n),
+        "phq_1": rng.integers(0, 4, n),
+        "pss_4 (reverse)": rng.integers(0, 5, n),
+    })
+    total = answers["gad_1"] + answers["phq_1"] + (4 - answers["pss_4 (reverse)"])
+    targets = pd.DataFrame({
+        "anxiety_level": answers["gad_1"],
+        "depression_level": answers["phq_1"],
+        "stress_level": total // 4,
+        "wellbeing_score": 96 - 8 * total,
+        "risk_level": (total >= 6).astype(int),
+    })
+    return answers, targets
+
+@pytest.mark.parametrize("family", ["ridge", "gbm"])
+def test_batch_prediction_matches_frame_prediction(family):
+    answers, targets = _data()
+    model = TabularAssessmentModel(family=family).fit(answers, targets)
+    raw = answers[model.feature_columns].to_numpy(dtype=np.float32)
+
+    predictions = model.predict(raw)
+    assert predictions.shape == (len(answers), len(ASSESSMENT_TARGET_COLUMNS))
+    np.testing.assert_allclose(predictions, model.predict_frame(answers), rtol=1e-6)
+    # Same contract as the BERT model: every target scaled to [0, 1] over the training range
+    assert predictions.min() >= 0.0 and predictions.max() <= 1.0
+    wellbeing = model.preprocessor.unscale_targets(predictions)[:, ASSESSMENT_TARGET_COLUMNS.index("wellbeing_score")]
+    assert wellbeing.min() >= targets["wellbeing_score"].min() - 1e-3 and wellbeing.max() <= targets["wellbeing_score"].max() + 1e-3
+    if family == "ridge": # Targets are linear in the answers
+        np.testing.assert_allclose(model.preprocessor.unscale_targets(predictions)[:, 0], targets["anxiety_level"], atol=0.2)
+
+def test_single_response_and_round_trip(tmp_path):
+    answers, targets = _data()
+    model = TabularAssessmentModel(family="ridge").fit(answers, targets)
+    row = model.predict_responses({"gad_1": "3", "phq_1": "2", "pss_4 (reverse)": "0"})
+    assert row.shape == (len(ASSESSMENT_TARGET_COLUMNS),)
+    with pytest.raises(InvalidAssessmentResponses):
+        model.predict_responses({"gad_1": "3", "phq1": "2", "pss_4 (reverse)": "0"})
+
+    path = str(tmp_path / "tabular.pkl")
+    model.save(path)
+    restored = TabularAssessmentModel.load(path)
+    np.testing.assert_array_equal(restored.predict(answers.to_numpy(dtype=np.float32)), model.predict(answers.to_numpy(dtype=np.float32)))
@@ -0,0 +1,46 @@
+# mental_health_ml/tests/unit/test_tokenized_dataset.py
+from unittest.mock import MagicMock
+
+from mental_health_ml.training.tokenized_dataset import (
+    build_token_cache, TokenizedDataset, DynamicPaddingCollator, LengthBucketBatchSampler
+)
+
+def make_tokenizer():
+    """Whitespace 'tokenizer': one id per word, plus [CLS]=101 / [SEP]=102."""
+    tokenizer = MagicMock()
+    tokenizer.name_or_path = "fake-tokenizer"
+    tokenizer.pad_token_id = 0
+    tokenizer.__len__.return_value = 1000
+    tokenizer.side_effect = lambda texts, **kwargs: {
+        "input_ids": [[101] + [len(w) for w in t.split()][:kwargs["max_length"] - 2] + [102] for t in texts]
+    }
+    return tokenizer
+
+def test_cache_round_trip_and_reuse(tmp_path):
+    tokenizer = make_tokenizer()
+    texts, labels = ["hello there", "a much longer example sentence here", "hi"], [0, 1, 2]
+    path = build_token_cache(texts, labels, tokenizer, max_len=16, cache_dir=str(tmp_path))
+    assert build_token_cache(texts, labels, tokenizer, max_len=16, cache_dir=str(tmp_path)) == path
+    assert tokenizer.call_count == 1 # Second call hit the cache
+
+    dataset = TokenizedDataset(path)
+    assert len(dataset) == 3
+    ids, label = dataset[1]
+    assert list(ids) == [101, 1, 4, 6, 7, 8, 4, 102] and label == 1
+
+def test_dynamic_padding_pads_to_longest_in_batch(tmp_path):
+    tokenizer = make_tokenizer()
+    path = build_token_cache(["a b", "a b c d"], [0, 1], tokenizer, max_len=16, cache_dir=str(tmp_path))
+    dataset = TokenizedDataset(path)
+    batch = DynamicPaddingCollator(dataset.pad_token_id)([dataset[0], dataset[1]])
+    assert tuple(batch["input_ids"].shape) == (2, 6)
+    assert batch["attention_mask"][0].tolist() == [1, 1, 1, 1, 0, 0]
+
+def test_length_buckets_cover_every_example_once():
+    lengths = [5, 50, 6, 49, 7, 48, 8, 47]
+    sampler = LengthBucketBatchSampler(lengths, batch_size=2, bucket_multiplier=4)
+    batches = list(sampler)
+    assert len(batches) == len(sampler)
+    assert sorted(i for batch in batches for i in batch) == list(range(len(lengths)))
+    # Within a single bucket, each batch pairs neighbouring lengths
+    assert all(abs(lengths[a] - lengths[b]) <= 1 for a, b in batches)
@@ -0,0 +1,42 @@
+# mental_health_ml/tests/unit/test_training_engine.py
+import os
+from unittest.mock import patch
+
+import torch
+from torch.utils.data import TensorDataset
+
+from mental_health_ml.training.engine import CHECKPOINT_FILENAME, TrainingEngine, make_data_loader
+
+def _dict_dataset_collate(batch):
+    features, targets = zip(*batch)
+    return {"x": torch.stack(features), "y": torch.stack(targets)}
+
+def _mse_loss(model, batch):
+    return torch.nn.functional.mse_loss(model(batch["x"]), batch["y"]), batch["y"].size(0)
+
+def _fit(checkpoint_dir, epochs=2):
+    torch.manual_seed(0)
+    features = torch.randn(32, 4)
+    loader = make_data_loader(TensorDataset(features, features.sum(dim=1, keepdim=True)), batch_size=8,
+                              collate_fn=_dict_dataset_collate, num_workers=0)
+    model = torch.nn.Linear(4, 1)
+    engine = TrainingEngine(model, torch.optim.SGD(model.parameters(), lr=0.05), _mse_loss,
+                            precision="fp32", checkpoint_dir=checkpoint_dir)
+    with patch("mental_health_ml.training.engine.mlflow"):
+        engine.fit(loader, epochs=epochs)
+    return engine
+
+def test_back_to_back_fits_both_train(tmp_path):
+    checkpoint_dir = str(tmp_path / "checkpoints")
+    first = _fit(checkpoint_dir)
+    assert len(first.history) == 2
+    assert not os.path.exists(os.path.join(checkpoint_dir, CHECKPOINT_FILENAME)) # Removed once the run completed
+    second = _fit(checkpoint_dir)
+    assert len(second.history) == 2 # Not resumed at the final epoch
+
+def test_interrupted_fit_resumes(tmp_path):
+    checkpoint_dir = str(tmp_path / "checkpoints")
+    engine = _fit(checkpoint_dir)
+    engine.save_checkpoint(0) # As if the run had stopped after its first epoch
+    resumed = _fit(checkpoint_dir)
+    assert len(resumed.history) == 1
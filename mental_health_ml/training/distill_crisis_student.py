@@ -0,0 +1,297 @@
+# mental_health_ml/training/distill_crisis_student.py
+import torch
+from torch.utils.data import DataLoader, Dataset
+from transformers import AutoModelForSequenceClassification, AutoTokenizer, get_linear_schedule_with_warmup
+import numpy as np
+import pandas as pd
+import glob
+import hashlib
+import json
+import mlflow
+import os
+from dotenv import load_dotenv
+
+from mental_health_ml.models.crisis.ml_crisis_predictor import (
+    CRISIS_CANDIDATE_LABELS, DEFAULT_ML_THRESHOLD_MAP, ML_CRISIS_MODEL_NAME, ML_CRISIS_STUDENT_PATH,
+    load_zero_shot_crisis_model
+)
+
+load_dotenv()
+
+# --- Configuration ---
+# Unlabelled corpus: "db" reads user messages from the chat_messages table,
+# anything else is treated as a CSV path with a `text` column.
+CORPUS_SOURCE = os.getenv("CRISIS_DISTILL_CORPUS", "db")
+TEXT_COLUMN = "text"
+SOFT_LABEL_CACHE_DIR = "mental_health_ml/data/processed/crisis_teacher_soft_labels"
+CHUNK_SIZE = 512 # Messages per cached chunk; a crashed run resumes from the last complete chunk
+TEACHER_BATCH_SIZE = 16
+
+STUDENT_BASE_MODEL = "distilbert-base-multilingual-cased" # Multilingual, like the teacher
+STUDENT_OUTPUT_PATH = ML_CRISIS_STUDENT_PATH
+
+# Hyperparameters
+EPOCHS = 3
+BATCH_SIZE = 32
+LEARNING_RATE = 3e-5
+MAX_LENGTH = 128
+VAL_FRACTION = 0.1
+
+# MLflow settings
+MLFLOW_EXPERIMENT_NAME = "Crisis_Detection_Systems"
+MLFLOW_RUN_NAME = f"{STUDENT_BASE_MODEL}_crisis_student_distilled"
+REGISTERED_MODEL_NAME = "CrisisStudentClassifier"
+# --- End Configuration ---
+
+def iter_corpus(source: str = CORPUS_SOURCE, batch_size: int = 1000):
+    """Yields message texts in a stable order (needed to resume chunked caching)."""
+    if source == "db":
+        from mental_health_ml.config.db import SessionLocal
+        from mental_health_ml.models.db_models import ChatMessage
+        db = SessionLocal()
+        try:
+            query = db.query(ChatMessage.message_text)\
+                .filter(ChatMessage.sender_type == "user")\
+                .order_by(ChatMessage.timestamp, ChatMessage.id)\
+                .yield_per(batch_size)
+            for (text,) in query:
+                if text and text.strip():
+                    yield text
+        finally:
+            db.close()
+    else:
+        for chunk in pd.read_csv(source, usecols=[TEXT_COLUMN], chunksize=batch_size):
+            for text in chunk[TEXT_COLUMN].dropna().astype(str):
+                if text.strip():
+                    yield text
+
+def _chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def teacher_soft_labels(teacher, texts: list, batch_size: int = TEACHER_BATCH_SIZE) -> np.ndarray:
+    """Zero-shot scores for every candidate label, shape (len(texts), len(CRISIS_CANDIDATE_LABELS))."""
+    outputs = teacher(texts, CRISIS_CANDIDATE_LABELS, multi_label=True, batch_size=batch_size)
+    if isinstance(outputs, dict): # Single text
+        outputs = [outputs]
+    scores = np.zeros((len(texts), len(CRISIS_CANDIDATE_LABELS)), dtype=np.float32)
+    label_index = {label: i for i, label in enumerate(CRISIS_CANDIDATE_LABELS)}
+    for row, output in enumerate(outputs):
+        for label, score in zip(output["labels"], output["scores"]):
+            scores[row, label_index[label]] = score
+    return scores
+
+def _chunk_hash(texts: list) -> str:
+    digest = hashlib.sha256()
+    for text in texts:
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+def _cached_chunk_hash(chunk_path: str):
+    """Content hash stored in a cached chunk, or None if it is missing or unreadable."""
+    try:
+        with np.load(chunk_path) as chunk:
+            return str(chunk["content_hash"]) if "content_hash" in chunk.files else None
+    except (OSError, ValueError):
+        return None
+
+def cache_soft_labels(texts, cache_dir: str = SOFT_LABEL_CACHE_DIR, chunk_size: int = CHUNK_SIZE) -> int:
+    """
+    Runs the teacher over the corpus and writes one compressed .npz per chunk
+    (texts + soft labels + a hash of the texts). Chunks already on disk with the
+    same texts are skipped, so the job can be interrupted and resumed; chunks whose
+    texts changed (corpus grew, was edited or reordered) are recomputed, and chunks
+    past the end of the corpus are removed. Returns the number of chunks in the cache.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest_path = os.path.join(cache_dir, "manifest.json")
+    manifest = {"teacher_model": ML_CRISIS_MODEL_NAME, "labels": CRISIS_CANDIDATE_LABELS, "chunk_size": chunk_size}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r") as f:
+            if json.load(f) != manifest:
+                raise ValueError(f"Soft label cache at {cache_dir} was built with a different teacher/labels/chunk size.")
+    else:
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+
+    teacher = None
+    n_chunks = 0
+    for chunk_idx, chunk in enumerate(_chunked(texts, chunk_size)):
+        n_chunks += 1
+        chunk_path = os.path.join(cache_dir, f"chunk_{chunk_idx:05d}.npz")
+        content_hash = _chunk_hash(chunk)
+        if os.path.exists(chunk_path) and _cached_chunk_hash(chunk_path) == content_hash:
+            continue
+        if teacher is None:
+            teacher = load_zero_shot_crisis_model()
+            if teacher is None:
+                raise RuntimeError("Zero-shot teacher model could not be loaded.")
+        scores = teacher_soft_labels(teacher, chunk)
+        tmp_path = chunk_path.replace(".npz", ".tmp.npz")
+        np.savez_compressed(tmp_path, texts=np.array(chunk, dtype=str), scores=scores, content_hash=np.array(content_hash))
+        os.replace(tmp_path, chunk_path) # Atomic: a chunk file is either complete or absent
+        print(f"  Cached teacher soft labels for chunk {chunk_idx} ({len(chunk)} messages)")
+
+    # The corpus may have shrunk since the last run
+    for chunk_path in glob.glob(os.path.join(cache_dir, "chunk_*.npz")):
+        suffix = os.path.basename(chunk_path)[len("chunk_"):-len(".npz")]
+        if not suffix.isdigit() or int(suffix) >= n_chunks:
+            os.remove(chunk_path)
+    return n_chunks
+
+def load_soft_labels(cache_dir: str = SOFT_LABEL_CACHE_DIR):
+    """Returns (texts, scores) from all cached chunks."""
+    texts, scores = [], []
+    for chunk_path in sorted(glob.glob(os.path.join(cache_dir, "chunk_*.npz"))):
+        if chunk_path.endswith(".tmp.npz"):
+            continue
+        with np.load(chunk_path) as chunk:
+            texts.extend(chunk["texts"].tolist())
+            scores.append(chunk["scores"])
+    if not scores:
+        return [], np.zeros((0, len(CRISIS_CANDIDATE_LABELS)), dtype=np.float32)
+    return texts, np.concatenate(scores, axis=0)
+
+class SoftLabelDataset(Dataset):
+    def __init__(self, texts, soft_labels):
+        self.texts = texts
+        self.soft_labels = soft_labels
+
+    def __len__(self):
+        return len(self.texts)
+
+    def __getitem__(self, idx):
+        return self.texts[idx], self.soft_labels[idx]
+
+def make_collate_fn(tokenizer, max_len):
+    def collate(batch):
+        texts, soft_labels = zip(*batch)
+        encoding = tokenizer(list(texts), padding=True, truncation=True, max_length=max_len, return_tensors="pt")
+        encoding["labels"] = torch.tensor(np.stack(soft_labels), dtype=torch.float)
+        return encoding
+    return collate
+
+def crisis_decisions(scores: np.ndarray) -> np.ndarray:
+    """Applies the production thresholds: True where any crisis label crosses its threshold."""
+    decisions = np.zeros(len(scores), dtype=bool)
+    for label, threshold in DEFAULT_ML_THRESHOLD_MAP.items():
+        decisions |= scores[:, CRISIS_CANDIDATE_LABELS.index(label)] >= threshold
+    return decisions
+
+def evaluate_student(model, data_loader, device) -> dict:
+    model.eval()
+    student_scores, teacher_scores = [], []
+    with torch.no_grad():
+        for batch in data_loader:
+            labels = batch.pop("labels")
+            batch = {k: v.to(device) for k, v in batch.items()}
+            student_scores.append(torch.sigmoid(model(**batch).logits).cpu().numpy())
+            teacher_scores.append(labels.numpy())
+    student_scores = np.concatenate(student_scores)
+    teacher_scores = np.concatenate(teacher_scores)
+
+    student_crisis = crisis_decisions(student_scores)
+    teacher_crisis = crisis_decisions(teacher_scores)
+    n_teacher_crisis = int(teacher_crisis.sum())
+    return {
+        "mae_vs_teacher": float(np.abs(student_scores - teacher_scores).mean()),
+        "decision_agreement": float((student_crisis == teacher_crisis).mean()),
+        # Share of teacher-flagged crises the student also flags
+        "crisis_recall_vs_teacher": float((student_crisis & teacher_crisis).sum() / n_teacher_crisis) if n_teacher_crisis else 1.0,
+    }
+
+def main():
+    mlflow.set_experiment(MLFLOW_EXPERIMENT_NAME)
+    with mlflow.start_run(run_name=MLFLOW_RUN_NAME) as run:
+        print(f"MLflow Run ID: {run.info.run_id}")
+        mlflow.log_params({
+            "teacher_model": ML_CRISIS_MODEL_NAME, "student_base_model": STUDENT_BASE_MODEL,
+            "corpus_source": CORPUS_SOURCE, "epochs": EPOCHS, "batch_size": BATCH_SIZE,
+            "learning_rate": LEARNING_RATE, "max_seq_length": MAX_LENGTH
+        })
+        mlflow.log_dict({"labels": CRISIS_CANDIDATE_LABELS}, "crisis_labels.json")
+
+        print("--- Caching teacher soft labels ---")
+        n_chunks = cache_soft_labels(iter_corpus())
+        texts, soft_labels = load_soft_labels()
+        mlflow.log_params({"n_soft_label_chunks": n_chunks, "n_messages": len(texts)})
+        if not texts:
+            print("No messages to distill from. Exiting.")
+            return
+
+        rng = np.random.default_rng(42)
+        order = rng.permutation(len(texts))
+        n_val = int(len(texts) * VAL_FRACTION)
+        val_idx, train_idx = order[:n_val], order[n_val:]
+
+        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        tokenizer = AutoTokenizer.from_pretrained(STUDENT_BASE_MODEL)
+        collate = make_collate_fn(tokenizer, MAX_LENGTH)
+        train_loader = DataLoader(
+            SoftLabelDataset([texts[i] for i in train_idx], soft_labels[train_idx]),
+            batch_size=BATCH_SIZE, shuffle=True, collate_fn=collate
+        )
+        val_loader = DataLoader(
+            SoftLabelDataset([texts[i] for i in val_idx], soft_labels[val_idx]),
+            batch_size=BATCH_SIZE, collate_fn=collate
+        ) if n_val > 0 else None
+
+        model = AutoModelForSequenceClassification.from_pretrained(
+            STUDENT_BASE_MODEL,
+            num_labels=len(CRISIS_CANDIDATE_LABELS),
+            problem_type="multi_label_classification",
+            id2label={i: label for i, label in enumerate(CRISIS_CANDIDATE_LABELS)},
+            label2id={label: i for i, label in enumerate(CRISIS_CANDIDATE_LABELS)},
+        ).to(device)
+
+        optimizer = torch.optim.AdamW(model.parameters(), lr=LEARNING_RATE)
+        scheduler = get_linear_schedule_with_warmup(optimizer, num_warmup_steps=0, num_training_steps=len(train_loader) * EPOCHS)
+        loss_fn = torch.nn.BCEWithLogitsLoss() # Soft targets: the teacher's per-label scores
+
+        print("\n--- Distilling crisis student ---")
+        for epoch in range(EPOCHS):
+            model.train()
+            losses = []
+            for batch in train_loader:
+                labels = batch.pop("labels").to(device)
+                batch = {k: v.to(device) for k, v in batch.items()}
+                loss = loss_fn(model(**batch).logits, labels)
+                loss.backward()
+                optimizer.step()
+                scheduler.step()
+                optimizer.zero_grad()
+                losses.append(loss.item())
+            mlflow.log_metric("train_loss", float(np.mean(losses)), step=epoch)
+            print(f"Epoch {epoch + 1}/{EPOCHS} - Train Loss: {np.mean(losses):.4f}")
+
+            if val_loader:
+                val_metrics = evaluate_student(model, val_loader, device)
+                for k, v in val_metrics.items(): mlflow.log_metric(f"val_{k}", v, step=epoch)
+                print(f"  Val: {val_metrics}")
+
+        os.makedirs(STUDENT_OUTPUT_PATH, exist_ok=True)
+        model.save_pretrained(STUDENT_OUTPUT_PATH)
+        tokenizer.save_pretrained(STUDENT_OUTPUT_PATH)
+        print(f"Saved crisis student to {STUDENT_OUTPUT_PATH}")
+        print("Serve it with ML_CRISIS_BACKEND=student (and ML_CRISIS_STUDENT_PATH if saved elsewhere).")
+
+        mlflow.log_artifacts(STUDENT_OUTPUT_PATH, artifact_path="crisis_student_model")
+        try:
+            mlflow.register_model(
+                model_uri=f"runs:/{run.info.run_id}/crisis_student_model",
+                name=REGISTERED_MODEL_NAME,
+                tags={"type": "distilled_crisis_classifier", "teacher": ML_CRISIS_MODEL_NAME},
+            )
+            print(f"Registered '{REGISTERED_MODEL_NAME}' in MLflow Model Registry.")
+        except Exception as e:
+            print(f"Could not register model {REGISTERED_MODEL_NAME}: {e}")
+
+if __name__ == "__main__":
+    main()
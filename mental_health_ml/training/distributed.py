@@ -0,0 +1,75 @@
+# mental_health_ml/training/distributed.py
+import os
+
+import torch
+import torch.distributed as dist
+
+# Helpers for data-parallel training with torch.distributed. The gloo backend
+# works on CPU-only machines, both for several processes on one box and across
+# nodes. Rank/world size come from the usual environment variables, which are
+# set by torchrun or by training/launch_assessment_ddp.py.
+DIST_BACKEND = os.getenv("DIST_BACKEND", "gloo")
+
+
+def init_distributed(backend: str = DIST_BACKEND) -> tuple:
+    """Joins the process group if WORLD_SIZE > 1. Returns (rank, world_size)."""
+    world_size = int(os.getenv("WORLD_SIZE", "1"))
+    if world_size <= 1:
+        return 0, 1
+    if not dist.is_initialized():
+        dist.init_process_group(backend=backend, init_method="env://")
+    rank = dist.get_rank()
+    if rank == 0:
+        print(f"Initialized torch.distributed ({backend}) with {world_size} processes")
+    return rank, world_size
+
+
+def is_distributed() -> bool:
+    return dist.is_available() and dist.is_initialized() and dist.get_world_size() > 1
+
+
+def get_rank() -> int:
+    return dist.get_rank() if is_distributed() else 0
+
+
+def get_world_size() -> int:
+    return dist.get_world_size() if is_distributed() else 1
+
+
+def is_main_process() -> bool:
+    """Only rank 0 logs to MLflow and writes checkpoints/models."""
+    return get_rank() == 0
+
+
+def local_world_size() -> int:
+    return int(os.getenv("LOCAL_WORLD_SIZE", "1"))
+
+
+def all_reduce_sum(value: float) -> float:
+    if not is_distributed():
+        return value
+    tensor = torch.tensor([value], dtype=torch.float64)
+    dist.all_reduce(tensor, op=dist.ReduceOp.SUM)
+    return float(tensor.item())
+
+
+def all_reduce_max(value: float) -> float:
+    if not is_distributed():
+        return value
+    tensor = torch.tensor([value], dtype=torch.float64)
+    dist.all_reduce(tensor, op=dist.ReduceOp.MAX)
+    return float(tensor.item())
+
+
+def all_reduce_mean(value: float) -> float:
+    return all_reduce_sum(value) / get_world_size()
+
+
+def barrier():
+    if is_distributed():
+        dist.barrier()
+
+
+def cleanup_distributed():
+    if is_distributed():
+        dist.destroy_process_group()
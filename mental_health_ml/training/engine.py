@@ -0,0 +1,221 @@
+# mental_health_ml/training/engine.py
+import os
+import time
+from contextlib import nullcontext
+
+import mlflow
+import numpy as np
+import torch
+from torch.nn.parallel import DistributedDataParallel
+from torch.utils.data import DataLoader
+
+from .distributed import is_distributed, is_main_process, all_reduce_sum, all_reduce_mean, all_reduce_max, barrier, get_world_size, local_world_size
+
+# Shared training loop for the PyTorch models. Our training machines are
+# many-core CPU boxes without a GPU, so the defaults are tuned for that:
+# bf16 autocast, all cores for intra-op parallelism and parallel data loading.
+# Everything can be overridden per run via environment variables.
+TRAIN_NUM_THREADS = int(os.getenv("TRAIN_NUM_THREADS", "0")) # 0 = let torch decide (all physical cores)
+TRAIN_NUM_WORKERS = int(os.getenv("TRAIN_NUM_WORKERS", "4"))
+TRAIN_PREFETCH_FACTOR = int(os.getenv("TRAIN_PREFETCH_FACTOR", "4"))
+TRAIN_PRECISION = os.getenv("TRAIN_PRECISION", "bf16") # "bf16" or "fp32"
+TRAIN_GRAD_ACCUM_STEPS = int(os.getenv("TRAIN_GRAD_ACCUM_STEPS", "1"))
+CHECKPOINT_FILENAME = "last_checkpoint.pt"
+
+
+def configure_cpu_threads(num_threads: int = TRAIN_NUM_THREADS):
+    if num_threads <= 0 and local_world_size() > 1:
+        # Several training processes share this machine: split the cores between them
+        num_threads = max(1, (os.cpu_count() or 1) // local_world_size())
+    if num_threads > 0:
+        torch.set_num_threads(num_threads)
+    print(f"Torch intra-op threads: {torch.get_num_threads()}")
+    return torch.get_num_threads()
+
+
+def make_data_loader(dataset, batch_size: int = None, shuffle: bool = False, batch_sampler=None, sampler=None,
+                     collate_fn=None, num_workers: int = TRAIN_NUM_WORKERS,
+                     prefetch_factor: int = TRAIN_PREFETCH_FACTOR) -> DataLoader:
+    """
+    DataLoader with worker processes that prefetch batches while the model trains.
+    Batches are pinned when a GPU is present so host-to-device copies can overlap.
+    """
+    kwargs = {"collate_fn": collate_fn, "num_workers": num_workers, "pin_memory": torch.cuda.is_available()}
+    if num_workers > 0:
+        kwargs.update(prefetch_factor=prefetch_factor, persistent_workers=True)
+    if batch_sampler is not None:
+        return DataLoader(dataset, batch_sampler=batch_sampler, **kwargs)
+    return DataLoader(dataset, batch_size=batch_size, shuffle=shuffle and sampler is None, sampler=sampler, **kwargs)
+
+
+class TrainingEngine:
+    """
+    Runs epochs for a model given a loss function:
+        compute_loss(model, batch) -> (loss tensor, number of samples in the batch)
+    Handles device placement, bf16 autocast, gradient accumulation, gradient
+    clipping, per-epoch throughput metrics and checkpoint/resume.
+    If torch.distributed is initialized the model is wrapped in
+    DistributedDataParallel; metrics are aggregated over all ranks and only
+    rank 0 logs to MLflow and writes checkpoints.
+    """
+    def __init__(self, model, optimizer, compute_loss, scheduler=None, device=None,
+                 precision: str = TRAIN_PRECISION, grad_accum_steps: int = TRAIN_GRAD_ACCUM_STEPS,
+                 max_grad_norm: float = None, checkpoint_dir: str = None, find_unused_parameters: bool = False):
+        self.device = device or torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        self.module = model.to(self.device) # The unwrapped model (for state dicts / saving)
+        # find_unused_parameters is needed when some branches are skipped for a batch (DDP only)
+        self.model = DistributedDataParallel(self.module, find_unused_parameters=find_unused_parameters) if is_distributed() else self.module
+        self.optimizer = optimizer
+        self.compute_loss = compute_loss
+        self.scheduler = scheduler
+        self.precision = precision
+        self.grad_accum_steps = max(1, grad_accum_steps)
+        self.max_grad_norm = max_grad_norm
+        self.checkpoint_dir = checkpoint_dir
+        self.history = [] # Per-epoch train metrics
+
+    def autocast(self):
+        if self.precision != "bf16":
+            return nullcontext()
+        return torch.autocast(device_type=self.device.type, dtype=torch.bfloat16)
+
+    def to_device(self, batch):
+        non_blocking = self.device.type == "cuda"
+        return {k: v.to(self.device, non_blocking=non_blocking) if torch.is_tensor(v) else v for k, v in batch.items()}
+
+    def _optimizer_step(self):
+        if self.max_grad_norm:
+            torch.nn.utils.clip_grad_norm_(self.model.parameters(), self.max_grad_norm)
+        self.optimizer.step()
+        if self.scheduler is not None:
+            self.scheduler.step()
+        self.optimizer.zero_grad()
+
+    def train_epoch(self, data_loader, log_every: int = 0) -> dict:
+        """Returns {"train_loss", "train_epoch_seconds", "train_samples_per_sec"}."""
+        self.model.train()
+        self.optimizer.zero_grad()
+        losses, n_samples = [], 0
+        start_time = time.perf_counter()
+        n_batches = len(data_loader)
+        for batch_idx, batch in enumerate(data_loader):
+            batch = self.to_device(batch)
+            is_step = (batch_idx + 1) % self.grad_accum_steps == 0 or batch_idx + 1 == n_batches
+            # Under DDP, only synchronize gradients on the micro-batch that ends an accumulation window
+            sync_context = self.model.no_sync() if is_distributed() and not is_step else nullcontext()
+            with sync_context:
+                with self.autocast():
+                    loss, batch_samples = self.compute_loss(self.model, batch)
+                # Scale so accumulated gradients equal those of one large batch
+                (loss / self.grad_accum_steps).backward()
+            if is_step:
+                self._optimizer_step()
+            losses.append(loss.item())
+            n_samples += batch_samples
+            if log_every and batch_idx % log_every == 0:
+                print(f"  Batch {batch_idx+1}/{n_batches}, Loss: {loss.item():.4f}")
+        elapsed = time.perf_counter() - start_time
+        # Aggregate over ranks: throughput is the whole job's, wall time the slowest rank's
+        n_samples = all_reduce_sum(n_samples)
+        elapsed = all_reduce_max(elapsed)
+        return {
+            "train_loss": all_reduce_mean(float(np.mean(losses)) if losses else 0.0),
+            "train_epoch_seconds": elapsed,
+            "train_samples_per_sec": n_samples / elapsed if elapsed > 0 else 0.0,
+        }
+
+    def evaluate(self, data_loader, eval_step) -> tuple:
+        """
+        eval_step(model, batch) -> (loss tensor, outputs). Returns (mean loss, list of outputs).
+        """
+        self.model.eval()
+        losses, outputs = [], []
+        with torch.no_grad():
+            for batch in data_loader:
+                with self.autocast():
+                    loss, batch_outputs = eval_step(self.model, self.to_device(batch))
+                losses.append(loss.item())
+                outputs.append(batch_outputs)
+        # Each rank evaluates its own shard; the reported loss is the mean over ranks
+        return all_reduce_mean(float(np.mean(losses)) if losses else 0.0), outputs
+
+    def save_checkpoint(self, epoch: int):
+        if not self.checkpoint_dir:
+            return
+        if not is_main_process():
+            barrier() # Wait until rank 0 has written it
+            return
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        path = os.path.join(self.checkpoint_dir, CHECKPOINT_FILENAME)
+        torch.save({
+            "epoch": epoch,
+            "model_state_dict": self.module.state_dict(),
+            "optimizer_state_dict": self.optimizer.state_dict(),
+            "scheduler_state_dict": self.scheduler.state_dict() if self.scheduler is not None else None,
+        }, path + ".tmp")
+        os.replace(path + ".tmp", path) # Never leave a half-written checkpoint behind
+        barrier()
+
+    def clear_checkpoint(self):
+        """Removes the resume checkpoint, so the next fit() starts a fresh run."""
+        if not self.checkpoint_dir:
+            return
+        if is_main_process():
+            path = os.path.join(self.checkpoint_dir, CHECKPOINT_FILENAME)
+            if os.path.exists(path):
+                os.remove(path)
+        barrier() # No rank may still be about to read it
+
+    def resume(self) -> int:
+        """Loads the last checkpoint if there is one. Returns the epoch to start from."""
+        path = os.path.join(self.checkpoint_dir, CHECKPOINT_FILENAME) if self.checkpoint_dir else None
+        if not path or not os.path.exists(path):
+            return 0
+        # Every rank loads the same checkpoint, so DDP replicas start identical
+        checkpoint = torch.load(path, map_location=self.device)
+        self.module.load_state_dict(checkpoint["model_state_dict"])
+        self.optimizer.load_state_dict(checkpoint["optimizer_state_dict"])
+        if self.scheduler is not None and checkpoint.get("scheduler_state_dict"):
+            self.scheduler.load_state_dict(checkpoint["scheduler_state_dict"])
+        if is_main_process():
+            print(f"Resumed from {path} (completed epoch {checkpoint['epoch'] + 1})")
+        return checkpoint["epoch"] + 1
+
+    def fit(self, train_loader, epochs: int, on_epoch_end=None, log_every: int = 0):
+        """
+        Trains from the last checkpoint (if any) up to `epochs`, logging loss,
+        wall time and throughput to the active MLflow run after every epoch.
+        on_epoch_end(epoch, train_metrics) runs before the checkpoint is written.
+        The checkpoint only exists to resume an interrupted run: it is removed once
+        all epochs have completed.
+        """
+        start_epoch = self.resume()
+        for epoch in range(start_epoch, epochs):
+            if is_main_process():
+                print(f"\nEpoch {epoch + 1}/{epochs}")
+            batch_sampler = getattr(train_loader, "batch_sampler", None)
+            for sampler in (batch_sampler, getattr(train_loader, "sampler", None)):
+                if hasattr(sampler, "set_epoch"):
+                    sampler.set_epoch(epoch)
+            train_metrics = self.train_epoch(train_loader, log_every=log_every)
+            self.history.append(train_metrics)
+            if is_main_process():
+                mlflow.log_metrics(train_metrics, step=epoch)
+                print(f"Training Loss: {train_metrics['train_loss']:.4f} "
+                      f"({train_metrics['train_epoch_seconds']:.1f}s, {train_metrics['train_samples_per_sec']:.1f} samples/sec)")
+            # Runs on every rank (it may evaluate, which is collective); guard logging inside it
+            if on_epoch_end is not None:
+                on_epoch_end(epoch, train_metrics)
+            self.save_checkpoint(epoch)
+        self.clear_checkpoint()
+
+    def log_config(self):
+        if not is_main_process():
+            return
+        mlflow.log_params({
+            "precision": self.precision,
+            "grad_accum_steps": self.grad_accum_steps,
+            "num_threads": torch.get_num_threads(),
+            "device": str(self.device),
+            "world_size": get_world_size(),
+        })
@@ -0,0 +1,110 @@
+# mental_health_ml/training/launch_assessment_ddp.py
+"""
+Launches data-parallel (DDP, gloo backend) training of the assessment model.
+
+Single machine, N processes (run from mental_health_ml/):
+    python -m training.launch_assessment_ddp --nproc 4 --data ../mental_health_assessment_dataset.csv
+
+Several nodes: start the same command on every node through torchrun, which sets
+RANK / WORLD_SIZE / MASTER_ADDR for each process:
+    torchrun --nnodes 2 --nproc_per_node 4 --rdzv_backend c10d --rdzv_endpoint <host>:29500 \\
+        -m training.launch_assessment_ddp --torchrun --data ../mental_health_assessment_dataset.csv
+
+Scaling report (one machine): trains for --epochs with each process count and
+writes throughput, speedup and parallel efficiency to a JSON file:
+    python -m training.launch_assessment_ddp --scaling-report 1,2,4,8 --epochs 1
+"""
+import argparse
+import json
+import os
+import socket
+import tempfile
+
+import torch.multiprocessing as mp
+
+from training.train_assessment import train_assessment_model
+
+DEFAULT_DATA_PATH = "../mental_health_assessment_dataset.csv"
+SCALING_REPORT_PATH = "reports/assessment_ddp_scaling.json"
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _worker(local_rank: int, world_size: int, port: int, train_kwargs: dict):
+    os.environ.update({
+        "RANK": str(local_rank), "LOCAL_RANK": str(local_rank),
+        "WORLD_SIZE": str(world_size), "LOCAL_WORLD_SIZE": str(world_size),
+        "MASTER_ADDR": "127.0.0.1", "MASTER_PORT": str(port),
+    })
+    train_assessment_model(distributed=True, **train_kwargs)
+
+
+def launch_local(nproc: int, **train_kwargs):
+    """Runs nproc training processes on this machine (nproc=1 trains without torch.distributed)."""
+    if nproc <= 1:
+        return train_assessment_model(**train_kwargs)
+    mp.spawn(_worker, args=(nproc, _free_port(), train_kwargs), nprocs=nproc, join=True)
+
+
+def scaling_report(process_counts: list, report_path: str = SCALING_REPORT_PATH, **train_kwargs) -> dict:
+    """
+    Trains once per process count (no checkpoints, model not saved) and compares
+    the final epoch's samples/sec against the single-process run.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for nproc in process_counts:
+            metrics_path = os.path.join(tmp_dir, f"metrics_{nproc}.json")
+            launch_local(nproc, checkpoint_dir=None, model_out=None, metrics_out=metrics_path, **train_kwargs)
+            with open(metrics_path, "r") as f:
+                last_epoch = json.load(f)["epochs"][-1]
+            results.append({
+                "processes": nproc,
+                "samples_per_sec": last_epoch["train_samples_per_sec"],
+                "epoch_seconds": last_epoch["train_epoch_seconds"],
+            })
+
+    baseline = next((r for r in results if r["processes"] == 1), results[0])
+    for r in results:
+        r["speedup"] = r["samples_per_sec"] / baseline["samples_per_sec"] * baseline["processes"]
+        r["efficiency"] = r["speedup"] / r["processes"] # 1.0 = perfect linear scaling
+
+    report = {"cpu_count": os.cpu_count(), "train_kwargs": train_kwargs, "results": results}
+    os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\n{'procs':>5} {'samples/s':>10} {'speedup':>8} {'efficiency':>10}")
+    for r in results:
+        print(f"{r['processes']:>5} {r['samples_per_sec']:>10.1f} {r['speedup']:>8.2f} {r['efficiency']:>10.2f}")
+    print(f"Scaling report written to {report_path}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distributed (DDP/gloo) training of the assessment model")
+    parser.add_argument("--data", default=DEFAULT_DATA_PATH)
+    parser.add_argument("--nproc", type=int, default=2, help="Local processes to spawn")
+    parser.add_argument("--torchrun", action="store_true", help="Process was started by torchrun (multi-node)")
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=16, help="Per-process batch size")
+    parser.add_argument("--lr", type=float, default=2e-5)
+    parser.add_argument("--scaling-report", default=None, help="Comma-separated process counts, e.g. 1,2,4")
+    parser.add_argument("--report-path", default=SCALING_REPORT_PATH)
+    args = parser.parse_args()
+
+    train_kwargs = {"train_data_path": args.data, "num_epochs": args.epochs, "batch_size": args.batch_size, "lr": args.lr}
+    if args.scaling_report:
+        scaling_report([int(n) for n in args.scaling_report.split(",")], report_path=args.report_path, **train_kwargs)
+    elif args.torchrun:
+        train_assessment_model(distributed=True, **train_kwargs)
+    else:
+        launch_local(args.nproc, **train_kwargs)
+
+
+if __name__ == "__main__":
+    main()
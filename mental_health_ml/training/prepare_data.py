@@ -1,95 +1,194 @@
 # training/prepare_data.py
-import pandas as pd
-import numpy as np
-from sklearn.model_selection import train_test_split
-from utils.data_pipeline import DataPipeline, clean_text, anonymize_personal_info
+import argparse
+import hashlib
 import json
+import os
+import shutil
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
-def prepare_assessment_data(data_file: str, output_dir: str):
+import pyarrow as pa
+import pyarrow.parquet as pq
+from mental_health_ml.utils.data_pipeline import build_text_pipeline
+from mental_health_ml.utils.json_stream import iter_json_file_items
+
+# Streaming ETL for collected training data. Records are read one at a time (JSONL,
+# or a JSON array parsed incrementally), cleaned in worker processes a chunk at a
+# time, and each chunk is written as its own Parquet file, partitioned by split:
+#     <output_dir>/assessment/split=train/part-00000.parquet
+#     <output_dir>/conversation/split=test/part-00003.parquet
+# Memory use is bounded by ETL_CHUNK_SIZE records per in-flight chunk, whatever the input size.
+# Every part file has the same explicit schema (PARQUET_SCHEMAS), whatever the records of its
+# chunk contain, so <output_dir>/<data_type>/ reads back as one dataset:
+#     pd.read_parquet("<output_dir>/assessment")  # + a "split" column from the directory names
+ETL_CHUNK_SIZE = int(os.getenv("ETL_CHUNK_SIZE", "5000"))
+ETL_WORKERS = int(os.getenv("ETL_WORKERS", str(os.cpu_count() or 1)))
+
+# The train/test split is a hash of the user id, so it is deterministic, needs no
+# global shuffle, and all records of one user land in the same split.
+TEST_FRACTION = 0.2
+SPLIT_SALT = "mhd-train-test-v1" # Changing it reshuffles the split
+
+DATA_TYPES = ("assessment", "conversation")
+
+# Same names as ASSESSMENT_TARGET_COLUMNS (not imported: that module loads torch and transformers)
+ASSESSMENT_LABEL_COLUMNS = ('anxiety_level', 'depression_level', 'stress_level', 'wellbeing_score', 'risk_level')
+
+# Answers are a question id -> cleaned answer map, as the questions differ between
+# questionnaires; labels that a record does not have are null.
+PARQUET_SCHEMAS = {
+    "assessment": pa.schema(
+        [("user_id", pa.string()), ("timestamp", pa.string()), ("responses", pa.map_(pa.string(), pa.string()))]
+        + [(label, pa.float64()) for label in ASSESSMENT_LABEL_COLUMNS]
+    ),
+    "conversation": pa.schema(
+        [("input", pa.string()), ("output", pa.string()), ("user_id", pa.string()), ("timestamp", pa.string())]
+    ),
+}
+
+# anonymize_personal_info + clean_text, with precompiled, fused regex passes
+TEXT_PIPELINE = build_text_pipeline(anonymize=True)
+
+def iter_records(data_file: str):
+    """Yields the records of a .jsonl file line by line, or of a .json array item by item."""
+    if data_file.endswith(".jsonl"):
+        with open(data_file, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        yield from iter_json_file_items(data_file)
+
+def hash_split(key: str, test_fraction: float = TEST_FRACTION, salt: str = SPLIT_SALT) -> str:
+    bucket = int(hashlib.md5(f"{salt}:{key}".encode("utf-8")).hexdigest()[:8], 16) / 0x100000000
+    return "test" if bucket < test_fraction else "train"
+
+def clean_field(text) -> str:
+    # Anonymizes first: clean_text strips the characters the e-mail/phone patterns rely on
+    return TEXT_PIPELINE.process(str(text))
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def assessment_rows(item: dict) -> list:
+    labels = item.get('labels') or {}
+    row = {
+        'user_id': str(item['user_id']),
+        'timestamp': str(item['timestamp']),
+        'responses': [(str(q_id), clean_field(response)) for q_id, response in item['responses'].items()],
+    }
+    for label in ASSESSMENT_LABEL_COLUMNS:
+        row[label] = _to_float(labels.get(label))
+    return [row]
+
+def conversation_rows(item: dict) -> list:
+    conversation = item['conversation']
+
+    # Create input-output pairs
+    training_pairs = []
+    for i in range(len(conversation) - 1):
+        if (conversation[i]['role'] == 'user' and
+            conversation[i+1]['role'] == 'assistant'):
+
+            training_pairs.append({
+                'input': clean_field(conversation[i]['content']),
+                'output': clean_field(conversation[i+1]['content']),
+                'user_id': str(item['user_id']),
+                'timestamp': str(conversation[i]['timestamp'])
+            })
+    return training_pairs
+
+ROW_BUILDERS = {"assessment": assessment_rows, "conversation": conversation_rows}
+
+def process_chunk(chunk_index: int, records: list, output_dir: str, data_types: tuple) -> dict:
+    """
+    Runs in a worker process: cleans one chunk of records and writes one Parquet
+    file per (data type, split). Returns the number of rows written per data type and split.
+    """
+    counts = {}
+    for data_type in data_types:
+        rows = []
+        for item in records:
+            if item.get('data_type') == data_type:
+                rows.extend(ROW_BUILDERS[data_type](item))
+        if not rows:
+            continue
+        rows_by_split = {}
+        for row in rows:
+            rows_by_split.setdefault(hash_split(row['user_id']), []).append(row)
+        for split, part in rows_by_split.items():
+            part_dir = os.path.join(output_dir, data_type, f"split={split}")
+            os.makedirs(part_dir, exist_ok=True)
+            table = pa.Table.from_pylist(part, schema=PARQUET_SCHEMAS[data_type])
+            pq.write_table(table, os.path.join(part_dir, f"part-{chunk_index:05d}.parquet"))
+            counts[f"{data_type}_{split}"] = len(part)
+    return counts
+
+def iter_chunks(records, chunk_size: int):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def run_etl(data_file: str, output_dir: str, data_types: tuple = DATA_TYPES,
+            chunk_size: int = ETL_CHUNK_SIZE, workers: int = ETL_WORKERS) -> dict:
+    """
+    Streams data_file through process_chunk. At most 2 * workers chunks are in
+    flight, so reading never runs far ahead of the workers.
+    """
+    for data_type in data_types:
+        shutil.rmtree(os.path.join(output_dir, data_type), ignore_errors=True) # Parts of a previous run
+    totals = {}
+    def add(counts):
+        for key, n in counts.items():
+            totals[key] = totals.get(key, 0) + n
+
+    chunks = enumerate(iter_chunks(iter_records(data_file), chunk_size))
+    if workers <= 1:
+        for chunk_index, records in chunks:
+            add(process_chunk(chunk_index, records, output_dir, data_types))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            in_flight = deque()
+            for chunk_index, records in chunks:
+                if len(in_flight) >= 2 * workers:
+                    add(in_flight.popleft().result())
+                in_flight.append(pool.submit(process_chunk, chunk_index, records, output_dir, data_types))
+            while in_flight:
+                add(in_flight.popleft().result())
+
+    for data_type in data_types:
+        n_train, n_test = totals.get(f"{data_type}_train", 0), totals.get(f"{data_type}_test", 0)
+        print(f"{data_type.capitalize()} data prepared: {n_train} train, {n_test} test samples")
+    return totals
+
+def prepare_assessment_data(data_file: str, output_dir: str, **etl_kwargs):
     """Prepare assessment data for training"""
-    # Load raw data
-    with open(data_file, 'r') as f:
-        raw_data = json.load(f)
-    
-    # Filter assessment data
-    assessment_data = [d for d in raw_data if d['data_type'] == 'assessment']
-    
-    # Convert to DataFrame
-    processed_data = []
-    for item in assessment_data:
-        row = {
-            'user_id': item['user_id'],
-            'timestamp': item['timestamp']
-        }
-        
-        # Add responses
-        for q_id, response in item['responses'].items():
-            row[f'response_{q_id}'] = clean_text(str(response))
-        
-        # Add labels if available
-        if item.get('labels'):
-            for label, value in item['labels'].items():
-                row[label] = value
-        
-        processed_data.append(row)
-    
-    df = pd.DataFrame(processed_data)
-    
-    # Split data
-    train_df, test_df = train_test_split(df, test_size=0.2, random_state=42)
-    
-    # Save prepared data
-    train_df.to_csv(f"{output_dir}/assessment_train.csv", index=False)
-    test_df.to_csv(f"{output_dir}/assessment_test.csv", index=False)
-    
-    print(f"Assessment data prepared: {len(train_df)} train, {len(test_df)} test samples")
-    
-def prepare_conversation_data(data_file: str, output_dir: str):
+    return run_etl(data_file, output_dir, data_types=("assessment",), **etl_kwargs)
+
+def prepare_conversation_data(data_file: str, output_dir: str, **etl_kwargs):
     """Prepare conversation data for chatbot training"""
-    with open(data_file, 'r') as f:
-        raw_data = json.load(f)
-    
-    # Filter conversation data
-    conversation_data = [d for d in raw_data if d['data_type'] == 'conversation']
-    
-    # Convert conversations to training format
-    training_pairs = []
-    for item in conversation_data:
-        conversation = item['conversation']
-        
-        # Create input-output pairs
-        for i in range(len(conversation) - 1):
-            if (conversation[i]['role'] == 'user' and 
-                conversation[i+1]['role'] == 'assistant'):
-                
-                training_pairs.append({
-                    'input': clean_text(conversation[i]['content']),
-                    'output': clean_text(conversation[i+1]['content']),
-                    'user_id': item['user_id'],
-                    'timestamp': conversation[i]['timestamp']
-                })
-    
-    df = pd.DataFrame(training_pairs)
-    
-    # Split data
-    train_df, test_df = train_test_split(df, test_size=0.2, random_state=42)
-    
-    # Save prepared data
-    train_df.to_csv(f"{output_dir}/conversation_train.csv", index=False)
-    test_df.to_csv(f"{output_dir}/conversation_test.csv", index=False)
-    
-    print(f"Conversation data prepared: {len(train_df)} train, {len(test_df)} test samples")
+    return run_etl(data_file, output_dir, data_types=("conversation",), **etl_kwargs)
 
 if __name__ == "__main__":
-    import os
-    
-    # Create output directory
-    output_dir = "data/processed"
-    os.makedirs(output_dir, exist_ok=True)
-    
-    # Prepare data (assuming you have collected data)
-    if os.path.exists("data/collected/training_data.json"):
-        prepare_assessment_data("data/collected/training_data.json", output_dir)
-        prepare_conversation_data("data/collected/training_data.json", output_dir)
+    parser = argparse.ArgumentParser(description="Clean collected data into partitioned Parquet train/test sets")
+    parser.add_argument("--data", default=None, help="JSONL (preferred) or JSON array of collected records")
+    parser.add_argument("--output-dir", default="data/processed")
+    parser.add_argument("--chunk-size", type=int, default=ETL_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=ETL_WORKERS)
+    args = parser.parse_args()
+
+    data_file = args.data or next((p for p in ("data/collected/training_data.jsonl", "data/collected/training_data.json")
+                                   if os.path.exists(p)), None)
+    if data_file and os.path.exists(data_file):
+        # Both data types in a single pass over the file
+        run_etl(data_file, args.output_dir, chunk_size=args.chunk_size, workers=args.workers)
     else:
-        print("No training data found. Please collect data first.")
\ No newline at end of file
+        print("No training data found. Please collect data first.")
@@ -9,6 +9,7 @@ from mental_health_ml.models.crisis.keyword_crisis_detector import (
     SUICIDE_INTENT_PATTERNS, HOPELESSNESS_PATTERNS, SELF_HARM_PATTERNS
 )
 from mental_health_ml.models.crisis.ml_crisis_predictor import ML_CRISIS_MODEL_NAME
+from mental_health_ml.models.crisis.crisis_prefilter import load_crisis_prefilter, CRISIS_PREFILTER_PATH
 
 load_dotenv()
 
@@ -52,6 +53,18 @@ if __name__ == "__main__":
         # mlflow.log_param("ml_default_thresholds", json.dumps(default_ml_thresholds))
 
 
+        # Log the cascade prefilter (Layer 2a) if one is trained and meets the recall floor
+        prefilter = load_crisis_prefilter()
+        mlflow.set_tag("layer2a_type", "hashed_ngram_logreg_prefilter" if prefilter else "none")
+        if prefilter is not None:
+            mlflow.log_param("prefilter_path", CRISIS_PREFILTER_PATH)
+            mlflow.log_metrics({
+                "prefilter_calibrated_recall": prefilter.calibration_report["recall"],
+                "prefilter_escalation_rate": prefilter.calibration_report["escalation_rate"],
+            })
+            mlflow.log_dict(prefilter.calibration_report, "prefilter_calibration_report.json")
+
+
         # Log evaluation metrics IF you have a benchmark dataset and evaluation script
         # This would involve running detect_crisis_hybrid on a labeled test set
         # For now, we'll skip this as we haven't defined that evaluation process yet.
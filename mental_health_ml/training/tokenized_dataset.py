@@ -0,0 +1,158 @@
+# mental_health_ml/training/tokenized_dataset.py
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import torch
+from torch.utils.data import Dataset, Sampler
+
+# Text classification datasets are tokenized once and stored on disk as flat NumPy
+# arrays (all token ids concatenated, plus per-example offsets/lengths/labels).
+# Training then reads token ids through a memmap and pads each batch only to its
+# longest example, instead of running the tokenizer and padding to max_length
+# for every item in every epoch.
+TOKENIZED_CACHE_DIR = os.getenv("TOKENIZED_CACHE_DIR", "mental_health_ml/data/processed/tokenized_cache")
+CACHE_FORMAT_VERSION = 1
+
+
+def cache_key(texts: list, labels: list, tokenizer, max_len: int) -> str:
+    """Hash of the data, the tokenizer (name, class, vocabulary size) and max_len."""
+    digest = hashlib.sha256()
+    tokenizer_id = {
+        "name": getattr(tokenizer, "name_or_path", ""),
+        "class": type(tokenizer).__name__,
+        "vocab_size": len(tokenizer),
+        "max_len": max_len,
+        "version": CACHE_FORMAT_VERSION,
+    }
+    digest.update(json.dumps(tokenizer_id, sort_keys=True).encode("utf-8"))
+    for text, label in zip(texts, labels):
+        digest.update(str(text).encode("utf-8"))
+        digest.update(b"\x1f")
+        digest.update(str(label).encode("utf-8"))
+        digest.update(b"\x1e")
+    return digest.hexdigest()[:16]
+
+
+def build_token_cache(texts: list, labels: list, tokenizer, max_len: int,
+                      cache_dir: str = TOKENIZED_CACHE_DIR, batch_size: int = 1000) -> str:
+    """
+    Tokenizes texts (truncated to max_len, no padding) into cache_dir/<key>/ unless
+    a cache for the same data and tokenizer already exists. Returns the cache path.
+    """
+    key = cache_key(texts, labels, tokenizer, max_len)
+    path = os.path.join(cache_dir, key)
+    if os.path.exists(os.path.join(path, "meta.json")):
+        print(f"Using tokenized cache {path}")
+        return path
+
+    print(f"Tokenizing {len(texts)} examples into {path}...")
+    token_ids, lengths = [], []
+    for start in range(0, len(texts), batch_size):
+        batch = [str(t) for t in texts[start:start + batch_size]]
+        encoded = tokenizer(batch, add_special_tokens=True, truncation=True, max_length=max_len)["input_ids"]
+        for ids in encoded:
+            token_ids.append(np.asarray(ids, dtype=np.int32))
+            lengths.append(len(ids))
+
+    lengths = np.asarray(lengths, dtype=np.int32)
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+
+    # Write to a temporary directory and rename, so a partial cache is never picked up
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    os.makedirs(tmp_path, exist_ok=True)
+    np.save(os.path.join(tmp_path, "input_ids.npy"), np.concatenate(token_ids) if token_ids else np.zeros(0, dtype=np.int32))
+    np.save(os.path.join(tmp_path, "offsets.npy"), offsets)
+    np.save(os.path.join(tmp_path, "lengths.npy"), lengths)
+    np.save(os.path.join(tmp_path, "labels.npy"), np.asarray(labels, dtype=np.int64))
+    with open(os.path.join(tmp_path, "meta.json"), "w") as f:
+        json.dump({
+            "tokenizer": getattr(tokenizer, "name_or_path", ""),
+            "pad_token_id": tokenizer.pad_token_id or 0,
+            "max_len": max_len,
+            "n_examples": len(lengths),
+            "n_tokens": int(offsets[-1]),
+        }, f, indent=2)
+    try:
+        os.rename(tmp_path, path)
+    except OSError: # Another process built the same cache concurrently
+        shutil.rmtree(tmp_path, ignore_errors=True)
+    return path
+
+
+class TokenizedDataset(Dataset):
+    """Examples from a token cache; token ids are memory-mapped, not loaded."""
+    def __init__(self, cache_path: str):
+        with open(os.path.join(cache_path, "meta.json"), "r") as f:
+            self.meta = json.load(f)
+        self.input_ids = np.load(os.path.join(cache_path, "input_ids.npy"), mmap_mode="r")
+        self.offsets = np.load(os.path.join(cache_path, "offsets.npy"))
+        self.lengths = np.load(os.path.join(cache_path, "lengths.npy"))
+        self.labels = np.load(os.path.join(cache_path, "labels.npy"))
+        self.pad_token_id = self.meta["pad_token_id"]
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def __getitem__(self, idx):
+        ids = self.input_ids[self.offsets[idx]:self.offsets[idx + 1]]
+        return ids, self.labels[idx]
+
+
+class DynamicPaddingCollator:
+    """Pads each batch to its longest sequence. A class (not a closure) so DataLoader workers can pickle it."""
+    def __init__(self, pad_token_id: int):
+        self.pad_token_id = pad_token_id
+
+    def __call__(self, batch):
+        max_len = max(len(ids) for ids, _ in batch)
+        input_ids = np.full((len(batch), max_len), self.pad_token_id, dtype=np.int64)
+        attention_mask = np.zeros((len(batch), max_len), dtype=np.int64)
+        for row, (ids, _) in enumerate(batch):
+            input_ids[row, :len(ids)] = ids
+            attention_mask[row, :len(ids)] = 1
+        return {
+            "input_ids": torch.from_numpy(input_ids),
+            "attention_mask": torch.from_numpy(attention_mask),
+            "labels": torch.tensor([label for _, label in batch], dtype=torch.long),
+        }
+
+
+class LengthBucketBatchSampler(Sampler):
+    """
+    Yields batches of indices with similar lengths, so dynamic padding adds few
+    pad tokens. Examples are shuffled, split into buckets of batch_size *
+    bucket_multiplier, sorted by length within a bucket, cut into batches, and
+    the batches are shuffled again.
+    """
+    def __init__(self, lengths, batch_size: int, shuffle: bool = True, bucket_multiplier: int = 50, seed: int = 42):
+        self.lengths = np.asarray(lengths)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.bucket_size = batch_size * bucket_multiplier
+        self.seed = seed
+        self.epoch = 0
+
+    def set_epoch(self, epoch: int):
+        """Call before each epoch for a different (but reproducible) order."""
+        self.epoch = epoch
+
+    def __iter__(self):
+        rng = np.random.default_rng(self.seed + self.epoch)
+        order = rng.permutation(len(self.lengths)) if self.shuffle else np.arange(len(self.lengths))
+        batches = []
+        for start in range(0, len(order), self.bucket_size):
+            bucket = order[start:start + self.bucket_size]
+            bucket = bucket[np.argsort(self.lengths[bucket], kind="stable")]
+            batches.extend(bucket[i:i + self.batch_size].tolist() for i in range(0, len(bucket), self.batch_size))
+        if self.shuffle:
+            rng.shuffle(batches)
+        return iter(batches)
+
+    def __len__(self):
+        full_buckets, remainder = divmod(len(self.lengths), self.bucket_size)
+        per_bucket = -(-self.bucket_size // self.batch_size)
+        return full_buckets * per_bucket + -(-remainder // self.batch_size)
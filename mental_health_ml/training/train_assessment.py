@@ -1,11 +1,15 @@
 # training/train_assessment.py
+import json
 import torch
-from torch.utils.data import DataLoader, Dataset
+from torch.utils.data import Dataset
+from torch.utils.data.distributed import DistributedSampler
 import mlflow
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from models.assessment.model import MentalHealthAssessmentModel
-from data.preprocessing.assessment_preprocessing import AssessmentPreprocessor
+from data.preprocessing.assessment_preprocessing import AssessmentPreprocessor, ASSESSMENT_TARGET_COLUMNS
+from training.engine import TrainingEngine, configure_cpu_threads, make_data_loader, TRAIN_GRAD_ACCUM_STEPS
+from training.distributed import init_distributed, is_main_process, cleanup_distributed
 
 class AssessmentDataset(Dataset):
     def __init__(self, encodings, labels):
@@ -20,82 +24,99 @@ class AssessmentDataset(Dataset):
     def __len__(self):
         return len(self.labels)
 
-def train_assessment_model(train_data_path ="G:/mhd-app/mental_health_assessment_dataset.csv", num_epochs=5, batch_size=16, lr=2e-5):
+def train_assessment_model(train_data_path ="G:/mhd-app/mental_health_assessment_dataset.csv", num_epochs=5, batch_size=16, lr=2e-5,
+                           grad_accum_steps=TRAIN_GRAD_ACCUM_STEPS, checkpoint_dir="models/assessment/checkpoints",
+                           distributed=False, metrics_out=None, model_out="models/assessment/assessment_model.pt",
+                           scaling_out="models/assessment/numeric_scaling.json"):
+    """
+    With distributed=True, runs as one rank of a DDP job (see training/launch_assessment_ddp.py);
+    batch_size is then per process. metrics_out: optional JSON path for the per-epoch train metrics.
+    model_out=None skips saving/logging the model (used for scaling runs).
+    """
+    rank, world_size = init_distributed() if distributed else (0, 1)
+    configure_cpu_threads()
+
     # Load and preprocess data
     data = pd.read_csv(train_data_path)
     preprocessor = AssessmentPreprocessor()
     
     # Extract features and labels
-    X = data.drop(['anxiety_level', 'depression_level', 'stress_level', 'wellbeing_score', 'risk_level'], axis=1)
-    y = data[['anxiety_level', 'depression_level', 'stress_level', 'wellbeing_score', 'risk_level']]
+    X = data.drop(ASSESSMENT_TARGET_COLUMNS, axis=1)
+    y = data[ASSESSMENT_TARGET_COLUMNS]
     
     # Split data
     X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.2, random_state=42)
     
-    # Preprocess text
+    # Numeric answers -> float32 features (scaling learned on the training split only);
+    # BERT inputs are only produced if the data has free-text columns
+    preprocessor.fit_numeric(X_train)
     train_encodings = preprocessor.preprocess_assessments(X_train)
     val_encodings = preprocessor.preprocess_assessments(X_val)
+    # The model ends in a sigmoid, so targets are min-max scaled to [0, 1] (training range,
+    # saved with the answer scaling); raw targets such as wellbeing_score (0-96) are out of its reach
+    preprocessor.fit_targets(y_train)
     
     # Create datasets
-    train_dataset = AssessmentDataset(train_encodings, y_train.values)
-    val_dataset = AssessmentDataset(val_encodings, y_val.values)
+    train_dataset = AssessmentDataset(train_encodings, preprocessor.scale_targets(y_train))
+    val_dataset = AssessmentDataset(val_encodings, preprocessor.scale_targets(y_val))
     
     # Create data loaders
-    train_loader = DataLoader(train_dataset, batch_size=batch_size, shuffle=True)
-    val_loader = DataLoader(val_dataset, batch_size=batch_size)
+    # Under DDP each rank trains (and validates) on its own shard of the data
+    train_sampler = DistributedSampler(train_dataset, shuffle=True) if world_size > 1 else None
+    val_sampler = DistributedSampler(val_dataset, shuffle=False) if world_size > 1 else None
+    train_loader = make_data_loader(train_dataset, batch_size=batch_size, shuffle=True, sampler=train_sampler)
+    val_loader = make_data_loader(val_dataset, batch_size=batch_size, sampler=val_sampler)
     
     # Initialize model
-    model = MentalHealthAssessmentModel(num_labels=5)
+    model = MentalHealthAssessmentModel(num_numerical_features=preprocessor.num_numeric_features, num_labels=5)
     optimizer = torch.optim.AdamW(model.parameters(), lr=lr)
     criterion = torch.nn.MSELoss()
+
+    def assessment_loss(model, batch):
+        outputs = model(batch["numerical_features"], batch.get("input_ids"), batch.get("attention_mask"))
+        return criterion(outputs.float(), batch["labels"].float()), batch["labels"].size(0)
+
+    def assessment_eval_step(model, batch):
+        loss, _ = assessment_loss(model, batch)
+        return loss, None
+
+    engine = TrainingEngine(model, optimizer, assessment_loss, grad_accum_steps=grad_accum_steps, checkpoint_dir=checkpoint_dir,
+                            find_unused_parameters=not preprocessor.text_columns) # Text branch is idle without free text
     
-    # Start MLflow tracking
-    mlflow.start_run()
-    mlflow.log_params({
-        "model_type": "BERT-based assessment",
-        "num_epochs": num_epochs,
-        "batch_size": batch_size,
-        "learning_rate": lr
-    })
+    # Start MLflow tracking (rank 0 only)
+    if is_main_process():
+        mlflow.start_run()
+        mlflow.log_params({
+            "model_type": "BERT-based assessment",
+            "num_epochs": num_epochs,
+            "batch_size": batch_size,
+            "learning_rate": lr,
+            "num_numeric_features": preprocessor.num_numeric_features,
+            "text_columns": ",".join(preprocessor.text_columns) or "none"
+        })
+    engine.log_config()
     
-    # Training loop
-    for epoch in range(num_epochs):
-        model.train()
-        train_loss = 0
-        for batch in train_loader:
-            optimizer.zero_grad()
-            input_ids = batch["input_ids"]
-            attention_mask = batch["attention_mask"]
-            labels = batch["labels"].float()
-            
-            outputs = model(input_ids, attention_mask)
-            loss = criterion(outputs, labels)
-            loss.backward()
-            optimizer.step()
-            train_loss += loss.item()
-        
-        # Validation
-        model.eval()
-        val_loss = 0
-        with torch.no_grad():
-            for batch in val_loader:
-                input_ids = batch["input_ids"]
-                attention_mask = batch["attention_mask"]
-                labels = batch["labels"].float()
-                
-                outputs = model(input_ids, attention_mask)
-                loss = criterion(outputs, labels)
-                val_loss += loss.item()
-        
-        print(f"Epoch {epoch+1}: Train Loss: {train_loss/len(train_loader)}, Val Loss: {val_loss/len(val_loader)}")
-        mlflow.log_metrics({
-            "train_loss": train_loss/len(train_loader),
-            "val_loss": val_loss/len(val_loader)
-        }, step=epoch)
+    def validate(epoch, train_metrics):
+        val_loss, _ = engine.evaluate(val_loader, assessment_eval_step)
+        if is_main_process():
+            print(f"Epoch {epoch+1}: Train Loss: {train_metrics['train_loss']}, Val Loss: {val_loss}")
+            mlflow.log_metrics({"val_loss": val_loss}, step=epoch)
+
+    # Training loop (resumes from checkpoint_dir if a previous run was interrupted)
+    engine.fit(train_loader, num_epochs, on_epoch_end=validate)
     
     # Save model
-    torch.save(model.state_dict(), "models/assessment/assessment_model.pt")
-    mlflow.pytorch.log_model(model, "assessment_model")
-    mlflow.end_run()
+    if is_main_process():
+        if model_out:
+            torch.save(model.state_dict(), model_out)
+            preprocessor.save_scaling(scaling_out) # Answer and target scaling, needed to serve the model
+            mlflow.log_artifact(scaling_out)
+            mlflow.pytorch.log_model(model, "assessment_model")
+        mlflow.end_run()
+        if metrics_out:
+            with open(metrics_out, "w") as f:
+                json.dump({"world_size": world_size, "epochs": engine.history}, f, indent=2)
+    if distributed:
+        cleanup_distributed()
     
     return model
\ No newline at end of file
@@ -1,6 +1,5 @@
 # mental_health_ml/training/train_chatbot_intent_classifier.py
 import torch
-from torch.utils.data import DataLoader, Dataset
 from transformers import AutoModelForSequenceClassification, AutoTokenizer, AdamW, get_linear_schedule_with_warmup
 from sklearn.metrics import accuracy_score, f1_score, classification_report
 import numpy as np
@@ -11,6 +10,11 @@ import mlflow.pytorch
 import os
 from dotenv import load_dotenv
 
+from mental_health_ml.training.tokenized_dataset import (
+    build_token_cache, TokenizedDataset, DynamicPaddingCollator, LengthBucketBatchSampler
+)
+from mental_health_ml.training.engine import TrainingEngine, configure_cpu_threads, make_data_loader
+
 load_dotenv()
 
 # --- Configuration ---
@@ -32,36 +36,6 @@ MLFLOW_EXPERIMENT_NAME = "Chatbot_Intent_Classification"
 MLFLOW_RUN_NAME = f"{MODEL_NAME}_intent_classifier"
 # --- End Configuration ---
 
-class IntentDataset(Dataset):
-    def __init__(self, texts, labels, tokenizer, max_len):
-        self.texts = texts
-        self.labels = labels
-        self.tokenizer = tokenizer
-        self.max_len = max_len
-
-    def __len__(self):
-        return len(self.texts)
-
-    def __getitem__(self, idx):
-        text = str(self.texts[idx])
-        label = self.labels[idx]
-        encoding = self.tokenizer.encode_plus(
-            text,
-            add_special_tokens=True,
-            max_length=self.max_len,
-            return_token_type_ids=False,
-            padding='max_length',
-            truncation=True,
-            return_attention_mask=True,
-            return_tensors='pt',
-        )
-        return {
-            'text': text, # Keep original text for potential error analysis
-            'input_ids': encoding['input_ids'].flatten(),
-            'attention_mask': encoding['attention_mask'].flatten(),
-            'labels': torch.tensor(label, dtype=torch.long) # CrossEntropyLoss expects long
-        }
-
 def compute_metrics(preds, labels, label_names):
     preds_flat = np.argmax(preds, axis=1).flatten()
     labels_flat = labels.flatten()
@@ -81,45 +55,20 @@ def compute_metrics(preds, labels, label_names):
 
     return {"accuracy": acc, "f1_macro": f1_macro, "f1_weighted": f1_weighted}
 
-def train_epoch(model, data_loader, loss_fn, optimizer, device, scheduler):
-    model = model.train()
-    losses = []
-    for batch_idx, d in enumerate(data_loader):
-        input_ids = d["input_ids"].to(device)
-        attention_mask = d["attention_mask"].to(device)
-        labels = d["labels"].to(device)
-        outputs = model(input_ids=input_ids, attention_mask=attention_mask, labels=labels)
-        loss = outputs.loss
-        losses.append(loss.item())
-        loss.backward()
-        optimizer.step()
-        scheduler.step()
-        optimizer.zero_grad()
-        if batch_idx % 5 == 0:
-             print(f"  Batch {batch_idx+1}/{len(data_loader)}, Loss: {loss.item():.4f}")
-    return np.mean(losses)
-
-def eval_model(model, data_loader, loss_fn, device, label_names):
-    model = model.eval()
-    losses = []
-    all_logits = []
-    all_labels = []
-    with torch.no_grad():
-        for d in data_loader:
-            input_ids = d["input_ids"].to(device)
-            attention_mask = d["attention_mask"].to(device)
-            labels = d["labels"].to(device)
-            outputs = model(input_ids=input_ids, attention_mask=attention_mask, labels=labels)
-            loss = outputs.loss
-            logits = outputs.logits
-            losses.append(loss.item())
-            all_logits.append(logits.cpu().numpy())
-            all_labels.append(labels.cpu().numpy())
-    
-    all_logits = np.concatenate(all_logits, axis=0)
-    all_labels = np.concatenate(all_labels, axis=0)
+def intent_loss(model, batch):
+    outputs = model(input_ids=batch["input_ids"], attention_mask=batch["attention_mask"], labels=batch["labels"])
+    return outputs.loss, batch["labels"].size(0)
+
+def intent_eval_step(model, batch):
+    outputs = model(input_ids=batch["input_ids"], attention_mask=batch["attention_mask"], labels=batch["labels"])
+    return outputs.loss, (outputs.logits.float().cpu().numpy(), batch["labels"].cpu().numpy())
+
+def eval_model(engine, data_loader, label_names):
+    val_loss, outputs = engine.evaluate(data_loader, intent_eval_step)
+    all_logits = np.concatenate([logits for logits, _ in outputs], axis=0)
+    all_labels = np.concatenate([labels for _, labels in outputs], axis=0)
     metrics = compute_metrics(all_logits, all_labels, label_names)
-    return np.mean(losses), metrics
+    return val_loss, metrics
 
 def main():
     mlflow.set_experiment(MLFLOW_EXPERIMENT_NAME)
@@ -133,6 +82,7 @@ def main():
 
         device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         print(f"Using device: {device}")
+        configure_cpu_threads()
 
         # Load label mapping
         with open(LABEL_MAPPING_PATH, 'r') as f:
@@ -153,32 +103,36 @@ def main():
             return
 
         tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-        train_dataset = IntentDataset(train_df[TEXT_COLUMN].tolist(), train_df[LABEL_COLUMN].tolist(), tokenizer, MAX_LENGTH)
-        val_dataset = IntentDataset(val_df[TEXT_COLUMN].tolist(), val_df[LABEL_COLUMN].tolist(), tokenizer, MAX_LENGTH) if val_df is not None else None
-        
-        train_data_loader = DataLoader(train_dataset, batch_size=BATCH_SIZE, shuffle=True)
-        val_data_loader = DataLoader(val_dataset, batch_size=BATCH_SIZE) if val_dataset else None
+        # Tokenized once into an on-disk cache (reused across runs with the same data/tokenizer)
+        train_dataset = TokenizedDataset(build_token_cache(train_df[TEXT_COLUMN].tolist(), train_df[LABEL_COLUMN].tolist(), tokenizer, MAX_LENGTH))
+        val_dataset = TokenizedDataset(build_token_cache(val_df[TEXT_COLUMN].tolist(), val_df[LABEL_COLUMN].tolist(), tokenizer, MAX_LENGTH)) if val_df is not None else None
+        collate = DynamicPaddingCollator(train_dataset.pad_token_id)
+
+        train_sampler = LengthBucketBatchSampler(train_dataset.lengths, BATCH_SIZE, shuffle=True)
+        train_data_loader = make_data_loader(train_dataset, batch_sampler=train_sampler, collate_fn=collate)
+        val_data_loader = make_data_loader(
+            val_dataset, batch_sampler=LengthBucketBatchSampler(val_dataset.lengths, BATCH_SIZE, shuffle=False), collate_fn=collate
+        ) if val_dataset else None
+        mlflow.log_params({"padding": "dynamic", "sampler": "length_bucketed"})
 
         model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME, num_labels=NUM_LABELS).to(device)
 
         optimizer = AdamW(model.parameters(), lr=LEARNING_RATE)
-        total_steps = len(train_data_loader) * EPOCHS
-        scheduler = get_linear_schedule_with_warmup(optimizer, num_warmup_steps=0, num_training_steps=total_steps)
-        loss_fn = torch.nn.CrossEntropyLoss().to(device) # For single label classification
+        model_save_path_base = f"saved_models/chatbot/intent_classifier_{MLFLOW_RUN_NAME}"
+        engine = TrainingEngine(model, optimizer, intent_loss, device=device,
+                                checkpoint_dir=f"{model_save_path_base}_checkpoint")
+        total_steps = -(-len(train_data_loader) // engine.grad_accum_steps) * EPOCHS # Optimizer steps, not batches
+        engine.scheduler = get_linear_schedule_with_warmup(optimizer, num_warmup_steps=0, num_training_steps=total_steps)
+        engine.log_config()
 
         print("\n--- Starting Intent Classifier Training ---")
         best_val_f1 = 0.0
-        model_save_path_base = f"saved_models/chatbot/intent_classifier_{MLFLOW_RUN_NAME}"
-
-        for epoch in range(EPOCHS):
-            print(f"\nEpoch {epoch + 1}/{EPOCHS}")
-            train_loss = train_epoch(model, train_data_loader, loss_fn, optimizer, device, scheduler)
-            mlflow.log_metric("train_loss", train_loss, step=epoch)
-            print(f"Training Loss: {train_loss:.4f}")
 
+        def validate(epoch, train_metrics):
+            nonlocal best_val_f1
             if val_data_loader:
                 print("--- Validating Intent Classifier ---")
-                val_loss, val_metrics = eval_model(model, val_data_loader, loss_fn, device, list(id2label.values()))
+                val_loss, val_metrics = eval_model(engine, val_data_loader, list(id2label.values()))
                 mlflow.log_metric("val_loss", val_loss, step=epoch)
                 for k, v in val_metrics.items(): mlflow.log_metric(f"val_{k}", v, step=epoch)
                 print(f"Validation Loss: {val_loss:.4f}, Val F1 Macro: {val_metrics['f1_macro']:.4f}")
@@ -196,10 +150,12 @@ def main():
                         # registered_model_name="ChatbotIntentClassifier", # Optional
                         tokenizer=tokenizer,
                         signature=mlflow.models.infer_signature(
-                            tokenizer(train_dataset.texts[0], return_tensors='pt', padding='max_length', truncation=True, max_length=MAX_LENGTH)['input_ids'].cpu().numpy(),
-                            model(tokenizer(train_dataset.texts[0], return_tensors='pt', padding='max_length', truncation=True, max_length=MAX_LENGTH)['input_ids'].to(device)).logits.detach().cpu().numpy()
+                            tokenizer(train_df[TEXT_COLUMN].iloc[0], return_tensors='pt', padding='max_length', truncation=True, max_length=MAX_LENGTH)['input_ids'].cpu().numpy(),
+                            model(tokenizer(train_df[TEXT_COLUMN].iloc[0], return_tensors='pt', padding='max_length', truncation=True, max_length=MAX_LENGTH)['input_ids'].to(device)).logits.detach().cpu().numpy()
                         )
                     )
+
+        engine.fit(train_data_loader, EPOCHS, on_epoch_end=validate, log_every=5)
         
         print("\n--- Intent Classifier Training Complete ---")
         # Save final model if no validation or if you want the last epoch's model explicitly
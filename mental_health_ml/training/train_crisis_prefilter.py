@@ -0,0 +1,118 @@
+# mental_health_ml/training/train_crisis_prefilter.py
+import json
+import os
+
+import mlflow
+import pandas as pd
+from dotenv import load_dotenv
+from sklearn.model_selection import train_test_split
+
+from mental_health_ml.models.crisis.crisis_prefilter import (
+    CrisisPrefilter, CRISIS_PREFILTER_PATH, CRISIS_RECALL_FLOOR
+)
+from mental_health_ml.models.crisis.keyword_crisis_detector import detect_crisis_keywords
+from mental_health_ml.models.crisis.ml_crisis_predictor import predict_crisis_ml, load_ml_crisis_model, ML_CRISIS_MODEL_NAME
+
+load_dotenv()
+
+# --- Configuration ---
+# Human-labelled messages: columns `text`, `is_crisis` (0/1)
+LABELLED_DATA_PATH = "mental_health_ml/data/processed/crisis_labelled.csv"
+# Unlabelled messages (e.g. exported chat_messages): column `text`. Pseudo-labelled by the teacher.
+UNLABELLED_DATA_PATH = "mental_health_ml/data/processed/crisis_unlabelled.csv"
+TEXT_COLUMN = "text"
+LABEL_COLUMN = "is_crisis"
+CALIBRATION_FRACTION = 0.2
+
+# MLflow settings
+MLFLOW_EXPERIMENT_NAME = "Crisis_Detection_Systems"
+MLFLOW_RUN_NAME = "crisis_prefilter_hashed_ngram_logreg"
+# --- End Configuration ---
+
+def pseudo_label(texts: list) -> list:
+    """
+    Labels texts with the current production detector (keywords, then the zero-shot model).
+    A text is a positive if either layer flags it.
+    """
+    load_ml_crisis_model("zero_shot")
+    labels = []
+    for i, text in enumerate(texts):
+        if detect_crisis_keywords(text)["keyword_crisis_detected"]:
+            labels.append(1)
+        else:
+            ml_result = predict_crisis_ml(text, backend="zero_shot")
+            labels.append(int(bool(ml_result.get("ml_crisis_detected"))))
+        if (i + 1) % 500 == 0:
+            print(f"  Pseudo-labelled {i + 1}/{len(texts)} messages...")
+    return labels
+
+def load_training_data():
+    """
+    Returns (train_texts, train_labels, calib_texts, calib_labels, calibration_source).
+    Calibration uses held-out human labels when available, so the reported recall
+    is measured against ground truth rather than against the teacher.
+    """
+    labelled_df = pd.read_csv(LABELLED_DATA_PATH) if os.path.exists(LABELLED_DATA_PATH) else pd.DataFrame(columns=[TEXT_COLUMN, LABEL_COLUMN])
+    unlabelled_df = pd.read_csv(UNLABELLED_DATA_PATH) if os.path.exists(UNLABELLED_DATA_PATH) else pd.DataFrame(columns=[TEXT_COLUMN])
+
+    pseudo_texts = unlabelled_df[TEXT_COLUMN].astype(str).tolist()
+    print(f"Pseudo-labelling {len(pseudo_texts)} unlabelled messages with the zero-shot teacher...")
+    pseudo_labels = pseudo_label(pseudo_texts) if pseudo_texts else []
+
+    gold_texts = labelled_df[TEXT_COLUMN].astype(str).tolist()
+    gold_labels = labelled_df[LABEL_COLUMN].astype(int).tolist()
+
+    if sum(gold_labels) >= 2:
+        train_gold_texts, calib_texts, train_gold_labels, calib_labels = train_test_split(
+            gold_texts, gold_labels, test_size=CALIBRATION_FRACTION, stratify=gold_labels, random_state=42
+        )
+        return (train_gold_texts + pseudo_texts, train_gold_labels + pseudo_labels,
+                calib_texts, calib_labels, "human_labels")
+
+    all_texts, all_labels = gold_texts + pseudo_texts, gold_labels + pseudo_labels
+    train_texts, calib_texts, train_labels, calib_labels = train_test_split(
+        all_texts, all_labels, test_size=CALIBRATION_FRACTION, stratify=all_labels, random_state=42
+    )
+    return train_texts, train_labels, calib_texts, calib_labels, "teacher_labels"
+
+def main(recall_floor: float = CRISIS_RECALL_FLOOR, output_path: str = CRISIS_PREFILTER_PATH):
+    mlflow.set_experiment(MLFLOW_EXPERIMENT_NAME)
+    with mlflow.start_run(run_name=MLFLOW_RUN_NAME) as run:
+        print(f"MLflow Run ID: {run.info.run_id}")
+        train_texts, train_labels, calib_texts, calib_labels, calibration_source = load_training_data()
+        if not train_texts or sum(train_labels) == 0:
+            print("No crisis examples available for training. Exiting.")
+            return None
+
+        mlflow.log_params({
+            "teacher_model": ML_CRISIS_MODEL_NAME,
+            "labelled_data": LABELLED_DATA_PATH,
+            "unlabelled_data": UNLABELLED_DATA_PATH,
+            "n_train": len(train_texts),
+            "n_train_crisis": sum(train_labels),
+            "recall_floor": recall_floor,
+            "calibration_source": calibration_source,
+        })
+
+        prefilter = CrisisPrefilter(recall_floor=recall_floor).fit(train_texts, train_labels)
+        report = prefilter.calibrate(calib_texts, calib_labels)
+        print(f"Calibration ({calibration_source}): {json.dumps(report, indent=2)}")
+
+        mlflow.log_metrics({
+            "calibrated_recall": report["recall"],
+            "escalation_rate": report["escalation_rate"],
+            "escalation_threshold": report["escalation_threshold"],
+        })
+        mlflow.log_dict(report, "calibration_report.json")
+
+        prefilter.save(output_path)
+        mlflow.log_artifact(output_path, artifact_path="crisis_prefilter")
+        print(f"Saved crisis prefilter to {output_path}")
+        print(f"  ~{report['escalation_rate'] * 100:.1f}% of messages will still reach the zero-shot model.")
+        return prefilter
+
+if __name__ == "__main__":
+    if not os.path.exists(LABELLED_DATA_PATH) and not os.path.exists(UNLABELLED_DATA_PATH):
+        print(f"ERROR: No training data found. Provide {LABELLED_DATA_PATH} and/or {UNLABELLED_DATA_PATH}.")
+    else:
+        main()
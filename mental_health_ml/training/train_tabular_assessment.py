@@ -0,0 +1,156 @@
+# mental_health_ml/training/train_tabular_assessment.py
+"""
+Trains the tabular assessment models (see models/assessment/tabular_model.py),
+compares them with the BERT assessment model on the same validation split and
+registers the best one in MLflow.
+
+Run from the repository root:
+    python -m mental_health_ml.training.train_tabular_assessment --families ridge,gbm
+"""
+import argparse
+import os
+import time
+
+import mlflow
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import train_test_split
+
+from mental_health_ml.data.preprocessing.assessment_preprocessing import AssessmentPreprocessor, ASSESSMENT_TARGET_COLUMNS
+from mental_health_ml.models.assessment.tabular_model import (
+    TabularAssessmentModel, TABULAR_ASSESSMENT_PATH, TABULAR_MODEL_FAMILIES
+)
+
+load_dotenv()
+
+# --- Configuration ---
+DEFAULT_DATA_PATH = "mental_health_assessment_dataset.csv"
+# Artifacts written by training/train_assessment.py; the comparison is skipped if they are missing
+BERT_MODEL_PATH = "mental_health_ml/models/assessment/assessment_model.pt"
+BERT_SCALING_PATH = "mental_health_ml/models/assessment/numeric_scaling.json"
+# The API resolves TABULAR_ASSESSMENT_PATH relative to mental_health_ml/
+OUTPUT_PATH = os.path.join("mental_health_ml", TABULAR_ASSESSMENT_PATH)
+
+MLFLOW_EXPERIMENT_NAME = "Assessment_Models"
+MLFLOW_RUN_NAME = "tabular_assessment_model"
+REGISTERED_MODEL_NAME = "TabularAssessmentModel"
+# --- End Configuration ---
+
+def regression_metrics(y_true: np.ndarray, y_pred: np.ndarray) -> dict:
+    """Per-target MAE / RMSE / R2 plus their mean over targets."""
+    metrics = {}
+    for i, label in enumerate(ASSESSMENT_TARGET_COLUMNS):
+        metrics[f"{label}_mae"] = float(mean_absolute_error(y_true[:, i], y_pred[:, i]))
+        metrics[f"{label}_rmse"] = float(np.sqrt(mean_squared_error(y_true[:, i], y_pred[:, i])))
+        metrics[f"{label}_r2"] = float(r2_score(y_true[:, i], y_pred[:, i]))
+    metrics["mean_mae"] = float(np.mean([metrics[f"{label}_mae"] for label in ASSESSMENT_TARGET_COLUMNS]))
+    metrics["mean_r2"] = float(np.mean([metrics[f"{label}_r2"] for label in ASSESSMENT_TARGET_COLUMNS]))
+    return metrics
+
+def measure_latency(predict, rows, repeat: int = 20) -> dict:
+    """Best-of-`repeat` latency for one row and per row in a full batch, in microseconds."""
+    single, batch = float("inf"), float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        predict(rows[:1])
+        single = min(single, time.perf_counter() - start)
+        start = time.perf_counter()
+        predict(rows)
+        batch = min(batch, time.perf_counter() - start)
+    return {"latency_single_us": single * 1e6, "latency_batch_per_row_us": batch * 1e6 / len(rows)}
+
+def evaluate_bert(X_val, y_val: np.ndarray):
+    """
+    Metrics (in original target units) and latency of the trained BERT assessment
+    model on the same split, or None if it is not available.
+    """
+    if not (os.path.exists(BERT_MODEL_PATH) and os.path.exists(BERT_SCALING_PATH)):
+        print(f"BERT assessment model not found at {BERT_MODEL_PATH}; skipping the comparison.")
+        return None
+    import torch
+    from mental_health_ml.models.assessment.model import MentalHealthAssessmentModel
+
+    preprocessor = AssessmentPreprocessor().load_scaling(BERT_SCALING_PATH)
+    if preprocessor.target_min is None:
+        print(f"{BERT_SCALING_PATH} has no target scaling (model trained on raw targets); skipping the comparison.")
+        return None
+    model = MentalHealthAssessmentModel(num_numerical_features=preprocessor.num_numeric_features)
+    model.load_state_dict(torch.load(BERT_MODEL_PATH, map_location="cpu"))
+    model.eval()
+
+    def predict(frame):
+        inputs = preprocessor.preprocess_assessments(frame)
+        with torch.no_grad():
+            return model(inputs["numerical_features"], inputs.get("input_ids"), inputs.get("attention_mask")).numpy()
+
+    metrics = regression_metrics(y_val, preprocessor.unscale_targets(predict(X_val)))
+    metrics.update(measure_latency(predict, X_val.iloc[:256], repeat=3))
+    return metrics
+
+def main(data_path: str = DEFAULT_DATA_PATH, families=TABULAR_MODEL_FAMILIES, output_path: str = OUTPUT_PATH):
+    data = pd.read_csv(data_path)
+    X = data.drop(columns=ASSESSMENT_TARGET_COLUMNS)
+    y = data[ASSESSMENT_TARGET_COLUMNS]
+    # Same split as training/train_assessment.py so the BERT numbers are comparable
+    X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.2, random_state=42)
+    y_val_values = y_val.to_numpy(dtype=np.float64)
+
+    mlflow.set_experiment(MLFLOW_EXPERIMENT_NAME)
+    with mlflow.start_run(run_name=MLFLOW_RUN_NAME) as run:
+        print(f"MLflow Run ID: {run.info.run_id}")
+        mlflow.log_params({"data_path": data_path, "n_train": len(X_train), "n_val": len(X_val),
+                           "families": ",".join(families)})
+
+        comparison, models = {}, {}
+        for family in families:
+            start = time.perf_counter()
+            model = TabularAssessmentModel(family=family).fit(X_train, y_train)
+            fit_seconds = time.perf_counter() - start
+
+            val_answers = X_val[model.feature_columns].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float32)
+            # Both backends predict [0, 1]; compare in original units (e.g. wellbeing_score 0-96)
+            metrics = regression_metrics(y_val_values, model.preprocessor.unscale_targets(model.predict(val_answers)))
+            metrics.update(measure_latency(model.predict, val_answers))
+            metrics["fit_seconds"] = fit_seconds
+            comparison[family], models[family] = metrics, model
+            print(f"{family}: mean MAE {metrics['mean_mae']:.4f}, mean R2 {metrics['mean_r2']:.4f}, "
+                  f"{metrics['latency_single_us']:.0f} us/request, {metrics['latency_batch_per_row_us']:.2f} us/row batched")
+            mlflow.log_metrics({f"{family}_{k}": v for k, v in metrics.items()})
+
+        bert_metrics = evaluate_bert(X_val, y_val_values)
+        if bert_metrics:
+            comparison["bert"] = bert_metrics
+            print(f"bert: mean MAE {bert_metrics['mean_mae']:.4f}, mean R2 {bert_metrics['mean_r2']:.4f}, "
+                  f"{bert_metrics['latency_single_us']:.0f} us/request")
+            mlflow.log_metrics({f"bert_{k}": v for k, v in bert_metrics.items()})
+        mlflow.log_dict(comparison, "assessment_model_comparison.json")
+
+        best_family = min(models, key=lambda f: comparison[f]["mean_mae"])
+        best = models[best_family]
+        mlflow.log_param("selected_family", best_family)
+        best.save(output_path)
+        print(f"Saved {best_family} tabular assessment model to {output_path}")
+        print("Serve it with ASSESSMENT_BACKEND=tabular (and TABULAR_ASSESSMENT_PATH if saved elsewhere).")
+
+        mlflow.sklearn.log_model(best.estimator, "tabular_assessment_model")
+        mlflow.log_artifact(output_path, artifact_path="tabular_assessment_bundle") # Estimator + answer scaling, as served
+        try:
+            mlflow.register_model(
+                model_uri=f"runs:/{run.info.run_id}/tabular_assessment_model",
+                name=REGISTERED_MODEL_NAME,
+                tags={"type": "tabular_assessment", "family": best_family},
+            )
+            print(f"Registered '{REGISTERED_MODEL_NAME}' in MLflow Model Registry.")
+        except Exception as e:
+            print(f"Could not register model {REGISTERED_MODEL_NAME}: {e}")
+        return best, comparison
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train and compare tabular assessment models")
+    parser.add_argument("--data", default=DEFAULT_DATA_PATH)
+    parser.add_argument("--families", default=",".join(TABULAR_MODEL_FAMILIES))
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    args = parser.parse_args()
+    main(args.data, tuple(args.families.split(",")), args.output)
@@ -0,0 +1,149 @@
+# mental_health_ml/utils/admission.py
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from mental_health_ml.utils.metrics import REGISTRY
+
+# Admission control for the expensive model stages. Every stage run through the
+# controller is measured (calls in flight, smoothed latency). Optional stages
+# (emotion detection, zero-shot themes, model-based recommendations) are skipped
+# ("shed") while their smoothed latency is above the stage's goal or the stage
+# already has its maximum number of calls in flight; callers fall back to a cheaper
+# answer and report the shed stage. Crisis detection and the chat reply are never
+# shed, only measured.
+ADMISSION_CONTROL = os.getenv("ADMISSION_CONTROL", "1") != "0"
+# "stage=value,..." overrides, e.g. ADMISSION_LATENCY_GOALS="emotion=0.1,recommender=0.05"
+ADMISSION_LATENCY_GOALS = os.getenv("ADMISSION_LATENCY_GOALS", "")
+ADMISSION_MAX_IN_FLIGHT = os.getenv("ADMISSION_MAX_IN_FLIGHT", "")
+# While a stage is shed for latency, one call per interval is let through to refresh the estimate
+ADMISSION_PROBE_INTERVAL = float(os.getenv("ADMISSION_PROBE_INTERVAL", "1.0"))
+ADMISSION_EWMA_ALPHA = 0.2
+
+DEFAULT_LATENCY_GOALS = {"emotion": 0.25, "themes": 0.5, "recommender": 0.2} # Seconds, including the wait for a thread
+DEFAULT_MAX_IN_FLIGHT = {"emotion": 8, "themes": 4, "recommender": 16}
+
+STAGE_IN_FLIGHT = REGISTRY.gauge("admission_stage_in_flight", "Calls currently running (or waiting for a thread) per model stage")
+STAGE_LATENCY_EWMA = REGISTRY.gauge("admission_stage_latency_ewma_seconds", "Smoothed latency per model stage, compared with its goal")
+STAGE_SHED = REGISTRY.counter("admission_shed_total", "Optional stage calls skipped by admission control, by reason (latency or queue_depth)")
+
+
+def parse_stage_map(spec: str, cast=float) -> Dict[str, Any]:
+    """"emotion=0.25,themes=0.5" -> {"emotion": 0.25, "themes": 0.5}"""
+    values = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        stage, value = item.split("=", 1)
+        values[stage.strip()] = cast(value)
+    return values
+
+
+class _StageState:
+    __slots__ = ("in_flight", "latency", "samples", "last_probe")
+
+    def __init__(self):
+        self.in_flight = 0
+        self.latency = 0.0
+        self.samples = 0
+        self.last_probe = float("-inf")
+
+
+class AdmissionController:
+    def __init__(self, latency_goals: Dict[str, float] = None, max_in_flight: Dict[str, int] = None,
+                 probe_interval: float = ADMISSION_PROBE_INTERVAL, alpha: float = ADMISSION_EWMA_ALPHA,
+                 enabled: bool = True):
+        self.latency_goals = dict(DEFAULT_LATENCY_GOALS if latency_goals is None else latency_goals)
+        self.max_in_flight = dict(DEFAULT_MAX_IN_FLIGHT if max_in_flight is None else max_in_flight)
+        self.probe_interval = probe_interval
+        self.alpha = alpha
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._stages: Dict[str, _StageState] = {}
+
+    def try_enter(self, stage: str, optional: bool = False) -> Optional[str]:
+        """
+        Registers a call of stage and returns None, or, for an optional stage that
+        has to be shed, returns the reason ("queue_depth" or "latency") without
+        registering anything. Every successful try_enter must be paired with exit().
+        """
+        with self._lock:
+            state = self._stages.get(stage)
+            if state is None:
+                state = self._stages[stage] = _StageState()
+            if optional and self.enabled:
+                reason = None
+                limit = self.max_in_flight.get(stage)
+                goal = self.latency_goals.get(stage)
+                if limit is not None and state.in_flight >= limit:
+                    reason = "queue_depth"
+                elif goal is not None and state.samples and state.latency > goal:
+                    now = time.monotonic()
+                    if now - state.last_probe >= self.probe_interval:
+                        state.last_probe = now # Let this call through as a probe
+                    else:
+                        reason = "latency"
+                if reason is not None:
+                    STAGE_SHED.inc(stage=stage, reason=reason)
+                    return reason
+            state.in_flight += 1
+        STAGE_IN_FLIGHT.inc(stage=stage)
+        return None
+
+    def exit(self, stage: str, seconds: float):
+        with self._lock:
+            state = self._stages[stage]
+            state.in_flight -= 1
+            state.latency = seconds if not state.samples else state.latency + self.alpha * (seconds - state.latency)
+            state.samples += 1
+            latency = state.latency
+        STAGE_IN_FLIGHT.dec(stage=stage)
+        STAGE_LATENCY_EWMA.set(latency, stage=stage)
+
+    def run_sync(self, stage: str, fn: Callable, *args, optional: bool = False, **kwargs) -> Tuple[Any, Optional[str]]:
+        """(fn(*args, **kwargs), None), or (None, reason) if the optional stage was shed."""
+        reason = self.try_enter(stage, optional)
+        if reason is not None:
+            return None, reason
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs), None
+        finally:
+            self.exit(stage, time.perf_counter() - start)
+
+    async def run(self, stage: str, call: Callable[[], Awaitable], optional: bool = False) -> Tuple[Any, Optional[str]]:
+        """
+        Async variant: call() returns the awaitable, so nothing is started for a shed
+        stage. E.g.
+            result, shed = await admission.run("emotion", lambda: run_in_threadpool(detect, text), optional=True)
+        """
+        reason = self.try_enter(stage, optional)
+        if reason is not None:
+            return None, reason
+        start = time.perf_counter()
+        try:
+            return await call(), None
+        finally:
+            self.exit(stage, time.perf_counter() - start)
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            return {stage: {"in_flight": state.in_flight, "latency_ewma": state.latency, "samples": state.samples}
+                    for stage, state in self._stages.items()}
+
+
+_admission_controller: Optional[AdmissionController] = None
+_admission_lock = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    """Process-wide admission controller shared by the inference routers."""
+    global _admission_controller
+    if _admission_controller is None:
+        with _admission_lock:
+            if _admission_controller is None:
+                _admission_controller = AdmissionController(
+                    latency_goals={**DEFAULT_LATENCY_GOALS, **parse_stage_map(ADMISSION_LATENCY_GOALS)},
+                    max_in_flight={**DEFAULT_MAX_IN_FLIGHT, **parse_stage_map(ADMISSION_MAX_IN_FLIGHT, int)},
+                    enabled=ADMISSION_CONTROL,
+                )
+    return _admission_controller
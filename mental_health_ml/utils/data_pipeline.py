@@ -1,9 +1,46 @@
 # utils/data_pipeline.py
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator
 import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from itertools import islice
+import os
+
+from .keyword_automaton import KeywordAutomaton
+
+_PIPELINE_WINDOW_PER_WORKER = 2 # Chunks in flight per worker in process_many
+
+class RegexStep:
+    """
+    Consecutive regex substitutions fused into one pipeline step. Patterns are
+    compiled once, and a substitution with a guard substring is skipped for
+    texts that do not contain it (e.g. "@" for e-mail addresses), so most
+    messages only pay for an `in` check.
+    """
+    def __init__(self):
+        self.substitutions = [] # (pattern, replacement, flags, guard)
+        self._compiled = None
+
+    def add(self, pattern: str, replacement: str, flags: int = 0, guard: str = None):
+        self.substitutions.append((pattern, replacement, flags, guard))
+        self._compiled = None
+
+    def __call__(self, text: str) -> str:
+        if self._compiled is None:
+            self._compiled = [(re.compile(pattern, flags).sub, replacement, guard)
+                              for pattern, replacement, flags, guard in self.substitutions]
+        for sub, replacement, guard in self._compiled:
+            if guard is None or guard in text:
+                text = sub(replacement, text)
+        return text
+
+    def __getstate__(self):
+        # Compiled on first use in each process
+        return {"substitutions": self.substitutions, "_compiled": None}
+
 
 class DataPipeline:
     def __init__(self):
@@ -12,6 +49,18 @@ class DataPipeline:
     def add_preprocessing_step(self, step_func, **kwargs):
         """Add a preprocessing step to the pipeline"""
         self.preprocessing_steps.append((step_func, kwargs))
+
+    def add_regex_step(self, pattern: str, replacement: str, flags: int = 0, guard: str = None):
+        """
+        Add a regex substitution. Consecutive regex steps are fused into one RegexStep
+        and still applied in the order they were added. guard: substring that every
+        match contains; texts without it skip the substitution.
+        """
+        last = self.preprocessing_steps[-1][0] if self.preprocessing_steps else None
+        if not isinstance(last, RegexStep):
+            last = RegexStep()
+            self.preprocessing_steps.append((last, {}))
+        last.add(pattern, replacement, flags, guard)
         
     def process(self, data):
         """Apply all preprocessing steps to data"""
@@ -19,6 +68,56 @@ class DataPipeline:
             data = step_func(data, **kwargs)
         return data
 
+    def process_many(self, items: Iterable, workers: int = 1, chunk_size: int = 1000) -> Iterator:
+        """
+        Applies the pipeline to every item, yielding results in input order. With
+        workers > 1 the items are processed in chunks by a process pool; at most
+        2 * workers chunks are in flight, so the input is streamed rather than
+        loaded. Steps must then be picklable (module-level functions, RegexSteps).
+        """
+        if workers <= 1:
+            for item in items:
+                yield self.process(item)
+            return
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_pipeline_worker, initargs=(self,)) as pool:
+            in_flight = deque()
+            for chunk in _chunked(items, chunk_size):
+                if len(in_flight) >= _PIPELINE_WINDOW_PER_WORKER * workers:
+                    yield from in_flight.popleft().result()
+                in_flight.append(pool.submit(_process_pipeline_chunk, chunk))
+            while in_flight:
+                yield from in_flight.popleft().result()
+
+_worker_pipeline = None
+
+def _init_pipeline_worker(pipeline: DataPipeline):
+    global _worker_pipeline
+    _worker_pipeline = pipeline
+
+def _process_pipeline_chunk(chunk: list) -> list:
+    return [_worker_pipeline.process(item) for item in chunk]
+
+def _chunked(items: Iterable, chunk_size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+# Patterns are compiled once at import instead of on every call
+_WHITESPACE_PATTERN = r'\s+'
+_SPECIAL_CHARS_PATTERN = r'[^\w\s\.\!\?\,\;\:]'
+_EMAIL_PATTERN = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+_PHONE_PATTERN = r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b'
+_NAME_PATTERN = r'\bmy name is \w+\b'
+_WHITESPACE_RE = re.compile(_WHITESPACE_PATTERN)
+_SPECIAL_CHARS_RE = re.compile(_SPECIAL_CHARS_PATTERN)
+_EMAIL_RE = re.compile(_EMAIL_PATTERN)
+_PHONE_RE = re.compile(_PHONE_PATTERN)
+_NAME_RE = re.compile(_NAME_PATTERN, re.IGNORECASE)
+
 # Text preprocessing functions
 def clean_text(text: str) -> str:
     """Basic text cleaning"""
@@ -26,10 +125,10 @@ def clean_text(text: str) -> str:
         return ""
     
     # Remove excessive whitespace
-    text = re.sub(r'\s+', ' ', text)
+    text = _WHITESPACE_RE.sub(' ', text)
     
     # Remove special characters but keep basic punctuation
-    text = re.sub(r'[^\w\s\.\!\?\,\;\:]', '', text)
+    text = _SPECIAL_CHARS_RE.sub('', text)
     
     # Convert to lowercase
     text = text.lower().strip()
@@ -42,31 +141,86 @@ def anonymize_personal_info(text: str) -> str:
         return ""
     
     # Remove email addresses
-    text = re.sub(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', '[EMAIL]', text)
+    if '@' in text:
+        text = _EMAIL_RE.sub('[EMAIL]', text)
     
     # Remove phone numbers
-    text = re.sub(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b', '[PHONE]', text)
+    text = _PHONE_RE.sub('[PHONE]', text)
     
     # Remove potential names (very basic - would need more sophisticated NER)
     # This is a simple approach, in production use proper NER models
-    text = re.sub(r'\bmy name is \w+\b', 'my name is [NAME]', text, flags=re.IGNORECASE)
+    text = _NAME_RE.sub('my name is [NAME]', text)
     
     return text
 
-def extract_emotional_keywords(text: str) -> List[str]:
-    """Extract emotional keywords from text"""
-    emotion_keywords = {
-        'positive': ['happy', 'joy', 'excited', 'grateful', 'content', 'peaceful', 'confident'],
-        'negative': ['sad', 'angry', 'frustrated', 'worried', 'anxious', 'depressed', 'stressed'],
-        'crisis': ['suicide', 'kill myself', 'end it all', 'hopeless', 'worthless']
-    }
-    
-    found_keywords = []
-    text_lower = text.lower()
-    
-    for category, keywords in emotion_keywords.items():
-        for keyword in keywords:
-            if keyword in text_lower:
-                found_keywords.append((keyword, category))
-    
-    return found_keywords
\ No newline at end of file
+def _to_str(text) -> str:
+    return text if isinstance(text, str) else ""
+
+def _lower_strip(text: str) -> str:
+    return text.lower().strip()
+
+def build_text_pipeline(anonymize: bool = True) -> DataPipeline:
+    """
+    anonymize_personal_info (optional) followed by clean_text, as a pipeline with a
+    single fused regex step. Produces the same output as calling the two functions.
+    """
+    pipeline = DataPipeline()
+    pipeline.add_preprocessing_step(_to_str)
+    if anonymize:
+        pipeline.add_regex_step(_EMAIL_PATTERN, '[EMAIL]', guard='@')
+        pipeline.add_regex_step(_PHONE_PATTERN, '[PHONE]')
+        pipeline.add_regex_step(_NAME_PATTERN, 'my name is [NAME]', flags=re.IGNORECASE)
+    pipeline.add_regex_step(_WHITESPACE_PATTERN, ' ')
+    pipeline.add_regex_step(_SPECIAL_CHARS_PATTERN, '')
+    pipeline.add_preprocessing_step(_lower_strip)
+    return pipeline
+
+EMOTION_KEYWORDS = {
+    'positive': ['happy', 'joy', 'excited', 'grateful', 'content', 'peaceful', 'confident'],
+    'negative': ['sad', 'angry', 'frustrated', 'worried', 'anxious', 'depressed', 'stressed'],
+    'crisis': ['suicide', 'kill myself', 'end it all', 'hopeless', 'worthless']
+}
+# Optional external lexicon (JSON {"category": [terms]} or CSV term,category) added to EMOTION_KEYWORDS
+EMOTION_LEXICON_PATH = os.getenv("EMOTION_LEXICON_PATH")
+
+_emotion_automaton = None
+
+def get_emotion_keyword_automaton() -> KeywordAutomaton:
+    """Built once per process from EMOTION_KEYWORDS and EMOTION_LEXICON_PATH."""
+    global _emotion_automaton
+    if _emotion_automaton is None:
+        automaton = KeywordAutomaton.from_lexicon_file(EMOTION_LEXICON_PATH) if EMOTION_LEXICON_PATH else KeywordAutomaton()
+        for category, keywords in EMOTION_KEYWORDS.items():
+            for keyword in keywords:
+                automaton.add(keyword, category)
+        _emotion_automaton = automaton.build()
+    return _emotion_automaton
+
+def extract_emotional_keywords(text: str, with_spans: bool = False) -> List[tuple]:
+    """
+    Extract emotional keywords from text, in text order, matching whole words only.
+    Returns (keyword, category) pairs, each at most once, or with_spans=True every
+    occurrence as (keyword, category, (start, end)).
+    """
+    if not isinstance(text, str):
+        return []
+    matches = get_emotion_keyword_automaton().find(text)
+    if with_spans:
+        return matches
+    return list(dict.fromkeys((keyword, category) for keyword, category, _ in matches))
+
+def add_emotional_keyword_columns(df: pd.DataFrame, text_column: str = 'text', with_spans: bool = False) -> pd.DataFrame:
+    """
+    Batch version for a DataFrame: adds an `emotional_keywords` column (as returned by
+    extract_emotional_keywords) and one `<category>_keyword_count` column per category.
+    """
+    automaton = get_emotion_keyword_automaton()
+    matches = automaton.find_many(df[text_column].tolist())
+    df = df.copy()
+    df['emotional_keywords'] = [
+        m if with_spans else list(dict.fromkeys((keyword, category) for keyword, category, _ in m))
+        for m in matches
+    ]
+    for category in sorted({category for _, category in automaton.keywords}):
+        df[f'{category}_keyword_count'] = [sum(1 for match in m if match[1] == category) for m in matches]
+    return df
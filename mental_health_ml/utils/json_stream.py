@@ -0,0 +1,118 @@
+# mental_health_ml/utils/json_stream.py
+import codecs
+import json
+from typing import AsyncIterable, AsyncIterator, Iterator
+
+# Largest single item (one JSON object / NDJSON line) accepted from a streamed upload.
+# Memory use of the parser is bounded by this, whatever the size of the upload.
+MAX_ITEM_BYTES = 1024 * 1024
+
+_WHITESPACE = " \t\r\n"
+
+
+class JSONStreamError(ValueError):
+    """The upload is not a JSON array or NDJSON, or an item exceeds MAX_ITEM_BYTES."""
+
+
+class JSONItemSplitter:
+    """
+    Incremental parser for a JSON array (`[{...}, {...}]`) or NDJSON (one JSON value
+    per line); the format is detected from the first non-whitespace character.
+    Bytes are fed in arbitrary chunks and complete items come out; only the item
+    being parsed is kept in memory.
+    """
+    def __init__(self, max_item_bytes: int = MAX_ITEM_BYTES):
+        self.max_item_bytes = max_item_bytes
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")() # Multi-byte characters may be split across chunks
+        self._buffer = ""
+        self._is_array = None
+        self._array_closed = False
+        self._expect_comma = False
+
+    def feed(self, chunk: bytes) -> list:
+        """Adds a chunk of the body and returns the items it completed."""
+        return self._parse(chunk, at_end=False)
+
+    def close(self) -> list:
+        """Signals the end of the body; returns the last items or raises if the body is incomplete."""
+        items = self._parse(b"", at_end=True)
+        if self._is_array and not self._array_closed:
+            raise JSONStreamError("JSON array is not closed.")
+        return items
+
+    def _parse(self, chunk: bytes, at_end: bool) -> list:
+        try:
+            self._buffer += self._utf8.decode(chunk, final=at_end)
+        except UnicodeDecodeError as e:
+            raise JSONStreamError(f"Upload is not valid UTF-8: {e}")
+
+        items = []
+        buffer, pos = self._buffer, 0 # Parse by position; slicing per item would be quadratic in the chunk size
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if self._is_array is None:
+                self._is_array = buffer[pos] == "["
+                if self._is_array:
+                    pos += 1
+                continue
+
+            if self._is_array:
+                if self._array_closed:
+                    raise JSONStreamError("Unexpected data after the end of the JSON array.")
+                if buffer[pos] == "]":
+                    self._array_closed, pos = True, pos + 1
+                    continue
+                if self._expect_comma:
+                    if buffer[pos] != ",":
+                        raise JSONStreamError("Expected ',' between array items.")
+                    self._expect_comma, pos = False, pos + 1
+                    continue
+                try:
+                    item, end = self._decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if at_end:
+                        raise JSONStreamError("Truncated or invalid JSON array item.")
+                    break # Item not complete yet
+                if end == len(buffer) and not at_end and not isinstance(item, (dict, list)):
+                    break # A bare number may continue in the next chunk
+                pos = end
+                self._expect_comma = True
+                items.append(item)
+            else:
+                newline = buffer.find("\n", pos)
+                if newline < 0 and not at_end:
+                    break # Line not complete yet
+                end = len(buffer) if newline < 0 else newline
+                try:
+                    items.append(json.loads(buffer[pos:end]))
+                except json.JSONDecodeError as e:
+                    raise JSONStreamError(f"Invalid NDJSON line: {e}")
+                pos = end + 1
+
+        self._buffer = buffer[pos:]
+        if len(self._buffer) > self.max_item_bytes:
+            raise JSONStreamError(f"A single item exceeds {self.max_item_bytes} bytes.")
+        return items
+
+
+async def iter_json_items(chunks: AsyncIterable[bytes], max_item_bytes: int = MAX_ITEM_BYTES) -> AsyncIterator:
+    """Yields the items of a streamed upload (JSON array or NDJSON) one at a time."""
+    splitter = JSONItemSplitter(max_item_bytes)
+    async for chunk in chunks:
+        for item in splitter.feed(chunk):
+            yield item
+    for item in splitter.close():
+        yield item
+
+
+def iter_json_file_items(path: str, read_size: int = 1024 * 1024, max_item_bytes: int = 64 * MAX_ITEM_BYTES) -> Iterator:
+    """Same for a file on disk, read read_size bytes at a time."""
+    splitter = JSONItemSplitter(max_item_bytes)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(read_size), b""):
+            yield from splitter.feed(chunk)
+    yield from splitter.close()
@@ -0,0 +1,205 @@
+# mental_health_ml/utils/jsonl_sink.py
+import glob
+import gzip
+import io
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+
+from mental_health_ml.utils.metrics import REGISTRY
+from mental_health_ml.utils.structured_logging import get_logger
+
+try:
+    import zstandard
+except ImportError: # Optional: only needed for compression="zstd"
+    zstandard = None
+
+logger = get_logger(__name__)
+
+# Append-only, rotating JSONL files written by a background thread. Callers only
+# enqueue records, so request handlers never wait on disk I/O.
+DATA_SINK_DIR = os.getenv("DATA_SINK_DIR", "data/collected/records")
+DATA_SINK_COMPRESSION = os.getenv("DATA_SINK_COMPRESSION", "") or None # "gzip", "zstd" or unset
+DATA_SINK_MAX_FILE_MB = float(os.getenv("DATA_SINK_MAX_FILE_MB", "64"))
+DATA_SINK_FLUSH_KB = int(os.getenv("DATA_SINK_FLUSH_KB", "256"))
+DATA_SINK_FLUSH_SECONDS = float(os.getenv("DATA_SINK_FLUSH_SECONDS", "2"))
+
+COMPRESSION_SUFFIXES = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+SINK_RECORDS = REGISTRY.counter("data_sink_records_total", "Records written by JSONL sinks")
+SINK_DROPPED = REGISTRY.counter("data_sink_dropped_total", "Records dropped because a sink queue was full")
+SINK_QUEUE_DEPTH = REGISTRY.gauge("data_sink_queue_depth", "Records waiting for a sink's writer thread")
+
+
+def _open_for_append(path: str, compression: Optional[str]):
+    if compression is None:
+        return open(path, "ab")
+    if compression == "gzip":
+        return gzip.open(path, "ab")
+    if compression == "zstd":
+        if zstandard is None:
+            raise ValueError("compression='zstd' requires the 'zstandard' package.")
+        return zstandard.ZstdCompressor().stream_writer(open(path, "ab"), closefd=True)
+    raise ValueError(f"Unknown compression '{compression}'. Expected one of {list(COMPRESSION_SUFFIXES)}.")
+
+
+def _open_for_read(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise ValueError(f"Reading {path} requires the 'zstandard' package.")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True, read_across_frames=True))
+    return open(path, "rb")
+
+
+class RotatingJSONLSink:
+    """
+    Buffered JSONL writer. Records are serialized by one writer thread and
+    flushed once flush_bytes are buffered or flush_seconds have passed. A new
+    file is started when the current one reaches max_file_bytes (uncompressed)
+    or the UTC date changes. Files are named <prefix>-<YYYYMMDD>-<seq>.jsonl[.gz|.zst],
+    so sorting them by name gives write order.
+    """
+    def __init__(self, directory: str = DATA_SINK_DIR, prefix: str = "records",
+                 compression: Optional[str] = DATA_SINK_COMPRESSION,
+                 max_file_bytes: int = int(DATA_SINK_MAX_FILE_MB * 1024 * 1024),
+                 flush_bytes: int = DATA_SINK_FLUSH_KB * 1024, flush_seconds: float = DATA_SINK_FLUSH_SECONDS,
+                 rotate_daily: bool = True, max_queue: int = 100000):
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unknown compression '{compression}'. Expected one of {list(COMPRESSION_SUFFIXES)}.")
+        if compression == "zstd" and zstandard is None:
+            raise ValueError("compression='zstd' requires the 'zstandard' package.")
+        self.directory = directory
+        self.prefix = prefix
+        self.compression = compression
+        self.max_file_bytes = max_file_bytes
+        self.flush_bytes = flush_bytes
+        self.flush_seconds = flush_seconds
+        self.rotate_daily = rotate_daily
+        os.makedirs(directory, exist_ok=True)
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._file = None
+        self._file_date = None
+        self._file_bytes = 0
+        self._buffer = []
+        self._buffer_bytes = 0
+        self._last_flush = time.monotonic()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f"jsonl-sink-{prefix}", daemon=True)
+        self._thread.start()
+
+    def write(self, record: dict) -> bool:
+        """Enqueues a record without blocking. Returns False (and counts a drop) if the queue is full."""
+        if self._closed:
+            raise RuntimeError("Sink is closed.")
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            SINK_DROPPED.inc(sink=self.prefix)
+            return False
+        SINK_QUEUE_DEPTH.set(self._queue.qsize(), sink=self.prefix)
+        return True
+
+    def flush(self, timeout: float = None):
+        """Blocks until every record enqueued so far is on disk."""
+        if self._closed:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def close(self, timeout: float = None):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _run(self):
+        while True:
+            timeout = max(0.0, self.flush_seconds - (time.monotonic() - self._last_flush))
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = ()
+            if item is None: # close()
+                self._flush_buffer()
+                if self._file is not None:
+                    self._file.close()
+                return
+            if isinstance(item, threading.Event): # flush()
+                self._flush_buffer()
+                item.set()
+                continue
+            if item != ():
+                line = (json.dumps(item, default=str) + "\n").encode("utf-8")
+                self._buffer.append(line)
+                self._buffer_bytes += len(line)
+            if self._buffer_bytes >= self.flush_bytes or time.monotonic() - self._last_flush >= self.flush_seconds:
+                self._flush_buffer()
+                SINK_QUEUE_DEPTH.set(self._queue.qsize(), sink=self.prefix)
+
+    def _flush_buffer(self):
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        try:
+            self._rotate_if_needed()
+            self._file.write(b"".join(self._buffer))
+            self._file.flush()
+            self._file_bytes += self._buffer_bytes
+            SINK_RECORDS.inc(len(self._buffer), sink=self.prefix)
+        except Exception as e:
+            logger.error("jsonl_sink_write_failed", directory=self.directory, records=len(self._buffer), error=str(e))
+        finally:
+            self._buffer, self._buffer_bytes = [], 0
+
+    def _rotate_if_needed(self):
+        today = datetime.now(timezone.utc).strftime("%Y%m%d")
+        if (self._file is not None and self._file_bytes < self.max_file_bytes
+                and not (self.rotate_daily and today != self._file_date)):
+            return
+        if self._file is not None:
+            self._file.close()
+        self._file = _open_for_append(self._next_path(today), self.compression)
+        self._file_date, self._file_bytes = today, 0
+
+    def _next_path(self, date: str) -> str:
+        existing = glob.glob(os.path.join(self.directory, f"{self.prefix}-{date}-*.jsonl*"))
+        seqs = [int(os.path.basename(p)[len(self.prefix) + 10:].split(".")[0]) for p in existing]
+        seq = max(seqs) + 1 if seqs else 0 # Never append to a file of a previous process
+        return os.path.join(self.directory, f"{self.prefix}-{date}-{seq:05d}.jsonl{COMPRESSION_SUFFIXES[self.compression]}")
+
+
+def sink_files(directory: str = DATA_SINK_DIR, prefix: str = "records") -> list:
+    """Sink files in write order."""
+    return sorted(glob.glob(os.path.join(directory, f"{prefix}-*.jsonl*")))
+
+
+def iter_sink_records(directory: str = DATA_SINK_DIR, prefix: str = "records") -> Iterator[dict]:
+    """
+    Lazily yields every record of the rotated files, oldest first. A file still being
+    written may end mid-way through a compressed block; reading stops there.
+    """
+    paths = sink_files(directory, prefix)
+    for i, path in enumerate(paths):
+        try:
+            with _open_for_read(path) as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        except (EOFError, json.JSONDecodeError) as e:
+            if i < len(paths) - 1: # Expected for the file currently being written
+                logger.warning("jsonl_sink_incomplete_file", path=path, error=str(e))
@@ -0,0 +1,154 @@
+# mental_health_ml/utils/keyword_automaton.py
+import csv
+import json
+from collections import deque
+from typing import Dict, Iterable, List, Tuple
+
+# (keyword, category, (start, end)) with text[start:end] being the matched phrase
+KeywordMatch = Tuple[str, str, Tuple[int, int]]
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def _normalize_char(char: str) -> str:
+    if char.isspace():
+        return " "
+    lowered = char.lower()
+    return lowered if len(lowered) == 1 else char # Keeps one character per input character
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over a keyword lexicon. One left-to-right pass over
+    the text finds every keyword, so matching time depends on the text length
+    (plus the number of matches), not on the number of keywords.
+
+    Matching is case-insensitive, treats any run of whitespace as a single space
+    (so "kill  myself" matches "kill myself"), and only accepts matches that start
+    and end on word boundaries ("sad" does not match inside "crusade").
+    """
+    def __init__(self, lexicon: Dict[str, Iterable[str]] = None):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._own_outputs: List[List[int]] = [[]] # Keyword ids ending exactly at each node
+        self._outputs: List[List[int]] = [[]] # Same, plus those reached through fail links
+        self.keywords: List[Tuple[str, str]] = [] # id -> (keyword, category)
+        self._known = set()
+        self._max_length = 0
+        self._built = True
+        for category, terms in (lexicon or {}).items():
+            for term in terms:
+                self.add(term, category)
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def add(self, keyword: str, category: str):
+        normalized = " ".join("".join(_normalize_char(c) for c in keyword).split())
+        if not normalized or (normalized, category) in self._known:
+            return
+        self._known.add((normalized, category))
+        node = 0
+        for char in normalized:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._own_outputs.append([])
+                self._outputs.append([])
+                self._goto[node][char] = next_node
+            node = next_node
+        self._own_outputs[node].append(len(self.keywords))
+        self.keywords.append((normalized, category))
+        self._max_length = max(self._max_length, len(normalized))
+        self._built = False
+
+    def build(self):
+        """Computes failure links (breadth first). Called automatically before the first search."""
+        queue = deque()
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            self._outputs[child] = list(self._own_outputs[child])
+            queue.append(child)
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                # Keywords ending at the fail target (a proper suffix) also end here
+                self._outputs[child] = self._own_outputs[child] + self._outputs[self._fail[child]]
+        self._built = True
+        return self
+
+    def find(self, text: str, overlapping: bool = False) -> List[KeywordMatch]:
+        """
+        Returns matches in text order. With overlapping=False, a match contained in or
+        overlapping an earlier/longer one is dropped (leftmost-longest).
+        """
+        if not self._built:
+            self.build()
+        if not text or not self.keywords:
+            return []
+        goto, fail, outputs, keywords = self._goto, self._fail, self._outputs, self.keywords
+
+        matches = []
+        # Text positions of the characters consumed by the automaton (whitespace runs count once)
+        consumed = deque(maxlen=self._max_length)
+        node = 0
+        previous_space = True # Leading whitespace is skipped
+        for position, raw_char in enumerate(text):
+            char = _normalize_char(raw_char)
+            if char == " ":
+                if previous_space:
+                    continue
+                previous_space = True
+            else:
+                previous_space = False
+            consumed.append(position)
+
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for keyword_id in outputs[node]:
+                keyword, category = keywords[keyword_id]
+                start = consumed[-len(keyword)]
+                end = position + 1
+                if (start == 0 or not _is_word_char(text[start - 1])) and (end == len(text) or not _is_word_char(text[end])):
+                    matches.append((keyword, category, (start, end)))
+
+        matches.sort(key=lambda m: (m[2][0], -(m[2][1] - m[2][0])))
+        if overlapping:
+            return matches
+        selected, last_end = [], -1
+        for match in matches:
+            if match[2][0] >= last_end:
+                selected.append(match)
+                last_end = match[2][1]
+        return selected
+
+    def find_many(self, texts: Iterable[str], overlapping: bool = False) -> List[List[KeywordMatch]]:
+        return [self.find(text if isinstance(text, str) else "", overlapping) for text in texts]
+
+    @classmethod
+    def from_lexicon_file(cls, path: str) -> "KeywordAutomaton":
+        """
+        Loads an external lexicon: JSON ({"category": ["term", ...]}) or CSV with
+        `term` and `category` columns.
+        """
+        automaton = cls()
+        if path.endswith(".json"):
+            with open(path, "r", encoding="utf-8") as f:
+                for category, terms in json.load(f).items():
+                    for term in terms:
+                        automaton.add(term, category)
+        else:
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                for row in csv.DictReader(f):
+                    automaton.add(row["term"], row["category"])
+        return automaton.build()
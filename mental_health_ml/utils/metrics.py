@@ -0,0 +1,270 @@
+# mental_health_ml/utils/metrics.py
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+# Prometheus text exposition format, as served on /metrics
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Histogram upper bounds. Latencies (seconds) range from cache lookups to text generation.
+DEFAULT_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_labels(key: Iterable[Tuple[str, str]]) -> str:
+    pairs = [f'{k}="{_escape_label_value(v)}"' for k, v in key]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    metric_type = "untyped"
+
+    def __init__(self, name: str, description: str = ""):
+        self.name = name
+        self.description = description
+        self._lock = threading.Lock()
+        self._values: Dict[LabelKey, float] = {}
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(_label_key(labels), 0.0)
+
+    def samples(self) -> Dict[LabelKey, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> List[str]:
+        """Sample lines in the Prometheus text format."""
+        return [f"{self.name}{_format_labels(key)} {_format_value(value)}" for key, value in sorted(self.samples().items())]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, optionally split by labels."""
+    metric_type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only be incremented by non-negative amounts.")
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down (e.g. resident bytes, queue depth)."""
+    metric_type = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[_label_key(labels)] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values (latencies, batch sizes) in fixed buckets,
+    optionally split by labels. observe() is a bisect and three additions under
+    the metric's lock, cheap enough for every request.
+    """
+    metric_type = "histogram"
+
+    def __init__(self, name: str, description: str = "", buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, description)
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [count per bucket..., count above the last bucket, sum]
+        self._series: Dict[LabelKey, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        index = bisect_left(self.buckets, value) # First bucket with value <= upper bound
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def value(self, **labels) -> float:
+        """Number of observations."""
+        with self._lock:
+            series = self._series.get(_label_key(labels))
+            return float(sum(series[:-1])) if series else 0.0
+
+    def samples(self) -> Dict[LabelKey, dict]:
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        return {key: {"count": sum(values[:-1]), "sum": values[-1]} for key, values in series.items()}
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = sorted((key, list(values)) for key, values in self._series.items())
+        lines = []
+        for key, values in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), values[:-1]):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(key + (('le', _format_value(bound)),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(values[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Process-wide collection of named metrics."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _get_or_create(self, metric_cls, name: str, description: str, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = metric_cls(name, description, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, metric_cls):
+                raise ValueError(f"Metric '{name}' already registered as {metric.metric_type}.")
+            return metric
+
+    def counter(self, name: str, description: str = "") -> Counter:
+        return self._get_or_create(Counter, name, description)
+
+    def gauge(self, name: str, description: str = "") -> Gauge:
+        return self._get_or_create(Gauge, name, description)
+
+    def histogram(self, name: str, description: str = "", buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, description, buckets=buckets)
+
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines = []
+        for metric in metrics:
+            if metric.description:
+                lines.append(f"# HELP {metric.name} {_escape_help(metric.description)}")
+            lines.append(f"# TYPE {metric.name} {metric.metric_type}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict:
+        """Returns {metric_name: {label_string: value}} for debugging and tests."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        snapshot = {}
+        for metric in metrics:
+            snapshot[metric.name] = {
+                ",".join(f"{k}={v}" for k, v in key): value
+                for key, value in metric.samples().items()
+            }
+        return snapshot
+
+
+# Shared registry used by the inference components. Always import it as
+# mental_health_ml.utils.metrics: a root-style "utils.metrics" import is a second
+# module with its own registry, which /metrics would not export.
+REGISTRY = MetricsRegistry()
+
+# Shared instruments for the inference pipeline
+STAGE_LATENCY = REGISTRY.histogram("inference_stage_duration_seconds", "Wall time of pipeline stages (tokenization, model forward, post-processing, DB calls, cache lookups)")
+STAGE_ERRORS = REGISTRY.counter("inference_stage_errors_total", "Exceptions raised inside timed pipeline stages")
+QUEUE_WAIT = REGISTRY.histogram("inference_queue_wait_seconds", "Time work waited for a worker (e.g. a threadpool thread) before starting")
+BATCH_SIZE = REGISTRY.histogram("inference_batch_size", "Items per model call", buckets=BATCH_SIZE_BUCKETS)
+
+# Per-request stage trace: while it holds a list (see utils/profiling.request_trace), every
+# timed() stage in the request appends (labels, start, seconds) to it. Threadpool calls and
+# tasks inherit the context, so they append to the same list.
+STAGE_TRACE: contextvars.ContextVar = contextvars.ContextVar("stage_trace", default=None)
+
+
+class timed:
+    """
+    Records the wall time of a pipeline stage in STAGE_LATENCY (and exceptions in
+    STAGE_ERRORS), labelled with stage and any extra labels (model=..., op=...).
+    Works as a context manager or as a decorator (sync or async functions):
+        with timed("forward", model="emotion"):
+            outputs = model(**inputs)
+
+        @timed("db", op="get_user")
+        def get_user(db, username): ...
+    Keep label values low-cardinality (no user ids or message text).
+    """
+    __slots__ = ("labels", "_start")
+
+    def __init__(self, stage: str, **labels):
+        self.labels = {"stage": stage, **labels}
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self._start
+        STAGE_LATENCY.observe(elapsed, **self.labels)
+        trace = STAGE_TRACE.get()
+        if trace is not None:
+            trace.append((self.labels, self._start, elapsed))
+        if exc_type is not None:
+            STAGE_ERRORS.inc(error=exc_type.__name__, **self.labels)
+        return False
+
+    def __call__(self, fn):
+        labels = dict(self.labels)
+        stage = labels.pop("stage")
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with timed(stage, **labels):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timed(stage, **labels): # A fresh timer per call, so concurrent calls do not share state
+                return fn(*args, **kwargs)
+        return wrapper
+
+
+def track_queue_wait(fn, queue: str, **labels):
+    """
+    Wraps fn so that the time from this call until fn starts running is recorded in
+    QUEUE_WAIT, e.g. run_in_threadpool(track_queue_wait(model_call, "threadpool"), text).
+    """
+    enqueued = time.perf_counter()
+
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        QUEUE_WAIT.observe(time.perf_counter() - enqueued, queue=queue, **labels)
+        return fn(*args, **kwargs)
+    return run
@@ -1,23 +1,70 @@
 # utils/model_manager.py
 import torch
 import os
+import sys
 import logging
-from typing import Dict, Any
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Optional
 import pickle
 from datetime import datetime
 
+from mental_health_ml.utils.single_flight import SingleFlight
+from mental_health_ml.utils.metrics import REGISTRY, timed
+
+# RAM budget for resident models, in MB. 0 (or unset) means unlimited.
+MODEL_MEMORY_BUDGET_ENV = "MODEL_MEMORY_BUDGET_MB"
+
+RESIDENT_BYTES = REGISTRY.gauge("model_manager_resident_bytes", "Approximate bytes held by resident models")
+RESIDENT_MODELS = REGISTRY.gauge("model_manager_resident_models", "Number of resident models")
+MODEL_LOADS = REGISTRY.counter("model_manager_loads_total", "Model loads (including reloads after eviction)")
+MODEL_HITS = REGISTRY.counter("model_manager_hits_total", "Requests served by an already resident model")
+MODEL_EVICTIONS = REGISTRY.counter("model_manager_evictions_total", "Models evicted to stay within the memory budget")
+
+
+def estimate_model_size(model) -> int:
+    """
+    Approximate in-memory size of a model in bytes.
+    PyTorch modules (and Hugging Face pipelines wrapping one) are measured from
+    their parameters and buffers; anything else falls back to its pickled size.
+    """
+    torch_module = model
+    if not isinstance(model, torch.nn.Module) and isinstance(getattr(model, "model", None), torch.nn.Module):
+        torch_module = model.model  # transformers.Pipeline
+
+    if isinstance(torch_module, torch.nn.Module):
+        size = sum(p.numel() * p.element_size() for p in torch_module.parameters())
+        size += sum(b.numel() * b.element_size() for b in torch_module.buffers())
+        return int(size)
+
+    try:
+        return len(pickle.dumps(model))
+    except Exception:
+        return sys.getsizeof(model)
+
+
+def _budget_from_env() -> Optional[int]:
+    budget_mb = float(os.getenv(MODEL_MEMORY_BUDGET_ENV, "0") or 0)
+    return int(budget_mb * 1024 * 1024) if budget_mb > 0 else None
+
+
 class ModelManager:
-    def __init__(self, models_dir="models"):
+    def __init__(self, models_dir="models", memory_budget_bytes: Optional[int] = None):
         self.models_dir = models_dir
-        self.loaded_models = {}
+        self.loaded_models = OrderedDict() # Least recently used first
+        self.model_sizes = {}
+        self.pinned_models = set()
         self.model_metadata = {}
+        self.memory_budget_bytes = memory_budget_bytes if memory_budget_bytes is not None else _budget_from_env()
         self.logger = logging.getLogger(__name__)
-        
+        self._lock = threading.RLock()
+        self._loads = SingleFlight()
+
     def save_model(self, model, model_name: str, metadata: Dict[str, Any] = None):
         """Save a model with metadata"""
         model_path = os.path.join(self.models_dir, model_name)
         os.makedirs(model_path, exist_ok=True)
-        
+
         # Save model state
         if hasattr(model, 'state_dict'):
             torch.save(model.state_dict(), os.path.join(model_path, "model.pt"))
@@ -25,37 +72,40 @@ class ModelManager:
             # For sklearn models or other types
             with open(os.path.join(model_path, "model.pkl"), 'wb') as f:
                 pickle.dump(model, f)
-        
+
         # Save metadata
         if metadata is None:
             metadata = {}
         metadata['saved_at'] = datetime.now().isoformat()
         metadata['model_type'] = type(model).__name__
-        
+
         with open(os.path.join(model_path, "metadata.json"), 'w') as f:
             import json
             json.dump(metadata, f, indent=2)
-        
+
         self.logger.info(f"Model {model_name} saved successfully")
-        
+
     def load_model(self, model_class, model_name: str):
-        """Load a model from disk"""
+        """Load a model from disk (or return it if already resident)"""
+        return self.get_or_load(model_name, lambda: self._load_from_disk(model_class, model_name))
+
+    def _load_from_disk(self, model_class, model_name: str):
         model_path = os.path.join(self.models_dir, model_name)
-        
+
         if not os.path.exists(model_path):
             raise FileNotFoundError(f"Model {model_name} not found at {model_path}")
-        
+
         # Load metadata
         metadata_path = os.path.join(model_path, "metadata.json")
         if os.path.exists(metadata_path):
             with open(metadata_path, 'r') as f:
                 import json
                 self.model_metadata[model_name] = json.load(f)
-        
+
         # Load model
         pt_path = os.path.join(model_path, "model.pt")
         pkl_path = os.path.join(model_path, "model.pkl")
-        
+
         if os.path.exists(pt_path):
             # PyTorch model
             model = model_class()
@@ -67,11 +117,118 @@ class ModelManager:
                 model = pickle.load(f)
         else:
             raise FileNotFoundError(f"No model file found for {model_name}")
-        
-        self.loaded_models[model_name] = model
-        self.logger.info(f"Model {model_name} loaded successfully")
+
+        return model
+
+    def get_or_load(self, model_name: str, loader: Callable[[], Any], pinned: bool = False):
+        """
+        Returns the resident model registered under model_name, calling loader()
+        to (re)load it if it is not resident. Concurrent requests for the same
+        missing model share a single load. Pinned models are never evicted.
+        """
+        with timed("cache_lookup", model="model_manager"), self._lock:
+            if model_name in self.loaded_models:
+                self.loaded_models.move_to_end(model_name)
+                MODEL_HITS.inc(model=model_name)
+                return self.loaded_models[model_name]
+
+        with timed("model_load", model=model_name):
+            model, _ = self._loads.do(model_name, self._load_and_register, model_name, loader, pinned)
+        return model
+
+    def _load_and_register(self, model_name: str, loader: Callable[[], Any], pinned: bool):
+        with self._lock:
+            # Another thread may have finished loading just before we became leader
+            if model_name in self.loaded_models:
+                self.loaded_models.move_to_end(model_name)
+                return self.loaded_models[model_name]
+
+        model = loader()
+        size = estimate_model_size(model)
+
+        with self._lock:
+            self.loaded_models[model_name] = model
+            self.model_sizes[model_name] = size
+            if pinned:
+                self.pinned_models.add(model_name)
+            MODEL_LOADS.inc(model=model_name)
+            self._evict_to_budget(keep=model_name)
+            self._update_residency_metrics()
+
+        self.logger.info(f"Model {model_name} loaded successfully (~{size / 1024 / 1024:.1f} MB)")
         return model
-        
+
+    def _evict_to_budget(self, keep: str):
+        """Evicts least recently used, unpinned models until within budget. Caller holds the lock."""
+        if self.memory_budget_bytes is None:
+            return
+        for candidate in list(self.loaded_models.keys()):
+            if self.resident_bytes() <= self.memory_budget_bytes:
+                break
+            if candidate == keep or candidate in self.pinned_models:
+                continue
+            self._remove(candidate)
+            MODEL_EVICTIONS.inc(model=candidate)
+            self.logger.info(f"Evicted model {candidate} to stay within memory budget")
+
+        if self.resident_bytes() > self.memory_budget_bytes:
+            self.logger.warning(
+                f"Resident models use {self.resident_bytes()} bytes, above the budget of "
+                f"{self.memory_budget_bytes} bytes, but nothing else can be evicted."
+            )
+
+    def _remove(self, model_name: str):
+        self.loaded_models.pop(model_name, None)
+        self.model_sizes.pop(model_name, None)
+        self.pinned_models.discard(model_name)
+
+    def unload_model(self, model_name: str) -> bool:
+        """Drops a model from memory. It will be reloaded on next use."""
+        with self._lock:
+            if model_name not in self.loaded_models:
+                return False
+            self._remove(model_name)
+            self._update_residency_metrics()
+        self.logger.info(f"Model {model_name} unloaded")
+        return True
+
+    def resident_bytes(self) -> int:
+        with self._lock:
+            return sum(self.model_sizes.values())
+
+    def _update_residency_metrics(self):
+        RESIDENT_BYTES.set(self.resident_bytes())
+        RESIDENT_MODELS.set(len(self.loaded_models))
+
+    def get_residency_stats(self) -> dict:
+        """Snapshot of resident models, their sizes and the LRU order."""
+        with self._lock:
+            return {
+                "memory_budget_bytes": self.memory_budget_bytes,
+                "resident_bytes": self.resident_bytes(),
+                "models": [
+                    {
+                        "name": name,
+                        "size_bytes": self.model_sizes.get(name, 0),
+                        "pinned": name in self.pinned_models,
+                    }
+                    for name in self.loaded_models # LRU order, least recent first
+                ],
+            }
+
     def get_model_info(self, model_name: str):
         """Get metadata for a model"""
-        return self.model_metadata.get(model_name, {})
\ No newline at end of file
+        return self.model_metadata.get(model_name, {})
+
+
+_default_manager = None
+_default_manager_lock = threading.Lock()
+
+def get_model_manager() -> ModelManager:
+    """Process-wide model manager shared by the inference modules."""
+    global _default_manager
+    if _default_manager is None:
+        with _default_manager_lock:
+            if _default_manager is None:
+                _default_manager = ModelManager()
+    return _default_manager
@@ -0,0 +1,135 @@
+# mental_health_ml/utils/profiling.py
+import hmac
+import os
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import List, Optional
+
+from mental_health_ml.utils.metrics import STAGE_TRACE
+
+# Opt-in profiling surface for live workers. Everything here is off unless
+# PROFILING_TOKEN is set; requests must then present the token:
+#   POST /admin/profile?seconds=10 with "X-Profiling-Token: <token>"
+#       samples every thread's stack and returns collapsed stacks ("frame;frame;frame count"
+#       per line), readable by flamegraph.pl, speedscope and inferno
+#   any request with "X-Debug-Trace: <token>"
+#       gets a Server-Timing header with the timed() model stages of that request
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+PROFILING_MAX_SECONDS = float(os.getenv("PROFILING_MAX_SECONDS", "30"))
+PROFILING_MIN_INTERVAL_MS = 1.0 # Below this the sampler itself starts to cost the worker real CPU
+PROFILING_MAX_DEPTH = 128
+PROFILING_TOKEN_HEADER = "x-profiling-token"
+DEBUG_TRACE_HEADER = "x-debug-trace"
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a profile is requested while another one is running."""
+
+
+def profiling_authorized(token: Optional[str]) -> bool:
+    # Compared as bytes: compare_digest raises TypeError on non-ASCII str, which a header can carry
+    return (bool(PROFILING_TOKEN) and token is not None
+            and hmac.compare_digest(token.encode("utf-8", "surrogatepass"), PROFILING_TOKEN.encode("utf-8", "surrogatepass")))
+
+
+class StackSampler:
+    """
+    Statistical profiler: a daemon thread that wakes every interval, reads the
+    current frame of every other thread (sys._current_frames) and counts the
+    stacks. Nothing is installed in the profiled threads, so the overhead is one
+    stack walk per thread per interval, and stopping leaves no trace behind.
+    Frames are function-level ("name (file.py:def_line)"), rooted at the thread name.
+    """
+    def __init__(self, interval: float = 0.01, max_depth: int = PROFILING_MAX_DEPTH):
+        self.interval = max(interval, PROFILING_MIN_INTERVAL_MS / 1000.0)
+        self.max_depth = max_depth
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sample_once(self):
+        own_id = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stack.append(names.get(thread_id, f"thread-{thread_id}").replace(" ", "_"))
+            self.counts[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample_once()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.counts.most_common())
+
+
+_profile_lock = threading.Lock()
+
+
+@contextmanager
+def sampling_profile(seconds: float, interval_ms: float = 10.0):
+    """
+    Runs a StackSampler while the block executes (one profile per process at a
+    time; ProfilerBusyError otherwise). The caller bounds the duration, e.g.
+        with sampling_profile(seconds) as sampler:
+            await asyncio.sleep(seconds)
+    seconds is only validated here: at most PROFILING_MAX_SECONDS.
+    """
+    if not 0 < seconds <= PROFILING_MAX_SECONDS:
+        raise ValueError(f"seconds must be in (0, {PROFILING_MAX_SECONDS:g}]")
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusyError("A profile is already running on this worker")
+    sampler = StackSampler(interval=interval_ms / 1000.0)
+    try:
+        sampler.start()
+        yield sampler
+    finally:
+        sampler.stop()
+        _profile_lock.release()
+
+
+@contextmanager
+def request_trace():
+    """Collects the timed() stages run in this context (including threadpool calls and tasks it starts)."""
+    trace: List = []
+    token = STAGE_TRACE.set(trace)
+    try:
+        yield trace
+    finally:
+        STAGE_TRACE.reset(token)
+
+
+def server_timing_header(trace: List, total_seconds: float = None) -> str:
+    """
+    Formats a stage trace as a Server-Timing header value, in start order:
+        forward;dur=31.2;desc="model=emotion", ..., total;dur=120.5
+    """
+    entries = []
+    for labels, _, seconds in sorted(trace, key=lambda item: item[1]):
+        labels = dict(labels)
+        stage = labels.pop("stage")
+        description = ",".join(f"{key}={value}" for key, value in labels.items()).replace('"', "'")
+        entries.append(f'{stage};dur={seconds * 1000:.1f}' + (f';desc="{description}"' if description else ""))
+    if total_seconds is not None:
+        entries.append(f"total;dur={total_seconds * 1000:.1f}")
+    return ", ".join(entries)
@@ -0,0 +1,66 @@
+# mental_health_ml/utils/session_store.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLSessionStore:
+    """
+    Bounded in-memory store for per-session state.
+
+    Entries expire ttl_seconds after their last access, and once max_entries is
+    reached the least recently used entry is dropped. All operations are O(1)
+    (amortised), so the store can sit on the request path.
+    """
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 3600.0, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, list]" = OrderedDict() # key -> [value, last_access]
+
+    def _expire(self, now: float):
+        # Entries are kept in access order, so expired ones are always at the front
+        while self._entries:
+            key, (_, last_access) = next(iter(self._entries.items()))
+            if now - last_access < self.ttl_seconds:
+                break
+            self._entries.popitem(last=False)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            now = self._clock()
+            self._expire(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry[1] = now
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """Returns the state for key, creating it with factory() if absent or expired."""
+        with self._lock:
+            now = self._clock()
+            self._expire(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = [factory(), now]
+                self._entries[key] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            else:
+                entry[1] = now
+                self._entries.move_to_end(key)
+            return entry[0]
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            return entry[0] if entry else None
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire(self._clock())
+            return len(self._entries)
@@ -0,0 +1,118 @@
+# mental_health_ml/utils/single_flight.py
+import copy
+import functools
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from mental_health_ml.utils.metrics import REGISTRY
+
+COALESCED_CALLS = REGISTRY.counter(
+    "single_flight_calls_total",
+    "Calls to coalesced model entry points, by role: leader (ran the model), follower (shared a leader's result) or uncoalesced"
+)
+
+
+class _Call:
+    """An in-flight computation that followers can wait on."""
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls that share a key into a single execution.
+
+    The first caller for a key (the "leader") runs the function; callers that
+    arrive while it is still running block until it finishes and receive the
+    same result (or the same exception). Once the call completes the key is
+    forgotten, so later calls trigger a fresh execution.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Tuple[Any, bool]:
+        """
+        Runs fn(*args, **kwargs) once per concurrent group of callers for key.
+        Returns:
+            tuple: (result, is_leader) where is_leader is True for the caller
+                   that actually executed fn.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.followers += 1
+                is_leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                is_leader = True
+
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, False
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result, True
+
+    def in_flight(self) -> int:
+        """Number of keys currently being computed."""
+        with self._lock:
+            return len(self._calls)
+
+
+def _freeze(value):
+    """Hashable form of call arguments (dicts, lists and sets become tuples/frozensets)."""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, set):
+        return frozenset(_freeze(item) for item in value)
+    return value
+
+
+def coalesce(name: str):
+    """
+    Decorator for model entry points: concurrent calls with equal arguments share
+    one execution (see SingleFlight), e.g. the chat pipeline and the themer scoring
+    the same message, or a client retry arriving while the first call still runs.
+    Each caller gets its own copy of the result, so callers may modify it. Calls
+    whose arguments cannot be hashed run on their own.
+    """
+    def decorate(fn: Callable) -> Callable:
+        flight = SingleFlight()
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (_freeze(args), _freeze(kwargs))
+            try:
+                hash(key)
+            except TypeError:
+                COALESCED_CALLS.inc(model=name, role="uncoalesced")
+                return fn(*args, **kwargs)
+
+            def run():
+                result = fn(*args, **kwargs)
+                return result, copy.deepcopy(result) # Snapshot for followers, untouched by the leader's caller
+
+            (result, snapshot), is_leader = flight.do(key, run)
+            COALESCED_CALLS.inc(model=name, role="leader" if is_leader else "follower")
+            return result if is_leader else copy.deepcopy(snapshot)
+
+        wrapper.single_flight = flight
+        return wrapper
+    return decorate
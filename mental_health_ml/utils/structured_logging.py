@@ -0,0 +1,182 @@
+# mental_health_ml/utils/structured_logging.py
+import atexit
+import hashlib
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from mental_health_ml.utils.metrics import REGISTRY
+
+# Structured logging for the inference hot paths. Modules log an event name plus
+# keyword fields:
+#     logger = get_logger(__name__)
+#     logger.debug("faq_intent_predicted", text=user_message, intent=intent, confidence=0.93)
+# configure_logging() (called once by the app) routes every record through a bounded
+# queue to a background thread, so request threads never block on stdout/stderr.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json") # "json" (one object per line) or "text"
+# Share of DEBUG/INFO records kept per logger (longest matching name prefix wins),
+# e.g. "mental_health_ml.models.chatbot=0.01,mental_health_ml.models.crisis=0.1".
+# WARNING and above are never sampled.
+LOG_SAMPLING = os.getenv("LOG_SAMPLING", "")
+# User-provided text in REDACTED_FIELDS is replaced by its length and a salted hash
+LOG_REDACT_TEXT = os.getenv("LOG_REDACT_TEXT", "1") != "0"
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+REDACTED_FIELDS = frozenset({"text", "message", "user_message", "content", "responses"})
+
+LOG_RECORDS_DROPPED = REGISTRY.counter("log_records_dropped_total", "Log records dropped because the logging queue was full")
+LOG_RECORDS_SAMPLED_OUT = REGISTRY.counter("log_records_sampled_out_total", "DEBUG/INFO log records skipped by sampling")
+
+# Per-process salt: hashes correlate repeated texts within one process, but cannot be
+# matched against a dictionary of known messages
+_REDACTION_SALT = os.urandom(16)
+
+
+def redact(value) -> str:
+    text = value if isinstance(value, str) else json.dumps(value, default=str, sort_keys=True)
+    digest = hashlib.sha256(_REDACTION_SALT + text.encode("utf-8")).hexdigest()[:12]
+    return f"<redacted len={len(text)} hash={digest}>"
+
+
+def parse_sampling(spec: str) -> Dict[str, float]:
+    """"a.b=0.01,c=0.5" -> {"a.b": 0.01, "c": 0.5}"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, rate = item.split("=", 1)
+        rates[name.strip()] = min(max(float(rate), 0.0), 1.0)
+    return rates
+
+
+class LogSampler:
+    def __init__(self, rates: Dict[str, float] = None):
+        self.rates = dict(rates or {})
+        self._cache: Dict[str, float] = {}
+
+    def rate(self, logger_name: str) -> float:
+        rate = self._cache.get(logger_name)
+        if rate is None:
+            matches = [name for name in self.rates if logger_name == name or logger_name.startswith(name + ".")]
+            rate = self.rates[max(matches, key=len)] if matches else 1.0
+            self._cache[logger_name] = rate
+        return rate
+
+    def keep(self, logger_name: str) -> bool:
+        rate = self.rate(logger_name)
+        return rate >= 1.0 or random.random() < rate
+
+
+_sampler = LogSampler(parse_sampling(LOG_SAMPLING))
+
+
+class StructuredLogger(logging.LoggerAdapter):
+    """
+    logger.info("event_name", key=value, ...): keyword arguments become structured
+    fields. Disabled levels and sampled-out records return before a record is built.
+    """
+    _LOGGING_KWARGS = ("exc_info", "stack_info", "stacklevel", "extra")
+
+    def __init__(self, logger: logging.Logger):
+        super().__init__(logger, {})
+
+    def process(self, msg, kwargs):
+        fields = {key: kwargs.pop(key) for key in list(kwargs) if key not in self._LOGGING_KWARGS}
+        kwargs["extra"] = {**(kwargs.get("extra") or {}), "fields": fields}
+        return msg, kwargs
+
+    def log(self, level, msg, *args, **kwargs):
+        if not self.isEnabledFor(level):
+            return
+        if level < logging.WARNING and not _sampler.keep(self.logger.name):
+            LOG_RECORDS_SAMPLED_OUT.inc()
+            return
+        msg, kwargs = self.process(msg, kwargs)
+        self.logger.log(level, msg, *args, **kwargs)
+
+
+def get_logger(name: str) -> StructuredLogger:
+    return StructuredLogger(logging.getLogger(name))
+
+
+class StructuredFormatter(logging.Formatter):
+    """Renders the event and its fields as a JSON line, or as "event key=value ..." text."""
+    def __init__(self, fmt: str = LOG_FORMAT, redact_text: bool = LOG_REDACT_TEXT):
+        super().__init__()
+        self.json = fmt == "json"
+        self.redact_text = redact_text
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = dict(getattr(record, "fields", None) or {})
+        if self.redact_text:
+            for key in REDACTED_FIELDS.intersection(fields):
+                if fields[key] is not None:
+                    fields[key] = redact(fields[key])
+        timestamp = datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds")
+        entry = {"ts": timestamp, "level": record.levelname, "logger": record.name, "event": record.getMessage(), **fields}
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        if self.json:
+            return json.dumps(entry, default=str, ensure_ascii=False)
+        text = " ".join(f"{key}={value}" for key, value in entry.items() if key not in ("ts", "level", "logger", "event", "exc"))
+        line = f"{timestamp} {record.levelname} {record.name} {entry['event']} {text}".rstrip()
+        return f"{line}\n{entry['exc']}" if record.exc_info else line
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Enqueues records for the listener thread; drops (and counts) them when the queue is full."""
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only merges the arguments; formatting (and redaction) happens on the listener thread
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[NonBlockingQueueHandler] = None
+
+
+def configure_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT, sampling: str = LOG_SAMPLING,
+                      redact_text: bool = LOG_REDACT_TEXT, stream=None, queue_size: int = LOG_QUEUE_SIZE):
+    """
+    Installs the queue handler on the root logger and starts the listener thread that
+    writes to stream (default stderr). Calling it again replaces the previous setup.
+    """
+    global _listener, _queue_handler, _sampler
+    shutdown_logging()
+    _sampler = LogSampler(parse_sampling(sampling))
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(StructuredFormatter(fmt, redact_text))
+    log_queue = queue.Queue(maxsize=queue_size)
+    _queue_handler = NonBlockingQueueHandler(log_queue)
+    root = logging.getLogger()
+    root.addHandler(_queue_handler)
+    root.setLevel(level)
+    _listener = logging.handlers.QueueListener(log_queue, output)
+    _listener.start()
+
+
+def shutdown_logging():
+    """Writes out the queued records and removes the handler installed by configure_logging."""
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)